@@ -3,7 +3,7 @@ import asyncio
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from backend.api.auth import get_current_user
 from backend.core import ari_services, db, models, models_ari, services
@@ -97,6 +97,28 @@ class ReportPurgeResponse(BaseModel):
     deleted: dict[str, int]
 
 
+class ReportRollupRebuildRequest(BaseModel):
+    module_key: str | None = None
+
+
+class ReportRollupRebuildResponse(BaseModel):
+    ok: bool
+    rebuilt: dict[str, int]
+
+
+class StockSnapshotCaptureResponse(BaseModel):
+    ok: bool
+    captured: dict[str, int]
+    expiry_radar: dict[str, int] = Field(default_factory=dict)
+    classifications: dict[str, int] = Field(default_factory=dict)
+
+
+class RemiseSyncReconcileResponse(BaseModel):
+    ok: bool
+    synced: int
+    orphans_deleted: int
+
+
 def require_admin(user: models.User = Depends(get_current_user)) -> models.User:
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="Autorisations insuffisantes")
@@ -268,6 +290,38 @@ def purge_reports(payload: ReportPurgeRequest, user: models.User = Depends(requi
     return ReportPurgeResponse(ok=True, module_key=module_key, deleted=deleted)
 
 
+@router.post("/reports/rollups/rebuild", response_model=ReportRollupRebuildResponse)
+def rebuild_report_rollups(
+    payload: ReportRollupRebuildRequest, user: models.User = Depends(require_admin)
+):
+    try:
+        rebuilt = services.rebuild_movement_rollups(payload.module_key)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return ReportRollupRebuildResponse(ok=True, rebuilt=rebuilt)
+
+
+@router.post("/reports/snapshots/capture", response_model=StockSnapshotCaptureResponse)
+def capture_report_snapshots(user: models.User = Depends(require_admin)):
+    captured = services.capture_stock_snapshots()
+    expiry_radar = services.capture_expiry_radar()
+    classifications = services.refresh_item_classifications()
+    return StockSnapshotCaptureResponse(
+        ok=True, captured=captured, expiry_radar=expiry_radar, classifications=classifications
+    )
+
+
+@router.get("/reports/cache", response_model=models.ReportCacheStats)
+def get_report_cache_stats(user: models.User = Depends(require_admin)):
+    return services.get_report_cache_stats()
+
+
+@router.post("/vehicle-inventory/remise-sync", response_model=RemiseSyncReconcileResponse)
+def reconcile_remise_sync(user: models.User = Depends(require_admin)):
+    result = services.reconcile_vehicle_inventory_with_remise()
+    return RemiseSyncReconcileResponse(ok=True, **result)
+
+
 @router.get("/security/settings", response_model=models.SecuritySettings)
 def get_security_settings(user: models.User = Depends(require_admin)) -> models.SecuritySettings:
     config = get_config()
@@ -122,6 +122,23 @@ async def scan_add_dotation(
         raise HTTPException(status_code=status_code, detail=detail) from exc
 
 
+@router.post("/scan_add/batch", response_model=list[models.Dotation], status_code=201)
+async def scan_add_dotations(
+    payload: models.DotationScanAddBatchPayload,
+    user: models.User = Depends(get_current_user),
+) -> list[models.Dotation]:
+    _require_permission(user, DOTATIONS_MODULE_KEY, action="edit")
+    try:
+        return services.scan_add_dotations(
+            employee_id=payload.employee_id,
+            barcodes=payload.barcodes,
+        )
+    except ValueError as exc:
+        detail = str(exc)
+        status_code = 404 if "Aucun article" in detail or "introuvable" in detail else 400
+        raise HTTPException(status_code=status_code, detail=detail) from exc
+
+
 @router.put("/dotations/{dotation_id}", response_model=models.Dotation)
 async def update_dotation(
     dotation_id: int,
@@ -58,13 +58,49 @@ async def find_item_by_barcode(
     return matches[0]
 
 
+@router.post("/by-barcode/batch", response_model=list[models.BarcodeBatchResult])
+async def resolve_barcodes_batch(
+    payload: models.BarcodeBatchResolveRequest,
+    user: models.User = Depends(get_current_user),
+) -> list[models.BarcodeBatchResult]:
+    try:
+        if payload.modules:
+            resolved = [_resolve_barcode_module(module) for module in payload.modules]
+        else:
+            resolved = [
+                _resolve_barcode_module(module) for module in ("clothing", "remise", "pharmacy")
+            ]
+            resolved = [
+                entry
+                for entry in resolved
+                if services.has_module_access(user, entry[0], action="view")
+            ]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if not resolved:
+        raise HTTPException(status_code=403, detail="Autorisations insuffisantes")
+    for module_key, _ in resolved:
+        _require_permission_for_module(user, module_key, action="view")
+    try:
+        return services.resolve_barcodes(
+            payload.codes, [service_module for _, service_module in resolved]
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 @router.get("/", response_model=list[models.Item])
 async def list_items(
     search: str | None = Query(default=None, description="Filtre nom/SKU"),
+    abc: str | None = Query(default=None, description="Classes ABC (ex. A, AB)"),
+    xyz: str | None = Query(default=None, description="Classes XYZ (ex. X, XY)"),
     user: models.User = Depends(get_current_user),
 ) -> list[models.Item]:
     _require_permission(user, action="view")
-    return services.list_items(search)
+    try:
+        return services.list_items(search, abc_class=abc, xyz_class=xyz)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.get("/stats", response_model=models.InventoryStats)
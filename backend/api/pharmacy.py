@@ -30,10 +30,15 @@ def _require_permission(user: models.User, *, action: str) -> None:
 
 @router.get("/", response_model=list[models.PharmacyItem])
 async def list_pharmacy_items(
+    abc: str | None = Query(default=None, description="Classes ABC (ex. A, AB)"),
+    xyz: str | None = Query(default=None, description="Classes XYZ (ex. X, XY)"),
     user: models.User = Depends(get_current_user),
 ) -> list[models.PharmacyItem]:
     _require_permission(user, action="view")
-    return services.list_pharmacy_items()
+    try:
+        return services.list_pharmacy_items(abc_class=abc, xyz_class=xyz)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.post("/", response_model=models.PharmacyItem, status_code=201)
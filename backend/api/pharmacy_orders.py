@@ -1,15 +1,15 @@
 """Routes pour la gestion des bons de commande pharmacie."""
 from __future__ import annotations
 
-import io
+from datetime import date
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response
 
 from backend.api.admin import require_admin
 from backend.api.auth import get_current_user
 from backend.core import db, models, services
-from backend.services.email_sender import EmailSendError
+from backend.services.pdf import purchase_order_cache
 from backend.services.pdf_config import render_filename, resolve_pdf_config
 
 router = APIRouter()
@@ -37,6 +37,41 @@ async def list_orders(
     )
 
 
+@router.get("/summary", response_model=models.PurchaseOrderSummaryPage)
+async def list_order_summaries(
+    status: list[str] | None = Query(None, description="Filtrer par statut"),
+    supplier_id: int | None = Query(None, ge=1),
+    created_from: date | None = Query(None, description="Créés à partir du"),
+    created_to: date | None = Query(None, description="Créés jusqu'au"),
+    auto_created: bool | None = Query(None, description="Bons de commande automatiques"),
+    search: str | None = Query(None, description="Recherche libre (note, fournisseur, article)"),
+    include_archived: bool = Query(False, description="Inclure les bons de commande archivés"),
+    archived_only: bool = Query(False, description="Afficher uniquement les bons de commande archivés"),
+    parent_id: int | None = Query(None, ge=1, description="Demandes de remplacement d'un bon de commande"),
+    cursor: str | None = Query(None, description="Curseur de la page suivante"),
+    limit: int = Query(50, ge=1, le=200),
+    user: models.User = Depends(get_current_user),
+) -> models.PurchaseOrderSummaryPage:
+    _require_permission(user, action="view")
+    try:
+        return services.list_purchase_order_summaries(
+            "pharmacy",
+            statuses=status,
+            supplier_id=supplier_id,
+            created_from=created_from,
+            created_to=created_to,
+            auto_created=auto_created,
+            search=search,
+            include_archived=include_archived,
+            archived_only=archived_only,
+            parent_id=parent_id,
+            cursor=cursor,
+            limit=limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 @router.post("/", response_model=models.PharmacyPurchaseOrderDetail, status_code=201)
 async def create_order(
     payload: models.PharmacyPurchaseOrderCreate,
@@ -65,7 +100,8 @@ async def get_order(
 async def download_order_pdf(
     order_id: int,
     user: models.User = Depends(get_current_user),
-) -> StreamingResponse:
+    if_none_match: str | None = Header(None, alias="If-None-Match"),
+) -> Response:
     _require_permission(user, action="view")
     try:
         order = services.get_pharmacy_purchase_order(order_id)
@@ -75,7 +111,7 @@ async def download_order_pdf(
         resolved = resolve_pdf_config("pharmacy_orders")
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    pdf_bytes = services.generate_pharmacy_purchase_order_pdf(
+    pdf_file = services.get_purchase_order_pdf_file(
         order,
         user=user,
         site_key=db.get_current_site_key(),
@@ -86,11 +122,14 @@ async def download_order_pdf(
         module_title=resolved.module_label,
         context={"order_id": order.id, "ref": order.id},
     )
-    return StreamingResponse(
-        io.BytesIO(pdf_bytes),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
-    )
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "ETag": pdf_file.etag,
+        "Cache-Control": "private, no-cache",
+    }
+    if purchase_order_cache.etag_matches(if_none_match, pdf_file.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=pdf_file.content, media_type="application/pdf", headers=headers)
 
 
 @router.put("/{order_id}", response_model=models.PharmacyPurchaseOrderDetail)
@@ -151,7 +190,11 @@ async def unarchive_order(
         raise HTTPException(status_code=status, detail=message) from exc
 
 
-@router.post("/{order_id}/send-to-supplier", response_model=models.PurchaseOrderSendResponse)
+@router.post(
+    "/{order_id}/send-to-supplier",
+    response_model=models.PurchaseOrderSendResponse,
+    status_code=202,
+)
 async def send_to_supplier(
     order_id: int,
     user: models.User = Depends(get_current_user),
@@ -168,8 +211,6 @@ async def send_to_supplier(
         raise HTTPException(status_code=status_code, detail=str(exc)) from exc
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    except EmailSendError as exc:
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
 
 
 @router.delete("/{order_id}", status_code=204)
@@ -53,6 +53,8 @@ def _validate_modules(modules: Iterable[str], allowed: list[str]) -> list[str]:
 async def list_suggestions(
     status: str | None = None,
     module: str | None = None,
+    abc: str | None = None,
+    xyz: str | None = None,
     user: models.User = Depends(get_current_user),
 ) -> list[models.PurchaseSuggestionDetail]:
     _require_permission(user, action="view")
@@ -63,12 +65,17 @@ async def list_suggestions(
     else:
         module_key = None
     site_key = db.get_current_site_key()
-    return services.list_purchase_suggestions(
-        site_key=site_key,
-        status=status,
-        module_key=module_key,
-        allowed_modules=allowed,
-    )
+    try:
+        return services.list_purchase_suggestions(
+            site_key=site_key,
+            status=status,
+            module_key=module_key,
+            allowed_modules=allowed,
+            abc_class=abc,
+            xyz_class=xyz,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.post("/purchasing/suggestions/refresh")
@@ -87,9 +94,22 @@ async def refresh_suggestions(
         site_key=site_key,
         module_keys=modules,
         created_by=user.username,
+        strategy=payload.strategy,
     )
 
 
+@router.get("/purchasing/forecasts")
+async def list_forecasts(
+    module: str,
+    user: models.User = Depends(get_current_user),
+) -> list[models.ConsumptionForecast]:
+    _require_permission(user, action="view")
+    modules = _validate_modules([module], _allowed_modules(user, action="view"))
+    if not modules:
+        raise HTTPException(status_code=400, detail="Module requis")
+    return services.list_consumption_forecasts(db.get_current_site_key(), modules[0])
+
+
 @router.patch("/purchasing/suggestions/{suggestion_id}")
 async def update_suggestion(
     suggestion_id: int,
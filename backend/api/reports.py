@@ -2,14 +2,12 @@
 from __future__ import annotations
 
 from datetime import date
-from pathlib import Path
-from tempfile import NamedTemporaryFile
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 
 from backend.api.auth import get_current_user
-from backend.core import models, services
+from backend.core import db, models, services, sites
 
 router = APIRouter()
 
@@ -56,10 +54,199 @@ async def overview(
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
+@router.get("/classification", response_model=models.ItemClassificationReport)
+async def classification(
+    module: str = Query(..., description="Module ciblé"),
+    abc: str | None = Query(default=None, description="Classes ABC (ex. A, AB)"),
+    xyz: str | None = Query(default=None, description="Classes XYZ (ex. X, XY)"),
+    user: models.User = Depends(get_current_user),
+) -> models.ItemClassificationReport:
+    if not services.has_module_access(user, module, action="view"):
+        raise HTTPException(status_code=403, detail="Autorisations insuffisantes")
+    try:
+        return services.get_item_classifications(module, abc_class=abc, xyz_class=xyz)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/expiry-radar", response_model=models.ExpiryRadar)
+async def expiry_radar(
+    module: str = Query(default="pharmacy", description="Module ciblé"),
+    include_empty: bool = Query(default=False, description="Inclure les articles sans stock"),
+    user: models.User = Depends(get_current_user),
+) -> models.ExpiryRadar:
+    if not services.has_module_access(user, module, action="view"):
+        raise HTTPException(status_code=403, detail="Autorisations insuffisantes")
+    try:
+        return services.get_expiry_radar(module, include_empty=include_empty)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/expiry-radar/history", response_model=list[models.ExpiryRadarDailyPoint])
+async def expiry_radar_history(
+    start: date = Query(..., description="Date de début"),
+    end: date = Query(..., description="Date de fin"),
+    module: str = Query(default="pharmacy", description="Module ciblé"),
+    user: models.User = Depends(get_current_user),
+) -> list[models.ExpiryRadarDailyPoint]:
+    if not services.has_module_access(user, module, action="view"):
+        raise HTTPException(status_code=403, detail="Autorisations insuffisantes")
+    try:
+        return services.list_expiry_radar_history(module, start=start, end=end)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _resolve_consolidated_sites(user: models.User, requested: list[str] | None) -> list[str]:
+    allowed = sites.list_accessible_site_keys(user)
+    if not requested:
+        return allowed
+    try:
+        selected = [sites.normalize_site_key(site_key) for site_key in requested]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if any(site_key not in allowed for site_key in selected):
+        raise HTTPException(status_code=403, detail="Autorisations insuffisantes")
+    return [site_key for site_key in selected if site_key]
+
+
+def _require_consolidated_access(
+    user: models.User, modules: list[str], site_keys: list[str]
+) -> None:
+    """Check module access in the context of every site included in a consolidation."""
+
+    for site_key in site_keys:
+        token = db.set_current_site(site_key)
+        try:
+            allowed = all(
+                services.has_module_access(user, module, action="view") for module in modules
+            )
+        finally:
+            db.reset_current_site(token)
+        if not allowed:
+            raise HTTPException(status_code=403, detail="Autorisations insuffisantes")
+
+
+@router.get("/consolidated/overview", response_model=models.ConsolidatedReportOverview)
+def consolidated_overview(
+    module: str = Query(..., description="Module ciblé"),
+    start: date = Query(..., description="Date de début"),
+    end: date = Query(..., description="Date de fin"),
+    bucket: str | None = Query(default=None, description="Granularité (day/week/month)"),
+    include_dotation: bool = Query(default=True, description="Inclure les mouvements de dotation"),
+    include_adjustment: bool = Query(
+        default=True, description="Inclure les mouvements d'ajustement"
+    ),
+    site: list[str] | None = Query(default=None, description="Sites à consolider"),
+    timeout: float = Query(default=10.0, ge=0.1, le=60, description="Délai par site (s)"),
+    user: models.User = Depends(get_current_user),
+) -> models.ConsolidatedReportOverview:
+    site_keys = _resolve_consolidated_sites(user, site)
+    _require_consolidated_access(user, [module], site_keys)
+    try:
+        return services.get_consolidated_reports_overview(
+            module,
+            site_keys=site_keys,
+            start=start,
+            end=end,
+            bucket=bucket,
+            include_dotation=include_dotation,
+            include_adjustment=include_adjustment,
+            timeout_seconds=timeout,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/consolidated/stats", response_model=models.ConsolidatedInventoryStats)
+def consolidated_stats(
+    module: str = Query(..., description="Module ciblé"),
+    site: list[str] | None = Query(default=None, description="Sites à consolider"),
+    timeout: float = Query(default=10.0, ge=0.1, le=60, description="Délai par site (s)"),
+    user: models.User = Depends(get_current_user),
+) -> models.ConsolidatedInventoryStats:
+    site_keys = _resolve_consolidated_sites(user, site)
+    _require_consolidated_access(user, [module], site_keys)
+    try:
+        return services.get_consolidated_inventory_stats(
+            module, site_keys=site_keys, timeout_seconds=timeout
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _resolve_dashboard_modules(user: models.User, requested: list[str] | None) -> list[str]:
+    candidates = requested or list(services.DASHBOARD_MODULES)
+    allowed = [
+        module for module in candidates if services.has_module_access(user, module, action="view")
+    ]
+    if not allowed or (requested and len(allowed) != len(requested)):
+        raise HTTPException(status_code=403, detail="Autorisations insuffisantes")
+    return allowed
+
+
+@router.get("/dashboard", response_model=models.DashboardStats)
+def dashboard(
+    module: list[str] | None = Query(default=None, description="Modules ciblés"),
+    user: models.User = Depends(get_current_user),
+) -> models.DashboardStats:
+    modules = _resolve_dashboard_modules(user, module)
+    try:
+        return services.get_dashboard_stats(modules)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/consolidated/dashboard", response_model=models.ConsolidatedDashboardStats)
+def consolidated_dashboard(
+    module: list[str] | None = Query(default=None, description="Modules ciblés"),
+    site: list[str] | None = Query(default=None, description="Sites à consolider"),
+    timeout: float = Query(default=10.0, ge=0.1, le=60, description="Délai par site (s)"),
+    user: models.User = Depends(get_current_user),
+) -> models.ConsolidatedDashboardStats:
+    modules = _resolve_dashboard_modules(user, module)
+    site_keys = _resolve_consolidated_sites(user, site)
+    _require_consolidated_access(user, modules, site_keys)
+    try:
+        return services.get_consolidated_dashboard_stats(
+            modules, site_keys=site_keys, timeout_seconds=timeout
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
 @router.get("/export/csv")
-async def export_csv(user: models.User = Depends(get_current_user)) -> FileResponse:
+def export_csv(user: models.User = Depends(get_current_user)) -> StreamingResponse:
     _require_permission(user, action="view")
-    with NamedTemporaryFile(delete=False, suffix=".csv") as tmp:
-        path = Path(tmp.name)
-    services.export_items_to_csv(path)
-    return FileResponse(path, filename="inventaire.csv", media_type="text/csv")
+    return StreamingResponse(
+        services.iter_items_csv(db.get_current_site_key()),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="inventaire.csv"'},
+    )
+
+
+@router.get("/export/{dataset}")
+def export_dataset(
+    dataset: str,
+    module: str | None = Query(default=None, description="Module ciblé"),
+    format: str = Query(default="csv", description="Format (csv/ndjson/parquet)"),
+    user: models.User = Depends(get_current_user),
+) -> StreamingResponse:
+    try:
+        resolved = services.resolve_export_dataset(dataset, module)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if not services.has_module_access(user, resolved.permission_module, action="view"):
+        raise HTTPException(status_code=403, detail="Autorisations insuffisantes")
+    try:
+        export = services.open_export_stream(
+            resolved, format, site_key=db.get_current_site_key()
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return StreamingResponse(
+        export.chunks,
+        media_type=export.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{export.filename}"'},
+    )
@@ -0,0 +1,92 @@
+"""Routes pour les sessions d'inventaire physique."""
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from backend.api.auth import get_current_user
+from backend.core import models, services
+
+router = APIRouter()
+
+
+def _require_permission(user: models.User, module: str, *, action: str) -> None:
+    if not services.has_module_access(user, module, action=action):
+        raise HTTPException(status_code=403, detail="Autorisations insuffisantes")
+
+
+def _get_session_or_404(session_id: int) -> models.StocktakeSession:
+    try:
+        return services.get_stocktake_session(session_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@router.get("/sessions", response_model=list[models.StocktakeSession])
+async def list_stocktake_sessions(
+    module: str = Query(..., description="Module inventorié"),
+    user: models.User = Depends(get_current_user),
+) -> list[models.StocktakeSession]:
+    _require_permission(user, module, action="view")
+    try:
+        return services.list_stocktake_sessions(module)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.post("/sessions", response_model=models.StocktakeSession, status_code=201)
+async def create_stocktake_session(
+    payload: models.StocktakeSessionCreate,
+    user: models.User = Depends(get_current_user),
+) -> models.StocktakeSession:
+    _require_permission(user, payload.module, action="edit")
+    try:
+        return services.create_stocktake_session(payload, user)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/sessions/{session_id}", response_model=models.StocktakeSession)
+async def get_stocktake_session(
+    session_id: int,
+    user: models.User = Depends(get_current_user),
+) -> models.StocktakeSession:
+    session = _get_session_or_404(session_id)
+    _require_permission(user, session.module, action="view")
+    return session
+
+
+@router.post("/sessions/{session_id}/counts", response_model=models.StocktakeUploadResult)
+async def upload_stocktake_counts(
+    session_id: int,
+    payload: models.StocktakeCountUpload,
+    user: models.User = Depends(get_current_user),
+) -> models.StocktakeUploadResult:
+    session = _get_session_or_404(session_id)
+    _require_permission(user, session.module, action="edit")
+    try:
+        return services.upload_stocktake_counts(session_id, payload)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.get("/sessions/{session_id}/variances", response_model=list[models.StocktakeVariance])
+async def list_stocktake_variances(
+    session_id: int,
+    user: models.User = Depends(get_current_user),
+) -> list[models.StocktakeVariance]:
+    session = _get_session_or_404(session_id)
+    _require_permission(user, session.module, action="view")
+    return services.list_stocktake_variances(session_id)
+
+
+@router.post("/sessions/{session_id}/reconcile", response_model=models.StocktakeReconcileResult)
+async def reconcile_stocktake_session(
+    session_id: int,
+    user: models.User = Depends(get_current_user),
+) -> models.StocktakeReconcileResult:
+    session = _get_session_or_404(session_id)
+    _require_permission(user, session.module, action="edit")
+    try:
+        return services.reconcile_stocktake_session(session_id, user)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
@@ -64,10 +64,15 @@ def _require_permission(user: models.User, *, action: str) -> None:
 @router.get("/", response_model=list[models.Item])
 async def list_vehicle_items(
     search: str | None = Query(default=None, description="Filtre nom/SKU"),
+    abc: str | None = Query(default=None, description="Classes ABC (ex. A, AB)"),
+    xyz: str | None = Query(default=None, description="Classes XYZ (ex. X, XY)"),
     user: models.User = Depends(get_current_user),
 ) -> list[models.Item]:
     _require_permission(user, action="view")
-    return services.list_vehicle_items(search)
+    try:
+        return services.list_vehicle_items(search, abc_class=abc, xyz_class=xyz)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
 
 
 @router.get("/library", response_model=list[models.VehicleLibraryItem])
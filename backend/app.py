@@ -22,6 +22,7 @@ from backend.api import (
     link_categories,
     pharmacy,
     stock,
+    stocktake,
     pharmacy_orders,
     remise_orders,
     purchase_orders,
@@ -61,7 +62,13 @@ from backend.core.services import (
 from backend.core import two_factor_crypto
 from backend.core.storage import MEDIA_ROOT
 from backend.services.backup_scheduler import backup_scheduler
-from backend.services import notifications
+from backend.services import (
+    auto_purchase_orders,
+    notifications,
+    purchase_order_archive,
+    purchase_suggestion_refresh,
+    stock_snapshots,
+)
 from backend.services.pdf.vehicle_inventory.playwright_support import (
     PLAYWRIGHT_OK,
     maybe_install_chromium_on_startup,
@@ -97,11 +104,19 @@ async def _lifespan(app: FastAPI):
     await backup_scheduler.reload_from_db()
     await backup_scheduler.start()
     notifications.start_outbox_worker(app)
+    stock_snapshots.start_snapshot_worker(app)
+    auto_purchase_orders.start_auto_purchase_order_worker(app)
+    purchase_suggestion_refresh.start_purchase_suggestion_refresh_worker(app)
+    purchase_order_archive.start_purchase_order_archive_worker(app)
     try:
         yield
     finally:
         await backup_scheduler.stop()
         await notifications.shutdown_outbox_worker(app)
+        await stock_snapshots.shutdown_snapshot_worker(app)
+        await auto_purchase_orders.shutdown_auto_purchase_order_worker(app)
+        await purchase_suggestion_refresh.shutdown_purchase_suggestion_refresh_worker(app)
+        await purchase_order_archive.shutdown_purchase_order_archive_worker(app)
 
 
 app = FastAPI(title="Gestion Stock Pro API", version="2.0.0", lifespan=_lifespan)
@@ -127,6 +142,7 @@ app.include_router(suppliers.router, prefix="/suppliers", tags=["suppliers"])
 app.include_router(dotations.router, prefix="/dotations", tags=["dotations"])
 app.include_router(pharmacy.router, prefix="/pharmacy", tags=["pharmacy"])
 app.include_router(stock.router, prefix="/stock", tags=["stock"])
+app.include_router(stocktake.router, prefix="/stocktake", tags=["stocktake"])
 app.include_router(purchase_orders.router, prefix="/purchase-orders", tags=["purchase-orders"])
 app.include_router(
     purchase_orders.router,
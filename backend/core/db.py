@@ -151,6 +151,13 @@ def get_stock_db_path(site_key: str | None = None) -> Path:
     return get_site_db_path(resolved_key)
 
 
+def get_stock_archive_db_path(site_key: str | None = None) -> Path:
+    """Return the cold storage database kept next to the stock database of a site."""
+
+    stock_path = get_stock_db_path(site_key)
+    return stock_path.with_name(f"{stock_path.stem}_archive{stock_path.suffix}")
+
+
 def get_ari_db_path(site_slug: str) -> str:
     normalized = (site_slug or DEFAULT_SITE_KEY).strip().upper()
     if normalized not in SITE_KEYS:
@@ -641,7 +648,15 @@ def _init_core_database() -> None:
                 sent_at TEXT,
                 send_attempts INTEGER NOT NULL DEFAULT 0,
                 last_error TEXT,
-                priority INTEGER NOT NULL DEFAULT 5
+                priority INTEGER NOT NULL DEFAULT 5,
+                reply_to TEXT,
+                attachments_json TEXT,
+                purpose TEXT,
+                meta_json TEXT,
+                max_attempts INTEGER,
+                failed_at TEXT,
+                claimed_at TEXT,
+                claim_token TEXT
             );
             CREATE INDEX IF NOT EXISTS idx_outbox_sent_at
             ON email_outbox(sent_at);
@@ -671,7 +686,8 @@ def _init_core_database() -> None:
                 user_email TEXT,
                 status TEXT NOT NULL CHECK(status IN ('sent','failed')),
                 message_id TEXT,
-                error_message TEXT
+                error_message TEXT,
+                tracking_id INTEGER
             );
             CREATE TABLE IF NOT EXISTS purchase_order_audit_log (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -692,6 +708,8 @@ def _init_core_database() -> None:
             """
         )
         _ensure_user_page_layouts_schema(conn)
+        _ensure_email_outbox_columns(conn)
+        _ensure_column(conn, "purchase_order_email_log", "tracking_id", "tracking_id INTEGER")
         default_paths = get_default_site_db_paths()
         for site_key in SITE_KEYS:
             conn.execute(
@@ -724,6 +742,17 @@ def _init_core_database() -> None:
         conn.commit()
 
 
+def _ensure_email_outbox_columns(conn: sqlite3.Connection) -> None:
+    _ensure_column(conn, "email_outbox", "reply_to", "reply_to TEXT")
+    _ensure_column(conn, "email_outbox", "attachments_json", "attachments_json TEXT")
+    _ensure_column(conn, "email_outbox", "purpose", "purpose TEXT")
+    _ensure_column(conn, "email_outbox", "meta_json", "meta_json TEXT")
+    _ensure_column(conn, "email_outbox", "max_attempts", "max_attempts INTEGER")
+    _ensure_column(conn, "email_outbox", "failed_at", "failed_at TEXT")
+    _ensure_column(conn, "email_outbox", "claimed_at", "claimed_at TEXT")
+    _ensure_column(conn, "email_outbox", "claim_token", "claim_token TEXT")
+
+
 def _migrate_user_layouts_to_core(core_conn: sqlite3.Connection) -> None:
     row = core_conn.execute("SELECT COUNT(*) AS count FROM user_page_layouts").fetchone()
     if row and row["count"]:
@@ -746,6 +746,56 @@ class InventoryStats(BaseModel):
     stockouts: int
 
 
+class StocktakeSessionCreate(BaseModel):
+    module: str = Field(..., min_length=1, max_length=64)
+    note: Optional[str] = Field(default=None, max_length=256)
+
+
+class StocktakeSession(BaseModel):
+    id: int
+    module: str
+    status: str
+    note: Optional[str] = None
+    created_by: Optional[str] = None
+    created_at: datetime
+    reconciled_at: Optional[datetime] = None
+    reconciled_by: Optional[str] = None
+    counted_items: int = 0
+    adjusted_items: int = 0
+
+
+class StocktakeCountLine(BaseModel):
+    item_id: Optional[int] = Field(default=None, gt=0)
+    barcode: Optional[str] = Field(default=None, max_length=64)
+    quantity: int = Field(..., ge=0)
+
+
+class StocktakeCountUpload(BaseModel):
+    device_id: Optional[str] = Field(default=None, max_length=64)
+    accumulate: bool = False
+    lines: list[StocktakeCountLine] = Field(..., min_length=1, max_length=20000)
+
+
+class StocktakeUploadResult(BaseModel):
+    accepted: int
+    unresolved: list[str] = Field(default_factory=list)
+
+
+class StocktakeVariance(BaseModel):
+    item_id: int
+    name: str
+    expected_qty: int
+    counted_qty: int
+    delta: int
+
+
+class StocktakeReconcileResult(BaseModel):
+    session: StocktakeSession
+    adjusted_items: int
+    quantity_added: int
+    quantity_removed: int
+
+
 class RemiseLotBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=128)
     description: str | None = Field(default=None, max_length=256)
@@ -945,6 +995,68 @@ class ReportLowStockSeriesPoint(BaseModel):
     count: int = 0
 
 
+class ReportCacheStats(BaseModel):
+    size: int
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class ItemClassification(BaseModel):
+    item_id: int
+    name: str | None = None
+    sku: str | None = None
+    abc_class: Literal["A", "B", "C"]
+    xyz_class: Literal["X", "Y", "Z"]
+    consumption: int = 0
+    consumption_share: float = 0.0
+    cv: float | None = None
+
+
+class ItemClassificationReport(BaseModel):
+    module: str
+    computed_on: date | None = None
+    history_days: int
+    counts: dict[str, int] = Field(default_factory=dict)
+    items: list[ItemClassification] = Field(default_factory=list)
+
+
+class ExpiryRadarItem(BaseModel):
+    item_id: int
+    name: str
+    sku: str | None = None
+    quantity: int = 0
+    expiration_date: date
+    days_left: int
+    lot_count: int = 0
+
+
+class ExpiryRadarBucket(BaseModel):
+    key: Literal["expired", "lt_7d", "lt_30d", "lt_90d"]
+    label: str
+    count: int = 0
+    quantity: int = 0
+    items: list[ExpiryRadarItem] = Field(default_factory=list)
+
+
+class ExpiryRadar(BaseModel):
+    module: str
+    generated_on: date
+    buckets: list[ExpiryRadarBucket] = Field(default_factory=list)
+
+
+class ExpiryRadarDailyPoint(BaseModel):
+    day: date
+    counts: dict[str, int] = Field(default_factory=dict)
+    quantities: dict[str, int] = Field(default_factory=dict)
+
+
+class ReportStockSeriesPoint(BaseModel):
+    t: str
+    quantity: int = 0
+
+
 class ReportOrderSeriesPoint(BaseModel):
     t: str
     created: int = 0
@@ -958,6 +1070,7 @@ class ReportSeries(BaseModel):
     moves: list[ReportMoveSeriesPoint] = Field(default_factory=list)
     net: list[ReportNetSeriesPoint] = Field(default_factory=list)
     low_stock: list[ReportLowStockSeriesPoint] = Field(default_factory=list)
+    stock: list[ReportStockSeriesPoint] = Field(default_factory=list)
     orders: list[ReportOrderSeriesPoint] = Field(default_factory=list)
 
 
@@ -990,6 +1103,36 @@ class ReportOverview(BaseModel):
     data_quality: ReportDataQuality
 
 
+class ReportSiteStatus(BaseModel):
+    site_key: str
+    status: Literal["ok", "error", "timeout"]
+    elapsed_ms: int = 0
+    detail: Optional[str] = None
+
+
+class ConsolidatedReportOverview(BaseModel):
+    overview: ReportOverview
+    sites: list[ReportSiteStatus] = Field(default_factory=list)
+    partial: bool = False
+
+
+class ConsolidatedInventoryStats(BaseModel):
+    stats: InventoryStats
+    sites: list[ReportSiteStatus] = Field(default_factory=list)
+    partial: bool = False
+
+
+class DashboardStats(BaseModel):
+    modules: dict[str, InventoryStats] = Field(default_factory=dict)
+
+
+class ConsolidatedDashboardStats(BaseModel):
+    modules: dict[str, InventoryStats] = Field(default_factory=dict)
+    by_site: dict[str, dict[str, InventoryStats]] = Field(default_factory=dict)
+    sites: list[ReportSiteStatus] = Field(default_factory=list)
+    partial: bool = False
+
+
 class ConfigEntry(BaseModel):
     section: str
     key: str
@@ -1408,6 +1551,48 @@ class PurchaseOrderDetail(PurchaseOrder):
     supplier_returns: list[ClothingSupplierReturn] = Field(default_factory=list)
 
 
+class PurchaseOrderSummary(BaseModel):
+    id: int
+    module: str
+    supplier_id: int | None = None
+    supplier_name: str | None = None
+    supplier_email: str | None = None
+    status: str
+    created_at: datetime
+    note: str | None = None
+    auto_created: bool = False
+    is_archived: bool = False
+    archived_at: datetime | None = None
+    kind: str = "standard"
+    parent_id: int | None = None
+    line_count: int = 0
+    quantity_ordered: int = 0
+    quantity_received: int = 0
+
+
+class PurchaseOrderSummaryPage(BaseModel):
+    items: list[PurchaseOrderSummary] = Field(default_factory=list)
+    next_cursor: str | None = None
+
+
+class PurchaseOrderBulkReceiveLine(BaseModel):
+    module: Literal["clothing", "inventory_remise", "pharmacy"]
+    order_id: int = Field(..., gt=0)
+    line_id: int = Field(..., gt=0)
+    qty: int = Field(..., gt=0)
+
+
+class PurchaseOrderBulkReceivePayload(BaseModel):
+    lines: list[PurchaseOrderBulkReceiveLine] = Field(..., min_length=1, max_length=5000)
+    note: str | None = Field(default=None, max_length=256)
+
+
+class PurchaseOrderBulkReceiveResult(BaseModel):
+    received_lines: int
+    received_quantity: int
+    orders: list[PurchaseOrderSummary] = Field(default_factory=list)
+
+
 class PurchaseOrderReplacementRequest(BaseModel):
     line_id: int = Field(..., gt=0)
     receipt_id: int = Field(..., gt=0)
@@ -1439,6 +1624,7 @@ class PurchaseOrderEmailLogEntry(BaseModel):
     status: Literal["sent", "failed"]
     message_id: str | None = None
     error_message: str | None = None
+    tracking_id: int | None = None
 
 
 class PurchaseOrderSendRequest(BaseModel):
@@ -1447,10 +1633,11 @@ class PurchaseOrderSendRequest(BaseModel):
 
 
 class PurchaseOrderSendResponse(BaseModel):
-    status: Literal["sent", "failed"]
+    status: Literal["queued", "sent", "failed"]
     sent_to: str
     sent_at: str
     message_id: str | None = None
+    tracking_id: int | None = None
 
 
 class PurchaseOrderAutoRefreshResponse(BaseModel):
@@ -1478,6 +1665,8 @@ class PurchaseSuggestionLine(BaseModel):
     reason_label: str | None = None
     stock_current: int
     threshold: int
+    abc_class: str | None = None
+    xyz_class: str | None = None
 
 
 class PurchaseSuggestion(BaseModel):
@@ -1511,6 +1700,18 @@ class PurchaseSuggestionUpdatePayload(BaseModel):
 
 class PurchaseSuggestionRefreshPayload(BaseModel):
     module_keys: list[str] = Field(default_factory=list)
+    strategy: Literal["threshold", "forecast"] = "threshold"
+
+
+class ConsumptionForecast(BaseModel):
+    item_id: int
+    quantity: int
+    avg_daily: float
+    std_daily: float
+    days_of_cover: float | None = None
+    reorder_point: int
+    order_up_to: int
+    needs_reorder: bool
 
 
 class PurchaseSuggestionConvertResult(BaseModel):
@@ -1737,6 +1938,11 @@ class DotationScanAddPayload(BaseModel):
     quantity: int = Field(default=1, gt=0)
 
 
+class DotationScanAddBatchPayload(BaseModel):
+    employee_id: int = Field(..., gt=0)
+    barcodes: list[str] = Field(..., min_length=1, max_length=500)
+
+
 class PharmacyItemBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=128)
     dosage: Optional[str] = Field(default=None, max_length=64)
@@ -1894,6 +2100,23 @@ class BarcodeLookupItem(BaseModel):
     name: str = Field(..., min_length=1, max_length=256)
 
 
+class BarcodeBatchResolveRequest(BaseModel):
+    codes: list[str] = Field(..., min_length=1, max_length=500)
+    modules: Optional[list[str]] = None
+
+
+class BarcodeBatchMatch(BaseModel):
+    module: str
+    id: int
+    name: str
+
+
+class BarcodeBatchResult(BaseModel):
+    code: str
+    normalized_code: Optional[str] = None
+    matches: list[BarcodeBatchMatch] = Field(default_factory=list)
+
+
 class BarcodeCatalogEntry(BaseModel):
     sku: str = Field(..., min_length=1, max_length=64)
     label: str = Field(..., min_length=1, max_length=256)
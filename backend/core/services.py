@@ -1,6 +1,7 @@
 """Services métier pour Gestion Stock Pro."""
 from __future__ import annotations
 
+import base64
 import hashlib
 import html
 import io
@@ -15,9 +16,10 @@ import shutil
 import threading
 import time
 import unicodedata
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
 from contextlib import contextmanager
-from dataclasses import dataclass, replace
+from dataclasses import asdict, dataclass, replace
 import sqlite3
 from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
@@ -26,6 +28,7 @@ from typing import Any, BinaryIO, Callable, ContextManager, Iterable, Iterator,
 from urllib.parse import urlparse
 from uuid import uuid4
 
+from pydantic import BaseModel
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape, portrait
 from reportlab.lib.units import mm
@@ -34,7 +37,8 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfgen import canvas
 
 from backend.core import db, menu_registry, models, models_ari, security, sites, system_config
-from backend.services.purchase_order_pdf import render_purchase_order_pdf
+from backend.services.pdf.purchase_order_cache import CachedPdf
+from backend.services.purchase_order_pdf import render_purchase_order_pdf_cached
 from backend.core.storage import (
     MEDIA_ROOT,
     PHARMACY_LOT_MEDIA_DIR,
@@ -46,7 +50,7 @@ from backend.core.storage import (
     relative_to_media,
 )
 from backend.services import barcode as barcode_service
-from backend.services import email_sender, notifications, system_settings
+from backend.services import notifications, system_settings
 from backend.services.pdf_config import (
     draw_watermark,
     effective_density_scale,
@@ -76,6 +80,8 @@ T = TypeVar("T")
 logger = logging.getLogger(__name__)
 
 _AUTO_PO_CLOSED_STATUSES = ("CANCELLED", "RECEIVED")
+_AUTO_PO_QUEUE_BATCH_SIZE = 500
+_REMISE_SYNC_BATCH_SIZE = 500
 
 MESSAGE_ARCHIVE_ROOT = db.DATA_DIR / "message_archive"
 
@@ -848,7 +854,7 @@ def _calculate_suggested_qty(
     return max(0, threshold - quantity) + max(0, safety_buffer)
 
 
-_SUGGESTION_REASON_ORDER = ("LOW_STOCK", "EXPIRY_SOON")
+_SUGGESTION_REASON_ORDER = ("LOW_STOCK", "LOW_COVER", "EXPIRY_SOON")
 
 
 def _normalize_reason_codes(codes: Iterable[str]) -> list[str]:
@@ -856,11 +862,19 @@ def _normalize_reason_codes(codes: Iterable[str]) -> list[str]:
     return [code for code in _SUGGESTION_REASON_ORDER if code in normalized]
 
 
-def _build_reason_label(reason_codes: Iterable[str], expiry_days_left: int | None) -> str | None:
+def _build_reason_label(
+    reason_codes: Iterable[str],
+    expiry_days_left: int | None,
+    *,
+    days_of_cover: float | None = None,
+) -> str | None:
     parts: list[str] = []
     reason_set = set(reason_codes)
     if "LOW_STOCK" in reason_set:
         parts.append("Stock sous seuil")
+    if "LOW_COVER" in reason_set:
+        suffix = f" ({days_of_cover:.0f} j)" if days_of_cover is not None else ""
+        parts.append(f"Couverture insuffisante{suffix}")
     if "EXPIRY_SOON" in reason_set:
         suffix = f" (J-{expiry_days_left})" if expiry_days_left is not None else ""
         parts.append(f"Péremption proche{suffix}")
@@ -919,23 +933,214 @@ def _build_purchase_suggestion_line(
     }
 
 
-def _resolve_supplier_id_from_name(
-    conn: sqlite3.Connection, supplier_name: str | None
-) -> int | None:
+_PURCHASE_SUGGESTION_STRATEGIES = ("threshold", "forecast")
+
+
+@dataclass(frozen=True)
+class _ForecastSettings:
+    history_days: int = 90
+    lead_time_days: int = 7
+    cover_days: int = 30
+    service_factor: float = 1.65
+
+
+@dataclass(frozen=True)
+class _ConsumptionForecast:
+    item_id: int
+    quantity: int
+    avg_daily: float
+    std_daily: float
+    reorder_point: int
+    order_up_to: int
+
+    @property
+    def days_of_cover(self) -> float | None:
+        if self.avg_daily <= 0:
+            return None
+        return self.quantity / self.avg_daily
+
+    @property
+    def needs_reorder(self) -> bool:
+        return self.avg_daily > 0 and self.quantity <= self.reorder_point
+
+    @property
+    def suggested_qty(self) -> int:
+        return max(0, self.order_up_to - self.quantity)
+
+
+def _get_forecast_settings() -> _ForecastSettings:
+    extra = system_config.get_config().extra
+    defaults = _ForecastSettings()
+
+    def _read(key: str, default: float, parse: Callable[[Any], float]) -> Any:
+        try:
+            value = parse(extra.get(f"purchase_suggestions_forecast_{key}", default))
+        except (TypeError, ValueError):
+            return default
+        return value if value > 0 else default
+
+    return _ForecastSettings(
+        history_days=_read("history_days", defaults.history_days, int),
+        lead_time_days=_read("lead_time_days", defaults.lead_time_days, int),
+        cover_days=_read("cover_days", defaults.cover_days, int),
+        service_factor=_read("service_factor", defaults.service_factor, float),
+    )
+
+
+def _compute_consumption_forecasts(
+    conn: sqlite3.Connection,
+    module_key: str,
+    settings: _ForecastSettings,
+    *,
+    today: date | None = None,
+) -> dict[int, _ConsumptionForecast]:
+    """Forecast daily consumption of every item from the movement rollups.
+
+    Consumption is the outgoing quantity per day, adjustments excluded, over the last
+    ``history_days``; days without movement count as zero. The reorder point covers the
+    lead time plus a safety stock of ``service_factor`` standard deviations, and the
+    order brings stock back up to that point plus ``cover_days`` of consumption.
+    """
+
+    config = _REPORT_MODULES[module_key]
+    if not config.items_table or not _table_exists(conn, config.items_table):
+        return {}
+    last_day = today or date.today()
+    first_day = last_day - timedelta(days=settings.history_days)
+    rows = conn.execute(
+        f"""
+        SELECT i.id AS item_id,
+               i.quantity AS quantity,
+               SUM(d.qty) AS total,
+               SUM(d.qty * d.qty) AS total_sq
+        FROM (
+            SELECT item_id, SUM(qty_out) AS qty
+            FROM movement_daily_rollups
+            WHERE module = ? AND day > ? AND day <= ? AND (reason_kind & {_MOVEMENT_ROLLUP_ADJUSTMENT}) = 0
+            GROUP BY item_id, day
+        ) AS d
+        JOIN {config.items_table} AS i ON i.id = d.item_id
+        GROUP BY i.id
+        """,
+        (module_key, first_day.isoformat(), last_day.isoformat()),
+    ).fetchall()
+    days = settings.history_days
+    lead = settings.lead_time_days
+    forecasts: dict[int, _ConsumptionForecast] = {}
+    for row in rows:
+        avg_daily = float(row["total"] or 0) / days
+        variance = max(0.0, float(row["total_sq"] or 0) / days - avg_daily * avg_daily)
+        std_daily = math.sqrt(variance)
+        reorder_point = math.ceil(
+            avg_daily * lead + settings.service_factor * std_daily * math.sqrt(lead)
+        )
+        forecasts[row["item_id"]] = _ConsumptionForecast(
+            item_id=row["item_id"],
+            quantity=int(row["quantity"] or 0),
+            avg_daily=avg_daily,
+            std_daily=std_daily,
+            reorder_point=reorder_point,
+            order_up_to=reorder_point + math.ceil(avg_daily * settings.cover_days),
+        )
+    return forecasts
+
+
+def _forecast_reorder_filter(
+    conn: sqlite3.Connection,
+    low_stock_where: str,
+    forecasts: dict[int, _ConsumptionForecast] | None,
+) -> str:
+    """Widen a low-stock ``WHERE`` fragment to the items whose forecast calls for a reorder."""
+
+    if forecasts is None:
+        return low_stock_where
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS forecast_reorder_items (item_id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.forecast_reorder_items")
+    conn.executemany(
+        "INSERT INTO temp.forecast_reorder_items (item_id) VALUES (?)",
+        [(forecast.item_id,) for forecast in forecasts.values() if forecast.needs_reorder],
+    )
+    return f"({low_stock_where} OR id IN (SELECT item_id FROM temp.forecast_reorder_items))"
+
+
+def _apply_consumption_forecast(
+    line: dict[str, Any], forecast: _ConsumptionForecast | None
+) -> dict[str, Any]:
+    if forecast is None or not forecast.needs_reorder:
+        return line
+    threshold = int(line["threshold"] or 0)
+    low_stock = threshold > 0 and line["stock_current"] < threshold
+    reason_codes = [code for code in line["reason_codes"] if code != "LOW_STOCK"]
+    if low_stock:
+        reason_codes.append("LOW_STOCK")
+        qty = max(line["qty_suggested"], forecast.suggested_qty)
+    else:
+        qty = forecast.suggested_qty
+    line["reason_codes"] = _normalize_reason_codes([*reason_codes, "LOW_COVER"])
+    line["qty_suggested"] = line["qty_final"] = qty
+    line["reason_label"] = line["reason"] = _build_reason_label(
+        line["reason_codes"], line.get("expiry_days_left"), days_of_cover=forecast.days_of_cover
+    )
+    return line
+
+
+def list_consumption_forecasts(site_key: str, module_key: str) -> list[models.ConsumptionForecast]:
+    ensure_database_ready()
+    if module_key not in _PURCHASE_SUGGESTION_MODULES:
+        raise ValueError(f"Module de suggestion inconnu: {module_key}")
+    settings = _get_forecast_settings()
+    with _get_site_stock_conn(site_key) as conn:
+        forecasts = _compute_consumption_forecasts(conn, module_key, settings)
+    return [
+        models.ConsumptionForecast(
+            item_id=forecast.item_id,
+            quantity=forecast.quantity,
+            avg_daily=round(forecast.avg_daily, 3),
+            std_daily=round(forecast.std_daily, 3),
+            days_of_cover=(
+                round(forecast.days_of_cover, 1) if forecast.days_of_cover is not None else None
+            ),
+            reorder_point=forecast.reorder_point,
+            order_up_to=forecast.order_up_to,
+            needs_reorder=forecast.needs_reorder,
+        )
+        for forecast in sorted(forecasts.values(), key=lambda entry: entry.item_id)
+    ]
+
+
+def _normalize_supplier_name_key(supplier_name: str | None) -> str:
     if not supplier_name:
-        return None
-    normalized = " ".join(str(supplier_name).strip().split())
-    if not normalized:
-        return None
-    row = conn.execute(
-        "SELECT id FROM suppliers WHERE lower(trim(name)) = ?",
-        (normalized.lower(),),
-    ).fetchone()
-    return int(row["id"]) if row is not None else None
+        return ""
+    return " ".join(str(supplier_name).split()).casefold()
+
+
+class _SupplierResolutionContext:
+    """Supplier ids by case-folded name, loaded once for a whole refresh run.
+
+    The suppliers table is only read on the first name lookup, so runs whose rows
+    all carry a ``supplier_id`` never query it.
+    """
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self._conn = conn
+        self._ids_by_name: dict[str, int] | None = None
+
+    def id_for_name(self, supplier_name: str | None) -> int | None:
+        key = _normalize_supplier_name_key(supplier_name)
+        if not key:
+            return None
+        if self._ids_by_name is None:
+            ids_by_name: dict[str, int] = {}
+            for row in self._conn.execute("SELECT id, name FROM suppliers ORDER BY id"):
+                name_key = _normalize_supplier_name_key(row["name"])
+                if name_key:
+                    ids_by_name.setdefault(name_key, int(row["id"]))
+            self._ids_by_name = ids_by_name
+        return self._ids_by_name.get(key)
 
 
 def _resolve_pharmacy_supplier_id(
-    conn: sqlite3.Connection,
+    suppliers: _SupplierResolutionContext,
     row: sqlite3.Row,
     extra: dict[str, Any],
 ) -> int | None:
@@ -943,9 +1148,8 @@ def _resolve_pharmacy_supplier_id(
     if supplier_id is None:
         supplier_id = extra.get("supplier_id") if isinstance(extra.get("supplier_id"), int) else None
     if supplier_id is None:
-        supplier_id = _resolve_supplier_id_from_name(
-            conn,
-            extra.get("supplier_name") or extra.get("supplier") or extra.get("fournisseur"),
+        supplier_id = suppliers.id_for_name(
+            extra.get("supplier_name") or extra.get("supplier") or extra.get("fournisseur")
         )
     return supplier_id
 
@@ -959,15 +1163,14 @@ def _row_get(row: sqlite3.Row, key: str, default: Any = None) -> Any:
 
 
 def _resolve_remise_supplier_id(
-    conn: sqlite3.Connection,
+    suppliers: _SupplierResolutionContext,
     row: sqlite3.Row,
     extra: dict[str, Any],
 ) -> int | None:
     supplier_id = _row_get(row, "supplier_id")
     if supplier_id is None:
-        supplier_id = _resolve_supplier_id_from_name(
-            conn,
-            extra.get("supplier_name") or extra.get("supplier") or extra.get("fournisseur"),
+        supplier_id = suppliers.id_for_name(
+            extra.get("supplier_name") or extra.get("supplier") or extra.get("fournisseur")
         )
     return supplier_id
 
@@ -994,36 +1197,55 @@ def _get_reorder_candidates(
     module_key: str,
     safety_buffer: int,
     expiry_soon_days: int,
+    forecasts: dict[int, _ConsumptionForecast] | None = None,
+    *,
+    scoped: bool = False,
 ) -> list[dict[str, Any]]:
+    """Compute the reorder candidates of a module.
+
+    With ``scoped`` only the items listed in ``temp.purchase_suggestion_scope`` are
+    considered, which is how incremental refreshes recompute changed items alone.
+    """
+
     candidates_by_item: dict[int, dict[str, Any]] = {}
+    suppliers = _SupplierResolutionContext(conn)
+    scope_filter = (
+        " AND id IN (SELECT item_id FROM temp.purchase_suggestion_scope)" if scoped else ""
+    )
 
     if module_key == "clothing":
         supplier_column = (
             "supplier_id" if _table_has_column(conn, "items", "supplier_id") else "NULL AS supplier_id"
         )
+        low_stock_where, low_stock_params = _low_stock_filter("clothing")
+        low_stock_where = _forecast_reorder_filter(conn, low_stock_where, forecasts) + scope_filter
         rows = conn.execute(
             """
             SELECT id, name, sku, size, quantity, low_stock_threshold, {supplier_column}, track_low_stock
             FROM items
-            WHERE quantity < low_stock_threshold AND low_stock_threshold > 0
+            WHERE {low_stock_where}
             """.format(
-                supplier_column=supplier_column
-            )
+                supplier_column=supplier_column, low_stock_where=low_stock_where
+            ),
+            low_stock_params,
         ).fetchall()
         for row in rows:
             if "track_low_stock" in row.keys() and not bool(row["track_low_stock"]):
                 continue
-            candidates_by_item[row["id"]] = _build_purchase_suggestion_line(
-                item_id=row["id"],
-                sku=row["sku"],
-                label=row["name"],
-                quantity=row["quantity"],
-                threshold=row["low_stock_threshold"],
-                unit=row["size"],
-                supplier_id=row["supplier_id"],
-                reorder_qty=None,
-                safety_buffer=safety_buffer,
-                reason_codes=["LOW_STOCK"],
+            candidates_by_item[row["id"]] = _apply_consumption_forecast(
+                _build_purchase_suggestion_line(
+                    item_id=row["id"],
+                    sku=row["sku"],
+                    label=row["name"],
+                    quantity=row["quantity"],
+                    threshold=row["low_stock_threshold"],
+                    unit=row["size"],
+                    supplier_id=row["supplier_id"],
+                    reorder_qty=None,
+                    safety_buffer=safety_buffer,
+                    reason_codes=["LOW_STOCK"],
+                ),
+                forecasts.get(row["id"]) if forecasts else None,
             )
         return list(candidates_by_item.values())
 
@@ -1033,6 +1255,8 @@ def _get_reorder_candidates(
             if _table_has_column(conn, "pharmacy_items", "supplier_id")
             else "NULL AS supplier_id"
         )
+        low_stock_where, low_stock_params = _low_stock_filter("pharmacy")
+        low_stock_where = _forecast_reorder_filter(conn, low_stock_where, forecasts) + scope_filter
         low_stock_rows = conn.execute(
             """
             SELECT id,
@@ -1045,27 +1269,32 @@ def _get_reorder_candidates(
                    {supplier_column},
                    extra_json
             FROM pharmacy_items
-            WHERE quantity < low_stock_threshold AND low_stock_threshold > 0
+            WHERE {low_stock_where}
             """.format(
-                supplier_column=supplier_column
-            )
+                supplier_column=supplier_column, low_stock_where=low_stock_where
+            ),
+            low_stock_params,
         ).fetchall()
         for row in low_stock_rows:
             extra = _parse_extra_json(row["extra_json"])
-            supplier_id = _resolve_pharmacy_supplier_id(conn, row, extra)
-            candidates_by_item[row["id"]] = _build_purchase_suggestion_line(
-                item_id=row["id"],
-                sku=row["barcode"] or str(row["id"]),
-                label=row["name"],
-                quantity=row["quantity"],
-                threshold=row["low_stock_threshold"],
-                unit=row["packaging"] or row["dosage"],
-                supplier_id=supplier_id,
-                reorder_qty=_extract_reorder_qty(extra),
-                safety_buffer=safety_buffer,
-                reason_codes=["LOW_STOCK"],
+            supplier_id = _resolve_pharmacy_supplier_id(suppliers, row, extra)
+            candidates_by_item[row["id"]] = _apply_consumption_forecast(
+                _build_purchase_suggestion_line(
+                    item_id=row["id"],
+                    sku=row["barcode"] or str(row["id"]),
+                    label=row["name"],
+                    quantity=row["quantity"],
+                    threshold=row["low_stock_threshold"],
+                    unit=row["packaging"] or row["dosage"],
+                    supplier_id=supplier_id,
+                    reorder_qty=_extract_reorder_qty(extra),
+                    safety_buffer=safety_buffer,
+                    reason_codes=["LOW_STOCK"],
+                ),
+                forecasts.get(row["id"]) if forecasts else None,
             )
         if _table_has_column(conn, "pharmacy_items", "expiration_date") and expiry_soon_days >= 0:
+            today = date.today()
             expiry_rows = conn.execute(
                 """
                 SELECT id,
@@ -1080,11 +1309,12 @@ def _get_reorder_candidates(
                        extra_json
                 FROM pharmacy_items
                 WHERE expiration_date IS NOT NULL
+                  AND date(expiration_date) BETWEEN ? AND ?{scope_filter}
                 """.format(
-                    supplier_column=supplier_column
-                )
+                    supplier_column=supplier_column, scope_filter=scope_filter
+                ),
+                (today.isoformat(), (today + timedelta(days=expiry_soon_days)).isoformat()),
             ).fetchall()
-            today = date.today()
             for row in expiry_rows:
                 expiry_date = _parse_date(row["expiration_date"])
                 if expiry_date is None:
@@ -1093,7 +1323,7 @@ def _get_reorder_candidates(
                 if days_left < 0 or days_left > expiry_soon_days:
                     continue
                 extra = _parse_extra_json(row["extra_json"])
-                supplier_id = _resolve_pharmacy_supplier_id(conn, row, extra)
+                supplier_id = _resolve_pharmacy_supplier_id(suppliers, row, extra)
                 existing = candidates_by_item.get(row["id"])
                 if existing:
                     existing["reason_codes"] = _normalize_reason_codes(
@@ -1135,33 +1365,40 @@ def _get_reorder_candidates(
             if _table_has_column(conn, "remise_items", "supplier_id")
             else "NULL AS supplier_id"
         )
+        low_stock_where, low_stock_params = _low_stock_filter("inventory_remise")
+        low_stock_where = _forecast_reorder_filter(conn, low_stock_where, forecasts) + scope_filter
         low_stock_rows = conn.execute(
             """
             SELECT id, name, sku, size, quantity, low_stock_threshold, {supplier_column}, track_low_stock, extra_json
             FROM remise_items
-            WHERE quantity < low_stock_threshold AND low_stock_threshold > 0
+            WHERE {low_stock_where}
             """.format(
-                supplier_column=supplier_column
-            )
+                supplier_column=supplier_column, low_stock_where=low_stock_where
+            ),
+            low_stock_params,
         ).fetchall()
         for row in low_stock_rows:
             if "track_low_stock" in row.keys() and not bool(row["track_low_stock"]):
                 continue
             extra = _parse_extra_json(row["extra_json"])
-            supplier_id = _resolve_remise_supplier_id(conn, row, extra)
-            candidates_by_item[row["id"]] = _build_purchase_suggestion_line(
-                item_id=row["id"],
-                sku=row["sku"],
-                label=row["name"],
-                quantity=row["quantity"],
-                threshold=row["low_stock_threshold"],
-                unit=row["size"],
-                supplier_id=supplier_id,
-                reorder_qty=_extract_reorder_qty(extra),
-                safety_buffer=safety_buffer,
-                reason_codes=["LOW_STOCK"],
+            supplier_id = _resolve_remise_supplier_id(suppliers, row, extra)
+            candidates_by_item[row["id"]] = _apply_consumption_forecast(
+                _build_purchase_suggestion_line(
+                    item_id=row["id"],
+                    sku=row["sku"],
+                    label=row["name"],
+                    quantity=row["quantity"],
+                    threshold=row["low_stock_threshold"],
+                    unit=row["size"],
+                    supplier_id=supplier_id,
+                    reorder_qty=_extract_reorder_qty(extra),
+                    safety_buffer=safety_buffer,
+                    reason_codes=["LOW_STOCK"],
+                ),
+                forecasts.get(row["id"]) if forecasts else None,
             )
         if _table_has_column(conn, "remise_items", "expiration_date") and expiry_soon_days >= 0:
+            today = date.today()
             expiry_rows = conn.execute(
                 """
                 SELECT id,
@@ -1176,11 +1413,12 @@ def _get_reorder_candidates(
                        expiration_date
                 FROM remise_items
                 WHERE expiration_date IS NOT NULL
+                  AND date(expiration_date) BETWEEN ? AND ?{scope_filter}
                 """.format(
-                    supplier_column=supplier_column
-                )
+                    supplier_column=supplier_column, scope_filter=scope_filter
+                ),
+                (today.isoformat(), (today + timedelta(days=expiry_soon_days)).isoformat()),
             ).fetchall()
-            today = date.today()
             for row in expiry_rows:
                 expiry_date = _parse_date(row["expiration_date"])
                 if expiry_date is None:
@@ -1189,7 +1427,7 @@ def _get_reorder_candidates(
                 if days_left < 0 or days_left > expiry_soon_days:
                     continue
                 extra = _parse_extra_json(row["extra_json"])
-                supplier_id = _resolve_remise_supplier_id(conn, row, extra)
+                supplier_id = _resolve_remise_supplier_id(suppliers, row, extra)
                 existing = candidates_by_item.get(row["id"])
                 if existing:
                     existing["reason_codes"] = _normalize_reason_codes(
@@ -1246,9 +1484,11 @@ def _get_purchase_suggestion_lines(
     placeholders = ", ".join("?" for _ in suggestion_ids)
     rows = conn.execute(
         f"""
-        SELECT psl.*, ps.module_key
+        SELECT psl.*, ps.module_key, ic.abc_class, ic.xyz_class
         FROM purchase_suggestion_lines AS psl
         JOIN purchase_suggestions AS ps ON ps.id = psl.suggestion_id
+        LEFT JOIN item_classifications AS ic
+          ON ic.module = ps.module_key AND ic.item_id = psl.item_id
         WHERE psl.suggestion_id IN ({placeholders})
         ORDER BY psl.id
         """,
@@ -1325,6 +1565,8 @@ def _get_purchase_suggestion_lines(
             reason_label=reason_label,
             stock_current=row["stock_current"],
             threshold=row["threshold"],
+            abc_class=row["abc_class"],
+            xyz_class=row["xyz_class"],
         )
         lines[line.suggestion_id].append(line)
     for suggestion_id, suggestion_lines in lines.items():
@@ -1527,146 +1769,1245 @@ def _resolve_report_module(module: str) -> _ReportModuleConfig | None:
     return _REPORT_MODULES.get(normalized)
 
 
-def get_inventory_stats(module_key: str) -> models.InventoryStats:
-    ensure_database_ready()
-    resolved = _resolve_report_module(module_key)
-    if not resolved or not resolved.items_table:
-        raise ValueError("Module introuvable")
-    with db.get_stock_connection() as conn:
-        if resolved.inventory_module == "inventory_remise":
-            _ensure_remise_item_columns(conn)
-        if not _table_exists(conn, resolved.items_table):
-            return models.InventoryStats(
-                references=0,
-                total_stock=0,
-                low_stock=0,
-                purchase_orders_open=0,
-                stockouts=0,
-            )
-        item_columns = {
-            row["name"]
-            for row in conn.execute(f"PRAGMA table_info({resolved.items_table})").fetchall()
+def _ensure_low_stock_items(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> None:
+    """Maintain ``low_stock_items``, the per-module set of items at or below threshold.
+
+    Rows are kept in sync by triggers on each items table. A module is rebuilt from its
+    items table whenever one of its triggers is missing (first run, table rebuilt).
+    """
+
+    if executescript is None:
+        executescript = conn.executescript
+    executescript(
+        """
+        CREATE TABLE IF NOT EXISTS low_stock_items (
+            module TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            low_stock_threshold INTEGER NOT NULL,
+            track_low_stock INTEGER NOT NULL DEFAULT 1,
+            PRIMARY KEY (module, item_id)
+        );
+        """
+    )
+    existing_triggers = {
+        row["name"]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%_low_stock_%'"
+        ).fetchall()
+    }
+    for config in _REPORT_MODULES.values():
+        table = config.items_table
+        if not table or not _table_exists(conn, table):
+            continue
+        if not _table_has_column(conn, table, "low_stock_threshold"):
+            continue
+        trigger_names = {
+            f"trg_{table}_low_stock_{event}" for event in ("insert", "update", "delete")
         }
-        references = int(
-            conn.execute(
-                f"SELECT COUNT(1) AS count FROM {resolved.items_table}"
-            ).fetchone()["count"]
-            or 0
-        )
-        total_stock = int(
-            conn.execute(
-                f"SELECT SUM(quantity) AS total FROM {resolved.items_table}"
-            ).fetchone()["total"]
-            or 0
-        )
-        stockouts_where = ["quantity = 0"]
-        if "track_low_stock" in item_columns:
-            stockouts_where.append("track_low_stock = 1")
-        stockouts = int(
-            conn.execute(
-                f"""
-                SELECT COUNT(1) AS count
-                FROM {resolved.items_table}
-                WHERE {" AND ".join(stockouts_where)}
-                """
-            ).fetchone()["count"]
-            or 0
-        )
-        low_stock = 0
-        if "low_stock_threshold" in item_columns:
-            low_stock_where = ["low_stock_threshold > 0", "quantity <= low_stock_threshold"]
-            if "track_low_stock" in item_columns:
-                low_stock_where.append("track_low_stock = 1")
-            low_stock = int(
-                conn.execute(
-                    f"""
-                    SELECT COUNT(1) AS count
-                    FROM {resolved.items_table}
-                    WHERE {" AND ".join(low_stock_where)}
-                    """
-                ).fetchone()["count"]
-                or 0
-            )
-        purchase_orders_open = 0
-        if resolved.orders_table and _table_exists(conn, resolved.orders_table):
-            purchase_orders_open = int(
-                conn.execute(
-                    f"""
-                    SELECT COUNT(1) AS count
-                    FROM {resolved.orders_table}
-                    WHERE status IN ('PENDING', 'ORDERED', 'PARTIALLY_RECEIVED')
-                    """
-                ).fetchone()["count"]
-                or 0
+        if trigger_names <= existing_triggers:
+            continue
+        module = config.module_key
+        has_track = _table_has_column(conn, table, "track_low_stock")
+        track_expr = "NEW.track_low_stock" if has_track else "1"
+        update_columns = "quantity, low_stock_threshold" + (", track_low_stock" if has_track else "")
+        insert_new = f"""
+            INSERT OR REPLACE INTO low_stock_items (
+                module, item_id, quantity, low_stock_threshold, track_low_stock
             )
-    return models.InventoryStats(
-        references=references,
-        total_stock=total_stock,
-        low_stock=low_stock,
-        purchase_orders_open=purchase_orders_open,
-        stockouts=stockouts,
+            SELECT '{module}', NEW.id, NEW.quantity, NEW.low_stock_threshold, {track_expr}
+            WHERE NEW.low_stock_threshold > 0 AND NEW.quantity <= NEW.low_stock_threshold;
+        """
+        executescript(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_low_stock_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                {insert_new}
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_low_stock_update
+            AFTER UPDATE OF {update_columns} ON {table}
+            BEGIN
+                DELETE FROM low_stock_items WHERE module = '{module}' AND item_id = OLD.id;
+                {insert_new}
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_low_stock_delete
+            AFTER DELETE ON {table}
+            BEGIN
+                DELETE FROM low_stock_items WHERE module = '{module}' AND item_id = OLD.id;
+            END;
+            """
+        )
+        _rebuild_low_stock_items(conn, module)
+
+
+def _rebuild_low_stock_items(conn: sqlite3.Connection, module_key: str) -> None:
+    config = _REPORT_MODULES[module_key]
+    table = config.items_table
+    track_column = "track_low_stock" if _table_has_column(conn, table, "track_low_stock") else "1"
+    conn.execute("DELETE FROM low_stock_items WHERE module = ?", (module_key,))
+    conn.execute(
+        f"""
+        INSERT INTO low_stock_items (module, item_id, quantity, low_stock_threshold, track_low_stock)
+        SELECT ?, id, quantity, low_stock_threshold, {track_column}
+        FROM {table}
+        WHERE low_stock_threshold > 0 AND quantity <= low_stock_threshold
+        """,
+        (module_key,),
     )
 
 
-def _auto_report_bucket(start: date, end: date) -> str:
-    delta_days = max(0, (end - start).days)
-    if delta_days <= 31:
-        return "day"
-    if delta_days <= 120:
-        return "week"
-    return "month"
+def _low_stock_filter(
+    module_key: str, *, inclusive: bool = False, tracked_only: bool = False
+) -> tuple[str, tuple[Any, ...]]:
+    """Return a ``WHERE`` fragment restricting an items table to its low-stock set."""
 
+    clauses = ["module = ?"]
+    if not inclusive:
+        clauses.append("quantity < low_stock_threshold")
+    if tracked_only:
+        clauses.append("track_low_stock = 1")
+    return (
+        f"id IN (SELECT item_id FROM low_stock_items WHERE {' AND '.join(clauses)})",
+        (module_key,),
+    )
 
-def _iter_report_buckets(start: date, end: date, bucket: str) -> list[date]:
-    if start > end:
-        start, end = end, start
-    if bucket == "week":
-        current = start - timedelta(days=start.weekday())
-    elif bucket == "month":
-        current = date(start.year, start.month, 1)
-    else:
-        current = start
-    buckets: list[date] = []
-    while current <= end:
-        buckets.append(current)
-        if bucket == "day":
-            current += timedelta(days=1)
-        elif bucket == "week":
-            current += timedelta(weeks=1)
-        else:
-            next_month = current.month + 1
-            year = current.year + (next_month - 1) // 12
-            month = ((next_month - 1) % 12) + 1
-            current = date(year, month, 1)
-    return buckets
 
+def _count_low_stock_items(
+    conn: sqlite3.Connection, module_key: str, *, inclusive: bool = False
+) -> int:
+    clauses = ["module = ?", "track_low_stock = 1"]
+    if not inclusive:
+        clauses.append("quantity < low_stock_threshold")
+    row = conn.execute(
+        f"SELECT COUNT(1) AS count FROM low_stock_items WHERE {' AND '.join(clauses)}",
+        (module_key,),
+    ).fetchone()
+    return int(row["count"] or 0)
 
-def _bucket_key(value: datetime, bucket: str) -> str:
-    target_date = value.date()
-    if bucket == "week":
-        target_date = target_date - timedelta(days=target_date.weekday())
-    elif bucket == "month":
-        target_date = date(target_date.year, target_date.month, 1)
-    return target_date.isoformat()
 
+_MOVEMENT_ROLLUP_DOTATION = 1
+_MOVEMENT_ROLLUP_ADJUSTMENT = 2
 
-def _should_include_reason(
-    reason: str | None, *, include_dotation: bool, include_adjustment: bool
-) -> bool:
-    if not reason:
-        return True
-    lowered = reason.lower()
-    if not include_dotation and "dotation" in lowered:
-        return False
-    if not include_adjustment and "ajust" in lowered:
-        return False
-    return True
 
+def _movement_reason_kind_sql(reason_expr: str) -> str:
+    """SQL expression classifying a movement reason as a bit mask (dotation, ajustement)."""
 
-def migrate_legacy_suppliers_to_site(site_key: str | int | None) -> None:
-    normalized_site_key = sites.normalize_site_key(str(site_key)) if site_key else db.DEFAULT_SITE_KEY
-    if not normalized_site_key:
-        normalized_site_key = db.DEFAULT_SITE_KEY
+    lowered = f"lower(COALESCE({reason_expr}, ''))"
+    return (
+        f"((CASE WHEN {lowered} LIKE '%dotation%' THEN {_MOVEMENT_ROLLUP_DOTATION} ELSE 0 END)"
+        f" | (CASE WHEN {lowered} LIKE '%ajust%' THEN {_MOVEMENT_ROLLUP_ADJUSTMENT} ELSE 0 END))"
+    )
+
+
+def _ensure_movement_rollups(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> None:
+    """Maintain ``movement_daily_rollups``, per-day movement totals for each item.
+
+    Each movements table feeds the rollups through triggers, so reports aggregate a
+    few rows per item and day instead of the raw ledger. A module is rebuilt from its
+    movements table whenever one of its triggers is missing.
+    """
+
+    if executescript is None:
+        executescript = conn.executescript
+    executescript(
+        """
+        CREATE TABLE IF NOT EXISTS movement_daily_rollups (
+            module TEXT NOT NULL,
+            day TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            reason_kind INTEGER NOT NULL DEFAULT 0,
+            qty_in INTEGER NOT NULL DEFAULT 0,
+            qty_out INTEGER NOT NULL DEFAULT 0,
+            move_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (module, day, item_id, reason_kind)
+        );
+        """
+    )
+    existing_triggers = {
+        row["name"]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%_rollup_%'"
+        ).fetchall()
+    }
+    for config in _REPORT_MODULES.values():
+        table = config.movements_table
+        item_column = config.movement_item_column
+        if not table or not item_column or not _table_exists(conn, table):
+            continue
+        trigger_names = {f"trg_{table}_rollup_{event}" for event in ("insert", "update", "delete")}
+        if trigger_names <= existing_triggers:
+            continue
+        module = config.module_key
+        has_reason = _table_has_column(conn, table, "reason")
+
+        def _apply(row: str, sign: int) -> str:
+            kind = _movement_reason_kind_sql(f"{row}.reason") if has_reason else "0"
+            return f"""
+                INSERT INTO movement_daily_rollups (
+                    module, day, item_id, reason_kind, qty_in, qty_out, move_count
+                )
+                SELECT '{module}', date({row}.created_at), {row}.{item_column}, {kind},
+                       {sign} * MAX({row}.delta, 0), {sign} * MAX(-{row}.delta, 0), {sign}
+                WHERE date({row}.created_at) IS NOT NULL
+                ON CONFLICT (module, day, item_id, reason_kind) DO UPDATE SET
+                    qty_in = qty_in + excluded.qty_in,
+                    qty_out = qty_out + excluded.qty_out,
+                    move_count = move_count + excluded.move_count;
+            """
+
+        cleanup = f"""
+                DELETE FROM movement_daily_rollups
+                WHERE module = '{module}' AND item_id = OLD.{item_column}
+                  AND day = date(OLD.created_at) AND move_count <= 0;
+        """
+        update_columns = f"{item_column}, delta, created_at" + (", reason" if has_reason else "")
+        executescript(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                {_apply("NEW", 1)}
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_update
+            AFTER UPDATE OF {update_columns} ON {table}
+            BEGIN
+                {_apply("OLD", -1)}
+                {_apply("NEW", 1)}
+                {cleanup}
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_delete
+            AFTER DELETE ON {table}
+            BEGIN
+                {_apply("OLD", -1)}
+                {cleanup}
+            END;
+            """
+        )
+        _rebuild_movement_rollups(conn, module)
+
+
+def _rebuild_movement_rollups(conn: sqlite3.Connection, module_key: str) -> int:
+    config = _REPORT_MODULES[module_key]
+    table = config.movements_table
+    item_column = config.movement_item_column
+    conn.execute("DELETE FROM movement_daily_rollups WHERE module = ?", (module_key,))
+    if not table or not item_column or not _table_exists(conn, table):
+        return 0
+    kind = _movement_reason_kind_sql("reason") if _table_has_column(conn, table, "reason") else "0"
+    cur = conn.execute(
+        f"""
+        INSERT INTO movement_daily_rollups (
+            module, day, item_id, reason_kind, qty_in, qty_out, move_count
+        )
+        SELECT ?, date(created_at) AS day, {item_column}, {kind} AS kind,
+               SUM(MAX(delta, 0)), SUM(MAX(-delta, 0)), COUNT(1)
+        FROM {table}
+        WHERE date(created_at) IS NOT NULL
+        GROUP BY day, {item_column}, kind
+        """,
+        (module_key,),
+    )
+    return int(cur.rowcount or 0)
+
+
+def rebuild_movement_rollups(module_key: str | None = None) -> dict[str, int]:
+    """Recompute the daily movement rollups of the current site from the raw ledgers."""
+
+    ensure_database_ready()
+    if module_key is None:
+        module_keys = list(_REPORT_MODULES)
+    else:
+        resolved = _resolve_report_module(module_key)
+        if not resolved:
+            raise ValueError("Module introuvable")
+        module_keys = [resolved.module_key]
+    rebuilt: dict[str, int] = {}
+    with db.get_stock_connection() as conn:
+        for key in module_keys:
+            rebuilt[key] = _rebuild_movement_rollups(conn, key)
+    return rebuilt
+
+
+def _movement_rollup_reason_filter(*, include_dotation: bool, include_adjustment: bool) -> str:
+    excluded = 0
+    if not include_dotation:
+        excluded |= _MOVEMENT_ROLLUP_DOTATION
+    if not include_adjustment:
+        excluded |= _MOVEMENT_ROLLUP_ADJUSTMENT
+    if not excluded:
+        return ""
+    return f" AND (reason_kind & {excluded}) = 0"
+
+
+def _sql_bucket_expression(column: str, bucket: str) -> str:
+    """Map an ISO date column to its bucket start: the day, its Monday or the 1st of the month."""
+
+    if bucket == "week":
+        return f"date({column}, '-' || ((CAST(strftime('%w', {column}) AS INTEGER) + 6) % 7) || ' days')"
+    if bucket == "month":
+        return f"strftime('%Y-%m-01', {column})"
+    return f"date({column})"
+
+
+def _ensure_stock_snapshots(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> None:
+    """Create ``stock_daily_snapshots``, the end-of-day stock levels of each item.
+
+    Only changes are stored: an item gets a row for a day when its quantity, threshold
+    or tracking flag differs from its previous snapshot (``removed`` marks deletions).
+    The state on a given day is the latest row at or before that day. On creation the
+    history is seeded from the movement rollups and the current quantities.
+    """
+
+    if executescript is None:
+        executescript = conn.executescript
+    created = not _table_exists(conn, "stock_daily_snapshots")
+    executescript(
+        """
+        CREATE TABLE IF NOT EXISTS stock_daily_snapshots (
+            module TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            low_stock_threshold INTEGER NOT NULL DEFAULT 0,
+            track_low_stock INTEGER NOT NULL DEFAULT 1,
+            removed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (module, item_id, day)
+        );
+        CREATE INDEX IF NOT EXISTS idx_stock_daily_snapshots_day
+        ON stock_daily_snapshots(module, day);
+        """
+    )
+    if created:
+        for module_key in _REPORT_MODULES:
+            _seed_stock_snapshots(conn, module_key)
+
+
+def _stock_snapshot_columns(conn: sqlite3.Connection, table: str) -> tuple[str, str]:
+    threshold = (
+        "COALESCE(i.low_stock_threshold, 0)"
+        if _table_has_column(conn, table, "low_stock_threshold")
+        else "0"
+    )
+    track = "i.track_low_stock" if _table_has_column(conn, table, "track_low_stock") else "1"
+    return threshold, track
+
+
+def _seed_stock_snapshots(conn: sqlite3.Connection, module_key: str) -> None:
+    config = _REPORT_MODULES[module_key]
+    table = config.items_table
+    if not table or not _table_exists(conn, table):
+        return
+    threshold, track = _stock_snapshot_columns(conn, table)
+    # Walk each item's daily net movements backwards from its current quantity.
+    conn.execute(
+        f"""
+        INSERT OR IGNORE INTO stock_daily_snapshots (
+            module, item_id, day, quantity, low_stock_threshold, track_low_stock
+        )
+        SELECT ?, d.item_id, d.day,
+               i.quantity - COALESCE(SUM(d.net) OVER (
+                   PARTITION BY d.item_id ORDER BY d.day DESC
+                   ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+               ), 0),
+               {threshold}, {track}
+        FROM (
+            SELECT item_id, day, SUM(qty_in - qty_out) AS net
+            FROM movement_daily_rollups
+            WHERE module = ?
+            GROUP BY item_id, day
+        ) AS d
+        JOIN {table} AS i ON i.id = d.item_id
+        """,
+        (module_key, module_key),
+    )
+    _capture_stock_snapshot(conn, module_key, date.today())
+
+
+def _capture_stock_snapshot(conn: sqlite3.Connection, module_key: str, day: date) -> int:
+    config = _REPORT_MODULES[module_key]
+    table = config.items_table
+    if not table or not _table_exists(conn, table):
+        return 0
+    threshold, track = _stock_snapshot_columns(conn, table)
+    day_key = day.isoformat()
+    latest = """
+        SELECT s.item_id, s.quantity, s.low_stock_threshold, s.track_low_stock, s.removed
+        FROM stock_daily_snapshots AS s
+        WHERE s.module = ? AND s.day = (
+            SELECT MAX(day) FROM stock_daily_snapshots
+            WHERE module = s.module AND item_id = s.item_id AND day <= ?
+        )
+    """
+    changed = conn.execute(
+        f"""
+        INSERT INTO stock_daily_snapshots (
+            module, item_id, day, quantity, low_stock_threshold, track_low_stock, removed
+        )
+        SELECT ?, i.id, ?, i.quantity, {threshold}, {track}, 0
+        FROM {table} AS i
+        LEFT JOIN ({latest}) AS s ON s.item_id = i.id
+        WHERE s.item_id IS NULL
+           OR s.removed = 1
+           OR s.quantity != i.quantity
+           OR s.low_stock_threshold != {threshold}
+           OR s.track_low_stock != {track}
+        ON CONFLICT (module, item_id, day) DO UPDATE SET
+            quantity = excluded.quantity,
+            low_stock_threshold = excluded.low_stock_threshold,
+            track_low_stock = excluded.track_low_stock,
+            removed = 0
+        """,
+        (module_key, day_key, module_key, day_key),
+    ).rowcount
+    removed = conn.execute(
+        f"""
+        INSERT INTO stock_daily_snapshots (
+            module, item_id, day, quantity, low_stock_threshold, track_low_stock, removed
+        )
+        SELECT ?, s.item_id, ?, 0, 0, 0, 1
+        FROM ({latest}) AS s
+        WHERE s.removed = 0 AND NOT EXISTS (SELECT 1 FROM {table} AS i WHERE i.id = s.item_id)
+        ON CONFLICT (module, item_id, day) DO UPDATE SET
+            quantity = 0, low_stock_threshold = 0, track_low_stock = 0, removed = 1
+        """,
+        (module_key, day_key, module_key, day_key),
+    ).rowcount
+    captured = int(changed or 0) + int(removed or 0)
+    if captured:
+        _bump_report_data_version(conn, module_key)
+    return captured
+
+
+def capture_stock_snapshots(
+    site_key: str | None = None, *, day: date | None = None
+) -> dict[str, int]:
+    """Record the stock levels of ``day`` (today by default) for every module of a site.
+
+    Capturing is idempotent: running it several times a day only rewrites the rows of
+    items that changed since the previous run.
+    """
+
+    ensure_database_ready()
+    target_day = day or date.today()
+    with db.get_stock_connection(site_key) as conn:
+        return {
+            module_key: _capture_stock_snapshot(conn, module_key, target_day)
+            for module_key in _REPORT_MODULES
+        }
+
+
+def _stock_snapshot_series(
+    conn: sqlite3.Connection, module_key: str, bucket_ends: dict[str, date]
+) -> dict[str, tuple[int, int]]:
+    """Return ``{bucket: (low_stock_count, total_quantity)}`` as of each bucket's last day."""
+
+    if not bucket_ends:
+        return {}
+    values_sql = ", ".join("(?, ?)" for _ in bucket_ends)
+    params: list[Any] = []
+    for key, last_day in bucket_ends.items():
+        params.extend((key, last_day.isoformat()))
+    params.extend((module_key, module_key))
+    rows = conn.execute(
+        f"""
+        WITH buckets(t, last_day) AS (VALUES {values_sql}),
+        latest AS (
+            SELECT b.t, s.item_id, MAX(s.day) AS day
+            FROM buckets AS b
+            JOIN stock_daily_snapshots AS s ON s.module = ? AND s.day <= b.last_day
+            GROUP BY b.t, s.item_id
+        )
+        SELECT l.t AS t,
+               SUM(CASE WHEN s.removed = 0 AND s.track_low_stock = 1
+                         AND s.low_stock_threshold > 0
+                         AND s.quantity < s.low_stock_threshold THEN 1 ELSE 0 END) AS low_count,
+               SUM(CASE WHEN s.removed = 0 THEN s.quantity ELSE 0 END) AS quantity
+        FROM latest AS l
+        JOIN stock_daily_snapshots AS s
+          ON s.module = ? AND s.item_id = l.item_id AND s.day = l.day
+        GROUP BY l.t
+        """,
+        params,
+    ).fetchall()
+    return {row["t"]: (int(row["low_count"] or 0), int(row["quantity"] or 0)) for row in rows}
+
+
+_CLASSIFICATION_HISTORY_DAYS = 365
+_ABC_CLASSES = "ABC"
+_XYZ_CLASSES = "XYZ"
+_ABC_SHARE_LIMITS = (0.8, 0.95)
+_XYZ_CV_LIMITS = (0.5, 1.0)
+
+
+def _ensure_item_classifications(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> None:
+    """Create ``item_classifications``, the daily ABC/XYZ class of every item.
+
+    ``item_classification_runs`` records the last computation of each module, so that
+    a module without items is not reclassified on every read.
+    """
+
+    if executescript is None:
+        executescript = conn.executescript
+    executescript(
+        """
+        CREATE TABLE IF NOT EXISTS item_classifications (
+            module TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            abc_class TEXT NOT NULL,
+            xyz_class TEXT NOT NULL,
+            consumption INTEGER NOT NULL DEFAULT 0,
+            cv REAL,
+            computed_on TEXT NOT NULL,
+            PRIMARY KEY (module, item_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_item_classifications_classes
+        ON item_classifications(module, abc_class, xyz_class);
+        CREATE TABLE IF NOT EXISTS item_classification_runs (
+            module TEXT PRIMARY KEY,
+            computed_on TEXT NOT NULL,
+            item_count INTEGER NOT NULL DEFAULT 0
+        );
+        """
+    )
+
+
+def _classify_share(previous_share: float, consumption: int) -> str:
+    if consumption <= 0:
+        return _ABC_CLASSES[-1]
+    for label, limit in zip(_ABC_CLASSES, _ABC_SHARE_LIMITS):
+        if previous_share < limit:
+            return label
+    return _ABC_CLASSES[-1]
+
+
+def _classify_variability(cv: float | None) -> str:
+    if cv is None:
+        return _XYZ_CLASSES[-1]
+    for label, limit in zip(_XYZ_CLASSES, _XYZ_CV_LIMITS):
+        if cv <= limit:
+            return label
+    return _XYZ_CLASSES[-1]
+
+
+def _get_item_classification_run(conn: sqlite3.Connection, module_key: str) -> str | None:
+    row = conn.execute(
+        "SELECT computed_on FROM item_classification_runs WHERE module = ?", (module_key,)
+    ).fetchone()
+    return row["computed_on"] if row is not None else None
+
+
+def _record_item_classification_run(
+    conn: sqlite3.Connection, module_key: str, day: str, item_count: int
+) -> None:
+    conn.execute(
+        """
+        INSERT INTO item_classification_runs (module, computed_on, item_count)
+        VALUES (?, ?, ?)
+        ON CONFLICT(module) DO UPDATE SET
+            computed_on = excluded.computed_on,
+            item_count = excluded.item_count
+        """,
+        (module_key, day, item_count),
+    )
+
+
+def _refresh_item_classifications(
+    conn: sqlite3.Connection, module_key: str, *, today: date | None = None
+) -> int | None:
+    """Classify the items of a module once per day; return the item count, ``None`` if fresh.
+
+    ABC ranks items by outgoing quantity over the last year (adjustments excluded): the
+    items making up the first 80 % of the volume are A, the next 15 % B, the rest C.
+    XYZ grades the coefficient of variation of daily demand (X up to 0.5, Y up to 1).
+    Both come from a single aggregate over the movement rollups.
+    """
+
+    config = _REPORT_MODULES[module_key]
+    day = (today or date.today()).isoformat()
+    if _get_item_classification_run(conn, module_key) == day:
+        return None
+    conn.execute("DELETE FROM item_classifications WHERE module = ?", (module_key,))
+    if not config.items_table or not _table_exists(conn, config.items_table):
+        _record_item_classification_run(conn, module_key, day, 0)
+        return 0
+    last_day = date.fromisoformat(day)
+    first_day = last_day - timedelta(days=_CLASSIFICATION_HISTORY_DAYS)
+    rows = conn.execute(
+        f"""
+        SELECT i.id AS item_id,
+               COALESCE(SUM(d.qty), 0) AS total,
+               COALESCE(SUM(d.qty * d.qty), 0) AS total_sq
+        FROM {config.items_table} AS i
+        LEFT JOIN (
+            SELECT item_id, SUM(qty_out) AS qty
+            FROM movement_daily_rollups
+            WHERE module = ? AND day > ? AND day <= ? AND (reason_kind & {_MOVEMENT_ROLLUP_ADJUSTMENT}) = 0
+            GROUP BY item_id, day
+        ) AS d ON d.item_id = i.id
+        GROUP BY i.id
+        ORDER BY total DESC, i.id
+        """,
+        (module_key, first_day.isoformat(), last_day.isoformat()),
+    ).fetchall()
+    grand_total = sum(int(entry["total"]) for entry in rows)
+    cumulated = 0
+    classified: list[tuple[Any, ...]] = []
+    for entry in rows:
+        total = int(entry["total"])
+        previous_share = cumulated / grand_total if grand_total else 1.0
+        cumulated += total
+        cv: float | None = None
+        if total > 0:
+            mean = total / _CLASSIFICATION_HISTORY_DAYS
+            variance = max(0.0, int(entry["total_sq"]) / _CLASSIFICATION_HISTORY_DAYS - mean * mean)
+            cv = math.sqrt(variance) / mean
+        classified.append(
+            (
+                module_key,
+                entry["item_id"],
+                _classify_share(previous_share, total),
+                _classify_variability(cv),
+                total,
+                cv,
+                day,
+            )
+        )
+    conn.executemany(
+        """
+        INSERT INTO item_classifications (
+            module, item_id, abc_class, xyz_class, consumption, cv, computed_on
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        classified,
+    )
+    _record_item_classification_run(conn, module_key, day, len(classified))
+    return len(classified)
+
+
+def refresh_item_classifications(
+    site_key: str | None = None, *, day: date | None = None
+) -> dict[str, int]:
+    """Reclassify every module of a site whose classes were not computed on ``day`` yet.
+
+    Returns the number of items classified per recomputed module. Reads never
+    recompute: they serve the rows stored by this function.
+    """
+
+    ensure_database_ready()
+    results: dict[str, int] = {}
+    with db.get_stock_connection(site_key) as conn:
+        for module_key, config in _REPORT_MODULES.items():
+            if not config.items_table:
+                continue
+            classified = _refresh_item_classifications(conn, module_key, today=day)
+            if classified is not None:
+                results[module_key] = classified
+    return results
+
+
+def _normalize_classification_filter(value: str | None, classes: str, label: str) -> list[str]:
+    if value is None:
+        return []
+    letters = sorted({letter for letter in value.strip().upper() if letter not in ", "})
+    if not letters:
+        return []
+    if any(letter not in classes for letter in letters):
+        raise ValueError(f"Classe {label} invalide: {value}")
+    return letters
+
+
+def _classification_filter_sql(
+    conn: sqlite3.Connection,
+    module_key: str,
+    column: str,
+    abc_class: str | None,
+    xyz_class: str | None,
+) -> tuple[str | None, list[Any]]:
+    """Build a ``column IN (...)`` fragment keeping the items of the requested classes."""
+
+    abc = _normalize_classification_filter(abc_class, _ABC_CLASSES, "ABC")
+    xyz = _normalize_classification_filter(xyz_class, _XYZ_CLASSES, "XYZ")
+    if not abc and not xyz:
+        return None, []
+    conditions = ["module = ?"]
+    params: list[Any] = [module_key]
+    for column_name, letters in (("abc_class", abc), ("xyz_class", xyz)):
+        if letters:
+            conditions.append(f"{column_name} IN ({', '.join('?' for _ in letters)})")
+            params.extend(letters)
+    return (
+        f"{column} IN (SELECT item_id FROM item_classifications WHERE {' AND '.join(conditions)})",
+        params,
+    )
+
+
+def get_item_classifications(
+    module_key: str, *, abc_class: str | None = None, xyz_class: str | None = None
+) -> models.ItemClassificationReport:
+    ensure_database_ready()
+    resolved = _resolve_report_module(module_key)
+    if not resolved or not resolved.items_table:
+        raise ValueError("Module introuvable")
+    abc = _normalize_classification_filter(abc_class, _ABC_CLASSES, "ABC")
+    xyz = _normalize_classification_filter(xyz_class, _XYZ_CLASSES, "XYZ")
+    with db.get_stock_connection() as conn:
+        computed_on = _get_item_classification_run(conn, resolved.module_key)
+        if not _table_exists(conn, resolved.items_table):
+            rows: list[sqlite3.Row] = []
+        else:
+            sku = "i.sku" if _table_has_column(conn, resolved.items_table, "sku") else "NULL"
+            rows = conn.execute(
+                f"""
+                SELECT c.item_id, c.abc_class, c.xyz_class, c.consumption, c.cv,
+                       i.name AS name, {sku} AS sku
+                FROM item_classifications AS c
+                JOIN {resolved.items_table} AS i ON i.id = c.item_id
+                WHERE c.module = ?
+                ORDER BY c.consumption DESC, c.item_id
+                """,
+                (resolved.module_key,),
+            ).fetchall()
+    counts = {f"{a}{x}": 0 for a in _ABC_CLASSES for x in _XYZ_CLASSES}
+    grand_total = sum(int(row["consumption"]) for row in rows)
+    items: list[models.ItemClassification] = []
+    for row in rows:
+        counts[f"{row['abc_class']}{row['xyz_class']}"] += 1
+        if (abc and row["abc_class"] not in abc) or (xyz and row["xyz_class"] not in xyz):
+            continue
+        items.append(
+            models.ItemClassification(
+                item_id=row["item_id"],
+                name=row["name"],
+                sku=row["sku"],
+                abc_class=row["abc_class"],
+                xyz_class=row["xyz_class"],
+                consumption=int(row["consumption"]),
+                consumption_share=(
+                    round(int(row["consumption"]) / grand_total, 4) if grand_total else 0.0
+                ),
+                cv=round(row["cv"], 3) if row["cv"] is not None else None,
+            )
+        )
+    return models.ItemClassificationReport(
+        module=resolved.module_key,
+        computed_on=date.fromisoformat(computed_on) if computed_on else None,
+        history_days=_CLASSIFICATION_HISTORY_DAYS,
+        counts=counts,
+        items=items,
+    )
+
+
+_EXPIRY_RADAR_TABLES: dict[str, tuple[str, str, str]] = {
+    "pharmacy": ("pharmacy_items", "barcode", "pharmacy_lot_items.pharmacy_item_id"),
+    "inventory_remise": ("remise_items", "sku", "remise_lot_items.remise_item_id"),
+}
+
+_EXPIRY_RADAR_BUCKETS: tuple[tuple[str, str, int | None, int], ...] = (
+    ("expired", "Périmés", None, 0),
+    ("lt_7d", "Moins de 7 jours", 0, 7),
+    ("lt_30d", "Moins de 30 jours", 7, 30),
+    ("lt_90d", "Moins de 90 jours", 30, 90),
+)
+
+
+def _ensure_expiry_radar(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> None:
+    """Index normalized expiration dates and create the daily expiry radar counts.
+
+    The partial indexes are on ``date(expiration_date)`` so that every radar bucket is
+    a single range scan, whatever time suffix the stored value carries.
+    """
+
+    if executescript is None:
+        executescript = conn.executescript
+    statements = [
+        """
+        CREATE TABLE IF NOT EXISTS expiry_radar_daily (
+            day TEXT NOT NULL,
+            module TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            item_count INTEGER NOT NULL DEFAULT 0,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (day, module, bucket)
+        );
+        """
+    ]
+    for table, _, _ in _EXPIRY_RADAR_TABLES.values():
+        if _table_has_column(conn, table, "expiration_date"):
+            statements.append(
+                f"""
+                CREATE INDEX IF NOT EXISTS idx_{table}_expiration_day
+                ON {table}(date(expiration_date)) WHERE expiration_date IS NOT NULL;
+                """
+            )
+    executescript("".join(statements))
+
+
+def _expiry_radar_bucket_rows(
+    conn: sqlite3.Connection,
+    module_key: str,
+    start: date | None,
+    end: date,
+    *,
+    include_empty: bool,
+) -> list[sqlite3.Row]:
+    table, code_column, lot_reference = _EXPIRY_RADAR_TABLES[module_key]
+    lot_table, lot_column = lot_reference.split(".")
+    conditions = ["i.expiration_date IS NOT NULL", "date(i.expiration_date) < ?"]
+    params: list[Any] = [end.isoformat()]
+    if start is not None:
+        conditions.append("date(i.expiration_date) >= ?")
+        params.append(start.isoformat())
+    if not include_empty:
+        conditions.append("i.quantity > 0")
+    lot_count = (
+        f"(SELECT COUNT(1) FROM {lot_table} AS l WHERE l.{lot_column} = i.id)"
+        if _table_exists(conn, lot_table)
+        else "0"
+    )
+    return conn.execute(
+        f"""
+        SELECT i.id, i.name, i.{code_column} AS sku, i.quantity,
+               date(i.expiration_date) AS expiration_date, {lot_count} AS lot_count
+        FROM {table} AS i
+        WHERE {' AND '.join(conditions)}
+        ORDER BY date(i.expiration_date), i.name COLLATE NOCASE
+        """,
+        params,
+    ).fetchall()
+
+
+def _compute_expiry_radar(
+    conn: sqlite3.Connection,
+    module_key: str,
+    today: date,
+    *,
+    include_empty: bool = False,
+) -> list[models.ExpiryRadarBucket]:
+    table = _EXPIRY_RADAR_TABLES[module_key][0]
+    if not _table_has_column(conn, table, "expiration_date"):
+        return [
+            models.ExpiryRadarBucket(key=key, label=label)
+            for key, label, _, _ in _EXPIRY_RADAR_BUCKETS
+        ]
+    buckets: list[models.ExpiryRadarBucket] = []
+    for key, label, start_offset, end_offset in _EXPIRY_RADAR_BUCKETS:
+        start = today + timedelta(days=start_offset) if start_offset is not None else None
+        rows = _expiry_radar_bucket_rows(
+            conn, module_key, start, today + timedelta(days=end_offset), include_empty=include_empty
+        )
+        items = [
+            models.ExpiryRadarItem(
+                item_id=row["id"],
+                name=row["name"],
+                sku=row["sku"],
+                quantity=int(row["quantity"] or 0),
+                expiration_date=date.fromisoformat(row["expiration_date"]),
+                days_left=(date.fromisoformat(row["expiration_date"]) - today).days,
+                lot_count=int(row["lot_count"] or 0),
+            )
+            for row in rows
+        ]
+        buckets.append(
+            models.ExpiryRadarBucket(
+                key=key,
+                label=label,
+                count=len(items),
+                quantity=sum(item.quantity for item in items),
+                items=items,
+            )
+        )
+    return buckets
+
+
+def get_expiry_radar(module_key: str, *, include_empty: bool = False) -> models.ExpiryRadar:
+    ensure_database_ready()
+    normalized = (module_key or "").strip().lower()
+    if normalized not in _EXPIRY_RADAR_TABLES:
+        raise ValueError("Module introuvable")
+    today = date.today()
+    with db.get_stock_connection() as conn:
+        buckets = _compute_expiry_radar(conn, normalized, today, include_empty=include_empty)
+    return models.ExpiryRadar(module=normalized, generated_on=today, buckets=buckets)
+
+
+def capture_expiry_radar(
+    site_key: str | None = None, *, day: date | None = None
+) -> dict[str, int]:
+    """Store the radar counts of the day so that dashboards read them without rescanning."""
+
+    ensure_database_ready()
+    target_day = day or date.today()
+    results: dict[str, int] = {}
+    with db.get_stock_connection(site_key) as conn:
+        for module_key in _EXPIRY_RADAR_TABLES:
+            buckets = _compute_expiry_radar(conn, module_key, target_day)
+            conn.executemany(
+                """
+                INSERT INTO expiry_radar_daily (day, module, bucket, item_count, quantity)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (day, module, bucket) DO UPDATE SET
+                    item_count = excluded.item_count,
+                    quantity = excluded.quantity
+                """,
+                [
+                    (target_day.isoformat(), module_key, bucket.key, bucket.count, bucket.quantity)
+                    for bucket in buckets
+                ],
+            )
+            results[module_key] = sum(bucket.count for bucket in buckets)
+    return results
+
+
+def list_expiry_radar_history(
+    module_key: str, *, start: date, end: date
+) -> list[models.ExpiryRadarDailyPoint]:
+    ensure_database_ready()
+    normalized = (module_key or "").strip().lower()
+    if normalized not in _EXPIRY_RADAR_TABLES:
+        raise ValueError("Module introuvable")
+    if start > end:
+        start, end = end, start
+    with db.get_stock_connection() as conn:
+        rows = conn.execute(
+            """
+            SELECT day, bucket, item_count, quantity
+            FROM expiry_radar_daily
+            WHERE module = ? AND day BETWEEN ? AND ?
+            ORDER BY day
+            """,
+            (normalized, start.isoformat(), end.isoformat()),
+        ).fetchall()
+    points: dict[str, models.ExpiryRadarDailyPoint] = {}
+    for row in rows:
+        point = points.setdefault(row["day"], models.ExpiryRadarDailyPoint(day=row["day"]))
+        point.counts[row["bucket"]] = int(row["item_count"])
+        point.quantities[row["bucket"]] = int(row["quantity"])
+    return list(points.values())
+
+
+def _ensure_report_data_versions(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> None:
+    """Maintain ``report_data_versions``, a per-module counter bumped on every write.
+
+    Triggers on the items, movements and orders tables of each report module increment
+    the counter, so cached reports keyed by it go stale as soon as their data changes.
+    Counters start from a random value to keep keys distinct across recreated databases.
+    """
+
+    if executescript is None:
+        executescript = conn.executescript
+    executescript(
+        """
+        CREATE TABLE IF NOT EXISTS report_data_versions (
+            module TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        );
+        """
+    )
+    existing_triggers = {
+        row["name"]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%_data_version_%'"
+        ).fetchall()
+    }
+    for config in _REPORT_MODULES.values():
+        module = config.module_key
+        conn.execute(
+            "INSERT OR IGNORE INTO report_data_versions (module, version) VALUES (?, abs(random() % 1000000000))",
+            (module,),
+        )
+        bump = f"UPDATE report_data_versions SET version = version + 1 WHERE module = '{module}';"
+        for table in (config.items_table, config.movements_table, config.orders_table):
+            if not table or not _table_exists(conn, table):
+                continue
+            statements = [
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_{table}_data_version_{event}
+                AFTER {event.upper()} ON {table}
+                BEGIN
+                    {bump}
+                END;
+                """
+                for event in ("insert", "update", "delete")
+                if f"trg_{table}_data_version_{event}" not in existing_triggers
+            ]
+            if statements:
+                executescript("".join(statements))
+
+
+def _report_data_version(conn: sqlite3.Connection, module_key: str) -> int:
+    row = conn.execute(
+        "SELECT version FROM report_data_versions WHERE module = ?", (module_key,)
+    ).fetchone()
+    return int(row["version"]) if row else 0
+
+
+def _bump_report_data_version(conn: sqlite3.Connection, module_key: str) -> None:
+    conn.execute(
+        "UPDATE report_data_versions SET version = version + 1 WHERE module = ?", (module_key,)
+    )
+
+
+_REPORT_CACHE_MAX_ENTRIES = 256
+
+_ReportCacheValue = TypeVar("_ReportCacheValue", bound=BaseModel)
+
+
+class _ReportCache:
+    """Bounded LRU of computed reports, keyed by site, parameters and data version."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[Any, ...], BaseModel] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(
+        self, key: tuple[Any, ...], compute: Callable[[], _ReportCacheValue]
+    ) -> _ReportCacheValue:
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached.model_copy(deep=True)  # type: ignore[return-value]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value.model_copy(deep=True)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def stats(self) -> models.ReportCacheStats:
+        with self._lock:
+            return models.ReportCacheStats(
+                size=len(self._entries),
+                max_entries=self.max_entries,
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+_REPORT_CACHE = _ReportCache(_REPORT_CACHE_MAX_ENTRIES)
+
+
+def _report_cache_key(kind: str, module_key: str, *params: Any) -> tuple[Any, ...]:
+    with db.get_stock_connection() as conn:
+        version = _report_data_version(conn, module_key)
+    return (kind, db.get_current_site_key(), module_key, version, *params)
+
+
+def get_report_cache_stats() -> models.ReportCacheStats:
+    return _REPORT_CACHE.stats()
+
+
+def clear_report_cache() -> None:
+    _REPORT_CACHE.clear()
+
+
+def get_inventory_stats(module_key: str) -> models.InventoryStats:
+    ensure_database_ready()
+    resolved = _resolve_report_module(module_key)
+    if not resolved or not resolved.items_table:
+        raise ValueError("Module introuvable")
+    return _REPORT_CACHE.get_or_compute(
+        _report_cache_key("stats", resolved.module_key),
+        lambda: _compute_inventory_stats(resolved),
+    )
+
+
+def _compute_inventory_stats(resolved: _ReportModuleConfig) -> models.InventoryStats:
+    with db.get_stock_connection() as conn:
+        if resolved.inventory_module == "inventory_remise":
+            _ensure_remise_item_columns(conn)
+        return _inventory_stats_from_conn(conn, resolved)
+
+
+def _inventory_stats_from_conn(
+    conn: sqlite3.Connection,
+    resolved: _ReportModuleConfig,
+    low_stock_counts: dict[str, int] | None = None,
+) -> models.InventoryStats:
+    """Compute the KPIs of a module with one aggregate per table."""
+
+    if not resolved.items_table or not _table_exists(conn, resolved.items_table):
+        return models.InventoryStats(
+            references=0,
+            total_stock=0,
+            low_stock=0,
+            purchase_orders_open=0,
+            stockouts=0,
+        )
+    item_columns = {
+        row["name"]
+        for row in conn.execute(f"PRAGMA table_info({resolved.items_table})").fetchall()
+    }
+    stockout_condition = "quantity = 0"
+    if "track_low_stock" in item_columns:
+        stockout_condition += " AND track_low_stock = 1"
+    totals = conn.execute(
+        f"""
+        SELECT COUNT(1) AS references_count,
+               SUM(quantity) AS total_stock,
+               SUM(CASE WHEN {stockout_condition} THEN 1 ELSE 0 END) AS stockouts
+        FROM {resolved.items_table}
+        """
+    ).fetchone()
+    low_stock = 0
+    if "low_stock_threshold" in item_columns:
+        if low_stock_counts is None:
+            low_stock = _count_low_stock_items(conn, resolved.module_key, inclusive=True)
+        else:
+            low_stock = low_stock_counts.get(resolved.module_key, 0)
+    purchase_orders_open = 0
+    if resolved.orders_table and _table_exists(conn, resolved.orders_table):
+        purchase_orders_open = int(
+            conn.execute(
+                f"""
+                SELECT COUNT(1) AS count
+                FROM {resolved.orders_table}
+                WHERE status IN ('PENDING', 'ORDERED', 'PARTIALLY_RECEIVED')
+                """
+            ).fetchone()["count"]
+            or 0
+        )
+    return models.InventoryStats(
+        references=int(totals["references_count"] or 0),
+        total_stock=int(totals["total_stock"] or 0),
+        low_stock=low_stock,
+        purchase_orders_open=purchase_orders_open,
+        stockouts=int(totals["stockouts"] or 0),
+    )
+
+
+DASHBOARD_MODULES: tuple[str, ...] = tuple(
+    key for key, config in _REPORT_MODULES.items() if config.items_table
+)
+
+
+def _resolve_dashboard_modules(module_keys: Iterable[str] | None) -> list[str]:
+    if module_keys is None:
+        return list(DASHBOARD_MODULES)
+    resolved_keys: list[str] = []
+    for module_key in module_keys:
+        resolved = _resolve_report_module(module_key)
+        if not resolved or not resolved.items_table:
+            raise ValueError(f"Module introuvable: {module_key}")
+        if resolved.module_key not in resolved_keys:
+            resolved_keys.append(resolved.module_key)
+    return resolved_keys
+
+
+def get_dashboard_stats(module_keys: Iterable[str] | None = None) -> models.DashboardStats:
+    """Return the inventory KPIs of several modules of the current site in one call.
+
+    The result is cached until the data version of one of the modules changes.
+    """
+
+    ensure_database_ready()
+    selected = _resolve_dashboard_modules(module_keys)
+    with db.get_stock_connection() as conn:
+        versions = {
+            row["module"]: int(row["version"])
+            for row in conn.execute("SELECT module, version FROM report_data_versions").fetchall()
+        }
+    key = (
+        "dashboard",
+        db.get_current_site_key(),
+        tuple(selected),
+        tuple(versions.get(module_key, 0) for module_key in selected),
+    )
+    return _REPORT_CACHE.get_or_compute(key, lambda: _compute_dashboard_stats(selected))
+
+
+def _compute_dashboard_stats(module_keys: list[str]) -> models.DashboardStats:
+    with db.get_stock_connection() as conn:
+        if "inventory_remise" in module_keys:
+            _ensure_remise_item_columns(conn)
+        low_stock_counts = {
+            row["module"]: int(row["count"])
+            for row in conn.execute(
+                """
+                SELECT module, COUNT(1) AS count
+                FROM low_stock_items
+                WHERE track_low_stock = 1
+                GROUP BY module
+                """
+            ).fetchall()
+        }
+        return models.DashboardStats(
+            modules={
+                module_key: _inventory_stats_from_conn(
+                    conn, _REPORT_MODULES[module_key], low_stock_counts
+                )
+                for module_key in module_keys
+            }
+        )
+
+
+def _auto_report_bucket(start: date, end: date) -> str:
+    delta_days = max(0, (end - start).days)
+    if delta_days <= 31:
+        return "day"
+    if delta_days <= 120:
+        return "week"
+    return "month"
+
+
+def _iter_report_buckets(start: date, end: date, bucket: str) -> list[date]:
+    if start > end:
+        start, end = end, start
+    if bucket == "week":
+        current = start - timedelta(days=start.weekday())
+    elif bucket == "month":
+        current = date(start.year, start.month, 1)
+    else:
+        current = start
+    buckets: list[date] = []
+    while current <= end:
+        buckets.append(current)
+        if bucket == "day":
+            current += timedelta(days=1)
+        elif bucket == "week":
+            current += timedelta(weeks=1)
+        else:
+            next_month = current.month + 1
+            year = current.year + (next_month - 1) // 12
+            month = ((next_month - 1) % 12) + 1
+            current = date(year, month, 1)
+    return buckets
+
+
+def migrate_legacy_suppliers_to_site(site_key: str | int | None) -> None:
+    normalized_site_key = sites.normalize_site_key(str(site_key)) if site_key else db.DEFAULT_SITE_KEY
+    if not normalized_site_key:
+        normalized_site_key = db.DEFAULT_SITE_KEY
     if normalized_site_key == db.DEFAULT_SITE_KEY:
         return
     with _SUPPLIER_MIGRATION_LOCK:
@@ -1736,9 +3077,13 @@ def list_purchase_suggestions(
     status: str | None = None,
     module_key: str | None = None,
     allowed_modules: Iterable[str] | None = None,
+    abc_class: str | None = None,
+    xyz_class: str | None = None,
 ) -> list[models.PurchaseSuggestionDetail]:
     ensure_database_ready()
     migrate_legacy_suppliers_to_site(site_key)
+    abc = _normalize_classification_filter(abc_class, _ABC_CLASSES, "ABC")
+    xyz = _normalize_classification_filter(xyz_class, _XYZ_CLASSES, "XYZ")
     with _get_site_stock_conn(site_key) as conn:
         query = """
             SELECT ps.*
@@ -1774,6 +3119,15 @@ def list_purchase_suggestions(
         lines_by_suggestion = _get_purchase_suggestion_lines(conn, suggestion_ids)
         results: list[models.PurchaseSuggestionDetail] = []
         for row in rows:
+            lines = lines_by_suggestion.get(row["id"], [])
+            if abc or xyz:
+                lines = [
+                    line
+                    for line in lines
+                    if (not abc or line.abc_class in abc) and (not xyz or line.xyz_class in xyz)
+                ]
+                if not lines:
+                    continue
             supplier_row = (
                 suppliers_by_id.get(row["supplier_id"])
                 if row["supplier_id"] is not None
@@ -1796,7 +3150,7 @@ def list_purchase_suggestions(
                     created_at=row["created_at"],
                     updated_at=row["updated_at"],
                     created_by=row["created_by"],
-                    lines=lines_by_suggestion.get(row["id"], []),
+                    lines=lines,
                 )
             )
         return results
@@ -1842,197 +3196,354 @@ def get_purchase_suggestion(suggestion_id: int) -> models.PurchaseSuggestionDeta
         )
 
 
+def _stage_purchase_suggestion_candidates(
+    conn: sqlite3.Connection, candidates: Iterable[dict[str, Any]]
+) -> None:
+    """Load the reorder candidates of one module in ``temp.purchase_suggestion_candidates``."""
+
+    conn.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS purchase_suggestion_candidates (
+            item_id INTEGER PRIMARY KEY,
+            supplier_id INTEGER,
+            suggestion_id INTEGER,
+            sku TEXT,
+            label TEXT,
+            qty_suggested INTEGER,
+            qty_final INTEGER,
+            unit TEXT,
+            reason TEXT,
+            reason_codes TEXT,
+            expiry_date TEXT,
+            expiry_days_left INTEGER,
+            reason_label TEXT,
+            stock_current INTEGER,
+            threshold INTEGER
+        )
+        """
+    )
+    conn.execute("DELETE FROM temp.purchase_suggestion_candidates")
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO temp.purchase_suggestion_candidates (
+            item_id, supplier_id, sku, label, qty_suggested, qty_final, unit, reason,
+            reason_codes, expiry_date, expiry_days_left, reason_label, stock_current, threshold
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        [
+            (
+                item["item_id"],
+                item["supplier_id"],
+                item["sku"],
+                item["label"],
+                item["qty_suggested"],
+                item["qty_final"],
+                item["unit"],
+                item["reason"],
+                json.dumps(item.get("reason_codes") or [], ensure_ascii=False),
+                item.get("expiry_date"),
+                item.get("expiry_days_left"),
+                item.get("reason_label"),
+                item["stock_current"],
+                item["threshold"],
+            )
+            for item in candidates
+        ],
+    )
+
+
+def _apply_purchase_suggestion_candidates(
+    conn: sqlite3.Connection,
+    *,
+    site_key: str,
+    module_key: str,
+    created_by: str | None,
+    scoped: bool = False,
+) -> None:
+    """Merge the staged candidates into the draft suggestions of ``module_key``.
+
+    One draft exists per supplier: missing drafts are created, lines are upserted on
+    ``(suggestion_id, item_id)`` keeping a manually edited ``qty_final``, stale lines are
+    removed by anti-join and drafts left without candidates are dismissed.
+
+    With ``scoped`` the candidates only cover the items of ``temp.purchase_suggestion_scope``:
+    stale lines are looked for among those items, and only drafts left without any line
+    are dismissed.
+    """
+
+    scope = (site_key, module_key)
+    conn.execute(
+        """
+        INSERT INTO purchase_suggestions (
+            site_key, module_key, supplier_id, status, created_at, updated_at, created_by
+        )
+        SELECT DISTINCT ?, ?, c.supplier_id, 'draft', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, ?
+        FROM temp.purchase_suggestion_candidates AS c
+        WHERE NOT EXISTS (
+            SELECT 1 FROM purchase_suggestions AS ps
+            WHERE ps.site_key = ? AND ps.module_key = ? AND ps.status = 'draft'
+              AND ps.supplier_id IS c.supplier_id
+        )
+        """,
+        (*scope, created_by, *scope),
+    )
+    conn.execute(
+        """
+        UPDATE temp.purchase_suggestion_candidates
+        SET suggestion_id = (
+            SELECT MAX(ps.id) FROM purchase_suggestions AS ps
+            WHERE ps.site_key = ? AND ps.module_key = ? AND ps.status = 'draft'
+              AND ps.supplier_id IS purchase_suggestion_candidates.supplier_id
+        )
+        """,
+        scope,
+    )
+    conn.execute(
+        """
+        UPDATE purchase_suggestions
+        SET updated_at = CURRENT_TIMESTAMP
+        WHERE id IN (SELECT suggestion_id FROM temp.purchase_suggestion_candidates)
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO purchase_suggestion_lines (
+            suggestion_id, item_id, sku, label, qty_suggested, qty_final, unit, reason,
+            reason_codes, expiry_date, expiry_days_left, reason_label, stock_current, threshold
+        )
+        SELECT suggestion_id, item_id, sku, label, qty_suggested, qty_final, unit, reason,
+               reason_codes, expiry_date, expiry_days_left, reason_label, stock_current, threshold
+        FROM temp.purchase_suggestion_candidates
+        WHERE true
+        ON CONFLICT(suggestion_id, item_id) DO UPDATE SET
+            sku = excluded.sku,
+            label = excluded.label,
+            qty_suggested = excluded.qty_suggested,
+            qty_final = CASE
+                WHEN purchase_suggestion_lines.qty_final = purchase_suggestion_lines.qty_suggested
+                THEN excluded.qty_final
+                ELSE purchase_suggestion_lines.qty_final
+            END,
+            unit = excluded.unit,
+            reason = excluded.reason,
+            reason_codes = excluded.reason_codes,
+            expiry_date = excluded.expiry_date,
+            expiry_days_left = excluded.expiry_days_left,
+            reason_label = excluded.reason_label,
+            stock_current = excluded.stock_current,
+            threshold = excluded.threshold
+        """
+    )
+    if scoped:
+        conn.execute(
+            """
+            DELETE FROM purchase_suggestion_lines
+            WHERE item_id IN (SELECT item_id FROM temp.purchase_suggestion_scope)
+              AND suggestion_id IN (
+                  SELECT ps.id FROM purchase_suggestions AS ps
+                  WHERE ps.site_key = ? AND ps.module_key = ? AND ps.status = 'draft'
+              )
+              AND NOT EXISTS (
+                  SELECT 1 FROM temp.purchase_suggestion_candidates AS c
+                  WHERE c.suggestion_id = purchase_suggestion_lines.suggestion_id
+                    AND c.item_id = purchase_suggestion_lines.item_id
+              )
+            """,
+            scope,
+        )
+        conn.execute(
+            """
+            UPDATE purchase_suggestions
+            SET status = 'dismissed', updated_at = CURRENT_TIMESTAMP
+            WHERE site_key = ? AND module_key = ? AND status = 'draft'
+              AND NOT EXISTS (
+                  SELECT 1 FROM purchase_suggestion_lines AS psl
+                  WHERE psl.suggestion_id = purchase_suggestions.id
+              )
+            """,
+            scope,
+        )
+        return
+    conn.execute(
+        """
+        DELETE FROM purchase_suggestion_lines
+        WHERE suggestion_id IN (
+            SELECT ps.id FROM purchase_suggestions AS ps
+            WHERE ps.site_key = ? AND ps.module_key = ? AND ps.status = 'draft'
+              AND (
+                  ps.id IN (SELECT suggestion_id FROM temp.purchase_suggestion_candidates)
+                  OR NOT EXISTS (
+                      SELECT 1 FROM temp.purchase_suggestion_candidates AS c
+                      WHERE c.supplier_id IS ps.supplier_id
+                  )
+              )
+        )
+        AND NOT EXISTS (
+            SELECT 1 FROM temp.purchase_suggestion_candidates AS c
+            WHERE c.suggestion_id = purchase_suggestion_lines.suggestion_id
+              AND c.item_id = purchase_suggestion_lines.item_id
+        )
+        """,
+        scope,
+    )
+    conn.execute(
+        """
+        UPDATE purchase_suggestions
+        SET status = 'dismissed', updated_at = CURRENT_TIMESTAMP
+        WHERE site_key = ? AND module_key = ? AND status = 'draft'
+          AND NOT EXISTS (
+              SELECT 1 FROM temp.purchase_suggestion_candidates AS c
+              WHERE c.supplier_id IS purchase_suggestions.supplier_id
+          )
+        """,
+        scope,
+    )
+
+
+def _clear_unusable_purchase_suggestion_suppliers(
+    conn: sqlite3.Connection, module_key: str, candidates: list[dict[str, Any]]
+) -> None:
+    """Detach the candidates whose supplier is missing or inactive."""
+
+    supplier_ids = sorted(
+        {
+            candidate["supplier_id"]
+            for candidate in candidates
+            if candidate.get("supplier_id") is not None
+        }
+    )
+    suppliers_by_id: dict[int, sqlite3.Row] = {}
+    if supplier_ids:
+        placeholders = ", ".join("?" for _ in supplier_ids)
+        supplier_rows = conn.execute(
+            f"SELECT * FROM suppliers WHERE id IN ({placeholders})",
+            supplier_ids,
+        ).fetchall()
+        suppliers_by_id = {row["id"]: row for row in supplier_rows}
+    for candidate in candidates:
+        supplier_id = candidate.get("supplier_id")
+        if supplier_id is None:
+            logger.info(
+                "[PURCHASE_SUGGESTIONS] missing supplier module=%s item_id=%s",
+                module_key,
+                candidate["item_id"],
+            )
+            continue
+        supplier_row = suppliers_by_id.get(supplier_id)
+        if supplier_row is None:
+            logger.info(
+                "[PURCHASE_SUGGESTIONS] supplier not found module=%s supplier_id=%s item_id=%s",
+                module_key,
+                supplier_id,
+                candidate["item_id"],
+            )
+            candidate["supplier_id"] = None
+            continue
+        if _is_supplier_inactive(supplier_row):
+            logger.info(
+                "[PURCHASE_SUGGESTIONS] supplier inactive module=%s supplier_id=%s item_id=%s",
+                module_key,
+                supplier_id,
+                candidate["item_id"],
+            )
+            candidate["supplier_id"] = None
+
+
+def _purchase_suggestion_settings_key(safety_buffer: int, expiry_soon_days: int) -> str:
+    return f"threshold:{safety_buffer}:{expiry_soon_days}"
+
+
+def _mark_purchase_suggestions_refreshed(
+    conn: sqlite3.Connection,
+    module_key: str,
+    settings_key: str,
+    forecast_settings: _ForecastSettings | None = None,
+) -> None:
+    """Record a full refresh of ``module_key`` and drop its pending changes.
+
+    The strategy and forecast settings are kept so that scheduled runs keep refreshing
+    the module the way it was last refreshed.
+    """
+
+    conn.execute("DELETE FROM purchase_suggestion_dirty_items WHERE module = ?", (module_key,))
+    conn.execute(
+        """
+        INSERT INTO purchase_suggestion_refresh_state (
+            module, settings_key, strategy, forecast_settings, full_refreshed_on, refreshed_at
+        )
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(module) DO UPDATE SET
+            settings_key = excluded.settings_key,
+            strategy = excluded.strategy,
+            forecast_settings = excluded.forecast_settings,
+            full_refreshed_on = excluded.full_refreshed_on,
+            refreshed_at = excluded.refreshed_at
+        """,
+        (
+            module_key,
+            settings_key,
+            "forecast" if forecast_settings else "threshold",
+            json.dumps(asdict(forecast_settings), sort_keys=True) if forecast_settings else None,
+            date.today().isoformat(),
+        ),
+    )
+
+
+def _stored_forecast_settings(state: sqlite3.Row | None) -> _ForecastSettings | None:
+    """Return the forecast settings of the last refresh, or None for threshold refreshes."""
+
+    if state is None or state["strategy"] != "forecast":
+        return None
+    try:
+        return _ForecastSettings(**json.loads(state["forecast_settings"] or "{}"))
+    except (TypeError, ValueError):
+        return _get_forecast_settings()
+
+
 def refresh_purchase_suggestions(
-    *, site_key: str, module_keys: Iterable[str], created_by: str | None = None
+    *,
+    site_key: str,
+    module_keys: Iterable[str],
+    created_by: str | None = None,
+    strategy: str = "threshold",
 ) -> list[models.PurchaseSuggestionDetail]:
     ensure_database_ready()
+    if strategy not in _PURCHASE_SUGGESTION_STRATEGIES:
+        raise ValueError(f"Stratégie de suggestion inconnue: {strategy}")
     safety_buffer = _get_purchase_suggestions_safety_buffer()
     expiry_soon_days = _get_purchase_suggestions_expiry_soon_days()
+    forecast_settings = _get_forecast_settings() if strategy == "forecast" else None
     module_list = [module for module in module_keys if module in _PURCHASE_SUGGESTION_MODULES]
     if not module_list:
         return []
     migrate_legacy_suppliers_to_site(site_key)
+    settings_key = _purchase_suggestion_settings_key(safety_buffer, expiry_soon_days)
     with _get_site_stock_conn(site_key) as conn:
+        staged_by_module: dict[str, list[dict[str, Any]]] = {}
         for module_key in module_list:
+            forecasts = (
+                _compute_consumption_forecasts(conn, module_key, forecast_settings)
+                if forecast_settings
+                else None
+            )
             candidates = _get_reorder_candidates(
-                conn, module_key, safety_buffer, expiry_soon_days
+                conn, module_key, safety_buffer, expiry_soon_days, forecasts
             )
-            supplier_ids = sorted(
-                {
-                    candidate["supplier_id"]
-                    for candidate in candidates
-                    if candidate.get("supplier_id") is not None
-                }
+            _clear_unusable_purchase_suggestion_suppliers(conn, module_key, candidates)
+            staged_by_module[module_key] = candidates
+        # Candidates are computed before any write so that each module only holds the
+        # write lock for the handful of set-based statements below.
+        for module_key, candidates in staged_by_module.items():
+            _stage_purchase_suggestion_candidates(conn, candidates)
+            _apply_purchase_suggestion_candidates(
+                conn, site_key=site_key, module_key=module_key, created_by=created_by
             )
-            suppliers_by_id: dict[int, sqlite3.Row] = {}
-            if supplier_ids:
-                placeholders = ", ".join("?" for _ in supplier_ids)
-                supplier_rows = conn.execute(
-                    f"SELECT * FROM suppliers WHERE id IN ({placeholders})",
-                    supplier_ids,
-                ).fetchall()
-                suppliers_by_id = {row["id"]: row for row in supplier_rows}
-            for candidate in candidates:
-                supplier_id = candidate.get("supplier_id")
-                if supplier_id is None:
-                    logger.info(
-                        "[PURCHASE_SUGGESTIONS] missing supplier module=%s item_id=%s",
-                        module_key,
-                        candidate["item_id"],
-                    )
-                    continue
-                supplier_row = suppliers_by_id.get(supplier_id)
-                if supplier_row is None:
-                    logger.info(
-                        "[PURCHASE_SUGGESTIONS] supplier not found module=%s supplier_id=%s item_id=%s",
-                        module_key,
-                        supplier_id,
-                        candidate["item_id"],
-                    )
-                    candidate["supplier_id"] = None
-                    continue
-                if _is_supplier_inactive(supplier_row):
-                    logger.info(
-                        "[PURCHASE_SUGGESTIONS] supplier inactive module=%s supplier_id=%s item_id=%s",
-                        module_key,
-                        supplier_id,
-                        candidate["item_id"],
-                    )
-                    candidate["supplier_id"] = None
-            grouped: dict[int | None, list[dict[str, Any]]] = defaultdict(list)
-            for candidate in candidates:
-                grouped[candidate["supplier_id"]].append(candidate)
-            existing_rows = conn.execute(
-                """
-                SELECT id, supplier_id
-                FROM purchase_suggestions
-                WHERE site_key = ? AND module_key = ? AND status = 'draft'
-                """,
-                (site_key, module_key),
-            ).fetchall()
-            existing_by_supplier: dict[int | None, int] = {
-                row["supplier_id"]: row["id"] for row in existing_rows
-            }
-            processed_suppliers: set[int | None] = set()
-            for supplier_id, items in grouped.items():
-                processed_suppliers.add(supplier_id)
-                suggestion_id = existing_by_supplier.get(supplier_id)
-                if suggestion_id is None:
-                    cur = conn.execute(
-                        """
-                        INSERT INTO purchase_suggestions (
-                            site_key, module_key, supplier_id, status, created_at, updated_at, created_by
-                        )
-                        VALUES (?, ?, ?, 'draft', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, ?)
-                        """,
-                        (site_key, module_key, supplier_id, created_by),
-                    )
-                    suggestion_id = int(cur.lastrowid)
-                else:
-                    conn.execute(
-                        """
-                        UPDATE purchase_suggestions
-                        SET updated_at = CURRENT_TIMESTAMP
-                        WHERE id = ?
-                        """,
-                        (suggestion_id,),
-                    )
-                current_item_ids = {item["item_id"] for item in items}
-                for item in items:
-                    row = conn.execute(
-                        """
-                        SELECT id, qty_final, qty_suggested
-                        FROM purchase_suggestion_lines
-                        WHERE suggestion_id = ? AND item_id = ?
-                        """,
-                        (suggestion_id, item["item_id"]),
-                    ).fetchone()
-                    if row is None:
-                        conn.execute(
-                            """
-                            INSERT INTO purchase_suggestion_lines (
-                                suggestion_id, item_id, sku, label, qty_suggested, qty_final, unit, reason,
-                                reason_codes, expiry_date, expiry_days_left, reason_label, stock_current, threshold
-                            )
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                suggestion_id,
-                                item["item_id"],
-                                item["sku"],
-                                item["label"],
-                                item["qty_suggested"],
-                                item["qty_final"],
-                                item["unit"],
-                                item["reason"],
-                                json.dumps(item.get("reason_codes") or [], ensure_ascii=False),
-                                item.get("expiry_date"),
-                                item.get("expiry_days_left"),
-                                item.get("reason_label"),
-                                item["stock_current"],
-                                item["threshold"],
-                            ),
-                        )
-                        continue
-                    previous_suggested = row["qty_suggested"]
-                    previous_final = row["qty_final"]
-                    next_final = previous_final
-                    if previous_final == previous_suggested:
-                        next_final = item["qty_final"]
-                    conn.execute(
-                        """
-                        UPDATE purchase_suggestion_lines
-                        SET sku = ?, label = ?, qty_suggested = ?, qty_final = ?, unit = ?, reason = ?,
-                            reason_codes = ?, expiry_date = ?, expiry_days_left = ?, reason_label = ?,
-                            stock_current = ?, threshold = ?
-                        WHERE id = ?
-                        """,
-                        (
-                            item["sku"],
-                            item["label"],
-                            item["qty_suggested"],
-                            next_final,
-                            item["unit"],
-                            item["reason"],
-                            json.dumps(item.get("reason_codes") or [], ensure_ascii=False),
-                            item.get("expiry_date"),
-                            item.get("expiry_days_left"),
-                            item.get("reason_label"),
-                            item["stock_current"],
-                            item["threshold"],
-                            row["id"],
-                        ),
-                    )
-                if current_item_ids:
-                    placeholders = ", ".join("?" for _ in current_item_ids)
-                    conn.execute(
-                        f"""
-                        DELETE FROM purchase_suggestion_lines
-                        WHERE suggestion_id = ? AND item_id NOT IN ({placeholders})
-                        """,
-                        (suggestion_id, *current_item_ids),
-                    )
-                else:
-                    conn.execute(
-                        "DELETE FROM purchase_suggestion_lines WHERE suggestion_id = ?",
-                        (suggestion_id,),
-                    )
-            for row in existing_rows:
-                if row["supplier_id"] in processed_suppliers:
-                    continue
-                conn.execute(
-                    """
-                    UPDATE purchase_suggestions
-                    SET status = 'dismissed', updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                    """,
-                    (row["id"],),
-                )
-                conn.execute(
-                    "DELETE FROM purchase_suggestion_lines WHERE suggestion_id = ?",
-                    (row["id"],),
-                )
-        conn.commit()
+            _mark_purchase_suggestions_refreshed(
+                conn, module_key, settings_key, forecast_settings
+            )
+            conn.commit()
+        conn.execute("DROP TABLE IF EXISTS temp.purchase_suggestion_candidates")
     return list_purchase_suggestions(
         site_key=site_key,
         module_key=None,
@@ -2041,6 +3552,133 @@ def refresh_purchase_suggestions(
     )
 
 
+def _refresh_changed_purchase_suggestions(
+    conn: sqlite3.Connection,
+    *,
+    site_key: str,
+    module_key: str,
+    safety_buffer: int,
+    expiry_soon_days: int,
+    created_by: str | None,
+    forecast_settings: _ForecastSettings | None = None,
+) -> int:
+    """Recompute the suggestion lines of the items queued since the last run.
+
+    The queue entries are removed in the transaction that applies their lines, so an
+    item changed meanwhile is queued again for the next run.
+    """
+
+    item_ids = [
+        row["item_id"]
+        for row in conn.execute(
+            "SELECT item_id FROM purchase_suggestion_dirty_items WHERE module = ?",
+            (module_key,),
+        ).fetchall()
+    ]
+    if not item_ids:
+        return 0
+    conn.executemany(
+        "DELETE FROM purchase_suggestion_dirty_items WHERE module = ? AND item_id = ?",
+        [(module_key, item_id) for item_id in item_ids],
+    )
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS purchase_suggestion_scope (item_id INTEGER PRIMARY KEY)"
+    )
+    conn.execute("DELETE FROM temp.purchase_suggestion_scope")
+    conn.executemany(
+        "INSERT INTO temp.purchase_suggestion_scope (item_id) VALUES (?)",
+        [(item_id,) for item_id in item_ids],
+    )
+    forecasts = (
+        _compute_consumption_forecasts(conn, module_key, forecast_settings)
+        if forecast_settings
+        else None
+    )
+    candidates = _get_reorder_candidates(
+        conn, module_key, safety_buffer, expiry_soon_days, forecasts, scoped=True
+    )
+    _clear_unusable_purchase_suggestion_suppliers(conn, module_key, candidates)
+    _stage_purchase_suggestion_candidates(conn, candidates)
+    _apply_purchase_suggestion_candidates(
+        conn, site_key=site_key, module_key=module_key, created_by=created_by, scoped=True
+    )
+    conn.execute(
+        "UPDATE purchase_suggestion_refresh_state SET refreshed_at = CURRENT_TIMESTAMP WHERE module = ?",
+        (module_key,),
+    )
+    return len(item_ids)
+
+
+def refresh_stale_purchase_suggestions(
+    site_key: str, *, created_by: str | None = None
+) -> dict[str, int]:
+    """Bring the draft suggestions of a site up to date with its item changes.
+
+    A module is fully recomputed once a day, when the suggestion settings change or
+    after a supplier edit, since expiry windows and supplier status move without any
+    item write. Otherwise only the items queued by the change-tracking triggers are
+    recomputed. Each module is refreshed with the strategy and forecast settings of
+    its last refresh. Returns the number of items recomputed per module.
+    """
+
+    ensure_database_ready()
+    safety_buffer = _get_purchase_suggestions_safety_buffer()
+    expiry_soon_days = _get_purchase_suggestions_expiry_soon_days()
+    settings_key = _purchase_suggestion_settings_key(safety_buffer, expiry_soon_days)
+    today = date.today().isoformat()
+    migrate_legacy_suppliers_to_site(site_key)
+    recomputed: dict[str, int] = {}
+    with _get_site_stock_conn(site_key) as conn:
+        states = {
+            row["module"]: row
+            for row in conn.execute(
+                """
+                SELECT module, settings_key, strategy, forecast_settings, full_refreshed_on
+                FROM purchase_suggestion_refresh_state
+                """
+            ).fetchall()
+        }
+        for module_key in _PURCHASE_SUGGESTION_MODULES:
+            state = states.get(module_key)
+            forecast_settings = _stored_forecast_settings(state)
+            if (
+                state is None
+                or state["settings_key"] != settings_key
+                or state["full_refreshed_on"] != today
+            ):
+                forecasts = (
+                    _compute_consumption_forecasts(conn, module_key, forecast_settings)
+                    if forecast_settings
+                    else None
+                )
+                candidates = _get_reorder_candidates(
+                    conn, module_key, safety_buffer, expiry_soon_days, forecasts
+                )
+                _clear_unusable_purchase_suggestion_suppliers(conn, module_key, candidates)
+                _stage_purchase_suggestion_candidates(conn, candidates)
+                _apply_purchase_suggestion_candidates(
+                    conn, site_key=site_key, module_key=module_key, created_by=created_by
+                )
+                _mark_purchase_suggestions_refreshed(
+                    conn, module_key, settings_key, forecast_settings
+                )
+                recomputed[module_key] = len(candidates)
+            else:
+                recomputed[module_key] = _refresh_changed_purchase_suggestions(
+                    conn,
+                    site_key=site_key,
+                    module_key=module_key,
+                    safety_buffer=safety_buffer,
+                    expiry_soon_days=expiry_soon_days,
+                    created_by=created_by,
+                    forecast_settings=forecast_settings,
+                )
+            conn.commit()
+        conn.execute("DROP TABLE IF EXISTS temp.purchase_suggestion_candidates")
+        conn.execute("DROP TABLE IF EXISTS temp.purchase_suggestion_scope")
+    return recomputed
+
+
 def update_purchase_suggestion_lines(
     suggestion_id: int, payload: models.PurchaseSuggestionUpdatePayload
 ) -> models.PurchaseSuggestionDetail:
@@ -4518,7 +6156,22 @@ def _apply_schema_migrations_for_site(site_key: str) -> None:
             """
         )
 
-        _sync_vehicle_inventory_with_remise(conn)
+        _ensure_low_stock_items(conn, executescript=executescript)
+        _ensure_movement_rollups(conn, executescript=executescript)
+        _ensure_report_data_versions(conn, executescript=executescript)
+        _ensure_stock_snapshots(conn, executescript=executescript)
+        _ensure_item_classifications(conn, executescript=executescript)
+        _ensure_expiry_radar(conn, executescript=executescript)
+        _ensure_barcode_index(conn, executescript=executescript)
+        _ensure_stocktake_tables(conn, executescript=executescript)
+        _ensure_purchase_order_listing_indexes(conn)
+        _ensure_auto_purchase_order_queue(conn, executescript=executescript)
+        _ensure_purchase_suggestion_change_tracking(conn, executescript=executescript)
+
+        if _ensure_vehicle_remise_sync_queue(conn, executescript=executescript):
+            _sync_vehicle_inventory_with_remise(conn)
+        else:
+            _process_vehicle_remise_sync_queue(conn)
 
         pharmacy_category_info = execute("PRAGMA table_info(pharmacy_items)").fetchall()
         pharmacy_category_columns = {row["name"] for row in pharmacy_category_info}
@@ -4535,6 +6188,7 @@ def _apply_schema_migrations_for_site(site_key: str) -> None:
 
 @dataclass(frozen=True)
 class _AutoPurchaseOrderSpec:
+    report_module_key: str
     items_table: str
     orders_table: str
     order_items_table: str
@@ -4543,12 +6197,13 @@ class _AutoPurchaseOrderSpec:
     unit_columns: tuple[str, ...]
     extra_json_column: str | None
     supplier_resolver: Callable[
-        [sqlite3.Connection, sqlite3.Row, dict[str, Any]], int | None
+        [_SupplierResolutionContext, sqlite3.Row, dict[str, Any]], int | None
     ]
 
 
 _AUTO_PO_SPECS: dict[str, _AutoPurchaseOrderSpec] = {
     "default": _AutoPurchaseOrderSpec(
+        report_module_key="clothing",
         items_table="items",
         orders_table="purchase_orders",
         order_items_table="purchase_order_items",
@@ -4556,9 +6211,10 @@ _AUTO_PO_SPECS: dict[str, _AutoPurchaseOrderSpec] = {
         sku_columns=("sku",),
         unit_columns=("size",),
         extra_json_column=None,
-        supplier_resolver=lambda _conn, row, _extra: _row_get(row, "supplier_id"),
+        supplier_resolver=lambda _suppliers, row, _extra: _row_get(row, "supplier_id"),
     ),
     "inventory_remise": _AutoPurchaseOrderSpec(
+        report_module_key="inventory_remise",
         items_table="remise_items",
         orders_table="remise_purchase_orders",
         order_items_table="remise_purchase_order_items",
@@ -4569,6 +6225,7 @@ _AUTO_PO_SPECS: dict[str, _AutoPurchaseOrderSpec] = {
         supplier_resolver=_resolve_remise_supplier_id,
     ),
     "pharmacy": _AutoPurchaseOrderSpec(
+        report_module_key="pharmacy",
         items_table="pharmacy_items",
         orders_table="pharmacy_purchase_orders",
         order_items_table="pharmacy_purchase_order_items",
@@ -4611,13 +6268,8 @@ def _auto_po_date_bucket() -> str:
     return datetime.now(timezone.utc).date().isoformat()
 
 
-def _build_auto_purchase_order_idempotency_key(
-    module: str, supplier_id: int, *, item_id: int | None = None
-) -> str:
-    key = f"auto:{module}:{db.get_current_site_key()}:{supplier_id}:{_auto_po_date_bucket()}"
-    if item_id is None:
-        return key
-    return f"{key}:{item_id}"
+def _build_auto_purchase_order_idempotency_key(module: str, supplier_id: int) -> str:
+    return f"auto:{module}:{db.get_current_site_key()}:{supplier_id}:{_auto_po_date_bucket()}"
 
 
 def _list_open_auto_orders_by_supplier(
@@ -4636,6 +6288,30 @@ def _list_open_auto_orders_by_supplier(
     ).fetchall()
 
 
+def _latest_open_auto_order_ids(
+    conn: sqlite3.Connection, spec: _AutoPurchaseOrderSpec, supplier_ids: Iterable[int]
+) -> dict[int, int]:
+    """Return the most recent open auto order of each supplier, in a single query."""
+
+    supplier_ids = list(supplier_ids)
+    if not supplier_ids:
+        return {}
+    latest: dict[int, int] = {}
+    for row in conn.execute(
+        f"""
+        SELECT id, supplier_id
+        FROM {spec.orders_table}
+        WHERE auto_created = 1
+          AND supplier_id IN ({", ".join("?" for _ in supplier_ids)})
+          AND UPPER(status) NOT IN ({", ".join("?" for _ in _AUTO_PO_CLOSED_STATUSES)})
+        ORDER BY created_at DESC, id DESC
+        """,
+        (*supplier_ids, *_AUTO_PO_CLOSED_STATUSES),
+    ).fetchall():
+        latest.setdefault(row["supplier_id"], row["id"])
+    return latest
+
+
 def _merge_duplicate_auto_orders(
     conn: sqlite3.Connection,
     spec: _AutoPurchaseOrderSpec,
@@ -4702,12 +6378,9 @@ def _merge_duplicate_auto_orders(
         )
 
 
-def _fetch_auto_po_item(
-    conn: sqlite3.Connection, module: str, item_id: int
-) -> tuple[sqlite3.Row, dict[str, Any], _AutoPurchaseOrderSpec] | None:
-    spec = _AUTO_PO_SPECS.get(module)
-    if spec is None:
-        return None
+def _fetch_auto_po_items(
+    conn: sqlite3.Connection, spec: _AutoPurchaseOrderSpec, item_ids: list[int]
+) -> list[tuple[sqlite3.Row, dict[str, Any]]]:
     columns = [
         "id",
         "name",
@@ -4719,100 +6392,256 @@ def _fetch_auto_po_item(
     columns.extend(spec.unit_columns)
     if spec.extra_json_column and _table_has_column(conn, spec.items_table, spec.extra_json_column):
         columns.append(spec.extra_json_column)
-    row = conn.execute(
-        f"SELECT {', '.join(columns)} FROM {spec.items_table} WHERE id = ?",
-        (item_id,),
-    ).fetchone()
-    if row is None:
-        return None
-    extra = {}
-    if spec.extra_json_column and spec.extra_json_column in row.keys():
-        extra = _parse_extra_json(row[spec.extra_json_column])
-    return row, extra, spec
+    placeholders = ", ".join("?" for _ in item_ids)
+    rows = conn.execute(
+        f"SELECT {', '.join(columns)} FROM {spec.items_table} WHERE id IN ({placeholders}) ORDER BY id",
+        item_ids,
+    ).fetchall()
+    fetched: list[tuple[sqlite3.Row, dict[str, Any]]] = []
+    for row in rows:
+        extra = {}
+        if spec.extra_json_column and spec.extra_json_column in row.keys():
+            extra = _parse_extra_json(row[spec.extra_json_column])
+        fetched.append((row, extra))
+    return fetched
+
+
+def _ensure_auto_purchase_order_queue(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> None:
+    if executescript is None:
+        executescript = conn.executescript
+    executescript(
+        """
+        CREATE TABLE IF NOT EXISTS auto_purchase_order_queue (
+            module TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            queued_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (module, item_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_auto_purchase_order_queue_queued
+        ON auto_purchase_order_queue(queued_at);
+        """
+    )
+
+
+_PURCHASE_SUGGESTION_TRACKED_COLUMNS: tuple[str, ...] = (
+    "name",
+    "sku",
+    "barcode",
+    "size",
+    "packaging",
+    "dosage",
+    "quantity",
+    "low_stock_threshold",
+    "track_low_stock",
+    "supplier_id",
+    "expiration_date",
+    "extra_json",
+)
+
+
+def _ensure_purchase_suggestion_change_tracking(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> None:
+    """Queue the items whose suggestion inputs change, for incremental refreshes.
+
+    Item triggers fire on the columns a suggestion line is computed from; supplier
+    writes clear ``full_refreshed_on`` so that the next run recomputes every module.
+    """
+
+    if executescript is None:
+        executescript = conn.executescript
+    executescript(
+        """
+        CREATE TABLE IF NOT EXISTS purchase_suggestion_dirty_items (
+            module TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            queued_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (module, item_id)
+        );
+        CREATE TABLE IF NOT EXISTS purchase_suggestion_refresh_state (
+            module TEXT PRIMARY KEY,
+            settings_key TEXT NOT NULL,
+            strategy TEXT NOT NULL DEFAULT 'threshold',
+            forecast_settings TEXT,
+            full_refreshed_on TEXT,
+            refreshed_at TIMESTAMP
+        );
+        """
+    )
+    state_columns = {
+        row["name"]
+        for row in conn.execute("PRAGMA table_info(purchase_suggestion_refresh_state)").fetchall()
+    }
+    if "strategy" not in state_columns:
+        conn.execute(
+            "ALTER TABLE purchase_suggestion_refresh_state "
+            "ADD COLUMN strategy TEXT NOT NULL DEFAULT 'threshold'"
+        )
+    if "forecast_settings" not in state_columns:
+        conn.execute("ALTER TABLE purchase_suggestion_refresh_state ADD COLUMN forecast_settings TEXT")
+    existing_triggers = {
+        row["name"]: " ".join((row["sql"] or "").split())
+        for row in conn.execute(
+            """
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'trigger' AND name LIKE 'trg_%_suggestion_%'
+            """
+        ).fetchall()
+    }
+    statements: list[str] = []
+    for module in _PURCHASE_SUGGESTION_MODULES:
+        table = _REPORT_MODULES[module].items_table
+        if not _table_exists(conn, table):
+            continue
+        columns = ", ".join(
+            column
+            for column in _PURCHASE_SUGGESTION_TRACKED_COLUMNS
+            if _table_has_column(conn, table, column)
+        )
+        for event, timing, row_ref in (
+            ("insert", "AFTER INSERT", "NEW"),
+            ("update", f"AFTER UPDATE OF {columns}", "NEW"),
+            ("delete", "AFTER DELETE", "OLD"),
+        ):
+            name = f"trg_{table}_suggestion_dirty_{event}"
+            existing_sql = existing_triggers.get(name)
+            if existing_sql is not None:
+                # Rebuilt when the tracked column set changed (new column, new table layout).
+                if f"{timing} ON {table}" in existing_sql:
+                    continue
+                statements.append(f"DROP TRIGGER IF EXISTS {name};")
+            statements.append(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {name}
+                {timing} ON {table}
+                BEGIN
+                    INSERT OR IGNORE INTO purchase_suggestion_dirty_items (module, item_id)
+                    VALUES ('{module}', {row_ref}.id);
+                END;
+                """
+            )
+    if _table_exists(conn, "suppliers"):
+        for event in ("insert", "update", "delete"):
+            name = f"trg_suppliers_suggestion_stale_{event}"
+            if name in existing_triggers:
+                continue
+            statements.append(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS {name}
+                AFTER {event.upper()} ON suppliers
+                BEGIN
+                    UPDATE purchase_suggestion_refresh_state SET full_refreshed_on = NULL;
+                END;
+                """
+            )
+    if statements:
+        executescript("".join(statements))
 
 
-def _maybe_create_auto_purchase_order(
+def _queue_auto_purchase_order(
     conn: sqlite3.Connection, module: str, item_id: int
 ) -> None:
-    fetched = _fetch_auto_po_item(conn, module, item_id)
-    if fetched is None:
-        return
-    item, extra, spec = fetched
-    supplier_id = spec.supplier_resolver(conn, item, extra)
-    if supplier_id is None:
-        logger.info(
-            "[AUTO_PO] skipped missing supplier module=%s item_id=%s",
-            module,
-            item_id,
-        )
+    """Mark an item for auto purchase order evaluation.
+
+    The entry is written in the caller's transaction; changes to the same item made
+    before the queue is processed coalesce into a single entry whose ``queued_at`` is
+    moved to the latest change, so the debounce window restarts.
+    """
+
+    if module not in _AUTO_PO_SPECS:
         return
-    threshold = item["low_stock_threshold"] or 0
-    if threshold <= 0:
+    conn.execute(
+        """
+        INSERT INTO auto_purchase_order_queue (module, item_id, queued_at)
+        VALUES (?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(module, item_id) DO UPDATE SET queued_at = excluded.queued_at
+        """,
+        (module, item_id),
+    )
+
+
+def _apply_auto_purchase_orders(
+    conn: sqlite3.Connection, module: str, item_ids: list[int]
+) -> None:
+    """Create or top up the auto purchase order lines of a batch of items.
+
+    Items below their threshold are grouped by supplier: an item already on an open
+    auto order has its line raised to cover the shortage, the other items are added
+    to the supplier's most recent open auto order, or to a new one.
+    """
+
+    spec = _AUTO_PO_SPECS.get(module)
+    if spec is None or not item_ids:
         return
-    quantity = item["quantity"] or 0
-    shortage = threshold - quantity
-    if shortage <= 0:
+    shortages_by_supplier: dict[int, list[tuple[sqlite3.Row, int]]] = defaultdict(list)
+    suppliers = _SupplierResolutionContext(conn)
+    for item, extra in _fetch_auto_po_items(conn, spec, item_ids):
+        supplier_id = spec.supplier_resolver(suppliers, item, extra)
+        if supplier_id is None:
+            logger.info(
+                "[AUTO_PO] skipped missing supplier module=%s item_id=%s",
+                module,
+                item["id"],
+            )
+            continue
+        threshold = item["low_stock_threshold"] or 0
+        if threshold <= 0:
+            continue
+        shortage = threshold - (item["quantity"] or 0)
+        if shortage <= 0:
+            continue
+        shortages_by_supplier[supplier_id].append((item, shortage))
+    if not shortages_by_supplier:
         return
 
-    existing = conn.execute(
+    short_item_ids = [item["id"] for items in shortages_by_supplier.values() for item, _ in items]
+    existing_lines: dict[int, sqlite3.Row] = {}
+    for line in conn.execute(
         f"""
-        SELECT poi.id, poi.quantity_ordered, poi.quantity_received
+        SELECT poi.id, poi.{spec.item_id_column} AS item_id, poi.quantity_ordered, poi.quantity_received
         FROM {spec.order_items_table} AS poi
         JOIN {spec.orders_table} AS po ON po.id = poi.purchase_order_id
-        WHERE poi.{spec.item_id_column} = ?
+        WHERE poi.{spec.item_id_column} IN ({", ".join("?" for _ in short_item_ids)})
           AND po.auto_created = 1
           AND UPPER(po.status) NOT IN ({", ".join("?" for _ in _AUTO_PO_CLOSED_STATUSES)})
         ORDER BY po.created_at DESC, po.id DESC
-        LIMIT 1
         """,
-        (item_id, *[status for status in _AUTO_PO_CLOSED_STATUSES]),
-    ).fetchone()
-
-    if existing:
-        outstanding = existing["quantity_ordered"] - existing["quantity_received"]
-        if outstanding < shortage:
-            new_total = existing["quantity_received"] + shortage
-            conn.execute(
-                f"UPDATE {spec.order_items_table} SET quantity_ordered = ? WHERE id = ?",
-                (new_total, existing["id"]),
-            )
-        return
+        (*short_item_ids, *_AUTO_PO_CLOSED_STATUSES),
+    ).fetchall():
+        existing_lines.setdefault(line["item_id"], line)
 
-    note = f"Commande automatique - {item['name']}"
-    idempotency_key = None
-    if _table_has_column(conn, spec.orders_table, "idempotency_key"):
-        idempotency_key = _build_auto_purchase_order_idempotency_key(
-            module, supplier_id, item_id=item_id
-        )
-        existing_order = conn.execute(
-            f"""
-            SELECT id
-            FROM {spec.orders_table}
-            WHERE idempotency_key = ?
-            ORDER BY id DESC
-            LIMIT 1
-            """,
-            (idempotency_key,),
-        ).fetchone()
-        if existing_order is not None:
-            return
-    try:
-        if idempotency_key:
-            po_cur = conn.execute(
-                f"""
-                INSERT INTO {spec.orders_table} (
-                    supplier_id,
-                    status,
-                    note,
-                    auto_created,
-                    created_at,
-                    idempotency_key
+    has_sku = _table_has_column(conn, spec.order_items_table, "sku")
+    has_unit = _table_has_column(conn, spec.order_items_table, "unit")
+    columns = ["purchase_order_id", spec.item_id_column, "quantity_ordered"]
+    if has_sku:
+        columns.append("sku")
+    if has_unit:
+        columns.append("unit")
+    open_order_ids = _latest_open_auto_order_ids(conn, spec, shortages_by_supplier)
+    for supplier_id, items in shortages_by_supplier.items():
+        new_lines: list[tuple[sqlite3.Row, int]] = []
+        for item, shortage in items:
+            existing = existing_lines.get(item["id"])
+            if existing is None:
+                new_lines.append((item, shortage))
+                continue
+            outstanding = existing["quantity_ordered"] - existing["quantity_received"]
+            if outstanding < shortage:
+                conn.execute(
+                    f"UPDATE {spec.order_items_table} SET quantity_ordered = ? WHERE id = ?",
+                    (existing["quantity_received"] + shortage, existing["id"]),
                 )
-                VALUES (?, 'PENDING', ?, 1, CURRENT_TIMESTAMP, ?)
-                """,
-                (supplier_id, note, idempotency_key),
+        if not new_lines:
+            continue
+        order_id = open_order_ids.get(supplier_id)
+        if order_id is None:
+            note = (
+                f"Commande automatique - {new_lines[0][0]['name']}"
+                if len(new_lines) == 1
+                else "Commande automatique - Stock sous seuil"
             )
-        else:
             po_cur = conn.execute(
                 f"""
                 INSERT INTO {spec.orders_table} (supplier_id, status, note, auto_created, created_at)
@@ -4820,25 +6649,65 @@ def _maybe_create_auto_purchase_order(
                 """,
                 (supplier_id, note),
             )
-    except sqlite3.IntegrityError:
-        if idempotency_key:
-            return
-        raise
-    order_id = int(po_cur.lastrowid)
-    has_sku = _table_has_column(conn, spec.order_items_table, "sku")
-    has_unit = _table_has_column(conn, spec.order_items_table, "unit")
-    columns = ["purchase_order_id", spec.item_id_column, "quantity_ordered"]
-    values: list[object] = [order_id, item_id, shortage]
-    if has_sku:
-        columns.append("sku")
-        values.append(_resolve_first_non_empty(item, spec.sku_columns))
-    if has_unit:
-        columns.append("unit")
-        values.append(_resolve_first_non_empty(item, spec.unit_columns))
-    conn.execute(
-        f"INSERT INTO {spec.order_items_table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
-        values,
-    )
+            order_id = int(po_cur.lastrowid)
+            open_order_ids[supplier_id] = order_id
+        line_values: list[list[object]] = []
+        for item, shortage in new_lines:
+            values: list[object] = [order_id, item["id"], shortage]
+            if has_sku:
+                values.append(_resolve_first_non_empty(item, spec.sku_columns))
+            if has_unit:
+                values.append(_resolve_first_non_empty(item, spec.unit_columns))
+            line_values.append(values)
+        conn.executemany(
+            f"INSERT INTO {spec.order_items_table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            line_values,
+        )
+
+
+def process_auto_purchase_order_queue(
+    site_key: str | None = None,
+    *,
+    debounce_seconds: int = 0,
+    batch_size: int = _AUTO_PO_QUEUE_BATCH_SIZE,
+) -> int:
+    """Evaluate the queued items of a site whose debounce window has elapsed.
+
+    Each batch is removed from the queue and applied in the same transaction, so an
+    item changed while the batch is processed is simply queued again. Returns the
+    number of queue entries processed.
+    """
+
+    ensure_database_ready()
+    processed = 0
+    with db.get_stock_connection(site_key) as conn:
+        while True:
+            rows = conn.execute(
+                """
+                SELECT module, item_id
+                FROM auto_purchase_order_queue
+                WHERE queued_at <= datetime('now', ?)
+                ORDER BY queued_at, module, item_id
+                LIMIT ?
+                """,
+                (f"-{max(int(debounce_seconds), 0)} seconds", batch_size),
+            ).fetchall()
+            if not rows:
+                break
+            conn.executemany(
+                "DELETE FROM auto_purchase_order_queue WHERE module = ? AND item_id = ?",
+                [(row["module"], row["item_id"]) for row in rows],
+            )
+            item_ids_by_module: dict[str, list[int]] = defaultdict(list)
+            for row in rows:
+                item_ids_by_module[row["module"]].append(row["item_id"])
+            for module, item_ids in item_ids_by_module.items():
+                _apply_auto_purchase_orders(conn, module, item_ids)
+            conn.commit()
+            processed += len(rows)
+            if len(rows) < batch_size:
+                break
+    return processed
 
 
 def refresh_auto_purchase_orders(module_key: str) -> models.PurchaseOrderAutoRefreshResponse:
@@ -4856,21 +6725,23 @@ def refresh_auto_purchase_orders(module_key: str) -> models.PurchaseOrderAutoRef
         if spec.extra_json_column and _table_has_column(conn, spec.items_table, spec.extra_json_column):
             item_columns.append(spec.extra_json_column)
 
-        low_stock_where = ["quantity < low_stock_threshold", "low_stock_threshold > 0"]
-        if "track_low_stock" in item_columns:
-            low_stock_where.append("track_low_stock = 1")
+        low_stock_where, low_stock_params = _low_stock_filter(
+            spec.report_module_key, tracked_only=True
+        )
         rows = conn.execute(
-            f"SELECT {', '.join(item_columns)} FROM {spec.items_table} WHERE {' AND '.join(low_stock_where)}"
+            f"SELECT {', '.join(item_columns)} FROM {spec.items_table} WHERE {low_stock_where}",
+            low_stock_params,
         ).fetchall()
 
         items_by_supplier: dict[int | None, list[dict[str, Any]]] = defaultdict(list)
         items_below_threshold = 0
         skipped = 0
+        suppliers = _SupplierResolutionContext(conn)
         for row in rows:
             extra: dict[str, Any] = {}
             if spec.extra_json_column and spec.extra_json_column in row.keys():
                 extra = _parse_extra_json(row[spec.extra_json_column])
-            supplier_id = spec.supplier_resolver(conn, row, extra)
+            supplier_id = spec.supplier_resolver(suppliers, row, extra)
             if supplier_id is None:
                 skipped += 1
                 continue
@@ -5192,43 +7063,120 @@ def _sync_vehicle_item_from_remise(conn: sqlite3.Connection, source: sqlite3.Row
     return False
 
 
-def _sync_vehicle_inventory_with_remise(conn: sqlite3.Connection) -> None:
-    remise_rows = conn.execute(
-        "SELECT id, name, sku, supplier_id, size FROM remise_items"
-    ).fetchall()
-    seen_ids: list[int] = []
+def _ensure_vehicle_remise_sync_queue(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> bool:
+    """Create the remise → vehicle sync queue and its triggers.
+
+    Returns ``True`` when the queue table did not exist yet, so the caller can run a
+    one-off full reconcile for rows written before the triggers were installed.
+    """
+
+    if executescript is None:
+        executescript = conn.executescript
+    created = not _table_exists(conn, "vehicle_remise_sync_queue")
+    executescript(
+        """
+        CREATE TABLE IF NOT EXISTS vehicle_remise_sync_queue (
+            remise_item_id INTEGER PRIMARY KEY,
+            queued_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TRIGGER IF NOT EXISTS trg_remise_items_sync_insert
+        AFTER INSERT ON remise_items
+        BEGIN
+            INSERT OR IGNORE INTO vehicle_remise_sync_queue (remise_item_id) VALUES (NEW.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_remise_items_sync_update
+        AFTER UPDATE OF name, sku, supplier_id, size ON remise_items
+        BEGIN
+            INSERT OR IGNORE INTO vehicle_remise_sync_queue (remise_item_id) VALUES (NEW.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS trg_remise_items_sync_delete
+        AFTER DELETE ON remise_items
+        BEGIN
+            INSERT OR IGNORE INTO vehicle_remise_sync_queue (remise_item_id) VALUES (OLD.id);
+        END;
+        """
+    )
+    return created
+
+
+def _process_vehicle_remise_sync_queue(
+    conn: sqlite3.Connection, *, batch_size: int = _REMISE_SYNC_BATCH_SIZE
+) -> int:
+    """Apply queued remise changes to the vehicle inventory, one batch at a time."""
+
+    processed = 0
     skipped = 0
-    for row in remise_rows:
-        if _sync_vehicle_item_from_remise(conn, row):
-            skipped += 1
-        seen_ids.append(row["id"])
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            """
+            SELECT q.remise_item_id, r.id, r.name, r.sku, r.supplier_id, r.size
+            FROM vehicle_remise_sync_queue AS q
+            LEFT JOIN remise_items AS r ON r.id = q.remise_item_id
+            WHERE q.remise_item_id > ?
+            ORDER BY q.remise_item_id
+            LIMIT ?
+            """,
+            (last_id, batch_size),
+        ).fetchall()
+        if not rows:
+            break
+        removed_ids: list[tuple[int]] = []
+        for row in rows:
+            if row["id"] is None:
+                removed_ids.append((row["remise_item_id"],))
+            elif _sync_vehicle_item_from_remise(conn, row):
+                skipped += 1
+        if removed_ids:
+            conn.executemany("DELETE FROM vehicle_items WHERE remise_item_id = ?", removed_ids)
+        conn.executemany(
+            "DELETE FROM vehicle_remise_sync_queue WHERE remise_item_id = ?",
+            [(row["remise_item_id"],) for row in rows],
+        )
+        processed += len(rows)
+        last_id = rows[-1]["remise_item_id"]
     if skipped:
         logger.warning(
             "[SYNC] skipped %s remise items without sku site_key=%s",
             skipped,
             db.get_current_site_key(),
         )
-    if seen_ids:
-        placeholders = ", ".join("?" for _ in seen_ids)
-        conn.execute(
-            f"DELETE FROM vehicle_items WHERE remise_item_id IS NOT NULL AND remise_item_id NOT IN ({placeholders})",
-            seen_ids,
-        )
-    else:
-        conn.execute("DELETE FROM vehicle_items WHERE remise_item_id IS NOT NULL")
+    return processed
+
+
+def _sync_vehicle_inventory_with_remise(conn: sqlite3.Connection) -> dict[str, int]:
+    """Full reconcile: requeue every remise item and drop orphaned vehicle items."""
+
+    conn.execute(
+        "INSERT OR IGNORE INTO vehicle_remise_sync_queue (remise_item_id) SELECT id FROM remise_items"
+    )
+    synced = _process_vehicle_remise_sync_queue(conn)
+    cur = conn.execute(
+        """
+        DELETE FROM vehicle_items
+        WHERE remise_item_id IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM remise_items AS r WHERE r.id = vehicle_items.remise_item_id
+          )
+        """
+    )
+    return {"synced": synced, "orphans_deleted": int(cur.rowcount or 0)}
 
 
-def _sync_single_vehicle_item(remise_item_id: int) -> None:
+def _flush_vehicle_remise_sync_queue() -> None:
     with db.get_stock_connection() as conn:
-        source = conn.execute(
-            "SELECT id, name, sku, supplier_id, size FROM remise_items WHERE id = ?",
-            (remise_item_id,),
-        ).fetchone()
-        if source is None:
-            conn.execute("DELETE FROM vehicle_items WHERE remise_item_id = ?", (remise_item_id,))
-        else:
-            _sync_vehicle_item_from_remise(conn, source)
+        if _process_vehicle_remise_sync_queue(conn):
+            _persist_after_commit(conn, "vehicle_inventory")
+
+
+def reconcile_vehicle_inventory_with_remise() -> dict[str, int]:
+    ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        result = _sync_vehicle_inventory_with_remise(conn)
         _persist_after_commit(conn, "vehicle_inventory")
+    return result
 
 
 def _build_inventory_item(row: sqlite3.Row) -> models.Item:
@@ -5337,15 +7285,21 @@ def _build_inventory_item(row: sqlite3.Row) -> models.Item:
 
 
 def _list_inventory_items_internal(
-    module: str, search: str | None = None
+    module: str,
+    search: str | None = None,
+    *,
+    abc_class: str | None = None,
+    xyz_class: str | None = None,
 ) -> list[models.Item]:
     ensure_database_ready()
     config = _get_inventory_config(module)
     if module == "vehicle_inventory":
         with db.get_stock_connection() as conn:
             _ensure_vehicle_item_columns(conn)
-    params: tuple[object, ...] = ()
+    conditions: list[str] = []
+    params: list[Any] = []
     if module == "vehicle_inventory":
+        id_column = "vi.id"
         query = (
             "SELECT vi.*, "
             "COALESCE(vi.size, ri.size) AS resolved_size, "
@@ -5363,11 +7317,12 @@ def _list_inventory_items_internal(
             "LEFT JOIN remise_lots AS rl ON rl.id = vi.lot_id"
         )
         if search:
-            query += " WHERE COALESCE(ri.name, vi.name) LIKE ? OR COALESCE(ri.sku, vi.sku) LIKE ?"
+            conditions.append("(COALESCE(ri.name, vi.name) LIKE ? OR COALESCE(ri.sku, vi.sku) LIKE ?)")
             like = f"%{search}%"
-            params = (like, like)
-        query += " ORDER BY COALESCE(ri.name, vi.name) COLLATE NOCASE"
+            params.extend((like, like))
+        order_by = " ORDER BY COALESCE(ri.name, vi.name) COLLATE NOCASE"
     elif module == "inventory_remise":
+        id_column = "ri.id"
         query = (
             "SELECT ri.*, assignments.vehicle_names AS assigned_vehicle_names, "
             "lot_memberships.lot_names, lot_memberships.lot_count "
@@ -5388,21 +7343,33 @@ def _list_inventory_items_internal(
             ") AS lot_memberships ON lot_memberships.remise_item_id = ri.id"
         )
         if search:
-            query += " WHERE ri.name LIKE ? OR ri.sku LIKE ?"
+            conditions.append("(ri.name LIKE ? OR ri.sku LIKE ?)")
             like = f"%{search}%"
-            params = (like, like)
-        query += " ORDER BY ri.name COLLATE NOCASE"
+            params.extend((like, like))
+        order_by = " ORDER BY ri.name COLLATE NOCASE"
     else:
+        id_column = "id"
         query = f"SELECT * FROM {config.tables.items}"
         if search:
-            query += " WHERE name LIKE ? OR sku LIKE ?"
+            conditions.append("(name LIKE ? OR sku LIKE ?)")
             like = f"%{search}%"
-            params = (like, like)
-        query += " ORDER BY name COLLATE NOCASE"
+            params.extend((like, like))
+        order_by = " ORDER BY name COLLATE NOCASE"
     with db.get_stock_connection() as conn:
         if module == "inventory_remise":
             _ensure_remise_item_columns(conn)
-        cur = conn.execute(query, params)
+        report_module = next(
+            key for key, entry in _REPORT_MODULES.items() if entry.inventory_module == module
+        )
+        classification_sql, classification_params = _classification_filter_sql(
+            conn, report_module, id_column, abc_class, xyz_class
+        )
+        if classification_sql:
+            conditions.append(classification_sql)
+            params.extend(classification_params)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        cur = conn.execute(query + order_by, params)
         return [_build_inventory_item(row) for row in cur.fetchall()]
 
 
@@ -5480,7 +7447,7 @@ def _update_remise_quantity(
         "UPDATE remise_items SET quantity = ? WHERE id = ?",
         (updated, remise_item_id),
     )
-    _maybe_create_auto_purchase_order(conn, "inventory_remise", remise_item_id)
+    _queue_auto_purchase_order(conn, "inventory_remise", remise_item_id)
     logger.info(
         "[VEHICLE_INVENTORY] Delete rowcount step=update-remise-quantity remise_item_id=%s rowcount=%s",
         remise_item_id,
@@ -5511,7 +7478,7 @@ def _update_pharmacy_quantity(
         "UPDATE pharmacy_items SET quantity = ? WHERE id = ?",
         (updated, pharmacy_item_id),
     )
-    _maybe_create_auto_purchase_order(conn, "pharmacy", pharmacy_item_id)
+    _queue_auto_purchase_order(conn, "pharmacy", pharmacy_item_id)
     logger.info(
         "[VEHICLE_INVENTORY] Delete rowcount step=update-pharmacy-quantity pharmacy_item_id=%s rowcount=%s",
         pharmacy_item_id,
@@ -5906,7 +7873,7 @@ def _create_inventory_item_internal(
         )
         item_id = cur.lastrowid
         if config.auto_purchase_orders:
-            _maybe_create_auto_purchase_order(conn, module, item_id)
+            _queue_auto_purchase_order(conn, module, item_id)
         _persist_after_commit(conn, *_inventory_modules_to_persist(module))
     return _get_inventory_item_internal(module, item_id)
 
@@ -6117,7 +8084,7 @@ def _update_inventory_item_internal(
             values,
         )
         if config.auto_purchase_orders and should_check_low_stock:
-            _maybe_create_auto_purchase_order(conn, module, item_id)
+            _queue_auto_purchase_order(conn, module, item_id)
         if module == "vehicle_inventory" and should_restack_to_template and current_row is not None:
             template_id = _restack_vehicle_item_template(
                 conn,
@@ -6508,58 +8475,393 @@ def _delete_inventory_category_internal(module: str, category_id: int) -> None:
             f"DELETE FROM {config.tables.categories} WHERE id = ?",
             (category_id,),
         )
-        _persist_after_commit(conn, *_inventory_modules_to_persist(module))
-    if previous_path:
-        _delete_media_file(previous_path)
+        _persist_after_commit(conn, *_inventory_modules_to_persist(module))
+    if previous_path:
+        _delete_media_file(previous_path)
+
+
+def _record_inventory_movement_internal(
+    module: str, item_id: int, payload: models.MovementCreate
+) -> None:
+    ensure_database_ready()
+    config = _get_inventory_config(module)
+    with db.get_stock_connection() as conn:
+        cur = conn.execute(
+            f"SELECT quantity FROM {config.tables.items} WHERE id = ?",
+            (item_id,),
+        )
+        row = cur.fetchone()
+        if row is None:
+            raise ValueError("Article introuvable")
+        conn.execute(
+            f"INSERT INTO {config.tables.movements} (item_id, delta, reason) VALUES (?, ?, ?)",
+            (item_id, payload.delta, payload.reason),
+        )
+        conn.execute(
+            f"UPDATE {config.tables.items} SET quantity = quantity + ? WHERE id = ?",
+            (payload.delta, item_id),
+        )
+        if config.auto_purchase_orders:
+            _queue_auto_purchase_order(conn, module, item_id)
+        _persist_after_commit(conn, *_inventory_modules_to_persist(module))
+
+
+def _fetch_inventory_movements_internal(
+    module: str, item_id: int
+) -> list[models.Movement]:
+    ensure_database_ready()
+    config = _get_inventory_config(module)
+    with db.get_stock_connection() as conn:
+        cur = conn.execute(
+            f"SELECT * FROM {config.tables.movements} WHERE item_id = ? ORDER BY created_at DESC",
+            (item_id,),
+        )
+        rows = cur.fetchall()
+        return [
+            models.Movement(
+                id=row["id"],
+                item_id=row["item_id"],
+                delta=row["delta"],
+                reason=row["reason"],
+                created_at=row["created_at"],
+            )
+            for row in rows
+        ]
+
+
+_STOCKTAKE_BARCODE_MODULES = {
+    "clothing": "clothing",
+    "inventory_remise": "remise",
+    "pharmacy": "pharmacy",
+}
+
+
+def _ensure_stocktake_tables(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> None:
+    if executescript is None:
+        executescript = conn.executescript
+    executescript(
+        """
+        CREATE TABLE IF NOT EXISTS stocktake_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            module TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'OPEN',
+            note TEXT,
+            created_by TEXT,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            reconciled_at TIMESTAMP,
+            reconciled_by TEXT,
+            adjusted_items INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_stocktake_sessions_module
+        ON stocktake_sessions(module, status);
+        CREATE TABLE IF NOT EXISTS stocktake_counts (
+            session_id INTEGER NOT NULL REFERENCES stocktake_sessions(id) ON DELETE CASCADE,
+            item_id INTEGER NOT NULL,
+            device_id TEXT NOT NULL DEFAULT '',
+            counted_qty INTEGER NOT NULL,
+            counted_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (session_id, item_id, device_id)
+        );
+        """
+    )
+
+
+def _resolve_stocktake_module(module: str) -> _ReportModuleConfig:
+    resolved = _resolve_report_module(module)
+    if not resolved or not resolved.items_table or not resolved.movements_table:
+        raise ValueError("Module introuvable")
+    return resolved
+
+
+def _build_stocktake_session(row: sqlite3.Row) -> models.StocktakeSession:
+    return models.StocktakeSession(
+        id=row["id"],
+        module=row["module"],
+        status=row["status"],
+        note=row["note"],
+        created_by=row["created_by"],
+        created_at=row["created_at"],
+        reconciled_at=row["reconciled_at"],
+        reconciled_by=row["reconciled_by"],
+        counted_items=int(row["counted_items"] or 0),
+        adjusted_items=int(row["adjusted_items"] or 0),
+    )
+
+
+def _fetch_stocktake_session(conn: sqlite3.Connection, session_id: int) -> sqlite3.Row:
+    row = conn.execute(
+        """
+        SELECT s.*,
+               (SELECT COUNT(DISTINCT c.item_id)
+                FROM stocktake_counts AS c
+                WHERE c.session_id = s.id) AS counted_items
+        FROM stocktake_sessions AS s
+        WHERE s.id = ?
+        """,
+        (session_id,),
+    ).fetchone()
+    if row is None:
+        raise ValueError("Session d'inventaire introuvable")
+    return row
+
+
+def create_stocktake_session(
+    payload: models.StocktakeSessionCreate, user: models.User | None = None
+) -> models.StocktakeSession:
+    ensure_database_ready()
+    resolved = _resolve_stocktake_module(payload.module)
+    with db.get_stock_connection() as conn:
+        cur = conn.execute(
+            "INSERT INTO stocktake_sessions (module, note, created_by) VALUES (?, ?, ?)",
+            (resolved.module_key, payload.note, user.username if user else None),
+        )
+        return _build_stocktake_session(_fetch_stocktake_session(conn, int(cur.lastrowid)))
+
+
+def list_stocktake_sessions(module: str | None = None) -> list[models.StocktakeSession]:
+    ensure_database_ready()
+    query = """
+        SELECT s.*,
+               (SELECT COUNT(DISTINCT c.item_id)
+                FROM stocktake_counts AS c
+                WHERE c.session_id = s.id) AS counted_items
+        FROM stocktake_sessions AS s
+    """
+    params: tuple[Any, ...] = ()
+    if module is not None:
+        query += " WHERE s.module = ?"
+        params = (_resolve_stocktake_module(module).module_key,)
+    query += " ORDER BY s.created_at DESC, s.id DESC"
+    with db.get_stock_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+    return [_build_stocktake_session(row) for row in rows]
+
+
+def get_stocktake_session(session_id: int) -> models.StocktakeSession:
+    ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        return _build_stocktake_session(_fetch_stocktake_session(conn, session_id))
+
+
+def upload_stocktake_counts(
+    session_id: int, payload: models.StocktakeCountUpload
+) -> models.StocktakeUploadResult:
+    """Stage a chunk of counted quantities for a session.
+
+    Lines are bulk-loaded into a temporary table, barcodes are resolved through
+    ``barcode_index`` and the result is upserted per (item, device) in one statement.
+    Re-sending a chunk from the same device replaces its counts unless ``accumulate``
+    is set; counts from different devices are summed at reconciliation.
+    """
+
+    ensure_database_ready()
+    device_id = (payload.device_id or "").strip()
+    with db.get_stock_connection() as conn:
+        session = _fetch_stocktake_session(conn, session_id)
+        if session["status"] != "OPEN":
+            raise ValueError("La session d'inventaire est clôturée")
+        resolved = _resolve_stocktake_module(session["module"])
+        staged: list[tuple[int | None, str | None, int]] = []
+        for line in payload.lines:
+            code = None
+            if line.item_id is None:
+                if not line.barcode or not line.barcode.strip():
+                    raise ValueError("Chaque ligne doit référencer un article ou un code-barres")
+                code = _normalize_scanned_code(line.barcode)
+            staged.append((line.item_id, code, line.quantity))
+
+        conn.execute("DROP TABLE IF EXISTS temp.stocktake_upload")
+        conn.execute(
+            """
+            CREATE TEMP TABLE stocktake_upload (
+                item_id INTEGER,
+                code TEXT,
+                quantity INTEGER NOT NULL
+            )
+            """
+        )
+        conn.executemany(
+            "INSERT INTO temp.stocktake_upload (item_id, code, quantity) VALUES (?, ?, ?)",
+            staged,
+        )
+        barcode_module = _STOCKTAKE_BARCODE_MODULES.get(resolved.module_key)
+        if barcode_module is not None:
+            conn.execute(
+                """
+                UPDATE temp.stocktake_upload
+                SET item_id = (
+                    SELECT CASE WHEN COUNT(1) = 1 THEN MIN(b.item_id) END
+                    FROM barcode_index AS b
+                    WHERE b.normalized_code = stocktake_upload.code AND b.module = ?
+                )
+                WHERE item_id IS NULL
+                """,
+                (barcode_module,),
+            )
+        unresolved_rows = conn.execute(
+            f"""
+            SELECT DISTINCT COALESCE(u.code, CAST(u.item_id AS TEXT)) AS reference
+            FROM temp.stocktake_upload AS u
+            LEFT JOIN {resolved.items_table} AS i ON i.id = u.item_id
+            WHERE i.id IS NULL
+            """
+        ).fetchall()
+        conflict_update = (
+            "counted_qty = stocktake_counts.counted_qty + excluded.counted_qty"
+            if payload.accumulate
+            else "counted_qty = excluded.counted_qty"
+        )
+        cur = conn.execute(
+            f"""
+            INSERT INTO stocktake_counts (session_id, item_id, device_id, counted_qty)
+            SELECT ?, u.item_id, ?, SUM(u.quantity)
+            FROM temp.stocktake_upload AS u
+            JOIN {resolved.items_table} AS i ON i.id = u.item_id
+            WHERE 1
+            GROUP BY u.item_id
+            ON CONFLICT(session_id, item_id, device_id) DO UPDATE SET
+                {conflict_update},
+                counted_at = CURRENT_TIMESTAMP
+            """,
+            (session_id, device_id),
+        )
+        accepted = int(cur.rowcount or 0)
+        conn.execute("DROP TABLE IF EXISTS temp.stocktake_upload")
+    return models.StocktakeUploadResult(
+        accepted=accepted,
+        unresolved=[str(row["reference"]) for row in unresolved_rows],
+    )
 
 
-def _record_inventory_movement_internal(
-    module: str, item_id: int, payload: models.MovementCreate
+def _stage_stocktake_variances(
+    conn: sqlite3.Connection, session_id: int, resolved: _ReportModuleConfig
 ) -> None:
+    conn.execute("DROP TABLE IF EXISTS temp.stocktake_variances")
+    conn.execute(
+        """
+        CREATE TEMP TABLE stocktake_variances (
+            item_id INTEGER PRIMARY KEY,
+            expected_qty INTEGER NOT NULL,
+            counted_qty INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO temp.stocktake_variances (item_id, expected_qty, counted_qty)
+        SELECT c.item_id, i.quantity, SUM(c.counted_qty)
+        FROM stocktake_counts AS c
+        JOIN {resolved.items_table} AS i ON i.id = c.item_id
+        WHERE c.session_id = ?
+        GROUP BY c.item_id, i.quantity
+        """,
+        (session_id,),
+    )
+
+
+def list_stocktake_variances(session_id: int) -> list[models.StocktakeVariance]:
     ensure_database_ready()
-    config = _get_inventory_config(module)
     with db.get_stock_connection() as conn:
-        cur = conn.execute(
-            f"SELECT quantity FROM {config.tables.items} WHERE id = ?",
-            (item_id,),
-        )
-        row = cur.fetchone()
-        if row is None:
-            raise ValueError("Article introuvable")
-        conn.execute(
-            f"INSERT INTO {config.tables.movements} (item_id, delta, reason) VALUES (?, ?, ?)",
-            (item_id, payload.delta, payload.reason),
-        )
-        conn.execute(
-            f"UPDATE {config.tables.items} SET quantity = quantity + ? WHERE id = ?",
-            (payload.delta, item_id),
+        session = _fetch_stocktake_session(conn, session_id)
+        resolved = _resolve_stocktake_module(session["module"])
+        _stage_stocktake_variances(conn, session_id, resolved)
+        rows = conn.execute(
+            f"""
+            SELECT v.item_id, i.name, v.expected_qty, v.counted_qty
+            FROM temp.stocktake_variances AS v
+            JOIN {resolved.items_table} AS i ON i.id = v.item_id
+            WHERE v.counted_qty <> v.expected_qty
+            ORDER BY ABS(v.counted_qty - v.expected_qty) DESC, i.name COLLATE NOCASE
+            """
+        ).fetchall()
+    return [
+        models.StocktakeVariance(
+            item_id=row["item_id"],
+            name=row["name"],
+            expected_qty=row["expected_qty"],
+            counted_qty=row["counted_qty"],
+            delta=row["counted_qty"] - row["expected_qty"],
         )
-        if config.auto_purchase_orders:
-            _maybe_create_auto_purchase_order(conn, module, item_id)
-        _persist_after_commit(conn, *_inventory_modules_to_persist(module))
+        for row in rows
+    ]
 
 
-def _fetch_inventory_movements_internal(
-    module: str, item_id: int
-) -> list[models.Movement]:
+def reconcile_stocktake_session(
+    session_id: int, user: models.User | None = None
+) -> models.StocktakeReconcileResult:
+    """Apply every variance of a session as adjustment movements in one transaction."""
+
     ensure_database_ready()
-    config = _get_inventory_config(module)
     with db.get_stock_connection() as conn:
-        cur = conn.execute(
-            f"SELECT * FROM {config.tables.movements} WHERE item_id = ? ORDER BY created_at DESC",
-            (item_id,),
+        conn.execute("BEGIN IMMEDIATE")
+        session = _fetch_stocktake_session(conn, session_id)
+        if session["status"] != "OPEN":
+            raise ValueError("La session d'inventaire est clôturée")
+        resolved = _resolve_stocktake_module(session["module"])
+        _stage_stocktake_variances(conn, session_id, resolved)
+        totals = conn.execute(
+            """
+            SELECT COUNT(1) AS adjusted,
+                   COALESCE(SUM(MAX(counted_qty - expected_qty, 0)), 0) AS added,
+                   COALESCE(SUM(MAX(expected_qty - counted_qty, 0)), 0) AS removed
+            FROM temp.stocktake_variances
+            WHERE counted_qty <> expected_qty
+            """
+        ).fetchone()
+        conn.execute(
+            f"""
+            INSERT INTO {resolved.movements_table} ({resolved.movement_item_column}, delta, reason)
+            SELECT item_id, counted_qty - expected_qty, ?
+            FROM temp.stocktake_variances
+            WHERE counted_qty <> expected_qty
+            ORDER BY item_id
+            """,
+            (f"Inventaire #{session_id}",),
         )
-        rows = cur.fetchall()
-        return [
-            models.Movement(
-                id=row["id"],
-                item_id=row["item_id"],
-                delta=row["delta"],
-                reason=row["reason"],
-                created_at=row["created_at"],
-            )
-            for row in rows
-        ]
+        conn.execute(
+            f"""
+            UPDATE {resolved.items_table}
+            SET quantity = v.counted_qty
+            FROM temp.stocktake_variances AS v
+            WHERE v.item_id = {resolved.items_table}.id
+              AND v.counted_qty <> v.expected_qty
+            """
+        )
+        inventory_config = _INVENTORY_MODULE_CONFIGS.get(resolved.inventory_module or "")
+        if inventory_config and inventory_config.auto_purchase_orders:
+            low_stock_where, low_stock_params = _low_stock_filter(resolved.module_key)
+            reordered = conn.execute(
+                f"""
+                SELECT item_id FROM temp.stocktake_variances
+                WHERE counted_qty < expected_qty
+                  AND item_id IN (SELECT id FROM {resolved.items_table} WHERE {low_stock_where})
+                """,
+                low_stock_params,
+            ).fetchall()
+            for row in reordered:
+                _queue_auto_purchase_order(conn, resolved.inventory_module, row["item_id"])
+        conn.execute(
+            """
+            UPDATE stocktake_sessions
+            SET status = 'RECONCILED',
+                reconciled_at = CURRENT_TIMESTAMP,
+                reconciled_by = ?,
+                adjusted_items = ?
+            WHERE id = ?
+            """,
+            (user.username if user else None, int(totals["adjusted"] or 0), session_id),
+        )
+        conn.execute("DROP TABLE IF EXISTS temp.stocktake_variances")
+        _persist_after_commit(conn, *_inventory_modules_to_persist(resolved.inventory_module))
+        updated = _fetch_stocktake_session(conn, session_id)
+    return models.StocktakeReconcileResult(
+        session=_build_stocktake_session(updated),
+        adjusted_items=int(totals["adjusted"] or 0),
+        quantity_added=int(totals["added"] or 0),
+        quantity_removed=int(totals["removed"] or 0),
+    )
 
 
 def _normalize_email(value: str) -> str:
@@ -7975,8 +10277,15 @@ def reject_user(user_id: int, rejected_by: models.User) -> models.User:
     return updated
 
 
-def list_items(search: str | None = None) -> list[models.Item]:
-    return _list_inventory_items_internal("default", search)
+def list_items(
+    search: str | None = None,
+    *,
+    abc_class: str | None = None,
+    xyz_class: str | None = None,
+) -> list[models.Item]:
+    return _list_inventory_items_internal(
+        "default", search, abc_class=abc_class, xyz_class=xyz_class
+    )
 
 
 def create_item(payload: models.ItemCreate) -> models.Item:
@@ -7995,8 +10304,15 @@ def delete_item(item_id: int) -> None:
     _delete_inventory_item_internal("default", item_id)
 
 
-def list_vehicle_items(search: str | None = None) -> list[models.Item]:
-    items = _list_inventory_items_internal("vehicle_inventory", search)
+def list_vehicle_items(
+    search: str | None = None,
+    *,
+    abc_class: str | None = None,
+    xyz_class: str | None = None,
+) -> list[models.Item]:
+    items = _list_inventory_items_internal(
+        "vehicle_inventory", search, abc_class=abc_class, xyz_class=xyz_class
+    )
     for item in items:
         if item.category_id is None:
             item.qr_token = None
@@ -8566,8 +10882,15 @@ def delete_vehicle_item(item_id: int) -> bool:
     return True
 
 
-def list_remise_items(search: str | None = None) -> list[models.Item]:
-    return _list_inventory_items_internal("inventory_remise", search)
+def list_remise_items(
+    search: str | None = None,
+    *,
+    abc_class: str | None = None,
+    xyz_class: str | None = None,
+) -> list[models.Item]:
+    return _list_inventory_items_internal(
+        "inventory_remise", search, abc_class=abc_class, xyz_class=xyz_class
+    )
 
 
 def _list_remise_items_for_pdf() -> list[models.Item]:
@@ -8591,36 +10914,183 @@ def _list_remise_items_for_pdf() -> list[models.Item]:
         return [_build_inventory_item(row) for row in cur.fetchall()]
 
 
+_BARCODE_INDEX_SOURCES: dict[str, tuple[str, str]] = {
+    "clothing": ("items", "sku"),
+    "remise": ("remise_items", "sku"),
+    "pharmacy": ("pharmacy_items", "barcode"),
+}
+
+
+def _normalize_scanned_code(barcode: str) -> str:
+    normalized = barcode.strip().replace(" ", "")
+    if not normalized:
+        raise ValueError("Le code-barres ne peut pas être vide")
+    return normalized.upper()
+
+
+def _ensure_barcode_index(
+    conn: sqlite3.Connection, executescript: Callable[[str], sqlite3.Cursor] | None = None
+) -> None:
+    """Maintain ``barcode_index``, the normalized scan code of every item of every module.
+
+    Codes are normalized like scanner input (trimmed, spaces removed, upper-cased) and
+    kept in sync by triggers on the source tables. A module is rebuilt whenever one of
+    its triggers is missing.
+    """
+
+    if executescript is None:
+        executescript = conn.executescript
+    executescript(
+        """
+        CREATE TABLE IF NOT EXISTS barcode_index (
+            normalized_code TEXT NOT NULL,
+            module TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            PRIMARY KEY (module, item_id)
+        );
+        DROP INDEX IF EXISTS idx_barcode_index_code;
+        CREATE INDEX IF NOT EXISTS idx_barcode_index_normalized_code
+        ON barcode_index(normalized_code);
+        """
+    )
+    existing_triggers = {
+        row["name"]
+        for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_%_barcode_index_%'"
+        ).fetchall()
+    }
+    for module, (table, column) in _BARCODE_INDEX_SOURCES.items():
+        if not _table_exists(conn, table) or not _table_has_column(conn, table, column):
+            continue
+        trigger_names = {
+            f"trg_{table}_barcode_index_{event}" for event in ("insert", "update", "delete")
+        }
+        if trigger_names <= existing_triggers:
+            continue
+        insert_new = f"""
+            INSERT OR REPLACE INTO barcode_index (normalized_code, module, item_id)
+            SELECT UPPER(REPLACE(TRIM(NEW.{column}), ' ', '')), '{module}', NEW.id
+            WHERE NEW.{column} IS NOT NULL AND REPLACE(TRIM(NEW.{column}), ' ', '') <> '';
+        """
+        executescript(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_barcode_index_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                {insert_new}
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_barcode_index_update
+            AFTER UPDATE OF {column} ON {table}
+            BEGIN
+                DELETE FROM barcode_index WHERE module = '{module}' AND item_id = OLD.id;
+                {insert_new}
+            END;
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_barcode_index_delete
+            AFTER DELETE ON {table}
+            BEGIN
+                DELETE FROM barcode_index WHERE module = '{module}' AND item_id = OLD.id;
+            END;
+            """
+        )
+        conn.execute("DELETE FROM barcode_index WHERE module = ?", (module,))
+        conn.execute(
+            f"""
+            INSERT OR REPLACE INTO barcode_index (normalized_code, module, item_id)
+            SELECT UPPER(REPLACE(TRIM({column}), ' ', '')), ?, id
+            FROM {table}
+            WHERE {column} IS NOT NULL AND REPLACE(TRIM({column}), ' ', '') <> ''
+            """,
+            (module,),
+        )
+
+
+def _lookup_barcode_index(
+    conn: sqlite3.Connection, codes: list[str], modules: Iterable[str]
+) -> list[sqlite3.Row]:
+    """Resolve normalized codes through ``barcode_index`` in a single query."""
+
+    modules = [module for module in modules if module in _BARCODE_INDEX_SOURCES]
+    if not codes or not modules:
+        return []
+    joins: list[str] = []
+    names: list[str] = []
+    for position, module in enumerate(modules):
+        table, _ = _BARCODE_INDEX_SOURCES[module]
+        alias = f"m{position}"
+        joins.append(
+            f"LEFT JOIN {table} AS {alias} ON b.module = '{module}' AND {alias}.id = b.item_id"
+        )
+        names.append(f"{alias}.name")
+    name_expr = names[0] if len(names) == 1 else f"COALESCE({', '.join(names)})"
+    code_placeholders = ", ".join("?" for _ in codes)
+    module_placeholders = ", ".join("?" for _ in modules)
+    return conn.execute(
+        f"""
+        SELECT b.normalized_code, b.module, b.item_id, {name_expr} AS name
+        FROM barcode_index AS b
+        {" ".join(joins)}
+        WHERE b.normalized_code IN ({code_placeholders})
+          AND b.module IN ({module_placeholders})
+        ORDER BY b.normalized_code, b.module, name COLLATE NOCASE
+        """,
+        (*codes, *modules),
+    ).fetchall()
+
+
 def find_items_by_barcode(module: str, barcode: str) -> list[models.BarcodeLookupItem]:
     ensure_database_ready()
-    normalized_input = barcode.strip().replace(" ", "")
-    if not normalized_input:
-        raise ValueError("Le code-barres ne peut pas être vide")
-    normalized = normalized_input.upper()
-
-    if module == "clothing":
-        table = "items"
-        column = "sku"
-    elif module == "remise":
-        table = "remise_items"
-        column = "sku"
-    elif module == "pharmacy":
-        table = "pharmacy_items"
-        column = "barcode"
-    else:
+    normalized = _normalize_scanned_code(barcode)
+    if module not in _BARCODE_INDEX_SOURCES:
         raise ValueError("Module invalide")
 
-    query = (
-        f"SELECT id, name FROM {table} "
-        f"WHERE UPPER(REPLACE(TRIM({column}), ' ', '')) = ? "
-        "ORDER BY name COLLATE NOCASE"
-    )
     with db.get_stock_connection() as conn:
-        if module == "remise":
-            _ensure_remise_item_columns(conn)
-        rows = conn.execute(query, (normalized,)).fetchall()
+        rows = _lookup_barcode_index(conn, [normalized], [module])
+
+    return [
+        models.BarcodeLookupItem(id=row["item_id"], name=row["name"])
+        for row in rows
+        if row["name"] is not None
+    ]
+
+
+def resolve_barcodes(
+    codes: Iterable[str], modules: Iterable[str] | None = None
+) -> list[models.BarcodeBatchResult]:
+    """Resolve a burst of scanned codes in one pass over ``barcode_index``."""
+
+    ensure_database_ready()
+    target_modules = list(modules) if modules is not None else list(_BARCODE_INDEX_SOURCES)
+    for module in target_modules:
+        if module not in _BARCODE_INDEX_SOURCES:
+            raise ValueError("Module invalide")
+    raw_codes = list(codes)
+    normalized_codes: list[str | None] = []
+    for code in raw_codes:
+        try:
+            normalized_codes.append(_normalize_scanned_code(code))
+        except ValueError:
+            normalized_codes.append(None)
+    unique_codes = list(dict.fromkeys(code for code in normalized_codes if code))
 
-    return [models.BarcodeLookupItem(id=row["id"], name=row["name"]) for row in rows]
+    matches_by_code: dict[str, list[models.BarcodeBatchMatch]] = defaultdict(list)
+    if unique_codes and target_modules:
+        with db.get_stock_connection() as conn:
+            rows = _lookup_barcode_index(conn, unique_codes, target_modules)
+        for row in rows:
+            if row["name"] is None:
+                continue
+            matches_by_code[row["normalized_code"]].append(
+                models.BarcodeBatchMatch(module=row["module"], id=row["item_id"], name=row["name"])
+            )
+
+    return [
+        models.BarcodeBatchResult(
+            code=code,
+            normalized_code=normalized,
+            matches=list(matches_by_code.get(normalized, [])) if normalized else [],
+        )
+        for code, normalized in zip(raw_codes, normalized_codes)
+    ]
 
 
 def attach_vehicle_item_image(item_id: int, stream: BinaryIO, filename: str | None) -> models.Item:
@@ -8887,7 +11357,7 @@ def delete_vehicle_photo(photo_id: int) -> None:
 
 def create_remise_item(payload: models.ItemCreate) -> models.Item:
     created = _create_inventory_item_internal("inventory_remise", payload)
-    _sync_single_vehicle_item(created.id)
+    _flush_vehicle_remise_sync_queue()
     return created
 
 
@@ -8897,13 +11367,13 @@ def get_remise_item(item_id: int) -> models.Item:
 
 def update_remise_item(item_id: int, payload: models.ItemUpdate) -> models.Item:
     updated = _update_inventory_item_internal("inventory_remise", item_id, payload)
-    _sync_single_vehicle_item(updated.id)
+    _flush_vehicle_remise_sync_queue()
     return updated
 
 
 def delete_remise_item(item_id: int) -> None:
     _delete_inventory_item_internal("inventory_remise", item_id)
-    _sync_single_vehicle_item(item_id)
+    _flush_vehicle_remise_sync_queue()
 
 
 def update_vehicle_view_background(
@@ -9439,20 +11909,15 @@ def delete_subview_pin(pin_id: int, deleted_by: str | None = None) -> None:
 def list_low_stock(threshold: int) -> list[models.LowStockReport]:
     ensure_database_ready()
     with db.get_stock_connection() as conn:
-        item_columns = {
-            row["name"] for row in conn.execute("PRAGMA table_info(items)").fetchall()
-        }
-        where_clauses = ["quantity < low_stock_threshold", "low_stock_threshold >= ?"]
-        if "track_low_stock" in item_columns:
-            where_clauses.append("track_low_stock = 1")
+        low_stock_where, low_stock_params = _low_stock_filter("clothing", tracked_only=True)
         cur = conn.execute(
             f"""
             SELECT *, (low_stock_threshold - quantity) AS shortage
             FROM items
-            WHERE {" AND ".join(where_clauses)}
+            WHERE {low_stock_where} AND low_stock_threshold >= ?
             ORDER BY shortage DESC
             """,
-            (threshold,),
+            (*low_stock_params, threshold),
         )
         rows = cur.fetchall()
         return [
@@ -10425,44 +12890,293 @@ def update_pharmacy_lot_item(
                 f"UPDATE pharmacy_lot_items SET {', '.join(updates)} WHERE id = ?",
                 params,
             )
-        _persist_after_commit(conn, "pharmacy")
+        _persist_after_commit(conn, "pharmacy")
+
+    with db.get_stock_connection() as conn:
+        updated_row = _get_pharmacy_lot_item(conn, lot_id, lot_item_id)
+    return _build_pharmacy_lot_item(updated_row)
+
+
+def remove_pharmacy_lot_item(lot_id: int, lot_item_id: int) -> None:
+    ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        _get_pharmacy_lot_item(conn, lot_id, lot_item_id)
+        conn.execute(
+            "DELETE FROM pharmacy_lot_items WHERE id = ? AND lot_id = ?",
+            (lot_item_id, lot_id),
+        )
+        _persist_after_commit(conn, "pharmacy")
+
+
+_EXPORT_CHUNK_SIZE = 5000
+_EXPORT_FORMATS: dict[str, tuple[str, str]] = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+_EXPORT_ORDER_PERMISSIONS: dict[str, str] = {
+    "clothing": "purchase_orders",
+    "pharmacy": "pharmacy",
+    "inventory_remise": "inventory_remise",
+}
+
+
+@dataclass(frozen=True)
+class ExportDataset:
+    name: str
+    table: str
+    permission_module: str
+
+
+@dataclass(frozen=True)
+class ExportStream:
+    filename: str
+    media_type: str
+    chunks: Iterator[bytes]
+
+
+def resolve_export_dataset(dataset: str, module: str | None = None) -> ExportDataset:
+    """Map ``dataset`` (items, movements, purchase_orders, dotations) to its table."""
+
+    normalized = (dataset or "").strip().lower()
+    if normalized == "dotations":
+        return ExportDataset(name="dotations", table="dotations", permission_module="dotations")
+    resolved = _resolve_report_module(module or "")
+    if normalized not in {"items", "movements", "purchase_orders"}:
+        raise ValueError("Jeu de données d'export inconnu")
+    if not resolved:
+        raise ValueError("Module introuvable")
+    table = {
+        "items": resolved.items_table,
+        "movements": resolved.movements_table,
+        "purchase_orders": resolved.orders_table,
+    }[normalized]
+    if not table:
+        raise ValueError("Ce module ne propose pas ce jeu de données")
+    permission_module = (
+        _EXPORT_ORDER_PERMISSIONS.get(resolved.module_key, resolved.module_key)
+        if normalized == "purchase_orders"
+        else resolved.module_key
+    )
+    return ExportDataset(
+        name=f"{normalized}_{resolved.module_key}", table=table, permission_module=permission_module
+    )
+
+
+_EXPORT_NUMERIC_STORAGE: dict[str, tuple[str, ...]] = {
+    "int": ("integer", "null"),
+    "float": ("integer", "real", "null"),
+}
+
+
+def _export_column_kind(declared: str) -> str:
+    """Map a declared SQLite column type to ``int``, ``float`` or ``string``."""
+
+    if "INT" in declared:
+        return "int"
+    if any(token in declared for token in ("REAL", "FLOA", "DOUB")):
+        return "float"
+    return "string"
+
+
+def _demote_mismatched_export_columns(
+    conn: sqlite3.Connection, table: str, columns: list[tuple[str, str]]
+) -> list[tuple[str, str]]:
+    """Declare numeric columns holding a value of another storage class as ``TEXT``.
+
+    SQLite accepts any value in any column, so the declared type alone cannot be
+    trusted for typed formats. The check is a single aggregate pass over the table.
+    """
+
+    probes = [
+        (name, _EXPORT_NUMERIC_STORAGE[kind])
+        for name, declared in columns
+        if (kind := _export_column_kind(declared)) in _EXPORT_NUMERIC_STORAGE
+    ]
+    if not probes:
+        return columns
+    selects = ", ".join(
+        f"MAX(typeof(\"{name}\") NOT IN ({', '.join(repr(value) for value in storage)}))"
+        for name, storage in probes
+    )
+    row = conn.execute(f"SELECT {selects} FROM {table}").fetchone()
+    mismatched = {name for (name, _), flag in zip(probes, row) if flag}
+    return [(name, "TEXT" if name in mismatched else declared) for name, declared in columns]
+
+
+def _iter_export_chunks(
+    site_key: str | None, dataset: ExportDataset, *, check_storage: bool = False
+) -> Iterator[tuple[list[tuple[str, str]], list[sqlite3.Row]]]:
+    """Yield ``(columns, rows)`` chunks from a server-side cursor over the dataset table.
+
+    With ``check_storage`` the declared types are first reconciled with the stored
+    values, inside the same read transaction as the export itself.
+    """
+
+    with db.get_stock_connection(site_key) as conn:
+        if not _table_exists(conn, dataset.table):
+            return
+        columns = [
+            (row["name"], (row["type"] or "").upper())
+            for row in conn.execute(f"PRAGMA table_info({dataset.table})").fetchall()
+        ]
+        if check_storage:
+            conn.execute("BEGIN")
+            columns = _demote_mismatched_export_columns(conn, dataset.table, columns)
+        cursor = conn.execute(f"SELECT * FROM {dataset.table} ORDER BY rowid")
+        rows = cursor.fetchmany(_EXPORT_CHUNK_SIZE)
+        # The first chunk is always yielded so that empty exports still carry a header.
+        yield columns, rows
+        while rows:
+            rows = cursor.fetchmany(_EXPORT_CHUNK_SIZE)
+            if rows:
+                yield columns, rows
+
+
+def _export_csv(chunks: Iterator[tuple[list[tuple[str, str]], list[sqlite3.Row]]]) -> Iterator[bytes]:
+    import csv
+
+    header_written = False
+    for columns, rows in chunks:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if not header_written:
+            writer.writerow([name for name, _ in columns])
+            header_written = True
+        writer.writerows(tuple(row) for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _export_ndjson(chunks: Iterator[tuple[list[tuple[str, str]], list[sqlite3.Row]]]) -> Iterator[bytes]:
+    for _, rows in chunks:
+        yield "".join(
+            json.dumps(dict(row), ensure_ascii=False, default=str) + "\n" for row in rows
+        ).encode("utf-8")
+
+
+class _ExportParquetSink(io.RawIOBase):
+    """Write-only file object buffering what the Parquet writer emits between chunks."""
+
+    def __init__(self) -> None:
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore[override]
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _coerce_export_value(value: Any, kind: str) -> Any:
+    if value is None:
+        return None
+    if kind == "int":
+        return int(value)
+    if kind == "float":
+        return float(value)
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def _export_parquet(chunks: Iterator[tuple[list[tuple[str, str]], list[sqlite3.Row]]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {"int": pa.int64(), "float": pa.float64(), "string": pa.string()}
+    sink = _ExportParquetSink()
+    writer = None
+    for columns, rows in chunks:
+        if writer is None:
+            # Column types come from the declared SQLite affinity (reconciled with the
+            # stored values), not the first rows, so a column empty at the start keeps
+            # its type.
+            kinds = [_export_column_kind(declared) for _, declared in columns]
+            schema = pa.schema(
+                [(name, arrow_types[kind]) for (name, _), kind in zip(columns, kinds)]
+            )
+            writer = pq.ParquetWriter(sink, schema)
+        if not rows:
+            continue
+        values = {
+            name: [_coerce_export_value(row[name], kind) for row in rows]
+            for name, kind in zip(schema.names, kinds)
+        }
+        writer.write_table(pa.Table.from_pydict(values, schema=schema))
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+def open_export_stream(
+    dataset: ExportDataset, export_format: str, *, site_key: str | None = None
+) -> ExportStream:
+    """Prepare a streamed export; rows are read lazily, one chunk at a time."""
+
+    ensure_database_ready()
+    normalized_format = (export_format or "").strip().lower()
+    if normalized_format not in _EXPORT_FORMATS:
+        raise ValueError("Format d'export inconnu")
+    if normalized_format == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as exc:
+            raise ValueError("Export Parquet indisponible (pyarrow non installé)") from exc
+    media_type, extension = _EXPORT_FORMATS[normalized_format]
+    encoder = {"csv": _export_csv, "ndjson": _export_ndjson, "parquet": _export_parquet}[
+        normalized_format
+    ]
+    resolved_site = site_key or db.get_current_site_key()
+    return ExportStream(
+        filename=f"{dataset.name}_{resolved_site.lower()}.{extension}",
+        media_type=media_type,
+        chunks=encoder(
+            _iter_export_chunks(
+                resolved_site, dataset, check_storage=normalized_format == "parquet"
+            )
+        ),
+    )
 
-    with db.get_stock_connection() as conn:
-        updated_row = _get_pharmacy_lot_item(conn, lot_id, lot_item_id)
-    return _build_pharmacy_lot_item(updated_row)
 
+def iter_items_csv(site_key: str | None = None) -> Iterator[bytes]:
+    import csv
 
-def remove_pharmacy_lot_item(lot_id: int, lot_item_id: int) -> None:
     ensure_database_ready()
-    with db.get_stock_connection() as conn:
-        _get_pharmacy_lot_item(conn, lot_id, lot_item_id)
-        conn.execute(
-            "DELETE FROM pharmacy_lot_items WHERE id = ? AND lot_id = ?",
-            (lot_item_id, lot_id),
+    header = ["ID", "Nom", "SKU", "Catégorie", "Taille", "Quantité", "Seuil bas"]
+    with db.get_stock_connection(site_key) as conn:
+        cursor = conn.execute(
+            """
+            SELECT id, name, sku, category_id, COALESCE(size, '') AS size, quantity, low_stock_threshold
+            FROM items
+            ORDER BY name COLLATE NOCASE, id
+            """
         )
-        _persist_after_commit(conn, "pharmacy")
+        rows: list[Any] = [header]
+        while True:
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(tuple(row) for row in rows)
+            yield buffer.getvalue().encode("utf-8")
+            rows = cursor.fetchmany(_EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
 
 
 def export_items_to_csv(path: Path) -> Path:
-    ensure_database_ready()
-    import csv
-
-    items = list_items()
-    with path.open("w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["ID", "Nom", "SKU", "Catégorie", "Taille", "Quantité", "Seuil bas"])
-        for item in items:
-            writer.writerow(
-                [
-                    item.id,
-                    item.name,
-                    item.sku,
-                    item.category_id,
-                    item.size or "",
-                    item.quantity,
-                    item.low_stock_threshold,
-                ]
-            )
+    with path.open("wb") as csvfile:
+        for chunk in iter_items_csv():
+            csvfile.write(chunk)
     return path
 
 
@@ -10783,69 +13497,137 @@ def resolve_supplier_email_for_order(
     return normalized_email, supplier
 
 
+def _table_columns(conn: sqlite3.Connection, table_name: str) -> set[str]:
+    return {row["name"] for row in conn.execute(f"PRAGMA table_info({table_name})").fetchall()}
+
+
+def _existing_tables(conn: sqlite3.Connection, table_names: Iterable[str]) -> set[str]:
+    names = list(table_names)
+    placeholders = ", ".join("?" for _ in names)
+    return {
+        row["name"]
+        for row in conn.execute(
+            f"SELECT name FROM sqlite_master WHERE type = 'table' AND name IN ({placeholders})",
+            names,
+        ).fetchall()
+    }
+
+
+def _load_order_batch(conn: sqlite3.Connection, order_ids: Iterable[int]) -> str:
+    """Stage a page of order ids in a temp table and return the subquery selecting them."""
+
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS purchase_order_batch (id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM temp.purchase_order_batch")
+    conn.executemany(
+        "INSERT OR IGNORE INTO temp.purchase_order_batch (id) VALUES (?)",
+        [(order_id,) for order_id in order_ids],
+    )
+    return "SELECT id FROM temp.purchase_order_batch"
+
+
+def _resolve_suppliers_for_orders(
+    conn: sqlite3.Connection, supplier_ids: Iterable[int | None]
+) -> dict[int, models.Supplier]:
+    ids = sorted({supplier_id for supplier_id in supplier_ids if supplier_id is not None})
+    if not ids:
+        return {}
+    placeholders = ", ".join("?" for _ in ids)
+    supplier_rows = conn.execute(
+        f"SELECT * FROM suppliers WHERE id IN ({placeholders})", ids
+    ).fetchall()
+    modules_map = _load_supplier_modules(conn, [supplier_row["id"] for supplier_row in supplier_rows])
+    return {
+        supplier_row["id"]: models.Supplier(
+            id=supplier_row["id"],
+            name=_row_get(supplier_row, "name", ""),
+            contact_name=_row_get(supplier_row, "contact_name"),
+            phone=_row_get(supplier_row, "phone"),
+            email=_row_get(supplier_row, "email"),
+            address=_row_get(supplier_row, "address"),
+            modules=modules_map.get(supplier_row["id"]) or ["suppliers"],
+        )
+        for supplier_row in supplier_rows
+        if not _is_supplier_inactive(supplier_row)
+    }
+
+
+def _resolve_order_supplier_state(
+    supplier_id: int | None, supplier: models.Supplier | None
+) -> tuple[str | None, bool, str | None]:
+    """Return ``(resolved_email, has_email, missing_reason)`` for an order's supplier."""
+
+    if supplier_id is None:
+        return None, False, "SUPPLIER_MISSING"
+    if supplier is None:
+        return None, False, "SUPPLIER_NOT_FOUND"
+    try:
+        return require_supplier_email(supplier), True, None
+    except SupplierResolutionError as exc:
+        return None, False, exc.code
+
+
 def _build_purchase_order_detail(
     conn: sqlite3.Connection,
     order_row: sqlite3.Row,
     *,
     site_key: str | None = None,
 ) -> models.PurchaseOrderDetail:
-    has_line_sku = _table_has_column(conn, "purchase_order_items", "sku")
-    has_line_unit = _table_has_column(conn, "purchase_order_items", "unit")
-    has_line_nonconformity_reason = _table_has_column(
-        conn, "purchase_order_items", "nonconformity_reason"
-    )
-    has_line_is_nonconforme = _table_has_column(conn, "purchase_order_items", "is_nonconforme")
-    has_beneficiary = _table_has_column(conn, "purchase_order_items", "beneficiary_employee_id")
-    has_line_type = _table_has_column(conn, "purchase_order_items", "line_type")
-    has_return_expected = _table_has_column(conn, "purchase_order_items", "return_expected")
-    has_return_reason = _table_has_column(conn, "purchase_order_items", "return_reason")
-    has_return_employee_item_id = _table_has_column(
-        conn, "purchase_order_items", "return_employee_item_id"
-    )
-    has_target_dotation_id = _table_has_column(
-        conn, "purchase_order_items", "target_dotation_id"
+    return _build_purchase_order_details(conn, [order_row], site_key=site_key)[0]
+
+
+def _build_purchase_order_details(
+    conn: sqlite3.Connection,
+    order_rows: list[sqlite3.Row],
+    *,
+    site_key: str | None = None,
+) -> list[models.PurchaseOrderDetail]:
+    """Assemble the details of a page of orders with a fixed number of queries.
+
+    Child rows (lines, receipts, nonconformities, pending assignments, supplier returns)
+    are loaded once for the whole page through a temp table of order ids and grouped
+    in memory, so the cost does not grow with the number of orders.
+    """
+
+    if not order_rows:
+        return []
+    resolved_site_key = site_key or db.get_current_site_key()
+    batch = _load_order_batch(conn, [row["id"] for row in order_rows])
+    tables = _existing_tables(
+        conn,
+        (
+            "purchase_order_receipts",
+            "purchase_order_nonconformities",
+            "pending_clothing_assignments",
+            "clothing_supplier_returns",
+        ),
     )
-    has_return_qty = _table_has_column(conn, "purchase_order_items", "return_qty")
-    has_return_status = _table_has_column(conn, "purchase_order_items", "return_status")
+    line_columns = _table_columns(conn, "purchase_order_items")
     sku_expr = "i.sku AS sku"
     unit_expr = "COALESCE(NULLIF(TRIM(i.size), ''), 'Unité') AS unit"
-    if has_line_sku:
+    if "sku" in line_columns:
         sku_expr = "COALESCE(NULLIF(TRIM(poi.sku), ''), i.sku) AS sku"
-    if has_line_unit:
+    if "unit" in line_columns:
         unit_expr = "COALESCE(NULLIF(TRIM(poi.unit), ''), NULLIF(TRIM(i.size), ''), 'Unité') AS unit"
     beneficiary_expr = "NULL AS beneficiary_employee_id"
     beneficiary_name_expr = "NULL AS beneficiary_name"
-    if has_beneficiary:
+    if "beneficiary_employee_id" in line_columns:
         beneficiary_expr = "poi.beneficiary_employee_id AS beneficiary_employee_id"
         beneficiary_name_expr = "c.full_name AS beneficiary_name"
-    nonconformity_reason_expr = "NULL AS nonconformity_reason"
-    if has_line_nonconformity_reason:
-        nonconformity_reason_expr = "poi.nonconformity_reason AS nonconformity_reason"
-    is_nonconforme_expr = "0 AS is_nonconforme"
-    if has_line_is_nonconforme:
-        is_nonconforme_expr = "poi.is_nonconforme AS is_nonconforme"
-    line_type_expr = "'standard' AS line_type"
-    if has_line_type:
-        line_type_expr = "poi.line_type AS line_type"
-    return_expected_expr = "0 AS return_expected"
-    if has_return_expected:
-        return_expected_expr = "poi.return_expected AS return_expected"
-    return_reason_expr = "NULL AS return_reason"
-    if has_return_reason:
-        return_reason_expr = "poi.return_reason AS return_reason"
-    return_employee_expr = "NULL AS return_employee_item_id"
-    if has_return_employee_item_id:
-        return_employee_expr = "poi.return_employee_item_id AS return_employee_item_id"
-    target_dotation_expr = "NULL AS target_dotation_id"
-    if has_target_dotation_id:
-        target_dotation_expr = "poi.target_dotation_id AS target_dotation_id"
-    return_qty_expr = "0 AS return_qty"
-    if has_return_qty:
-        return_qty_expr = "poi.return_qty AS return_qty"
-    return_status_expr = "'none' AS return_status"
-    if has_return_status:
-        return_status_expr = "poi.return_status AS return_status"
-    items_cur = conn.execute(
+    optional_line_exprs = [
+        f"poi.{column} AS {column}" if column in line_columns else f"{default} AS {column}"
+        for column, default in (
+            ("nonconformity_reason", "NULL"),
+            ("is_nonconforme", "0"),
+            ("line_type", "'standard'"),
+            ("return_expected", "0"),
+            ("return_reason", "NULL"),
+            ("return_employee_item_id", "NULL"),
+            ("target_dotation_id", "NULL"),
+            ("return_qty", "0"),
+            ("return_status", "'none'"),
+        )
+    ]
+    items_rows = conn.execute(
         f"""
         SELECT poi.id,
                poi.purchase_order_id,
@@ -10858,127 +13640,105 @@ def _build_purchase_order_detail(
                {unit_expr},
                {beneficiary_expr},
                {beneficiary_name_expr},
-               {nonconformity_reason_expr},
-               {is_nonconforme_expr},
-               {line_type_expr},
-               {return_expected_expr},
-               {return_reason_expr},
-               {return_employee_expr},
-               {target_dotation_expr},
-               {return_qty_expr},
-               {return_status_expr}
+               {", ".join(optional_line_exprs)}
         FROM purchase_order_items AS poi
         JOIN items AS i ON i.id = poi.item_id
         LEFT JOIN collaborators AS c ON c.id = poi.beneficiary_employee_id
-        WHERE poi.purchase_order_id = ?
+        WHERE poi.purchase_order_id IN ({batch})
         ORDER BY i.name COLLATE NOCASE
-        """,
-        (order_row["id"],),
+        """
+    ).fetchall()
+    items_by_order: dict[int, list[sqlite3.Row]] = defaultdict(list)
+    for item_row in items_rows:
+        items_by_order[item_row["purchase_order_id"]].append(item_row)
+    suppliers = _resolve_suppliers_for_orders(
+        conn, (_row_get(row, "supplier_id") for row in order_rows)
     )
-    items_rows = items_cur.fetchall()
-    resolved_email = None
-    supplier_has_email = False
-    supplier_missing_reason = None
-    supplier_id = _row_get(order_row, "supplier_id")
-    supplier = resolve_supplier_for_order(conn, site_key or db.get_current_site_key(), supplier_id)
-    if supplier_id is None:
-        supplier_missing_reason = "SUPPLIER_MISSING"
-    elif supplier is None:
-        supplier_missing_reason = "SUPPLIER_NOT_FOUND"
-    else:
-        try:
-            resolved_email = require_supplier_email(supplier)
-            supplier_has_email = True
-        except SupplierResolutionError as exc:
-            supplier_missing_reason = exc.code
-    resolved_site_key = site_key or db.get_current_site_key()
-    receipts: list[models.PurchaseOrderReceipt] = []
-    receipt_summaries: dict[int, dict[str, int]] = {}
+
+    receipts_by_order: dict[int, list[models.PurchaseOrderReceipt]] = defaultdict(list)
+    receipt_summaries: dict[int, dict[int, dict[str, int]]] = defaultdict(dict)
     receipt_counts: dict[int, int] = {}
-    if _table_exists(conn, "purchase_order_receipts"):
+    if "purchase_order_receipts" in tables:
         receipt_rows = conn.execute(
-            """
+            f"""
             SELECT *
             FROM purchase_order_receipts
-            WHERE purchase_order_id = ? AND site_key = ?
+            WHERE purchase_order_id IN ({batch}) AND site_key = ?
             ORDER BY created_at DESC, id DESC
             """,
-            (order_row["id"], resolved_site_key),
+            (resolved_site_key,),
         ).fetchall()
-        receipts = [
-            models.PurchaseOrderReceipt(
-                id=row["id"],
-                site_key=row["site_key"],
-                purchase_order_id=row["purchase_order_id"],
-                purchase_order_line_id=row["purchase_order_line_id"],
-                module=_row_get(row, "module"),
-                received_qty=row["received_qty"],
-                conformity_status=row["conformity_status"],
-                nonconformity_reason=_row_get(row, "nonconformity_reason"),
-                nonconformity_action=_row_get(row, "nonconformity_action"),
-                note=_row_get(row, "note"),
-                created_by=_row_get(row, "created_by"),
-                created_at=row["created_at"],
+        for row in receipt_rows:
+            receipts_by_order[row["purchase_order_id"]].append(
+                models.PurchaseOrderReceipt(
+                    id=row["id"],
+                    site_key=row["site_key"],
+                    purchase_order_id=row["purchase_order_id"],
+                    purchase_order_line_id=row["purchase_order_line_id"],
+                    module=_row_get(row, "module"),
+                    received_qty=row["received_qty"],
+                    conformity_status=row["conformity_status"],
+                    nonconformity_reason=_row_get(row, "nonconformity_reason"),
+                    nonconformity_action=_row_get(row, "nonconformity_action"),
+                    note=_row_get(row, "note"),
+                    created_by=_row_get(row, "created_by"),
+                    created_at=row["created_at"],
+                )
             )
-            for row in receipt_rows
-        ]
         summary_rows = conn.execute(
-            """
-            SELECT purchase_order_line_id,
+            f"""
+            SELECT purchase_order_id,
+                   purchase_order_line_id,
                    conformity_status,
                    SUM(received_qty) AS total
             FROM purchase_order_receipts
-            WHERE purchase_order_id = ? AND site_key = ?
-            GROUP BY purchase_order_line_id, conformity_status
+            WHERE purchase_order_id IN ({batch}) AND site_key = ?
+            GROUP BY purchase_order_id, purchase_order_line_id, conformity_status
             """,
-            (order_row["id"], resolved_site_key),
+            (resolved_site_key,),
         ).fetchall()
         for row in summary_rows:
             line_id = row["purchase_order_line_id"]
-            receipt_summaries.setdefault(line_id, {})[row["conformity_status"]] = int(
-                row["total"] or 0
-            )
+            receipt_summaries[row["purchase_order_id"]].setdefault(line_id, {})[
+                row["conformity_status"]
+            ] = int(row["total"] or 0)
             receipt_counts[line_id] = receipt_counts.get(line_id, 0) + 1
-    nonconformities: list[models.PurchaseOrderNonconformity] = []
-    if _table_exists(conn, "purchase_order_nonconformities"):
-        module_expr = "module AS module"
-        if not _table_has_column(conn, "purchase_order_nonconformities", "module"):
-            module_expr = "'clothing' AS module"
-        note_expr = "note AS note"
-        if not _table_has_column(conn, "purchase_order_nonconformities", "note"):
-            note_expr = "NULL AS note"
-        requested_expr = "requested_replacement AS requested_replacement"
-        if not _table_has_column(conn, "purchase_order_nonconformities", "requested_replacement"):
-            requested_expr = "0 AS requested_replacement"
-        created_by_expr = "created_by AS created_by"
-        if not _table_has_column(conn, "purchase_order_nonconformities", "created_by"):
-            created_by_expr = "NULL AS created_by"
-        updated_at_expr = "updated_at AS updated_at"
-        if not _table_has_column(conn, "purchase_order_nonconformities", "updated_at"):
-            updated_at_expr = "created_at AS updated_at"
+
+    nonconformities_by_order: dict[int, list[models.PurchaseOrderNonconformity]] = defaultdict(list)
+    if "purchase_order_nonconformities" in tables:
+        nonconformity_columns = _table_columns(conn, "purchase_order_nonconformities")
+        optional_exprs = [
+            f"{column} AS {column}" if column in nonconformity_columns else f"{default} AS {column}"
+            for column, default in (
+                ("module", "'clothing'"),
+                ("note", "NULL"),
+                ("requested_replacement", "0"),
+                ("created_by", "NULL"),
+                ("updated_at", "created_at"),
+            )
+        ]
         try:
             nonconformity_rows = conn.execute(
                 f"""
                 SELECT id,
                        site_key,
-                       {module_expr},
                        purchase_order_id,
                        purchase_order_line_id,
                        receipt_id,
                        status,
                        reason,
-                       {note_expr},
-                       {requested_expr},
-                       {created_by_expr},
                        created_at,
-                       {updated_at_expr}
+                       {", ".join(optional_exprs)}
                 FROM purchase_order_nonconformities
-                WHERE purchase_order_id = ? AND site_key = ?
+                WHERE purchase_order_id IN ({batch}) AND site_key = ?
                 ORDER BY created_at DESC, id DESC
                 """,
-                (order_row["id"], resolved_site_key),
+                (resolved_site_key,),
             ).fetchall()
-            nonconformities = [
+        except sqlite3.OperationalError:
+            nonconformity_rows = []
+        for row in nonconformity_rows:
+            nonconformities_by_order[row["purchase_order_id"]].append(
                 models.PurchaseOrderNonconformity(
                     id=row["id"],
                     site_key=row["site_key"],
@@ -10994,56 +13754,94 @@ def _build_purchase_order_detail(
                     created_at=row["created_at"],
                     updated_at=row["updated_at"],
                 )
-                for row in nonconformity_rows
-            ]
-        except sqlite3.OperationalError:
-            nonconformities = []
-    items = [
-        models.PurchaseOrderItem(
-            id=item_row["id"],
-            purchase_order_id=item_row["purchase_order_id"],
-            item_id=item_row["item_id"],
-            quantity_ordered=item_row["quantity_ordered"],
-            quantity_received=item_row["quantity_received"],
-            item_name=item_row["item_name"],
-            size=_row_get(item_row, "size"),
-            sku=_row_get(item_row, "sku"),
-            unit=_row_get(item_row, "unit"),
-            nonconformity_reason=_row_get(item_row, "nonconformity_reason"),
-            is_nonconforme=bool(_row_get(item_row, "is_nonconforme", 0)),
-            beneficiary_employee_id=_row_get(item_row, "beneficiary_employee_id"),
-            beneficiary_name=_row_get(item_row, "beneficiary_name"),
-            line_type=_row_get(item_row, "line_type", "standard"),
-            return_expected=bool(_row_get(item_row, "return_expected", 0)),
-            return_reason=_row_get(item_row, "return_reason"),
-            return_employee_item_id=_row_get(item_row, "return_employee_item_id"),
-            target_dotation_id=_row_get(item_row, "target_dotation_id"),
-            return_qty=_row_get(item_row, "return_qty", 0),
-            return_status=_row_get(item_row, "return_status", "none"),
-            received_conforme_qty=(
-                receipt_summaries.get(item_row["id"], {}).get("conforme", 0)
-                if receipt_counts.get(item_row["id"])
-                else item_row["quantity_received"]
-            ),
-            received_non_conforme_qty=(
-                receipt_summaries.get(item_row["id"], {}).get("non_conforme", 0)
-                if receipt_counts.get(item_row["id"])
-                else 0
-            ),
-        )
-        for item_row in items_rows
-    ]
-    pending_assignments: list[models.PendingClothingAssignment] = []
-    if _table_exists(conn, "pending_clothing_assignments"):
-        pending_rows = conn.execute(
-            """
+            )
+
+    pending_rows_by_order: dict[int, list[sqlite3.Row]] = defaultdict(list)
+    if "pending_clothing_assignments" in tables:
+        for row in conn.execute(
+            f"""
             SELECT *
             FROM pending_clothing_assignments
-            WHERE purchase_order_id = ? AND site_key = ?
+            WHERE purchase_order_id IN ({batch}) AND site_key = ?
             ORDER BY created_at DESC, id DESC
             """,
-            (order_row["id"], resolved_site_key),
-        ).fetchall()
+            (resolved_site_key,),
+        ).fetchall():
+            pending_rows_by_order[row["purchase_order_id"]].append(row)
+
+    returns_by_order: dict[int, list[models.ClothingSupplierReturn]] = defaultdict(list)
+    if "clothing_supplier_returns" in tables:
+        for row in conn.execute(
+            f"""
+            SELECT *
+            FROM clothing_supplier_returns
+            WHERE purchase_order_id IN ({batch}) AND site_key = ?
+            ORDER BY created_at DESC, id DESC
+            """,
+            (resolved_site_key,),
+        ).fetchall():
+            returns_by_order[row["purchase_order_id"]].append(
+                models.ClothingSupplierReturn(
+                    id=row["id"],
+                    site_key=row["site_key"],
+                    purchase_order_id=row["purchase_order_id"],
+                    purchase_order_line_id=_row_get(row, "purchase_order_line_id"),
+                    employee_id=_row_get(row, "employee_id"),
+                    employee_item_id=_row_get(row, "employee_item_id"),
+                    item_id=_row_get(row, "item_id"),
+                    qty=row["qty"],
+                    reason=_row_get(row, "reason"),
+                    status=row["status"],
+                    created_at=row["created_at"],
+                )
+            )
+
+    details: list[models.PurchaseOrderDetail] = []
+    for order_row in order_rows:
+        order_id = order_row["id"]
+        supplier_id = _row_get(order_row, "supplier_id")
+        supplier = suppliers.get(supplier_id) if supplier_id is not None else None
+        resolved_email, supplier_has_email, supplier_missing_reason = (
+            _resolve_order_supplier_state(supplier_id, supplier)
+        )
+        receipts = receipts_by_order.get(order_id, [])
+        order_summaries = receipt_summaries.get(order_id, {})
+        nonconformities = nonconformities_by_order.get(order_id, [])
+        items = [
+            models.PurchaseOrderItem(
+                id=item_row["id"],
+                purchase_order_id=item_row["purchase_order_id"],
+                item_id=item_row["item_id"],
+                quantity_ordered=item_row["quantity_ordered"],
+                quantity_received=item_row["quantity_received"],
+                item_name=item_row["item_name"],
+                size=_row_get(item_row, "size"),
+                sku=_row_get(item_row, "sku"),
+                unit=_row_get(item_row, "unit"),
+                nonconformity_reason=_row_get(item_row, "nonconformity_reason"),
+                is_nonconforme=bool(_row_get(item_row, "is_nonconforme", 0)),
+                beneficiary_employee_id=_row_get(item_row, "beneficiary_employee_id"),
+                beneficiary_name=_row_get(item_row, "beneficiary_name"),
+                line_type=_row_get(item_row, "line_type", "standard"),
+                return_expected=bool(_row_get(item_row, "return_expected", 0)),
+                return_reason=_row_get(item_row, "return_reason"),
+                return_employee_item_id=_row_get(item_row, "return_employee_item_id"),
+                target_dotation_id=_row_get(item_row, "target_dotation_id"),
+                return_qty=_row_get(item_row, "return_qty", 0),
+                return_status=_row_get(item_row, "return_status", "none"),
+                received_conforme_qty=(
+                    order_summaries.get(item_row["id"], {}).get("conforme", 0)
+                    if receipt_counts.get(item_row["id"])
+                    else item_row["quantity_received"]
+                ),
+                received_non_conforme_qty=(
+                    order_summaries.get(item_row["id"], {}).get("non_conforme", 0)
+                    if receipt_counts.get(item_row["id"])
+                    else 0
+                ),
+            )
+            for item_row in items_by_order.get(order_id, [])
+        ]
         receipt_by_id = {receipt.id: receipt for receipt in receipts}
         pending_assignments = [
             models.PendingClothingAssignment(
@@ -11066,107 +13864,627 @@ def _build_purchase_order_detail(
                 validated_by=_row_get(row, "validated_by"),
                 source_receipt=receipt_by_id.get(row["receipt_id"]),
             )
-            for row in pending_rows
-        ]
-    supplier_returns: list[models.ClothingSupplierReturn] = []
-    if _table_exists(conn, "clothing_supplier_returns"):
-        return_rows = conn.execute(
-            """
-            SELECT *
-            FROM clothing_supplier_returns
-            WHERE purchase_order_id = ? AND site_key = ?
-            ORDER BY created_at DESC, id DESC
-            """,
-            (order_row["id"], resolved_site_key),
+            for row in pending_rows_by_order.get(order_id, [])
+        ]
+        supplier_returns = returns_by_order.get(order_id, [])
+        latest_returns_by_line, _ = _resolve_latest_supplier_returns(supplier_returns)
+        if latest_returns_by_line:
+            for item in items:
+                latest_return = latest_returns_by_line.get(item.id)
+                if latest_return is not None:
+                    item.return_status = _map_supplier_return_status(latest_return.status)
+        has_nonconforming_receipt = any(
+            summary.get("non_conforme", 0) > 0 for summary in order_summaries.values()
+        )
+        latest_nonconforming_receipt_at: datetime | None = None
+        for receipt in receipts:
+            if receipt.conformity_status != "non_conforme":
+                continue
+            receipt_time = _coerce_datetime(receipt.created_at)
+            if (
+                latest_nonconforming_receipt_at is None
+                or receipt_time > latest_nonconforming_receipt_at
+            ):
+                latest_nonconforming_receipt_at = receipt_time
+        replacement_sent_at = _row_get(order_row, "replacement_sent_at")
+        replacement_closed_at = _row_get(order_row, "replacement_closed_at")
+        replacement_closed_by = _row_get(order_row, "replacement_closed_by")
+        replacement_closed_effective = False
+        if replacement_closed_at:
+            closed_at_dt = _coerce_datetime(replacement_closed_at)
+            if (
+                latest_nonconforming_receipt_at is None
+                or closed_at_dt >= latest_nonconforming_receipt_at
+            ):
+                replacement_closed_effective = True
+        requested_replacements = [
+            nonconformity
+            for nonconformity in nonconformities
+            if nonconformity.requested_replacement
+        ]
+        replacement_flow_status = "none"
+        if requested_replacements:
+            replacement_flow_status = "closed" if replacement_closed_effective else "open"
+        replacement_flow_open = replacement_flow_status == "open"
+        replacement_lock_reception = has_nonconforming_receipt and not replacement_closed_effective
+        replacement_assignment_completed = (
+            replacement_flow_status == "closed"
+            and not any(assignment.status == "pending" for assignment in pending_assignments)
+        )
+        details.append(
+            models.PurchaseOrderDetail(
+                id=order_id,
+                supplier_id=supplier_id,
+                parent_id=_row_get(order_row, "parent_id"),
+                replacement_for_line_id=_row_get(order_row, "replacement_for_line_id"),
+                kind=_row_get(order_row, "kind", "standard") or "standard",
+                supplier_name=order_row["supplier_name"],
+                supplier_email=supplier.email if supplier else None,
+                supplier_email_resolved=resolved_email,
+                supplier_has_email=supplier_has_email,
+                supplier_missing_reason=supplier_missing_reason,
+                replacement_flow_status=replacement_flow_status,
+                replacement_flow_open=replacement_flow_open,
+                replacement_lock_reception=replacement_lock_reception,
+                replacement_assignment_completed=replacement_assignment_completed,
+                replacement_sent_at=replacement_sent_at,
+                replacement_closed_at=replacement_closed_at,
+                replacement_closed_by=replacement_closed_by,
+                status=order_row["status"],
+                created_at=order_row["created_at"],
+                note=order_row["note"],
+                auto_created=bool(order_row["auto_created"]),
+                last_sent_at=order_row["last_sent_at"],
+                last_sent_to=order_row["last_sent_to"],
+                last_sent_by=order_row["last_sent_by"],
+                is_archived=bool(_row_get(order_row, "is_archived", 0)),
+                archived_at=_row_get(order_row, "archived_at"),
+                archived_by=_row_get(order_row, "archived_by"),
+                items=items,
+                receipts=receipts,
+                nonconformities=nonconformities,
+                pending_assignments=pending_assignments,
+                supplier_returns=supplier_returns,
+            )
+        )
+    return details
+
+
+@dataclass(frozen=True)
+class _PurchaseOrderListing:
+    orders_table: str
+    lines_table: str
+    line_item_column: str
+    items_table: str
+    item_code_column: str
+
+
+_PURCHASE_ORDER_LISTINGS: dict[str, _PurchaseOrderListing] = {
+    "clothing": _PurchaseOrderListing(
+        "purchase_orders", "purchase_order_items", "item_id", "items", "sku"
+    ),
+    "inventory_remise": _PurchaseOrderListing(
+        "remise_purchase_orders",
+        "remise_purchase_order_items",
+        "remise_item_id",
+        "remise_items",
+        "sku",
+    ),
+    "pharmacy": _PurchaseOrderListing(
+        "pharmacy_purchase_orders",
+        "pharmacy_purchase_order_items",
+        "pharmacy_item_id",
+        "pharmacy_items",
+        "barcode",
+    ),
+}
+
+_PURCHASE_ORDER_SUMMARY_MAX_LIMIT = 200
+
+
+def _ensure_purchase_order_listing_indexes(conn: sqlite3.Connection) -> None:
+    """Index the keyset order of every order table and the order id of every line table."""
+
+    for listing in _PURCHASE_ORDER_LISTINGS.values():
+        if _table_exists(conn, listing.orders_table):
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{listing.orders_table}_created "
+                f"ON {listing.orders_table}(created_at, id)"
+            )
+        if _table_exists(conn, listing.lines_table):
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{listing.lines_table}_order "
+                f"ON {listing.lines_table}(purchase_order_id)"
+            )
+
+
+def _encode_purchase_order_cursor(created_at: object, order_id: int) -> str:
+    raw = f"{created_at}|{order_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_purchase_order_cursor(cursor: str) -> tuple[str, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, order_id = raw.rsplit("|", 1)
+        return created_at, int(order_id)
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("Curseur de pagination invalide") from exc
+
+
+def _build_purchase_order_summaries(
+    conn: sqlite3.Connection, module_key: str, rows: list[sqlite3.Row]
+) -> list[models.PurchaseOrderSummary]:
+    """Attach the SQL-aggregated line totals to order header rows."""
+
+    listing = _PURCHASE_ORDER_LISTINGS[module_key]
+    totals: dict[int, sqlite3.Row] = {}
+    if rows:
+        order_ids = [row["id"] for row in rows]
+        placeholders = ", ".join("?" for _ in order_ids)
+        totals = {
+            total_row["purchase_order_id"]: total_row
+            for total_row in conn.execute(
+                f"""
+                SELECT purchase_order_id,
+                       COUNT(*) AS line_count,
+                       COALESCE(SUM(quantity_ordered), 0) AS quantity_ordered,
+                       COALESCE(SUM(quantity_received), 0) AS quantity_received
+                FROM {listing.lines_table}
+                WHERE purchase_order_id IN ({placeholders})
+                GROUP BY purchase_order_id
+                """,
+                order_ids,
+            ).fetchall()
+        }
+    summaries: list[models.PurchaseOrderSummary] = []
+    for row in rows:
+        total_row = totals.get(row["id"])
+        summaries.append(
+            models.PurchaseOrderSummary(
+                id=row["id"],
+                module=module_key,
+                supplier_id=row["supplier_id"],
+                supplier_name=row["supplier_name"],
+                supplier_email=_row_get(row, "supplier_email"),
+                status=row["status"],
+                created_at=row["created_at"],
+                note=row["note"],
+                auto_created=bool(row["auto_created"]),
+                is_archived=bool(row["is_archived"]),
+                archived_at=row["archived_at"],
+                kind=_row_get(row, "kind") or "standard",
+                parent_id=_row_get(row, "parent_id"),
+                line_count=total_row["line_count"] if total_row else 0,
+                quantity_ordered=total_row["quantity_ordered"] if total_row else 0,
+                quantity_received=total_row["quantity_received"] if total_row else 0,
+            )
+        )
+    return summaries
+
+
+def list_purchase_order_summaries(
+    module_key: str,
+    *,
+    statuses: Iterable[str] | None = None,
+    supplier_id: int | None = None,
+    created_from: date | None = None,
+    created_to: date | None = None,
+    auto_created: bool | None = None,
+    search: str | None = None,
+    include_archived: bool = False,
+    archived_only: bool = False,
+    parent_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = 50,
+) -> models.PurchaseOrderSummaryPage:
+    """Return one page of order headers with SQL-aggregated line totals.
+
+    Orders are sorted by ``created_at DESC, id DESC`` and paginated by keyset: the
+    returned ``next_cursor`` encodes the last row of the page. Replacement requests
+    are only listed under their original order, through ``parent_id``.
+    """
+
+    listing = _PURCHASE_ORDER_LISTINGS.get(module_key)
+    if listing is None:
+        raise ValueError("Module de bons de commande inconnu")
+    limit = max(1, min(int(limit), _PURCHASE_ORDER_SUMMARY_MAX_LIMIT))
+    ensure_database_ready()
+
+    conditions: list[str] = []
+    params: list[object] = []
+    if archived_only:
+        conditions.append("COALESCE(po.is_archived, 0) = 1")
+    elif not include_archived:
+        conditions.append("COALESCE(po.is_archived, 0) = 0")
+    status_values = sorted({value.strip().upper() for value in statuses or () if value.strip()})
+    if status_values:
+        conditions.append(f"po.status IN ({', '.join('?' for _ in status_values)})")
+        params.extend(status_values)
+    if supplier_id is not None:
+        conditions.append("po.supplier_id = ?")
+        params.append(supplier_id)
+    if created_from is not None:
+        conditions.append("po.created_at >= ?")
+        params.append(created_from.isoformat())
+    if created_to is not None:
+        conditions.append("po.created_at < ?")
+        params.append((created_to + timedelta(days=1)).isoformat())
+    if auto_created is not None:
+        conditions.append("COALESCE(po.auto_created, 0) = ?")
+        params.append(1 if auto_created else 0)
+    needle = (search or "").strip()
+    if needle:
+        pattern = f"%{needle}%"
+        conditions.append(
+            "(po.note LIKE ? OR s.name LIKE ? OR CAST(po.id AS TEXT) = ? OR EXISTS ("
+            f"SELECT 1 FROM {listing.lines_table} AS line "
+            f"JOIN {listing.items_table} AS item ON item.id = line.{listing.line_item_column} "
+            "WHERE line.purchase_order_id = po.id "
+            f"AND (item.name LIKE ? OR item.{listing.item_code_column} LIKE ?)))"
+        )
+        params.extend([pattern, pattern, needle.lstrip("#"), pattern, pattern])
+    if cursor:
+        cursor_created_at, cursor_id = _decode_purchase_order_cursor(cursor)
+        conditions.append("(po.created_at < ? OR (po.created_at = ? AND po.id < ?))")
+        params.extend([cursor_created_at, cursor_created_at, cursor_id])
+
+    with db.get_stock_connection() as conn:
+        if not _table_exists(conn, listing.orders_table):
+            return models.PurchaseOrderSummaryPage()
+        has_replacements = _table_has_column(conn, listing.orders_table, "parent_id")
+        if parent_id is not None:
+            if not has_replacements:
+                return models.PurchaseOrderSummaryPage()
+            conditions.append("po.parent_id = ?")
+            params.append(parent_id)
+        elif has_replacements:
+            conditions.append("COALESCE(po.kind, 'standard') <> 'replacement_request'")
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        replacement_columns = (
+            "po.kind, po.parent_id" if has_replacements else "NULL AS kind, NULL AS parent_id"
+        )
+        if archived_only or include_archived:
+            _overlay_purchase_order_archive(conn, db.get_current_site_key())
+        rows = conn.execute(
+            f"""
+            SELECT po.id, po.supplier_id, po.status, po.created_at, po.note,
+                   po.auto_created, po.is_archived, po.archived_at, {replacement_columns},
+                   s.name AS supplier_name, s.email AS supplier_email
+            FROM {listing.orders_table} AS po
+            LEFT JOIN suppliers AS s ON s.id = po.supplier_id
+            {where_clause}
+            ORDER BY po.created_at DESC, po.id DESC
+            LIMIT ?
+            """,
+            (*params, limit + 1),
+        ).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        summaries = _build_purchase_order_summaries(conn, module_key, rows)
+    next_cursor = (
+        _encode_purchase_order_cursor(rows[-1]["created_at"], rows[-1]["id"]) if has_more else None
+    )
+    return models.PurchaseOrderSummaryPage(items=summaries, next_cursor=next_cursor)
+
+
+@dataclass(frozen=True)
+class _PurchaseOrderArchiveSpec:
+    log_module_key: str
+    history_tables: tuple[str, ...] = ()
+
+
+_PURCHASE_ORDER_ARCHIVE_SPECS: dict[str, _PurchaseOrderArchiveSpec] = {
+    "clothing": _PurchaseOrderArchiveSpec(
+        "purchase_orders",
+        ("purchase_order_receipts", "purchase_order_nonconformities"),
+    ),
+    "inventory_remise": _PurchaseOrderArchiveSpec("remise_orders"),
+    "pharmacy": _PurchaseOrderArchiveSpec("pharmacy_orders"),
+}
+
+_PURCHASE_ORDER_ARCHIVE_LOG_TABLES = ("purchase_order_email_log", "purchase_order_audit_log")
+PURCHASE_ORDER_ARCHIVE_RETENTION_DAYS = 365
+
+
+def _attach_purchase_order_archive(
+    conn: sqlite3.Connection, site_key: str, *, create: bool = False
+) -> bool:
+    """Attach the archive database of ``site_key`` as ``archive`` on ``conn``."""
+
+    attached = {row["name"] for row in conn.execute("PRAGMA database_list").fetchall()}
+    if "archive" in attached:
+        return True
+    archive_path = db.get_stock_archive_db_path(site_key)
+    if not create and not archive_path.exists():
+        return False
+    conn.execute("ATTACH DATABASE ? AS archive", (str(archive_path),))
+    return True
+
+
+def _schema_columns(conn: sqlite3.Connection, schema: str, table_name: str) -> list[str]:
+    return [
+        row["name"]
+        for row in conn.execute(f"PRAGMA {schema}.table_info({table_name})").fetchall()
+    ]
+
+
+def _ensure_archive_table(
+    conn: sqlite3.Connection, table_name: str, index_columns: tuple[str, ...]
+) -> list[str]:
+    """Mirror ``table_name`` into the attached archive and return the shared columns."""
+
+    conn.execute(
+        f"CREATE TABLE IF NOT EXISTS archive.{table_name} AS "
+        f"SELECT * FROM main.{table_name} WHERE 0"
+    )
+    conn.execute(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS archive.idx_{table_name}_archive_id "
+        f"ON {table_name}(id)"
+    )
+    conn.execute(
+        f"CREATE INDEX IF NOT EXISTS archive.idx_{table_name}_archive_lookup "
+        f"ON {table_name}({', '.join(index_columns)})"
+    )
+    columns = _schema_columns(conn, "main", table_name)
+    archived = set(_schema_columns(conn, "archive", table_name))
+    for column in columns:
+        if column not in archived:
+            conn.execute(f"ALTER TABLE archive.{table_name} ADD COLUMN {column}")
+    return columns
+
+
+def _overlay_purchase_order_archive(conn: sqlite3.Connection, site_key: str) -> bool:
+    """Shadow the order tables with views over the live and archived rows.
+
+    The views live in the temp schema, which SQLite resolves before ``main``, so the
+    existing read queries see archived orders unchanged. They make the order tables
+    read-only for the rest of ``conn``: only call this on read paths.
+    """
+
+    if not _attach_purchase_order_archive(conn, site_key):
+        return False
+    for module_key, spec in _PURCHASE_ORDER_ARCHIVE_SPECS.items():
+        listing = _PURCHASE_ORDER_LISTINGS[module_key]
+        for table_name in (listing.orders_table, listing.lines_table, *spec.history_tables):
+            archived = set(_schema_columns(conn, "archive", table_name))
+            columns = _schema_columns(conn, "main", table_name)
+            if not archived or not columns:
+                continue
+            archived_select = ", ".join(
+                column if column in archived else f"NULL AS {column}" for column in columns
+            )
+            # Rows copied by an archive run whose live delete is still pending are
+            # read from ``main`` only.
+            conn.execute(
+                f"""
+                CREATE TEMP VIEW IF NOT EXISTS {table_name} AS
+                SELECT {', '.join(columns)} FROM main.{table_name}
+                UNION ALL
+                SELECT {archived_select} FROM archive.{table_name}
+                WHERE id NOT IN (SELECT id FROM main.{table_name})
+                """
+            )
+    return True
+
+
+def _archive_copy_matches(
+    conn: sqlite3.Connection,
+    table_name: str,
+    columns: str,
+    where_clause: str,
+    params: tuple[object, ...] = (),
+) -> bool:
+    """Check that the live rows matched by ``where_clause`` are in the archive unchanged."""
+
+    live_count = conn.execute(
+        f"SELECT COUNT(*) FROM main.{table_name} {where_clause}", params
+    ).fetchone()[0]
+    archived_count = conn.execute(
+        f"SELECT COUNT(*) FROM archive.{table_name} {where_clause}", params
+    ).fetchone()[0]
+    if archived_count < live_count:
+        return False
+    missing = conn.execute(
+        f"""
+        SELECT 1 FROM (
+            SELECT {columns} FROM main.{table_name} {where_clause}
+            EXCEPT
+            SELECT {columns} FROM archive.{table_name} {where_clause}
+        )
+        LIMIT 1
+        """,
+        (*params, *params),
+    ).fetchone()
+    return missing is None
+
+
+def _select_archivable_purchase_orders(
+    conn: sqlite3.Connection, module_key: str, retention_days: int
+) -> list[int]:
+    listing = _PURCHASE_ORDER_LISTINGS[module_key]
+    conditions = [
+        "COALESCE(po.is_archived, 0) = 1",
+        "po.archived_at IS NOT NULL",
+        "po.archived_at < datetime('now', ?)",
+    ]
+    if module_key == "clothing" and _table_exists(conn, "pending_clothing_assignments"):
+        conditions.append(
+            "NOT EXISTS (SELECT 1 FROM pending_clothing_assignments AS pca "
+            "WHERE pca.purchase_order_id = po.id AND pca.status = 'pending')"
+        )
+    order_ids = {
+        row["id"]
+        for row in conn.execute(
+            f"SELECT po.id FROM {listing.orders_table} AS po WHERE {' AND '.join(conditions)}",
+            (f"-{retention_days} days",),
         ).fetchall()
-        supplier_returns = [
-            models.ClothingSupplierReturn(
-                id=row["id"],
-                site_key=row["site_key"],
-                purchase_order_id=row["purchase_order_id"],
-                purchase_order_line_id=_row_get(row, "purchase_order_line_id"),
-                employee_id=_row_get(row, "employee_id"),
-                employee_item_id=_row_get(row, "employee_item_id"),
-                item_id=_row_get(row, "item_id"),
-                qty=row["qty"],
-                reason=_row_get(row, "reason"),
-                status=row["status"],
-                created_at=row["created_at"],
+    }
+    if module_key == "clothing" and order_ids:
+        # A replacement order reads its parent: keep parents while a child stays live.
+        children = conn.execute(
+            "SELECT id, parent_id FROM purchase_orders WHERE parent_id IS NOT NULL"
+        ).fetchall()
+        while True:
+            blocked = {
+                child["parent_id"]
+                for child in children
+                if child["parent_id"] in order_ids and child["id"] not in order_ids
+            }
+            if not blocked:
+                break
+            order_ids -= blocked
+    return sorted(order_ids)
+
+
+def _move_purchase_order_logs_to_archive(site_key: str, module_keys: Iterable[str]) -> int:
+    """Move the core email and audit log rows of the archived orders of ``site_key``.
+
+    Like the orders, the rows are copied and committed first, then deleted from the
+    live tables in a separate transaction once the copy is verified.
+    """
+
+    moved = 0
+    copied: list[tuple[str, str, str, tuple[object, ...]]] = []
+    with db.get_core_connection() as conn:
+        if not _attach_purchase_order_archive(conn, site_key):
+            return 0
+        for table_name in _PURCHASE_ORDER_ARCHIVE_LOG_TABLES:
+            columns = ", ".join(
+                _ensure_archive_table(
+                    conn, table_name, ("site_key", "module_key", "purchase_order_id")
+                )
             )
-            for row in return_rows
-        ]
-    latest_returns_by_line, _ = _resolve_latest_supplier_returns(supplier_returns)
-    if latest_returns_by_line:
-        for item in items:
-            latest_return = latest_returns_by_line.get(item.id)
-            if latest_return is not None:
-                item.return_status = _map_supplier_return_status(latest_return.status)
-    has_nonconforming_receipt = any(
-        summary.get("non_conforme", 0) > 0 for summary in receipt_summaries.values()
-    )
-    latest_nonconforming_receipt_at: datetime | None = None
-    for receipt in receipts:
-        if receipt.conformity_status != "non_conforme":
-            continue
-        receipt_time = _coerce_datetime(receipt.created_at)
-        if latest_nonconforming_receipt_at is None or receipt_time > latest_nonconforming_receipt_at:
-            latest_nonconforming_receipt_at = receipt_time
-    replacement_sent_at = _row_get(order_row, "replacement_sent_at")
-    replacement_closed_at = _row_get(order_row, "replacement_closed_at")
-    replacement_closed_by = _row_get(order_row, "replacement_closed_by")
-    replacement_closed_effective = False
-    if replacement_closed_at:
-        closed_at_dt = _coerce_datetime(replacement_closed_at)
-        if latest_nonconforming_receipt_at is None or closed_at_dt >= latest_nonconforming_receipt_at:
-            replacement_closed_effective = True
-    requested_replacements = [
-        nonconformity
-        for nonconformity in nonconformities
-        if nonconformity.requested_replacement
-    ]
-    replacement_flow_status = "none"
-    if requested_replacements:
-        replacement_flow_status = "closed" if replacement_closed_effective else "open"
-    replacement_flow_open = replacement_flow_status == "open"
-    replacement_lock_reception = has_nonconforming_receipt and not replacement_closed_effective
-    replacement_assignment_completed = (
-        replacement_flow_status == "closed"
-        and not any(assignment.status == "pending" for assignment in pending_assignments)
-    )
-    return models.PurchaseOrderDetail(
-        id=order_row["id"],
-        supplier_id=supplier_id,
-        parent_id=_row_get(order_row, "parent_id"),
-        replacement_for_line_id=_row_get(order_row, "replacement_for_line_id"),
-        kind=_row_get(order_row, "kind", "standard") or "standard",
-        supplier_name=order_row["supplier_name"],
-        supplier_email=supplier.email if supplier else None,
-        supplier_email_resolved=resolved_email,
-        supplier_has_email=supplier_has_email,
-        supplier_missing_reason=supplier_missing_reason,
-        replacement_flow_status=replacement_flow_status,
-        replacement_flow_open=replacement_flow_open,
-        replacement_lock_reception=replacement_lock_reception,
-        replacement_assignment_completed=replacement_assignment_completed,
-        replacement_sent_at=replacement_sent_at,
-        replacement_closed_at=replacement_closed_at,
-        replacement_closed_by=replacement_closed_by,
-        status=order_row["status"],
-        created_at=order_row["created_at"],
-        note=order_row["note"],
-        auto_created=bool(order_row["auto_created"]),
-        last_sent_at=order_row["last_sent_at"],
-        last_sent_to=order_row["last_sent_to"],
-        last_sent_by=order_row["last_sent_by"],
-        is_archived=bool(_row_get(order_row, "is_archived", 0)),
-        archived_at=_row_get(order_row, "archived_at"),
-        archived_by=_row_get(order_row, "archived_by"),
-        items=items,
-        receipts=receipts,
-        nonconformities=nonconformities,
-        pending_assignments=pending_assignments,
-        supplier_returns=supplier_returns,
+            for module_key in module_keys:
+                listing = _PURCHASE_ORDER_LISTINGS[module_key]
+                if not _schema_columns(conn, "archive", listing.orders_table):
+                    continue
+                where_clause = (
+                    "WHERE site_key = ? AND module_key = ? AND purchase_order_id IN "
+                    f"(SELECT id FROM archive.{listing.orders_table})"
+                )
+                params = (site_key, _PURCHASE_ORDER_ARCHIVE_SPECS[module_key].log_module_key)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO archive.{table_name} ({columns}) "
+                    f"SELECT {columns} FROM main.{table_name} {where_clause}",
+                    params,
+                )
+                copied.append((table_name, columns, where_clause, params))
+        conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        for table_name, columns, where_clause, params in copied:
+            if not _archive_copy_matches(conn, table_name, columns, where_clause, params):
+                logger.error(
+                    "[PURCHASE_ORDER_ARCHIVE] site=%s table=%s archive copy mismatch, live rows kept",
+                    site_key,
+                    table_name,
+                )
+                continue
+            moved += conn.execute(
+                f"DELETE FROM main.{table_name} {where_clause}", params
+            ).rowcount
+        conn.commit()
+    return moved
+
+
+def archive_closed_purchase_orders(
+    site_key: str | None = None,
+    *,
+    retention_days: int = PURCHASE_ORDER_ARCHIVE_RETENTION_DAYS,
+) -> dict[str, int]:
+    """Move archived orders older than ``retention_days`` to the site archive database.
+
+    The order, its lines, its receipts and its non-conformities leave the live tables
+    together with their email and audit log rows. Archived orders stay readable
+    through the archived listings, the order detail and its PDF. Returns the number
+    of orders moved per module.
+
+    SQLite does not commit the two database files atomically in WAL mode, so the
+    move runs in two phases: the rows are copied into the archive and committed,
+    then the copy is checked against the live rows and only then are the live rows
+    deleted in their own transaction. A run interrupted in between leaves both
+    copies and the next run completes it.
+    """
+
+    ensure_database_ready()
+    resolved_site_key = (
+        sites.normalize_site_key(site_key) if site_key else db.get_current_site_key()
     )
+    retention_days = max(0, int(retention_days))
+    moved: dict[str, int] = {}
+    with _get_site_stock_conn(resolved_site_key) as conn:
+        for module_key, spec in _PURCHASE_ORDER_ARCHIVE_SPECS.items():
+            listing = _PURCHASE_ORDER_LISTINGS[module_key]
+            tables = [listing.orders_table, listing.lines_table, *spec.history_tables]
+            if not all(_table_exists(conn, table_name) for table_name in tables):
+                moved[module_key] = 0
+                continue
+            order_ids = _select_archivable_purchase_orders(conn, module_key, retention_days)
+            moved[module_key] = len(order_ids)
+            if not order_ids:
+                continue
+            _attach_purchase_order_archive(conn, resolved_site_key, create=True)
+            try:
+                conn.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS purchase_order_archive_batch "
+                    "(id INTEGER PRIMARY KEY)"
+                )
+                conn.execute("DELETE FROM temp.purchase_order_archive_batch")
+                conn.executemany(
+                    "INSERT INTO temp.purchase_order_archive_batch (id) VALUES (?)",
+                    [(order_id,) for order_id in order_ids],
+                )
+                copied: list[tuple[str, str, str]] = []
+                for table_name in tables:
+                    key_column = "id" if table_name == listing.orders_table else "purchase_order_id"
+                    index_columns = (
+                        ("created_at", "id")
+                        if table_name == listing.orders_table
+                        else ("purchase_order_id",)
+                    )
+                    columns = ", ".join(_ensure_archive_table(conn, table_name, index_columns))
+                    batch_filter = (
+                        f"WHERE {key_column} IN (SELECT id FROM temp.purchase_order_archive_batch)"
+                    )
+                    # Replace rather than insert so rows copied by an interrupted run
+                    # are simply written again.
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO archive.{table_name} ({columns}) "
+                        f"SELECT {columns} FROM main.{table_name} {batch_filter}"
+                    )
+                    copied.append((table_name, columns, batch_filter))
+                conn.commit()
+
+                conn.execute("BEGIN IMMEDIATE")
+                if not all(
+                    _archive_copy_matches(conn, table_name, columns, batch_filter)
+                    for table_name, columns, batch_filter in copied
+                ):
+                    conn.rollback()
+                    logger.error(
+                        "[PURCHASE_ORDER_ARCHIVE] site=%s module=%s archive copy mismatch, "
+                        "live rows kept",
+                        resolved_site_key,
+                        module_key,
+                    )
+                    moved[module_key] = 0
+                    continue
+                # Children first, so the parent orders go last whatever the FK setup.
+                for table_name, _, batch_filter in reversed(copied):
+                    conn.execute(f"DELETE FROM main.{table_name} {batch_filter}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+    _move_purchase_order_logs_to_archive(resolved_site_key, _PURCHASE_ORDER_ARCHIVE_SPECS)
+    if any(moved.values()):
+        logger.info(
+            "[PURCHASE_ORDER_ARCHIVE] site=%s moved=%s retention_days=%s",
+            resolved_site_key,
+            moved,
+            retention_days,
+        )
+    return moved
 
 
 def list_purchase_orders(
@@ -11182,6 +14500,8 @@ def list_purchase_orders(
     elif not include_archived:
         where_clause = "WHERE COALESCE(po.is_archived, 0) = 0"
     with db.get_stock_connection() as conn:
+        if archived_only or include_archived:
+            _overlay_purchase_order_archive(conn, db.get_current_site_key())
         cur = conn.execute(
             f"""
             SELECT po.*, s.name AS supplier_name, s.email AS supplier_email
@@ -11193,24 +14513,21 @@ def list_purchase_orders(
             params,
         )
         rows = cur.fetchall()
-        return [
-            _build_purchase_order_detail(conn, row, site_key=db.get_current_site_key())
-            for row in rows
-        ]
+        return _build_purchase_order_details(conn, rows, site_key=db.get_current_site_key())
 
 
 def get_purchase_order(order_id: int) -> models.PurchaseOrderDetail:
     ensure_database_ready()
+    query = """
+        SELECT po.*, s.name AS supplier_name, s.email AS supplier_email
+        FROM purchase_orders AS po
+        LEFT JOIN suppliers AS s ON s.id = po.supplier_id
+        WHERE po.id = ?
+    """
     with db.get_stock_connection() as conn:
-        row = conn.execute(
-            """
-            SELECT po.*, s.name AS supplier_name, s.email AS supplier_email
-            FROM purchase_orders AS po
-            LEFT JOIN suppliers AS s ON s.id = po.supplier_id
-            WHERE po.id = ?
-            """,
-            (order_id,),
-        ).fetchone()
+        row = conn.execute(query, (order_id,)).fetchone()
+        if row is None and _overlay_purchase_order_archive(conn, db.get_current_site_key()):
+            row = conn.execute(query, (order_id,)).fetchone()
         if row is None:
             raise ValueError("Bon de commande introuvable")
         return _build_purchase_order_detail(conn, row, site_key=db.get_current_site_key())
@@ -12066,12 +15383,17 @@ def _render_remise_inventory_pdf(
     return buffer.getvalue()
 
 
-def generate_purchase_order_pdf(
-    order: models.PurchaseOrderDetail,
+def get_purchase_order_pdf_file(
+    order: models.PurchaseOrderDetail
+    | models.RemisePurchaseOrderDetail
+    | models.PharmacyPurchaseOrderDetail,
     *,
     user: models.User | None = None,
     site_key: str | None = None,
-) -> bytes:
+    include_received: bool = False,
+) -> CachedPdf:
+    """Return the rendered PDF of an order from the on-disk cache, rendering it on a miss."""
+
     resolved_site_key = sites.normalize_site_key(site_key) if site_key else db.get_current_site_key()
     site_info = _get_site_info_for_email(resolved_site_key)
     buyer_block, supplier_block, delivery_block = _build_purchase_order_blocks(
@@ -12079,37 +15401,36 @@ def generate_purchase_order_pdf(
         user=user,
         site_info=site_info,
     )
-    return render_purchase_order_pdf(
+    return render_purchase_order_pdf_cached(
         title="BON DE COMMANDE",
         purchase_order=order,
         buyer_block=buyer_block,
         supplier_block=supplier_block,
         delivery_block=delivery_block,
-        include_received=False,
+        include_received=include_received,
     )
 
 
+def generate_purchase_order_pdf(
+    order: models.PurchaseOrderDetail,
+    *,
+    user: models.User | None = None,
+    site_key: str | None = None,
+) -> bytes:
+    return get_purchase_order_pdf_file(
+        order, user=user, site_key=site_key, include_received=False
+    ).read_bytes()
+
+
 def generate_purchase_order_reception_pdf(
     order: models.PurchaseOrderDetail,
     *,
     user: models.User | None = None,
     site_key: str | None = None,
 ) -> bytes:
-    resolved_site_key = sites.normalize_site_key(site_key) if site_key else db.get_current_site_key()
-    site_info = _get_site_info_for_email(resolved_site_key)
-    buyer_block, supplier_block, delivery_block = _build_purchase_order_blocks(
-        order,
-        user=user,
-        site_info=site_info,
-    )
-    return render_purchase_order_pdf(
-        title="BON DE COMMANDE",
-        purchase_order=order,
-        buyer_block=buyer_block,
-        supplier_block=supplier_block,
-        delivery_block=delivery_block,
-        include_received=True,
-    )
+    return get_purchase_order_pdf_file(
+        order, user=user, site_key=site_key, include_received=True
+    ).read_bytes()
 
 
 def _get_site_info_for_email(site_key: str) -> models.SiteInfo:
@@ -12142,6 +15463,7 @@ def _record_purchase_order_email_log(
     status: str,
     message_id: str | None = None,
     error_message: str | None = None,
+    tracking_id: int | None = None,
 ) -> None:
     with db.get_core_connection() as conn:
         conn.execute(
@@ -12158,9 +15480,10 @@ def _record_purchase_order_email_log(
                 user_email,
                 status,
                 message_id,
-                error_message
+                error_message,
+                tracking_id
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
             (
                 created_at,
@@ -12175,6 +15498,7 @@ def _record_purchase_order_email_log(
                 status,
                 message_id,
                 error_message,
+                tracking_id,
             ),
         )
         conn.commit()
@@ -12235,44 +15559,73 @@ def _record_purchase_order_audit_log(
         conn.commit()
 
 
-def send_purchase_order_to_supplier(
-    site_key: str,
+PURCHASE_ORDER_EMAIL_PURPOSE = "purchase_order_to_supplier"
+PURCHASE_ORDER_EMAIL_MAX_ATTEMPTS = 3
+
+
+def _load_purchase_order_for_email(
+    conn: sqlite3.Connection,
+    module_key: str,
     purchase_order_id: int,
-    sent_by_user: models.User,
     *,
-    to_email_override: str | None = None,
-    context_note: str | None = None,
-) -> models.PurchaseOrderSendResponse:
-    ensure_database_ready()
-    normalized_site_key = sites.normalize_site_key(site_key) or db.DEFAULT_SITE_KEY
-    with db.get_stock_connection(normalized_site_key) as conn:
-        row = conn.execute(
-            """
-            SELECT po.*, s.name AS supplier_name, s.email AS supplier_email
-            FROM purchase_orders AS po
-            LEFT JOIN suppliers AS s ON s.id = po.supplier_id
-            WHERE po.id = ?
-            """,
-            (purchase_order_id,),
-        ).fetchone()
-        if row is None:
-            raise ValueError("Bon de commande introuvable")
-        order = _build_purchase_order_detail(conn, row, site_key=normalized_site_key)
-        supplier_id = row["supplier_id"]
-        supplier_name = row["supplier_name"]
-        supplier_email = row["supplier_email"]
+    site_key: str,
+) -> tuple[
+    sqlite3.Row,
+    models.PurchaseOrderDetail
+    | models.RemisePurchaseOrderDetail
+    | models.PharmacyPurchaseOrderDetail,
+]:
+    if module_key == "purchase_orders":
+        orders_table = "purchase_orders"
+        not_found_message = "Bon de commande introuvable"
+    elif module_key == "remise_orders":
+        orders_table = "remise_purchase_orders"
+        not_found_message = "Bon de commande introuvable"
+    elif module_key == "pharmacy_orders":
+        orders_table = "pharmacy_purchase_orders"
+        not_found_message = "Bon de commande pharmacie introuvable"
+    else:
+        raise ValueError("Module de bon de commande inconnu")
+    row = conn.execute(
+        f"""
+        SELECT po.*, s.name AS supplier_name, s.email AS supplier_email
+        FROM {orders_table} AS po
+        LEFT JOIN suppliers AS s ON s.id = po.supplier_id
+        WHERE po.id = ?
+        """,
+        (purchase_order_id,),
+    ).fetchone()
+    if row is None:
+        raise ValueError(not_found_message)
+    if module_key == "purchase_orders":
+        order = _build_purchase_order_detail(conn, row, site_key=site_key)
+    elif module_key == "remise_orders":
+        order = _build_remise_purchase_order_detail(conn, row, site_key=site_key)
+    else:
+        order = _build_pharmacy_purchase_order_detail(conn, row, site_key=site_key)
+    return row, order
+
 
+def _resolve_purchase_order_recipient(
+    *,
+    site_key: str,
+    module_key: str,
+    order_id: int,
+    supplier_id: int | None,
+    supplier_name: str | None,
+    supplier_email: str | None,
+    sent_by_user: models.User,
+) -> tuple[str, str | None, str | None]:
     try:
-        supplier = get_supplier_for_order(normalized_site_key, supplier_id)
+        supplier = get_supplier_for_order(site_key, supplier_id)
         resolved_email = require_supplier_email(supplier)
     except SupplierResolutionError as exc:
-        sent_at = datetime.now(timezone.utc).isoformat()
         _record_purchase_order_audit_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="purchase_orders",
+            created_at=datetime.now(timezone.utc).isoformat(),
+            site_key=site_key,
+            module_key=module_key,
             action="send_to_supplier",
-            purchase_order_id=order.id,
+            purchase_order_id=order_id,
             supplier_id=supplier_id,
             supplier_name=supplier_name,
             supplier_email=supplier_email,
@@ -12283,117 +15636,162 @@ def send_purchase_order_to_supplier(
             message=str(exc),
         )
         raise
+    return (
+        resolved_email,
+        supplier.name if supplier else supplier_name,
+        supplier.email if supplier else supplier_email,
+    )
 
-    to_email = resolved_email
-    supplier_name = supplier.name if supplier else supplier_name
-    supplier_email = supplier.email if supplier else supplier_email
-    if to_email_override:
-        to_email = _normalize_email(to_email_override)
-    sent_at = datetime.now(timezone.utc).isoformat()
-    site_info = _get_site_info_for_email(normalized_site_key)
-    subject, body_text, body_html = notifications.build_purchase_order_email(
-        order,
-        site_info,
-        sent_by_user,
-        context_note=context_note,
+
+def _queue_purchase_order_email(
+    *,
+    site_key: str,
+    module_key: str,
+    order: models.PurchaseOrderDetail
+    | models.RemisePurchaseOrderDetail
+    | models.PharmacyPurchaseOrderDetail,
+    supplier_id: int | None,
+    supplier_name: str | None,
+    supplier_email: str | None,
+    to_email: str,
+    subject: str,
+    body_text: str,
+    body_html: str,
+    sent_by_user: models.User,
+    replacement_parent_id: int | None = None,
+) -> models.PurchaseOrderSendResponse:
+    """Queue a supplier email whose PDF is rendered by the outbox worker.
+
+    The returned tracking id is the outbox id; it is stored on the
+    ``purchase_order_email_log`` entry written once the delivery completes.
+    """
+
+    queued_at = datetime.now(timezone.utc).isoformat()
+    reply_to = sent_by_user.email if sent_by_user.email and "@" in sent_by_user.email else None
+    tracking_id = notifications.enqueue_email(
+        to_email,
+        subject,
+        body_text,
+        body_html,
+        purpose=PURCHASE_ORDER_EMAIL_PURPOSE,
+        meta={
+            "site_key": site_key,
+            "module_key": module_key,
+            "purchase_order_id": order.id,
+            "supplier_id": supplier_id,
+            "supplier_name": supplier_name,
+            "supplier_email": supplier_email,
+            "to_email": to_email,
+            "user_id": sent_by_user.id,
+            "user_email": sent_by_user.email,
+            "sent_by": sent_by_user.email or sent_by_user.username,
+            "replacement_parent_id": replacement_parent_id,
+        },
+        reply_to=reply_to,
+        attachments=[
+            {
+                "kind": "purchase_order_pdf",
+                "site_key": site_key,
+                "module_key": module_key,
+                "purchase_order_id": order.id,
+                "user_id": sent_by_user.id,
+            }
+        ],
+        max_attempts=PURCHASE_ORDER_EMAIL_MAX_ATTEMPTS,
     )
-    pdf_bytes = generate_purchase_order_pdf(
-        order,
-        user=sent_by_user,
-        site_key=normalized_site_key,
+    return models.PurchaseOrderSendResponse(
+        status="queued",
+        sent_to=to_email,
+        sent_at=queued_at,
+        tracking_id=tracking_id,
     )
-    resolved = resolve_pdf_config("purchase_orders")
+
+
+def render_email_attachment(descriptor: dict[str, Any]) -> tuple[str, bytes, str]:
+    """Render an outbox attachment descriptor into ``(filename, content, mime type)``."""
+
+    if descriptor.get("kind") != "purchase_order_pdf":
+        raise ValueError("Type de pièce jointe inconnu")
+    site_key = sites.normalize_site_key(descriptor.get("site_key")) or db.DEFAULT_SITE_KEY
+    module_key = str(descriptor.get("module_key"))
+    with db.get_stock_connection(site_key) as conn:
+        _, order = _load_purchase_order_for_email(
+            conn,
+            module_key,
+            int(descriptor["purchase_order_id"]),
+            site_key=site_key,
+        )
+    user_id = descriptor.get("user_id")
+    user = get_user_by_id(int(user_id)) if user_id is not None else None
+    pdf_bytes = get_purchase_order_pdf_file(
+        order, user=user, site_key=site_key, include_received=False
+    ).read_bytes()
+    resolved = resolve_pdf_config(module_key)
     filename = render_filename(
         resolved.config.filename.pattern,
-        module_key="purchase_orders",
+        module_key=module_key,
         module_title=resolved.module_label,
         context={"order_id": order.id, "ref": order.id},
     )
-    reply_to = sent_by_user.email if sent_by_user.email and "@" in sent_by_user.email else None
-    try:
-        message_id = email_sender.send_email(
-            to_email,
-            subject,
-            body_text,
-            body_html,
-            reply_to=reply_to,
-            attachments=[(filename, pdf_bytes, "application/pdf")],
-            sensitive=True,
-        )
-        _record_purchase_order_email_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="purchase_orders",
-            purchase_order_id=order.id,
-            purchase_order_number=str(order.id),
-            supplier_id=supplier_id,
-            supplier_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="sent",
-            message_id=message_id,
-        )
-        _record_purchase_order_audit_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="purchase_orders",
-            action="send_to_supplier",
-            purchase_order_id=order.id,
-            supplier_id=supplier_id,
-            supplier_name=supplier_name,
-            supplier_email=supplier_email,
-            recipient_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="ok",
-            message=f"Email envoyé ({message_id})",
-        )
-    except email_sender.EmailSendError as exc:
-        _record_purchase_order_email_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="purchase_orders",
-            purchase_order_id=order.id,
-            purchase_order_number=str(order.id),
-            supplier_id=supplier_id,
-            supplier_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="failed",
-            error_message=str(exc),
-        )
-        _record_purchase_order_audit_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="purchase_orders",
-            action="send_to_supplier",
-            purchase_order_id=order.id,
-            supplier_id=supplier_id,
-            supplier_name=supplier_name,
-            supplier_email=supplier_email,
-            recipient_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="error",
-            message=str(exc),
-        )
-        raise
+    return filename, pdf_bytes, "application/pdf"
 
-    with db.get_stock_connection(normalized_site_key) as conn:
+
+def record_purchase_order_email_delivery(
+    tracking_id: int,
+    meta: dict[str, Any],
+    *,
+    message_id: str | None,
+    error: str | None,
+) -> None:
+    """Log the outcome of a queued supplier email and stamp the order once sent."""
+
+    completed_at = datetime.now(timezone.utc).isoformat()
+    site_key = meta["site_key"]
+    module_key = meta["module_key"]
+    purchase_order_id = int(meta["purchase_order_id"])
+    to_email = meta["to_email"]
+    _record_purchase_order_email_log(
+        created_at=completed_at,
+        site_key=site_key,
+        module_key=module_key,
+        purchase_order_id=purchase_order_id,
+        purchase_order_number=str(purchase_order_id),
+        supplier_id=meta.get("supplier_id"),
+        supplier_email=to_email,
+        user_id=meta.get("user_id"),
+        user_email=meta.get("user_email"),
+        status="failed" if error else "sent",
+        message_id=message_id,
+        error_message=error,
+        tracking_id=tracking_id,
+    )
+    _record_purchase_order_audit_log(
+        created_at=completed_at,
+        site_key=site_key,
+        module_key=module_key,
+        action="send_to_supplier",
+        purchase_order_id=purchase_order_id,
+        supplier_id=meta.get("supplier_id"),
+        supplier_name=meta.get("supplier_name"),
+        supplier_email=meta.get("supplier_email"),
+        recipient_email=to_email,
+        user_id=meta.get("user_id"),
+        user_email=meta.get("user_email"),
+        status="error" if error else "ok",
+        message=error or f"Email envoyé ({message_id})",
+    )
+    if error or module_key != "purchase_orders":
+        return
+    with db.get_stock_connection(site_key) as conn:
         conn.execute(
             """
             UPDATE purchase_orders
             SET last_sent_at = ?, last_sent_to = ?, last_sent_by = ?
             WHERE id = ?
             """,
-            (
-                sent_at,
-                to_email,
-                sent_by_user.email or sent_by_user.username,
-                order.id,
-            ),
+            (completed_at, to_email, meta.get("sent_by"), purchase_order_id),
         )
-        if order.kind == "replacement_request" and order.parent_id:
+        if meta.get("replacement_parent_id"):
             conn.execute(
                 """
                 UPDATE purchase_orders
@@ -12402,15 +15800,59 @@ def send_purchase_order_to_supplier(
                     replacement_closed_by = NULL
                 WHERE id = ?
                 """,
-                (sent_at, order.parent_id),
+                (completed_at, meta["replacement_parent_id"]),
             )
         conn.commit()
 
-    return models.PurchaseOrderSendResponse(
-        status="sent",
-        sent_to=to_email,
-        sent_at=sent_at,
-        message_id=message_id,
+
+def send_purchase_order_to_supplier(
+    site_key: str,
+    purchase_order_id: int,
+    sent_by_user: models.User,
+    *,
+    to_email_override: str | None = None,
+    context_note: str | None = None,
+) -> models.PurchaseOrderSendResponse:
+    ensure_database_ready()
+    normalized_site_key = sites.normalize_site_key(site_key) or db.DEFAULT_SITE_KEY
+    with db.get_stock_connection(normalized_site_key) as conn:
+        row, order = _load_purchase_order_for_email(
+            conn, "purchase_orders", purchase_order_id, site_key=normalized_site_key
+        )
+
+    to_email, supplier_name, supplier_email = _resolve_purchase_order_recipient(
+        site_key=normalized_site_key,
+        module_key="purchase_orders",
+        order_id=order.id,
+        supplier_id=row["supplier_id"],
+        supplier_name=row["supplier_name"],
+        supplier_email=row["supplier_email"],
+        sent_by_user=sent_by_user,
+    )
+    if to_email_override:
+        to_email = _normalize_email(to_email_override)
+    site_info = _get_site_info_for_email(normalized_site_key)
+    subject, body_text, body_html = notifications.build_purchase_order_email(
+        order,
+        site_info,
+        sent_by_user,
+        context_note=context_note,
+    )
+    return _queue_purchase_order_email(
+        site_key=normalized_site_key,
+        module_key="purchase_orders",
+        order=order,
+        supplier_id=row["supplier_id"],
+        supplier_name=supplier_name,
+        supplier_email=supplier_email,
+        to_email=to_email,
+        subject=subject,
+        body_text=body_text,
+        body_html=body_html,
+        sent_by_user=sent_by_user,
+        replacement_parent_id=(
+            order.parent_id if order.kind == "replacement_request" else None
+        ),
     )
 
 
@@ -12424,148 +15866,41 @@ def send_remise_purchase_order_to_supplier(
     ensure_database_ready()
     normalized_site_key = sites.normalize_site_key(site_key) or db.DEFAULT_SITE_KEY
     with db.get_stock_connection(normalized_site_key) as conn:
-        row = conn.execute(
-            """
-            SELECT po.*, s.name AS supplier_name
-            FROM remise_purchase_orders AS po
-            LEFT JOIN suppliers AS s ON s.id = po.supplier_id
-            WHERE po.id = ?
-            """,
-            (purchase_order_id,),
-        ).fetchone()
-        if row is None:
-            raise ValueError("Bon de commande introuvable")
-        order = _build_remise_purchase_order_detail(
-            conn,
-            row,
-            site_key=normalized_site_key,
-        )
-        supplier_id = row["supplier_id"]
-        supplier_name = row["supplier_name"]
-
-    try:
-        supplier = get_supplier_for_order(normalized_site_key, supplier_id)
-        resolved_email = require_supplier_email(supplier)
-    except SupplierResolutionError as exc:
-        sent_at = datetime.now(timezone.utc).isoformat()
-        _record_purchase_order_audit_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="remise_orders",
-            action="send_to_supplier",
-            purchase_order_id=order.id,
-            supplier_id=supplier_id,
-            supplier_name=supplier_name,
-            supplier_email=None,
-            recipient_email=None,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="error",
-            message=str(exc),
+        row, order = _load_purchase_order_for_email(
+            conn, "remise_orders", purchase_order_id, site_key=normalized_site_key
         )
-        raise
 
-    to_email = resolved_email
-    supplier_name = supplier.name if supplier else supplier_name
-    supplier_email = supplier.email if supplier else None
+    to_email, supplier_name, supplier_email = _resolve_purchase_order_recipient(
+        site_key=normalized_site_key,
+        module_key="remise_orders",
+        order_id=order.id,
+        supplier_id=row["supplier_id"],
+        supplier_name=row["supplier_name"],
+        supplier_email=None,
+        sent_by_user=sent_by_user,
+    )
     if to_email_override:
         to_email = _normalize_email(to_email_override)
     site_info = _get_site_info_for_email(normalized_site_key)
-    subject, body_text, body_html = notifications.build_purchase_order_email(
+    _, body_text, body_html = notifications.build_purchase_order_email(
         order,
         site_info,
         sent_by_user,
         context_note=None,
     )
     subject = f"Bon de commande REMISE - {site_info.display_name or site_info.site_key} - #{order.id}"
-    pdf_bytes = generate_remise_purchase_order_pdf(
-        order,
-        user=sent_by_user,
+    return _queue_purchase_order_email(
         site_key=normalized_site_key,
-    )
-    resolved = resolve_pdf_config("remise_orders")
-    filename = render_filename(
-        resolved.config.filename.pattern,
         module_key="remise_orders",
-        module_title=resolved.module_label,
-        context={"order_id": order.id, "ref": order.id},
-    )
-    reply_to = sent_by_user.email if sent_by_user.email and "@" in sent_by_user.email else None
-    sent_at = datetime.now(timezone.utc).isoformat()
-    try:
-        message_id = email_sender.send_email(
-            to_email,
-            subject,
-            body_text,
-            body_html,
-            reply_to=reply_to,
-            attachments=[(filename, pdf_bytes, "application/pdf")],
-            sensitive=True,
-        )
-        _record_purchase_order_email_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="remise_orders",
-            purchase_order_id=order.id,
-            purchase_order_number=str(order.id),
-            supplier_id=supplier_id,
-            supplier_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="sent",
-            message_id=message_id,
-        )
-        _record_purchase_order_audit_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="remise_orders",
-            action="send_to_supplier",
-            purchase_order_id=order.id,
-            supplier_id=supplier_id,
-            supplier_name=supplier_name,
-            supplier_email=supplier_email,
-            recipient_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="ok",
-            message=f"Email envoyé ({message_id})",
-        )
-    except email_sender.EmailSendError as exc:
-        _record_purchase_order_email_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="remise_orders",
-            purchase_order_id=order.id,
-            purchase_order_number=str(order.id),
-            supplier_id=supplier_id,
-            supplier_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="failed",
-            error_message=str(exc),
-        )
-        _record_purchase_order_audit_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="remise_orders",
-            action="send_to_supplier",
-            purchase_order_id=order.id,
-            supplier_id=supplier_id,
-            supplier_name=supplier_name,
-            supplier_email=supplier_email,
-            recipient_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="error",
-            message=str(exc),
-        )
-        raise
-
-    return models.PurchaseOrderSendResponse(
-        status="sent",
-        sent_to=to_email,
-        sent_at=sent_at,
-        message_id=message_id,
+        order=order,
+        supplier_id=row["supplier_id"],
+        supplier_name=supplier_name,
+        supplier_email=supplier_email,
+        to_email=to_email,
+        subject=subject,
+        body_text=body_text,
+        body_html=body_html,
+        sent_by_user=sent_by_user,
     )
 
 
@@ -12576,26 +15911,34 @@ def list_purchase_order_email_logs(
 ) -> list[models.PurchaseOrderEmailLogEntry]:
     ensure_database_ready()
     normalized_site_key = sites.normalize_site_key(site_key) or db.DEFAULT_SITE_KEY
+    conditions = "site_key = ? AND purchase_order_id = ?"
+    params: list[object] = [normalized_site_key, purchase_order_id]
+    if module_key:
+        conditions += " AND module_key = ?"
+        params.append(module_key)
     with db.get_core_connection() as conn:
-        if module_key:
-            rows = conn.execute(
-                """
-                SELECT *
-                FROM purchase_order_email_log
-                WHERE site_key = ? AND purchase_order_id = ? AND module_key = ?
-                ORDER BY created_at DESC
-                """,
-                (normalized_site_key, purchase_order_id, module_key),
-            ).fetchall()
-        else:
+        rows = conn.execute(
+            f"""
+            SELECT *
+            FROM main.purchase_order_email_log
+            WHERE {conditions}
+            ORDER BY created_at DESC
+            """,
+            params,
+        ).fetchall()
+        if (
+            not rows
+            and _attach_purchase_order_archive(conn, normalized_site_key)
+            and _schema_columns(conn, "archive", "purchase_order_email_log")
+        ):
             rows = conn.execute(
-                """
+                f"""
                 SELECT *
-                FROM purchase_order_email_log
-                WHERE site_key = ? AND purchase_order_id = ?
+                FROM archive.purchase_order_email_log
+                WHERE {conditions}
                 ORDER BY created_at DESC
                 """,
-                (normalized_site_key, purchase_order_id),
+                params,
             ).fetchall()
     return [
         models.PurchaseOrderEmailLogEntry(
@@ -12612,6 +15955,7 @@ def list_purchase_order_email_logs(
             status=row["status"],
             message_id=row["message_id"],
             error_message=row["error_message"],
+            tracking_id=row["tracking_id"],
         )
         for row in rows
     ]
@@ -12738,46 +16082,19 @@ def send_pharmacy_purchase_order_to_supplier(
     ensure_database_ready()
     normalized_site_key = sites.normalize_site_key(site_key) or db.DEFAULT_SITE_KEY
     with db.get_stock_connection(normalized_site_key) as conn:
-        row = conn.execute(
-            """
-            SELECT po.*, s.name AS supplier_name, s.email AS supplier_email
-            FROM pharmacy_purchase_orders AS po
-            LEFT JOIN suppliers AS s ON s.id = po.supplier_id
-            WHERE po.id = ?
-            """,
-            (purchase_order_id,),
-        ).fetchone()
-        if row is None:
-            raise ValueError("Bon de commande pharmacie introuvable")
-        order = _build_pharmacy_purchase_order_detail(conn, row, site_key=normalized_site_key)
-        supplier_id = row["supplier_id"]
-        supplier_name = row["supplier_name"]
-        supplier_email = row["supplier_email"]
-
-    try:
-        supplier = get_supplier_for_order(normalized_site_key, supplier_id)
-        resolved_email = require_supplier_email(supplier)
-    except SupplierResolutionError as exc:
-        sent_at = datetime.now(timezone.utc).isoformat()
-        _record_purchase_order_audit_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="pharmacy_orders",
-            action="send_to_supplier",
-            purchase_order_id=order.id,
-            supplier_id=supplier_id,
-            supplier_name=supplier_name,
-            supplier_email=supplier_email,
-            recipient_email=None,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="error",
-            message=str(exc),
+        row, order = _load_purchase_order_for_email(
+            conn, "pharmacy_orders", purchase_order_id, site_key=normalized_site_key
         )
-        raise
-    to_email = resolved_email
-    supplier_name = supplier.name if supplier else supplier_name
-    supplier_email = supplier.email if supplier else supplier_email
+
+    to_email, supplier_name, supplier_email = _resolve_purchase_order_recipient(
+        site_key=normalized_site_key,
+        module_key="pharmacy_orders",
+        order_id=order.id,
+        supplier_id=row["supplier_id"],
+        supplier_name=row["supplier_name"],
+        supplier_email=row["supplier_email"],
+        sent_by_user=sent_by_user,
+    )
     site_info = _get_site_info_for_email(normalized_site_key)
     subject, body_text, body_html = notifications.build_purchase_order_email(
         order,
@@ -12785,94 +16102,18 @@ def send_pharmacy_purchase_order_to_supplier(
         sent_by_user,
         context_note=None,
     )
-    pdf_bytes = generate_pharmacy_purchase_order_pdf(
-        order,
-        user=sent_by_user,
+    return _queue_purchase_order_email(
         site_key=normalized_site_key,
-    )
-    resolved = resolve_pdf_config("pharmacy_orders")
-    filename = render_filename(
-        resolved.config.filename.pattern,
         module_key="pharmacy_orders",
-        module_title=resolved.module_label,
-        context={"order_id": order.id, "ref": order.id},
-    )
-    reply_to = sent_by_user.email if sent_by_user.email and "@" in sent_by_user.email else None
-    sent_at = datetime.now(timezone.utc).isoformat()
-    try:
-        message_id = email_sender.send_email(
-            to_email,
-            subject,
-            body_text,
-            body_html,
-            reply_to=reply_to,
-            attachments=[(filename, pdf_bytes, "application/pdf")],
-            sensitive=True,
-        )
-        _record_purchase_order_email_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="pharmacy_orders",
-            purchase_order_id=order.id,
-            purchase_order_number=str(order.id),
-            supplier_id=supplier_id,
-            supplier_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="sent",
-            message_id=message_id,
-        )
-        _record_purchase_order_audit_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="pharmacy_orders",
-            action="send_to_supplier",
-            purchase_order_id=order.id,
-            supplier_id=supplier_id,
-            supplier_name=supplier_name,
-            supplier_email=supplier_email,
-            recipient_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="ok",
-            message=f"Email envoyé ({message_id})",
-        )
-    except email_sender.EmailSendError as exc:
-        _record_purchase_order_email_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="pharmacy_orders",
-            purchase_order_id=order.id,
-            purchase_order_number=str(order.id),
-            supplier_id=supplier_id,
-            supplier_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="failed",
-            error_message=str(exc),
-        )
-        _record_purchase_order_audit_log(
-            created_at=sent_at,
-            site_key=normalized_site_key,
-            module_key="pharmacy_orders",
-            action="send_to_supplier",
-            purchase_order_id=order.id,
-            supplier_id=supplier_id,
-            supplier_name=supplier_name,
-            supplier_email=supplier_email,
-            recipient_email=to_email,
-            user_id=sent_by_user.id,
-            user_email=sent_by_user.email,
-            status="error",
-            message=str(exc),
-        )
-        raise
-
-    return models.PurchaseOrderSendResponse(
-        status="sent",
-        sent_to=to_email,
-        sent_at=sent_at,
-        message_id=message_id,
+        order=order,
+        supplier_id=row["supplier_id"],
+        supplier_name=supplier_name,
+        supplier_email=supplier_email,
+        to_email=to_email,
+        subject=subject,
+        body_text=body_text,
+        body_html=body_html,
+        sent_by_user=sent_by_user,
     )
 
 
@@ -12882,21 +16123,9 @@ def generate_remise_purchase_order_pdf(
     user: models.User | None = None,
     site_key: str | None = None,
 ) -> bytes:
-    resolved_site_key = sites.normalize_site_key(site_key) if site_key else db.get_current_site_key()
-    site_info = _get_site_info_for_email(resolved_site_key)
-    buyer_block, supplier_block, delivery_block = _build_purchase_order_blocks(
-        order,
-        user=user,
-        site_info=site_info,
-    )
-    return render_purchase_order_pdf(
-        title="BON DE COMMANDE",
-        purchase_order=order,
-        buyer_block=buyer_block,
-        supplier_block=supplier_block,
-        delivery_block=delivery_block,
-        include_received=False,
-    )
+    return get_purchase_order_pdf_file(
+        order, user=user, site_key=site_key, include_received=False
+    ).read_bytes()
 
 
 def generate_pharmacy_purchase_order_pdf(
@@ -12905,21 +16134,9 @@ def generate_pharmacy_purchase_order_pdf(
     user: models.User | None = None,
     site_key: str | None = None,
 ) -> bytes:
-    resolved_site_key = sites.normalize_site_key(site_key) if site_key else db.get_current_site_key()
-    site_info = _get_site_info_for_email(resolved_site_key)
-    buyer_block, supplier_block, delivery_block = _build_purchase_order_blocks(
-        order,
-        user=user,
-        site_info=site_info,
-    )
-    return render_purchase_order_pdf(
-        title="BON DE COMMANDE",
-        purchase_order=order,
-        buyer_block=buyer_block,
-        supplier_block=supplier_block,
-        delivery_block=delivery_block,
-        include_received=False,
-    )
+    return get_purchase_order_pdf_file(
+        order, user=user, site_key=site_key, include_received=False
+    ).read_bytes()
 
 
 def generate_vehicle_inventory_pdf(
@@ -13113,7 +16330,7 @@ def receive_purchase_order(
                         "INSERT INTO movements (item_id, delta, reason) VALUES (?, ?, ?)",
                         (line["item_id"], increment, f"Réception bon de commande #{order_id}"),
                     )
-                    _maybe_create_auto_purchase_order(conn, "default", line["item_id"])
+                    _queue_auto_purchase_order(conn, "default", line["item_id"])
             else:
                 for item_id, increment in item_increments.items():
                     line = conn.execute(
@@ -13144,7 +16361,7 @@ def receive_purchase_order(
                         "INSERT INTO movements (item_id, delta, reason) VALUES (?, ?, ?)",
                         (item_id, increment, f"Réception bon de commande #{order_id}"),
                     )
-                    _maybe_create_auto_purchase_order(conn, "default", item_id)
+                    _queue_auto_purchase_order(conn, "default", item_id)
             totals = conn.execute(
                 """
                 SELECT quantity_ordered, quantity_received
@@ -13171,6 +16388,125 @@ def receive_purchase_order(
     return get_purchase_order(order_id)
 
 
+def _record_purchase_order_line_receipt(
+    conn: sqlite3.Connection,
+    order_id: int,
+    line: sqlite3.Row,
+    payload: models.PurchaseOrderReceiveLinePayload,
+    *,
+    created_by: str | None,
+    normalized_site_key: str,
+) -> None:
+    """Record one clothing line receipt; conforming quantities also enter the stock.
+
+    The order status is left to the caller, which may receive several lines at once.
+    """
+
+    if payload.conformity_status == "conforme":
+        new_received = line["quantity_received"] + payload.received_qty
+        conn.execute(
+            "UPDATE purchase_order_items SET quantity_received = ? WHERE id = ?",
+            (new_received, line["id"]),
+        )
+        conn.execute(
+            "UPDATE items SET quantity = quantity + ? WHERE id = ?",
+            (payload.received_qty, line["item_id"]),
+        )
+        conn.execute(
+            "INSERT INTO movements (item_id, delta, reason) VALUES (?, ?, ?)",
+            (
+                line["item_id"],
+                payload.received_qty,
+                f"Réception bon de commande #{order_id}",
+            ),
+        )
+    receipt_cur = conn.execute(
+        """
+        INSERT INTO purchase_order_receipts (
+            site_key,
+            purchase_order_id,
+            purchase_order_line_id,
+            module,
+            received_qty,
+            conformity_status,
+            nonconformity_reason,
+            nonconformity_action,
+            note,
+            created_by
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            normalized_site_key,
+            order_id,
+            payload.purchase_order_line_id,
+            "clothing",
+            payload.received_qty,
+            payload.conformity_status,
+            payload.nonconformity_reason,
+            payload.nonconformity_action,
+            payload.note,
+            created_by,
+        ),
+    )
+    receipt_id = receipt_cur.lastrowid
+    line_type = _row_get(line, "line_type", "standard")
+    beneficiary_id = _row_get(line, "beneficiary_employee_id")
+    if payload.conformity_status == "conforme" and line_type == "replacement":
+        item_row = conn.execute(
+            "SELECT sku, size FROM items WHERE id = ?",
+            (line["item_id"],),
+        ).fetchone()
+        target_dotation_id = _row_get(line, "target_dotation_id") or _row_get(
+            line, "return_employee_item_id"
+        )
+        pending_columns = [
+            "site_key",
+            "purchase_order_id",
+            "purchase_order_line_id",
+            "receipt_id",
+            "employee_id",
+            "new_item_id",
+            "new_item_sku",
+            "new_item_size",
+            "qty",
+            "return_employee_item_id",
+            "return_reason",
+            "status",
+        ]
+        pending_values: list[object] = [
+            normalized_site_key,
+            order_id,
+            line["id"],
+            receipt_id,
+            beneficiary_id,
+            line["item_id"],
+            _row_get(item_row, "sku"),
+            _row_get(item_row, "size"),
+            payload.received_qty,
+            target_dotation_id,
+            _row_get(line, "return_reason"),
+            "pending",
+        ]
+        if _table_has_column(conn, "pending_clothing_assignments", "target_dotation_id"):
+            pending_columns.insert(-2, "target_dotation_id")
+            pending_values.insert(-2, target_dotation_id)
+        conn.execute(
+            f"""
+            INSERT OR IGNORE INTO pending_clothing_assignments (
+                {", ".join(pending_columns)}
+            ) VALUES ({", ".join("?" for _ in pending_columns)})
+            """,
+            pending_values,
+        )
+        if _table_has_column(conn, "purchase_order_items", "return_status") and _row_get(
+            line, "return_expected", 0
+        ):
+            conn.execute(
+                "UPDATE purchase_order_items SET return_status = ? WHERE id = ?",
+                ("to_prepare", line["id"]),
+            )
+
+
 def receive_purchase_order_line(
     order_id: int,
     payload: models.PurchaseOrderReceiveLinePayload,
@@ -13213,109 +16549,14 @@ def receive_purchase_order_line(
             if not payload.nonconformity_reason:
                 raise ValueError("Motif de non-conformité requis")
         try:
-            if payload.conformity_status == "conforme":
-                new_received = line["quantity_received"] + payload.received_qty
-                conn.execute(
-                    "UPDATE purchase_order_items SET quantity_received = ? WHERE id = ?",
-                    (new_received, line["id"]),
-                )
-                conn.execute(
-                    "UPDATE items SET quantity = quantity + ? WHERE id = ?",
-                    (payload.received_qty, line["item_id"]),
-                )
-                conn.execute(
-                    "INSERT INTO movements (item_id, delta, reason) VALUES (?, ?, ?)",
-                    (
-                        line["item_id"],
-                        payload.received_qty,
-                        f"Réception bon de commande #{order_id}",
-                    ),
-                )
-            receipt_cur = conn.execute(
-                """
-                INSERT INTO purchase_order_receipts (
-                    site_key,
-                    purchase_order_id,
-                    purchase_order_line_id,
-                    module,
-                    received_qty,
-                    conformity_status,
-                    nonconformity_reason,
-                    nonconformity_action,
-                    note,
-                    created_by
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    normalized_site_key,
-                    order_id,
-                    payload.purchase_order_line_id,
-                    "clothing",
-                    payload.received_qty,
-                    payload.conformity_status,
-                    payload.nonconformity_reason,
-                    payload.nonconformity_action,
-                    payload.note,
-                    created_by,
-                ),
+            _record_purchase_order_line_receipt(
+                conn,
+                order_id,
+                line,
+                payload,
+                created_by=created_by,
+                normalized_site_key=normalized_site_key,
             )
-            receipt_id = receipt_cur.lastrowid
-            line_type = _row_get(line, "line_type", "standard")
-            beneficiary_id = _row_get(line, "beneficiary_employee_id")
-            if payload.conformity_status == "conforme" and line_type == "replacement":
-                item_row = conn.execute(
-                    "SELECT sku, size FROM items WHERE id = ?",
-                    (line["item_id"],),
-                ).fetchone()
-                target_dotation_id = _row_get(line, "target_dotation_id") or _row_get(
-                    line, "return_employee_item_id"
-                )
-                pending_columns = [
-                    "site_key",
-                    "purchase_order_id",
-                    "purchase_order_line_id",
-                    "receipt_id",
-                    "employee_id",
-                    "new_item_id",
-                    "new_item_sku",
-                    "new_item_size",
-                    "qty",
-                    "return_employee_item_id",
-                    "return_reason",
-                    "status",
-                ]
-                pending_values: list[object] = [
-                    normalized_site_key,
-                    order_id,
-                    line["id"],
-                    receipt_id,
-                    beneficiary_id,
-                    line["item_id"],
-                    _row_get(item_row, "sku"),
-                    _row_get(item_row, "size"),
-                    payload.received_qty,
-                    target_dotation_id,
-                    _row_get(line, "return_reason"),
-                    "pending",
-                ]
-                if _table_has_column(conn, "pending_clothing_assignments", "target_dotation_id"):
-                    pending_columns.insert(-2, "target_dotation_id")
-                    pending_values.insert(-2, target_dotation_id)
-                conn.execute(
-                    f"""
-                    INSERT OR IGNORE INTO pending_clothing_assignments (
-                        {", ".join(pending_columns)}
-                    ) VALUES ({", ".join("?" for _ in pending_columns)})
-                    """,
-                    pending_values,
-                )
-                if _table_has_column(conn, "purchase_order_items", "return_status") and _row_get(
-                    line, "return_expected", 0
-                ):
-                    conn.execute(
-                        "UPDATE purchase_order_items SET return_status = ? WHERE id = ?",
-                        ("to_prepare", line["id"]),
-                    )
             if payload.conformity_status == "conforme":
                 totals = conn.execute(
                     """
@@ -14334,17 +17575,28 @@ def _build_remise_purchase_order_detail(
     order_row: sqlite3.Row,
     *,
     site_key: str | None = None,
-    suppliers_map: dict[int, models.Supplier] | None = None,
 ) -> models.RemisePurchaseOrderDetail:
-    has_line_sku = _table_has_column(conn, "remise_purchase_order_items", "sku")
-    has_line_unit = _table_has_column(conn, "remise_purchase_order_items", "unit")
+    return _build_remise_purchase_order_details(conn, [order_row], site_key=site_key)[0]
+
+
+def _build_remise_purchase_order_details(
+    conn: sqlite3.Connection,
+    order_rows: list[sqlite3.Row],
+    *,
+    site_key: str | None = None,
+) -> list[models.RemisePurchaseOrderDetail]:
+    if not order_rows:
+        return []
+    batch = _load_order_batch(conn, [row["id"] for row in order_rows])
+    line_columns = _table_columns(conn, "remise_purchase_order_items")
     sku_expr = "ri.sku AS sku"
     unit_expr = "COALESCE(NULLIF(TRIM(ri.size), ''), 'Unité') AS unit"
-    if has_line_sku:
+    if "sku" in line_columns:
         sku_expr = "COALESCE(NULLIF(TRIM(rpoi.sku), ''), ri.sku) AS sku"
-    if has_line_unit:
+    if "unit" in line_columns:
         unit_expr = "COALESCE(NULLIF(TRIM(rpoi.unit), ''), NULLIF(TRIM(ri.size), ''), 'Unité') AS unit"
-    items_cur = conn.execute(
+    items_by_order: dict[int, list[models.RemisePurchaseOrderItem]] = defaultdict(list)
+    for item_row in conn.execute(
         f"""
         SELECT rpoi.id,
                rpoi.purchase_order_id,
@@ -14356,66 +17608,53 @@ def _build_remise_purchase_order_detail(
                {unit_expr}
         FROM remise_purchase_order_items AS rpoi
         JOIN remise_items AS ri ON ri.id = rpoi.remise_item_id
-        WHERE rpoi.purchase_order_id = ?
+        WHERE rpoi.purchase_order_id IN ({batch})
         ORDER BY ri.name COLLATE NOCASE
-        """,
-        (order_row["id"],),
-    )
-    items = [
-        models.RemisePurchaseOrderItem(
-            id=item_row["id"],
-            purchase_order_id=item_row["purchase_order_id"],
-            remise_item_id=item_row["remise_item_id"],
-            quantity_ordered=item_row["quantity_ordered"],
-            quantity_received=item_row["quantity_received"],
-            item_name=item_row["item_name"],
-            sku=_row_get(item_row, "sku"),
-            unit=_row_get(item_row, "unit"),
+        """
+    ).fetchall():
+        items_by_order[item_row["purchase_order_id"]].append(
+            models.RemisePurchaseOrderItem(
+                id=item_row["id"],
+                purchase_order_id=item_row["purchase_order_id"],
+                remise_item_id=item_row["remise_item_id"],
+                quantity_ordered=item_row["quantity_ordered"],
+                quantity_received=item_row["quantity_received"],
+                item_name=item_row["item_name"],
+                sku=_row_get(item_row, "sku"),
+                unit=_row_get(item_row, "unit"),
+            )
         )
-        for item_row in items_cur.fetchall()
-    ]
-    supplier_email = None
-    resolved_email = None
-    supplier_has_email = False
-    supplier_missing_reason = None
-    supplier_missing = False
-    supplier_id = _row_get(order_row, "supplier_id")
-    supplier = None
-    if supplier_id is None:
-        supplier_missing_reason = "SUPPLIER_MISSING"
-    else:
-        if suppliers_map is not None:
-            supplier = suppliers_map.get(supplier_id)
-        else:
-            supplier = resolve_supplier_for_order(conn, site_key or db.get_current_site_key(), supplier_id)
-        if supplier is None:
-            supplier_missing = True
-            supplier_missing_reason = "SUPPLIER_NOT_FOUND"
-        else:
-            supplier_email = supplier.email
-            try:
-                resolved_email = require_supplier_email(supplier)
-                supplier_has_email = True
-            except SupplierResolutionError as exc:
-                supplier_missing_reason = exc.code
-    return models.RemisePurchaseOrderDetail(
-        id=order_row["id"],
-        supplier_id=supplier_id,
-        supplier_name=order_row["supplier_name"],
-        supplier_email=supplier_email,
-        supplier_email_resolved=resolved_email,
-        supplier_has_email=supplier_has_email,
-        supplier_missing_reason=supplier_missing_reason,
-        supplier_missing=supplier_missing,
-        status=order_row["status"],
-        created_at=order_row["created_at"],
-        note=order_row["note"],
-        auto_created=bool(order_row["auto_created"]),
-        is_archived=bool(_row_get(order_row, "is_archived", 0)),
-        archived_at=_row_get(order_row, "archived_at"),
-        archived_by=_row_get(order_row, "archived_by"),
-        items=items,
+    suppliers = _resolve_suppliers_for_orders(
+        conn, (_row_get(row, "supplier_id") for row in order_rows)
     )
+    details: list[models.RemisePurchaseOrderDetail] = []
+    for order_row in order_rows:
+        supplier_id = _row_get(order_row, "supplier_id")
+        supplier = suppliers.get(supplier_id) if supplier_id is not None else None
+        resolved_email, supplier_has_email, supplier_missing_reason = (
+            _resolve_order_supplier_state(supplier_id, supplier)
+        )
+        details.append(
+            models.RemisePurchaseOrderDetail(
+                id=order_row["id"],
+                supplier_id=supplier_id,
+                supplier_name=order_row["supplier_name"],
+                supplier_email=supplier.email if supplier else None,
+                supplier_email_resolved=resolved_email,
+                supplier_has_email=supplier_has_email,
+                supplier_missing_reason=supplier_missing_reason,
+                supplier_missing=supplier_id is not None and supplier is None,
+                status=order_row["status"],
+                created_at=order_row["created_at"],
+                note=order_row["note"],
+                auto_created=bool(order_row["auto_created"]),
+                is_archived=bool(_row_get(order_row, "is_archived", 0)),
+                archived_at=_row_get(order_row, "archived_at"),
+                archived_by=_row_get(order_row, "archived_by"),
+                items=items_by_order.get(order_row["id"], []),
+            )
+        )
+    return details
 
 
 def list_remise_purchase_orders(
@@ -14431,6 +17670,8 @@ def list_remise_purchase_orders(
     elif not include_archived:
         where_clause = "WHERE COALESCE(po.is_archived, 0) = 0"
     with db.get_stock_connection() as conn:
+        if archived_only or include_archived:
+            _overlay_purchase_order_archive(conn, db.get_current_site_key())
         cur = conn.execute(
             f"""
             SELECT po.*, s.name AS supplier_name
@@ -14442,80 +17683,29 @@ def list_remise_purchase_orders(
             params,
         )
         rows = cur.fetchall()
-        supplier_ids = {row["supplier_id"] for row in rows if row["supplier_id"] is not None}
-        suppliers_map: dict[int, models.Supplier] = {}
-        if supplier_ids:
-            placeholders = ", ".join("?" for _ in supplier_ids)
-            supplier_rows = conn.execute(
-                f"SELECT * FROM suppliers WHERE id IN ({placeholders})",
-                tuple(supplier_ids),
-            ).fetchall()
-            modules_map = _load_supplier_modules(
-                conn, [supplier_row["id"] for supplier_row in supplier_rows]
-            )
-            suppliers_map = {
-                supplier_row["id"]: models.Supplier(
-                    id=supplier_row["id"],
-                    name=_row_get(supplier_row, "name", ""),
-                    contact_name=_row_get(supplier_row, "contact_name"),
-                    phone=_row_get(supplier_row, "phone"),
-                    email=_row_get(supplier_row, "email"),
-                    address=_row_get(supplier_row, "address"),
-                    modules=modules_map.get(supplier_row["id"]) or ["suppliers"],
-                )
-                for supplier_row in supplier_rows
-                if not _is_supplier_inactive(supplier_row)
-            }
-        return [
-            _build_remise_purchase_order_detail(
-                conn,
-                row,
-                site_key=db.get_current_site_key(),
-                suppliers_map=suppliers_map,
-            )
-            for row in rows
-        ]
+        return _build_remise_purchase_order_details(
+            conn, rows, site_key=db.get_current_site_key()
+        )
 
 
 def get_remise_purchase_order(order_id: int) -> models.RemisePurchaseOrderDetail:
     ensure_database_ready()
+    query = """
+        SELECT po.*, s.name AS supplier_name
+        FROM remise_purchase_orders AS po
+        LEFT JOIN suppliers AS s ON s.id = po.supplier_id
+        WHERE po.id = ?
+    """
     with db.get_stock_connection() as conn:
-        row = conn.execute(
-            """
-            SELECT po.*, s.name AS supplier_name
-            FROM remise_purchase_orders AS po
-            LEFT JOIN suppliers AS s ON s.id = po.supplier_id
-            WHERE po.id = ?
-            """,
-            (order_id,),
-        ).fetchone()
+        row = conn.execute(query, (order_id,)).fetchone()
+        if row is None and _overlay_purchase_order_archive(conn, db.get_current_site_key()):
+            row = conn.execute(query, (order_id,)).fetchone()
         if row is None:
             raise ValueError("Bon de commande introuvable")
-        supplier_ids = [row["supplier_id"]] if row["supplier_id"] is not None else []
-        suppliers_map: dict[int, models.Supplier] = {}
-        if supplier_ids:
-            supplier_row = conn.execute(
-                "SELECT * FROM suppliers WHERE id = ?",
-                (supplier_ids[0],),
-            ).fetchone()
-            if supplier_row is not None and not _is_supplier_inactive(supplier_row):
-                modules_map = _load_supplier_modules(conn, [supplier_row["id"]])
-                suppliers_map = {
-                    supplier_row["id"]: models.Supplier(
-                        id=supplier_row["id"],
-                        name=_row_get(supplier_row, "name", ""),
-                        contact_name=_row_get(supplier_row, "contact_name"),
-                        phone=_row_get(supplier_row, "phone"),
-                        email=_row_get(supplier_row, "email"),
-                        address=_row_get(supplier_row, "address"),
-                        modules=modules_map.get(supplier_row["id"]) or ["suppliers"],
-                    )
-                }
         return _build_remise_purchase_order_detail(
             conn,
             row,
             site_key=db.get_current_site_key(),
-            suppliers_map=suppliers_map,
         )
 
 
@@ -14793,7 +17983,7 @@ def receive_remise_purchase_order(
                             f"Réception bon de commande remise #{order_id}"
                         ),
                     )
-                    _maybe_create_auto_purchase_order(
+                    _queue_auto_purchase_order(
                         conn, "inventory_remise", line["remise_item_id"]
                     )
             else:
@@ -14826,7 +18016,7 @@ def receive_remise_purchase_order(
                         "INSERT INTO remise_movements (item_id, delta, reason) VALUES (?, ?, ?)",
                         (remise_item_id, increment, f"Réception bon de commande remise #{order_id}"),
                     )
-                    _maybe_create_auto_purchase_order(
+                    _queue_auto_purchase_order(
                         conn, "inventory_remise", remise_item_id
                     )
             totals = conn.execute(
@@ -14871,6 +18061,9 @@ def list_collaborators(site_key: str | None = None) -> list[models.Collaborator]
         ]
 
 
+_REPORT_TOP_ITEMS_LIMIT = 5
+
+
 def get_reports_overview(
     module: str,
     *,
@@ -14879,7 +18072,10 @@ def get_reports_overview(
     bucket: str | None = None,
     include_dotation: bool = True,
     include_adjustment: bool = True,
+    top_limit: int | None = _REPORT_TOP_ITEMS_LIMIT,
 ) -> models.ReportOverview:
+    """Movement overview of ``module``; ``top_limit=None`` returns every item in the tops."""
+
     ensure_database_ready()
     normalized_module = (module or "").strip().lower()
     resolved = _resolve_report_module(normalized_module)
@@ -14890,7 +18086,56 @@ def get_reports_overview(
     selected_bucket = bucket or _auto_report_bucket(start_date, end_date)
     if selected_bucket not in {"day", "week", "month"}:
         raise ValueError("Granularité invalide")
+    if not resolved:
+        return _compute_reports_overview(
+            normalized_module or module,
+            None,
+            start_date,
+            end_date,
+            selected_bucket,
+            include_dotation=include_dotation,
+            include_adjustment=include_adjustment,
+            top_limit=top_limit,
+        )
+    # The current day is part of the key: it decides which buckets read live stock.
+    key = _report_cache_key(
+        "overview",
+        resolved.module_key,
+        start_date,
+        end_date,
+        selected_bucket,
+        include_dotation,
+        include_adjustment,
+        top_limit,
+        date.today(),
+    )
+    return _REPORT_CACHE.get_or_compute(
+        key,
+        lambda: _compute_reports_overview(
+            normalized_module,
+            resolved,
+            start_date,
+            end_date,
+            selected_bucket,
+            include_dotation=include_dotation,
+            include_adjustment=include_adjustment,
+            top_limit=top_limit,
+        ),
+    )
+
 
+def _compute_reports_overview(
+    module: str,
+    resolved: _ReportModuleConfig | None,
+    start_date: date,
+    end_date: date,
+    selected_bucket: str,
+    *,
+    include_dotation: bool,
+    include_adjustment: bool,
+    top_limit: int | None = _REPORT_TOP_ITEMS_LIMIT,
+) -> models.ReportOverview:
+    normalized_module = module
     bucket_dates = _iter_report_buckets(start_date, end_date, selected_bucket)
     bucket_keys = [entry.isoformat() for entry in bucket_dates]
     empty_moves = [
@@ -14945,60 +18190,37 @@ def get_reports_overview(
                 data_quality=models.ReportDataQuality(),
             )
 
-        movement_reason_filter = ""
-        if _table_has_column(conn, resolved.movements_table, "reason"):
-            clauses: list[str] = []
-            if not include_dotation:
-                clauses.append("(reason IS NULL OR lower(reason) NOT LIKE '%dotation%')")
-            if not include_adjustment:
-                clauses.append("(reason IS NULL OR lower(reason) NOT LIKE '%ajust%')")
-            if clauses:
-                movement_reason_filter = " AND " + " AND ".join(clauses)
-
-        movement_where = (
-            "date(created_at) BETWEEN ? AND ?" + movement_reason_filter
+        rollup_where = "module = ? AND day BETWEEN ? AND ?" + _movement_rollup_reason_filter(
+            include_dotation=include_dotation, include_adjustment=include_adjustment
         )
-        totals = conn.execute(
-            f"""
-            SELECT
-                COALESCE(SUM(CASE WHEN delta > 0 THEN delta ELSE 0 END), 0) AS in_qty,
-                COALESCE(SUM(CASE WHEN delta < 0 THEN -delta ELSE 0 END), 0) AS out_qty
-            FROM {resolved.movements_table}
-            WHERE {movement_where}
-            """,
-            (start_date.isoformat(), end_date.isoformat()),
-        ).fetchone()
-        in_qty = int(totals["in_qty"] or 0)
-        out_qty = int(totals["out_qty"] or 0)
-        net_qty = in_qty - out_qty
-
+        rollup_params = (resolved.module_key, start_date.isoformat(), end_date.isoformat())
+        bucket_expression = _sql_bucket_expression("day", selected_bucket)
         moves_by_bucket: dict[str, dict[str, int]] = {
             key: {"in": 0, "out": 0, "net": 0} for key in bucket_keys
         }
-        rows = conn.execute(
+        in_qty = 0
+        out_qty = 0
+        for row in conn.execute(
             f"""
-            SELECT created_at, delta, reason
-            FROM {resolved.movements_table}
-            WHERE date(created_at) BETWEEN ? AND ?
+            SELECT {bucket_expression} AS bucket,
+                   COALESCE(SUM(qty_in), 0) AS in_qty,
+                   COALESCE(SUM(qty_out), 0) AS out_qty
+            FROM movement_daily_rollups
+            WHERE {rollup_where}
+            GROUP BY bucket
             """,
-            (start_date.isoformat(), end_date.isoformat()),
-        ).fetchall()
-        for row in rows:
-            reason = row["reason"] if "reason" in row.keys() else None
-            if not _should_include_reason(
-                reason, include_dotation=include_dotation, include_adjustment=include_adjustment
-            ):
-                continue
-            created_at = _coerce_datetime(row["created_at"])
-            bucket_key = _bucket_key(created_at, selected_bucket)
-            if bucket_key not in moves_by_bucket:
-                moves_by_bucket[bucket_key] = {"in": 0, "out": 0, "net": 0}
-            delta = int(row["delta"] or 0)
-            if delta > 0:
-                moves_by_bucket[bucket_key]["in"] += delta
-            elif delta < 0:
-                moves_by_bucket[bucket_key]["out"] += abs(delta)
-            moves_by_bucket[bucket_key]["net"] += delta
+            rollup_params,
+        ).fetchall():
+            bucket_in = int(row["in_qty"] or 0)
+            bucket_out = int(row["out_qty"] or 0)
+            moves_by_bucket[row["bucket"]] = {
+                "in": bucket_in,
+                "out": bucket_out,
+                "net": bucket_in - bucket_out,
+            }
+            in_qty += bucket_in
+            out_qty += bucket_out
+        net_qty = in_qty - out_qty
 
         ordered_move_keys = sorted(moves_by_bucket.keys())
         moves_series = [
@@ -15021,34 +18243,26 @@ def get_reports_overview(
         sku_select = sku_column if sku_column else "''"
         name_select = name_column if name_column else "''"
 
-        top_out_rows = conn.execute(
-            f"""
-            SELECT {name_select} AS name, {sku_select} AS sku,
-                   SUM(CASE WHEN delta < 0 THEN -delta ELSE 0 END) AS qty
-            FROM {resolved.movements_table} AS m
-            JOIN {resolved.items_table} AS i
-              ON i.id = m.{resolved.movement_item_column}
-            WHERE {movement_where} AND delta < 0
-            GROUP BY i.id, name, sku
-            ORDER BY qty DESC
-            LIMIT 5
-            """,
-            (start_date.isoformat(), end_date.isoformat()),
-        ).fetchall()
-        top_in_rows = conn.execute(
-            f"""
-            SELECT {name_select} AS name, {sku_select} AS sku,
-                   SUM(CASE WHEN delta > 0 THEN delta ELSE 0 END) AS qty
-            FROM {resolved.movements_table} AS m
-            JOIN {resolved.items_table} AS i
-              ON i.id = m.{resolved.movement_item_column}
-            WHERE {movement_where} AND delta > 0
-            GROUP BY i.id, name, sku
-            ORDER BY qty DESC
-            LIMIT 5
-            """,
-            (start_date.isoformat(), end_date.isoformat()),
-        ).fetchall()
+        def _top_items(qty_column: str) -> list[sqlite3.Row]:
+            return conn.execute(
+                f"""
+                SELECT {name_select} AS name, {sku_select} AS sku, r.qty AS qty
+                FROM (
+                    SELECT item_id, SUM({qty_column}) AS qty
+                    FROM movement_daily_rollups
+                    WHERE {rollup_where}
+                    GROUP BY item_id
+                    HAVING SUM({qty_column}) > 0
+                ) AS r
+                JOIN {resolved.items_table} AS i ON i.id = r.item_id
+                ORDER BY r.qty DESC
+                LIMIT ?
+                """,
+                (*rollup_params, -1 if top_limit is None else top_limit),
+            ).fetchall()
+
+        top_out_rows = _top_items("qty_out")
+        top_in_rows = _top_items("qty_in")
         top_out = [
             models.ReportTopItem(
                 sku=str(row["sku"] or ""),
@@ -15068,23 +18282,39 @@ def get_reports_overview(
 
         low_stock_count = 0
         if "low_stock_threshold" in item_columns:
-            low_stock_where = ["quantity < low_stock_threshold", "low_stock_threshold > 0"]
-            if "track_low_stock" in item_columns:
-                low_stock_where.append("track_low_stock = 1")
-            low_stock_count = int(
-                conn.execute(
-                    f"""
-                    SELECT COUNT(1) AS count
-                    FROM {resolved.items_table}
-                    WHERE {" AND ".join(low_stock_where)}
-                    """
-                ).fetchone()["count"]
-                or 0
+            low_stock_count = _count_low_stock_items(conn, resolved.module_key)
+        current_quantity = int(
+            conn.execute(
+                f"SELECT COALESCE(SUM(quantity), 0) AS total FROM {resolved.items_table}"
+            ).fetchone()["total"]
+            or 0
+        )
+        # Past buckets read the daily snapshots as of their last day; the bucket
+        # containing today (or later) reflects the live stock.
+        today = date.today()
+        bucket_ends = {
+            key: min(
+                end_date,
+                bucket_dates[index + 1] - timedelta(days=1)
+                if index + 1 < len(bucket_dates)
+                else end_date,
             )
-        low_stock_series = [
-            models.ReportLowStockSeriesPoint(t=key, count=low_stock_count)
-            for key in bucket_keys
-        ]
+            for index, key in enumerate(bucket_keys)
+        }
+        history = _stock_snapshot_series(
+            conn,
+            resolved.module_key,
+            {key: last_day for key, last_day in bucket_ends.items() if last_day < today},
+        )
+        low_stock_series: list[models.ReportLowStockSeriesPoint] = []
+        stock_series: list[models.ReportStockSeriesPoint] = []
+        for key in bucket_keys:
+            if bucket_ends[key] >= today:
+                bucket_low, bucket_quantity = low_stock_count, current_quantity
+            else:
+                bucket_low, bucket_quantity = history.get(key, (0, 0))
+            low_stock_series.append(models.ReportLowStockSeriesPoint(t=key, count=bucket_low))
+            stock_series.append(models.ReportStockSeriesPoint(t=key, quantity=bucket_quantity))
 
         orders_series = list(empty_orders)
         open_orders = 0
@@ -15105,34 +18335,34 @@ def get_reports_overview(
                 )
                 for key in bucket_keys
             }
+            order_bucket = _sql_bucket_expression("created_at", selected_bucket)
             order_rows = conn.execute(
                 f"""
-                SELECT created_at, status
+                SELECT {order_bucket} AS bucket,
+                       COUNT(1) AS created,
+                       SUM(CASE WHEN upper(status) = 'PARTIALLY_RECEIVED' THEN 1 ELSE 0 END)
+                           AS partial,
+                       SUM(CASE WHEN upper(status) = 'RECEIVED' THEN 1 ELSE 0 END) AS received,
+                       SUM(CASE WHEN upper(status) = 'CANCELLED' THEN 1 ELSE 0 END) AS cancelled
                 FROM {resolved.orders_table}
                 WHERE date(created_at) BETWEEN ? AND ?
+                GROUP BY bucket
                 """,
                 (start_date.isoformat(), end_date.isoformat()),
             ).fetchall()
             for row in order_rows:
-                created_at = _coerce_datetime(row["created_at"])
-                bucket_key = _bucket_key(created_at, selected_bucket)
-                if bucket_key not in orders_map:
-                    orders_map[bucket_key] = models.ReportOrderSeriesPoint(
-                        t=bucket_key, created=0, ordered=0, partial=0, received=0, cancelled=0
-                    )
-                target = orders_map[bucket_key]
-                target.created += 1
-                status = str(row["status"] or "").upper()
-                if status in {"PENDING", "ORDERED"}:
-                    target.ordered += 1
-                elif status == "PARTIALLY_RECEIVED":
-                    target.partial += 1
-                elif status == "RECEIVED":
-                    target.received += 1
-                elif status == "CANCELLED":
-                    target.cancelled += 1
-                else:
-                    target.ordered += 1
+                created = int(row["created"] or 0)
+                partial = int(row["partial"] or 0)
+                received = int(row["received"] or 0)
+                cancelled = int(row["cancelled"] or 0)
+                orders_map[row["bucket"]] = models.ReportOrderSeriesPoint(
+                    t=row["bucket"],
+                    created=created,
+                    ordered=created - partial - received - cancelled,
+                    partial=partial,
+                    received=received,
+                    cancelled=cancelled,
+                )
             ordered_order_keys = sorted(orders_map.keys())
             orders_series = [orders_map[key] for key in ordered_order_keys]
 
@@ -15189,31 +18419,251 @@ def get_reports_overview(
                 or 0
             )
 
-    return models.ReportOverview(
-        module=normalized_module,
-        range=models.ReportRange(
-            start=start_date.isoformat(), end=end_date.isoformat(), bucket=selected_bucket
+    return models.ReportOverview(
+        module=normalized_module,
+        range=models.ReportRange(
+            start=start_date.isoformat(), end=end_date.isoformat(), bucket=selected_bucket
+        ),
+        kpis=models.ReportKpis(
+            in_qty=in_qty,
+            out_qty=out_qty,
+            net_qty=net_qty,
+            low_stock_count=low_stock_count,
+            open_orders=open_orders,
+        ),
+        series=models.ReportSeries(
+            moves=moves_series,
+            net=net_series,
+            low_stock=low_stock_series,
+            stock=stock_series,
+            orders=orders_series,
+        ),
+        tops=models.ReportTops(out=top_out, **{"in": top_in}),
+        data_quality=models.ReportDataQuality(
+            missing_sku=missing_sku,
+            missing_supplier=missing_supplier,
+            missing_threshold=missing_threshold,
+            abnormal_movements=abnormal_movements,
+        ),
+    )
+
+
+_CONSOLIDATED_REPORT_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class _SiteReportRun:
+    site_key: str
+    value: Any = None
+    status: str = "timeout"
+    detail: str | None = None
+    elapsed_ms: int = 0
+
+
+def _run_per_site(
+    site_keys: Iterable[str], compute: Callable[[], Any], timeout_seconds: float
+) -> list[_SiteReportRun]:
+    """Run ``compute`` once per site database, concurrently, within ``timeout_seconds``.
+
+    Sites still running at the deadline are reported as ``timeout`` and left to finish
+    in the background; their results are discarded.
+    """
+
+    runs = [_SiteReportRun(site_key=site_key) for site_key in dict.fromkeys(site_keys)]
+    if not runs:
+        return []
+
+    def _worker(run: _SiteReportRun) -> None:
+        token = db.set_current_site(run.site_key)
+        started = time.perf_counter()
+        try:
+            value = compute()
+        except Exception as exc:
+            logger.warning("[REPORTS] Consolidation failed site=%s", run.site_key, exc_info=exc)
+            run.status, run.detail = "error", str(exc) or exc.__class__.__name__
+        else:
+            run.value, run.status = value, "ok"
+        finally:
+            run.elapsed_ms = int((time.perf_counter() - started) * 1000)
+            db.reset_current_site(token)
+
+    executor = ThreadPoolExecutor(max_workers=len(runs), thread_name_prefix="site-report")
+    try:
+        futures = [executor.submit(_worker, run) for run in runs]
+        _, pending = wait(futures, timeout=timeout_seconds)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    # Late workers keep mutating their own run, so timed-out sites get a fresh record.
+    return [
+        _SiteReportRun(site_key=run.site_key, elapsed_ms=int(timeout_seconds * 1000))
+        if future in pending
+        else run
+        for run, future in zip(runs, futures)
+    ]
+
+
+def _merge_report_points(series: Iterable[list[BaseModel]], model: type[BaseModel]) -> list[Any]:
+    merged: dict[str, dict[str, int]] = {}
+    for points in series:
+        for point in points:
+            values = point.model_dump()
+            key = values.pop("t")
+            target = merged.setdefault(key, dict.fromkeys(values, 0))
+            for field, amount in values.items():
+                target[field] += int(amount or 0)
+    return [model(t=key, **merged[key]) for key in sorted(merged)]
+
+
+def _merge_report_tops(groups: Iterable[list[models.ReportTopItem]]) -> list[models.ReportTopItem]:
+    totals: dict[tuple[str, str], int] = defaultdict(int)
+    for items in groups:
+        for item in items:
+            totals[(item.sku, item.name)] += item.qty
+    ranked = sorted(totals.items(), key=lambda entry: (-entry[1], entry[0]))
+    return [
+        models.ReportTopItem(sku=sku, name=name, qty=qty)
+        for (sku, name), qty in ranked[:_REPORT_TOP_ITEMS_LIMIT]
+    ]
+
+
+def _site_report_statuses(runs: list[_SiteReportRun]) -> list[models.ReportSiteStatus]:
+    return [
+        models.ReportSiteStatus(
+            site_key=run.site_key, status=run.status, elapsed_ms=run.elapsed_ms, detail=run.detail
+        )
+        for run in runs
+    ]
+
+
+def get_consolidated_reports_overview(
+    module: str,
+    *,
+    site_keys: Iterable[str],
+    start: date,
+    end: date,
+    bucket: str | None = None,
+    include_dotation: bool = True,
+    include_adjustment: bool = True,
+    timeout_seconds: float = _CONSOLIDATED_REPORT_TIMEOUT_SECONDS,
+) -> models.ConsolidatedReportOverview:
+    ensure_database_ready()
+    start_date = _ensure_date(start)
+    end_date = _ensure_date(end)
+    if start_date > end_date:
+        start_date, end_date = end_date, start_date
+    selected_bucket = bucket or _auto_report_bucket(start_date, end_date)
+    if selected_bucket not in {"day", "week", "month"}:
+        raise ValueError("Granularité invalide")
+
+    runs = _run_per_site(
+        site_keys,
+        lambda: get_reports_overview(
+            module,
+            start=start_date,
+            end=end_date,
+            bucket=selected_bucket,
+            include_dotation=include_dotation,
+            include_adjustment=include_adjustment,
+            # Per-site tops are uncapped so the merged ranking sees every item's full count.
+            top_limit=None,
         ),
-        kpis=models.ReportKpis(
-            in_qty=in_qty,
-            out_qty=out_qty,
-            net_qty=net_qty,
-            low_stock_count=low_stock_count,
-            open_orders=open_orders,
+        timeout_seconds,
+    )
+    overviews: list[models.ReportOverview] = [run.value for run in runs if run.status == "ok"]
+    kpis = models.ReportKpis()
+    data_quality = models.ReportDataQuality()
+    for overview in overviews:
+        for field in models.ReportKpis.model_fields:
+            setattr(kpis, field, getattr(kpis, field) + getattr(overview.kpis, field))
+        for field in models.ReportDataQuality.model_fields:
+            setattr(
+                data_quality, field, getattr(data_quality, field) + getattr(overview.data_quality, field)
+            )
+    series = models.ReportSeries(
+        moves=_merge_report_points(
+            (overview.series.moves for overview in overviews), models.ReportMoveSeriesPoint
         ),
-        series=models.ReportSeries(
-            moves=moves_series,
-            net=net_series,
-            low_stock=low_stock_series,
-            orders=orders_series,
+        net=_merge_report_points(
+            (overview.series.net for overview in overviews), models.ReportNetSeriesPoint
         ),
-        tops=models.ReportTops(out=top_out, **{"in": top_in}),
-        data_quality=models.ReportDataQuality(
-            missing_sku=missing_sku,
-            missing_supplier=missing_supplier,
-            missing_threshold=missing_threshold,
-            abnormal_movements=abnormal_movements,
+        low_stock=_merge_report_points(
+            (overview.series.low_stock for overview in overviews), models.ReportLowStockSeriesPoint
+        ),
+        stock=_merge_report_points(
+            (overview.series.stock for overview in overviews), models.ReportStockSeriesPoint
         ),
+        orders=_merge_report_points(
+            (overview.series.orders for overview in overviews), models.ReportOrderSeriesPoint
+        ),
+    )
+    return models.ConsolidatedReportOverview(
+        overview=models.ReportOverview(
+            module=(module or "").strip().lower(),
+            range=models.ReportRange(
+                start=start_date.isoformat(), end=end_date.isoformat(), bucket=selected_bucket
+            ),
+            kpis=kpis,
+            series=series,
+            tops=models.ReportTops(
+                out=_merge_report_tops(overview.tops.out for overview in overviews),
+                **{"in": _merge_report_tops(overview.tops.in_ for overview in overviews)},
+            ),
+            data_quality=data_quality,
+        ),
+        sites=_site_report_statuses(runs),
+        partial=any(run.status != "ok" for run in runs),
+    )
+
+
+def get_consolidated_inventory_stats(
+    module_key: str,
+    *,
+    site_keys: Iterable[str],
+    timeout_seconds: float = _CONSOLIDATED_REPORT_TIMEOUT_SECONDS,
+) -> models.ConsolidatedInventoryStats:
+    ensure_database_ready()
+    if not _resolve_report_module(module_key):
+        raise ValueError("Module introuvable")
+    runs = _run_per_site(site_keys, lambda: get_inventory_stats(module_key), timeout_seconds)
+    totals = dict.fromkeys(models.InventoryStats.model_fields, 0)
+    for run in runs:
+        if run.status == "ok":
+            for field in totals:
+                totals[field] += getattr(run.value, field)
+    return models.ConsolidatedInventoryStats(
+        stats=models.InventoryStats(**totals),
+        sites=_site_report_statuses(runs),
+        partial=any(run.status != "ok" for run in runs),
+    )
+
+
+def get_consolidated_dashboard_stats(
+    module_keys: Iterable[str] | None = None,
+    *,
+    site_keys: Iterable[str],
+    timeout_seconds: float = _CONSOLIDATED_REPORT_TIMEOUT_SECONDS,
+) -> models.ConsolidatedDashboardStats:
+    ensure_database_ready()
+    selected = _resolve_dashboard_modules(module_keys)
+    runs = _run_per_site(site_keys, lambda: get_dashboard_stats(selected), timeout_seconds)
+    totals = {
+        module_key: dict.fromkeys(models.InventoryStats.model_fields, 0) for module_key in selected
+    }
+    by_site: dict[str, dict[str, models.InventoryStats]] = {}
+    for run in runs:
+        if run.status != "ok":
+            continue
+        by_site[run.site_key] = run.value.modules
+        for module_key, stats in run.value.modules.items():
+            for field in totals[module_key]:
+                totals[module_key][field] += getattr(stats, field)
+    return models.ConsolidatedDashboardStats(
+        modules={
+            module_key: models.InventoryStats(**values) for module_key, values in totals.items()
+        },
+        by_site=by_site,
+        sites=_site_report_statuses(runs),
+        partial=any(run.status != "ok" for run in runs),
     )
 
 
@@ -16050,78 +19500,87 @@ def create_dotation(payload: models.DotationCreate) -> models.Dotation:
             raise ValueError("Collaborateur introuvable")
         collaborator_name = collaborator_row["full_name"]
 
-        degraded_qty = payload.degraded_qty
-        lost_qty = payload.lost_qty
-        if payload.is_degraded and degraded_qty == 0:
-            degraded_qty = payload.quantity
-        if payload.is_lost and lost_qty == 0:
-            lost_qty = payload.quantity
-        _validate_dotation_quantities(
-            quantity=payload.quantity,
-            degraded_qty=degraded_qty,
-            lost_qty=lost_qty,
-        )
-        is_lost, is_degraded = _derive_dotation_flags(degraded_qty, lost_qty)
-
-        notes = payload.notes
-        if notes is not None:
-            notes = clamp_note(notes, DOTATION_NOTE_MAX_LENGTH)
-        cur = conn.execute(
-            """
-            INSERT INTO dotations (
-                collaborator_id,
-                item_id,
-                quantity,
-                notes,
-                perceived_at,
-                is_lost,
-                is_degraded,
-                degraded_qty,
-                lost_qty
-            )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                payload.collaborator_id,
-                payload.item_id,
-                payload.quantity,
-                notes,
-                payload.perceived_at.isoformat(),
-                is_lost,
-                is_degraded,
-                degraded_qty,
-                lost_qty,
-            ),
-        )
-        occurred_at = datetime.now()
-        _record_dotation_event(
-            conn,
-            dotation_id=cur.lastrowid,
-            event_type="CREATION",
-            message="Dotation créée.",
-            order_id=None,
-            item_id=payload.item_id,
-            item_name=None,
-            sku=None,
-            size=None,
-            quantity=payload.quantity,
-            reason=None,
-            occurred_at=occurred_at,
-        )
-        conn.execute(
-            "UPDATE items SET quantity = quantity - ? WHERE id = ?",
-            (payload.quantity, payload.item_id),
-        )
-        conn.execute(
-            "INSERT INTO movements (item_id, delta, reason) VALUES (?, ?, ?)",
-            (
-                payload.item_id,
-                -payload.quantity,
-                f"Dotation - {collaborator_name}",
-            ),
-        )
+        dotation_id = _insert_dotation(conn, payload, collaborator_name)
         _persist_after_commit(conn, "default")
-        return get_dotation(cur.lastrowid)
+        return get_dotation(dotation_id)
+
+
+def _insert_dotation(
+    conn: sqlite3.Connection, payload: models.DotationCreate, collaborator_name: str
+) -> int:
+    """Insert a dotation and book the matching stock exit on ``conn``."""
+
+    degraded_qty = payload.degraded_qty
+    lost_qty = payload.lost_qty
+    if payload.is_degraded and degraded_qty == 0:
+        degraded_qty = payload.quantity
+    if payload.is_lost and lost_qty == 0:
+        lost_qty = payload.quantity
+    _validate_dotation_quantities(
+        quantity=payload.quantity,
+        degraded_qty=degraded_qty,
+        lost_qty=lost_qty,
+    )
+    is_lost, is_degraded = _derive_dotation_flags(degraded_qty, lost_qty)
+
+    notes = payload.notes
+    if notes is not None:
+        notes = clamp_note(notes, DOTATION_NOTE_MAX_LENGTH)
+    cur = conn.execute(
+        """
+        INSERT INTO dotations (
+            collaborator_id,
+            item_id,
+            quantity,
+            notes,
+            perceived_at,
+            is_lost,
+            is_degraded,
+            degraded_qty,
+            lost_qty
+        )
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            payload.collaborator_id,
+            payload.item_id,
+            payload.quantity,
+            notes,
+            payload.perceived_at.isoformat(),
+            is_lost,
+            is_degraded,
+            degraded_qty,
+            lost_qty,
+        ),
+    )
+    occurred_at = datetime.now()
+    _record_dotation_event(
+        conn,
+        dotation_id=cur.lastrowid,
+        event_type="CREATION",
+        message="Dotation créée.",
+        order_id=None,
+        item_id=payload.item_id,
+        item_name=None,
+        sku=None,
+        size=None,
+        quantity=payload.quantity,
+        reason=None,
+        occurred_at=occurred_at,
+    )
+    conn.execute(
+        "UPDATE items SET quantity = quantity - ? WHERE id = ?",
+        (payload.quantity, payload.item_id),
+    )
+    conn.execute(
+        "INSERT INTO movements (item_id, delta, reason) VALUES (?, ?, ?)",
+        (
+            payload.item_id,
+            -payload.quantity,
+            f"Dotation - {collaborator_name}",
+        ),
+    )
+    return int(cur.lastrowid)
 
 
 def scan_add_dotation(*, employee_id: int, barcode: str, quantity: int = 1) -> models.Dotation:
@@ -16145,6 +19604,73 @@ def scan_add_dotation(*, employee_id: int, barcode: str, quantity: int = 1) -> m
     return create_dotation(payload)
 
 
+def scan_add_dotations(*, employee_id: int, barcodes: Iterable[str]) -> list[models.Dotation]:
+    """Allocate a buffered batch of scans in a single transaction.
+
+    Each scan counts for one unit; repeated codes are grouped into one dotation per
+    article. The whole batch is rejected when a code is unknown, ambiguous or when the
+    stock does not cover the requested quantities.
+    """
+
+    ensure_database_ready()
+    normalized_codes = [_normalize_scanned_code(barcode) for barcode in barcodes]
+    if not normalized_codes:
+        raise ValueError("Aucun code-barres fourni")
+    unique_codes = list(dict.fromkeys(normalized_codes))
+    with db.get_stock_connection() as conn:
+        collaborator_row = conn.execute(
+            "SELECT full_name FROM collaborators WHERE id = ?",
+            (employee_id,),
+        ).fetchone()
+        if collaborator_row is None:
+            raise ValueError("Collaborateur introuvable")
+
+        item_ids_by_code: dict[str, list[int]] = defaultdict(list)
+        for row in _lookup_barcode_index(conn, unique_codes, ["clothing"]):
+            if row["name"] is not None:
+                item_ids_by_code[row["normalized_code"]].append(int(row["item_id"]))
+        missing = [code for code in unique_codes if not item_ids_by_code.get(code)]
+        if missing:
+            raise ValueError(f"Aucun article trouvé pour ce code : {', '.join(missing)}")
+        ambiguous = [code for code in unique_codes if len(item_ids_by_code[code]) > 1]
+        if ambiguous:
+            raise ValueError(
+                f"Plusieurs articles correspondent à ce code : {', '.join(ambiguous)}"
+            )
+
+        quantities: dict[int, int] = {}
+        for code in normalized_codes:
+            item_id = item_ids_by_code[code][0]
+            quantities[item_id] = quantities.get(item_id, 0) + 1
+        placeholders = ", ".join("?" for _ in quantities)
+        stock_rows = conn.execute(
+            f"SELECT id, quantity FROM items WHERE id IN ({placeholders})",
+            tuple(quantities),
+        ).fetchall()
+        stock = {row["id"]: row["quantity"] for row in stock_rows}
+        if any(stock.get(item_id, 0) < quantity for item_id, quantity in quantities.items()):
+            raise ValueError("Stock insuffisant pour la dotation")
+
+        dotation_ids = [
+            _insert_dotation(
+                conn,
+                models.DotationCreate(
+                    collaborator_id=employee_id,
+                    item_id=item_id,
+                    quantity=quantity,
+                    notes=None,
+                    perceived_at=date.today(),
+                    is_lost=False,
+                    is_degraded=False,
+                ),
+                collaborator_row["full_name"],
+            )
+            for item_id, quantity in quantities.items()
+        ]
+        _persist_after_commit(conn, "default")
+    return [get_dotation(dotation_id) for dotation_id in dotation_ids]
+
+
 def update_dotation(dotation_id: int, payload: models.DotationUpdate) -> models.Dotation:
     ensure_database_ready()
     with db.get_stock_connection() as conn:
@@ -16321,10 +19847,18 @@ def delete_dotation(dotation_id: int, *, restock: bool = False) -> None:
         _persist_after_commit(conn, "default")
 
 
-def list_pharmacy_items() -> list[models.PharmacyItem]:
+def list_pharmacy_items(
+    *, abc_class: str | None = None, xyz_class: str | None = None
+) -> list[models.PharmacyItem]:
     ensure_database_ready()
     with db.get_stock_connection() as conn:
-        cur = conn.execute("SELECT * FROM pharmacy_items ORDER BY name COLLATE NOCASE")
+        classification_sql, params = _classification_filter_sql(
+            conn, "pharmacy", "id", abc_class, xyz_class
+        )
+        where = f" WHERE {classification_sql}" if classification_sql else ""
+        cur = conn.execute(
+            f"SELECT * FROM pharmacy_items{where} ORDER BY name COLLATE NOCASE", params
+        )
         rows = cur.fetchall()
         supplier_ids = sorted(
             {
@@ -17251,7 +20785,7 @@ def create_pharmacy_item(payload: models.PharmacyItemCreate) -> models.PharmacyI
             )
         except sqlite3.IntegrityError as exc:  # pragma: no cover - handled via exception flow
             raise ValueError("Ce code-barres est déjà utilisé") from exc
-        _maybe_create_auto_purchase_order(conn, "pharmacy", cur.lastrowid)
+        _queue_auto_purchase_order(conn, "pharmacy", cur.lastrowid)
         _persist_after_commit(conn, "pharmacy")
         return get_pharmacy_item(cur.lastrowid)
 
@@ -17296,7 +20830,7 @@ def update_pharmacy_item(item_id: int, payload: models.PharmacyItemUpdate) -> mo
         except sqlite3.IntegrityError as exc:  # pragma: no cover - handled via exception flow
             raise ValueError("Ce code-barres est déjà utilisé") from exc
         if should_check_low_stock:
-            _maybe_create_auto_purchase_order(conn, "pharmacy", item_id)
+            _queue_auto_purchase_order(conn, "pharmacy", item_id)
         _persist_after_commit(conn, "pharmacy")
     return get_pharmacy_item(item_id)
 
@@ -17442,7 +20976,7 @@ def record_pharmacy_movement(item_id: int, payload: models.PharmacyMovementCreat
             "UPDATE pharmacy_items SET quantity = quantity + ? WHERE id = ?",
             (payload.delta, item_id),
         )
-        _maybe_create_auto_purchase_order(conn, "pharmacy", item_id)
+        _queue_auto_purchase_order(conn, "pharmacy", item_id)
         _persist_after_commit(conn, "pharmacy")
 
 
@@ -17476,15 +21010,27 @@ def _build_pharmacy_purchase_order_detail(
     *,
     site_key: str | None = None,
 ) -> models.PharmacyPurchaseOrderDetail:
-    has_line_sku = _table_has_column(conn, "pharmacy_purchase_order_items", "sku")
-    has_line_unit = _table_has_column(conn, "pharmacy_purchase_order_items", "unit")
+    return _build_pharmacy_purchase_order_details(conn, [order_row], site_key=site_key)[0]
+
+
+def _build_pharmacy_purchase_order_details(
+    conn: sqlite3.Connection,
+    order_rows: list[sqlite3.Row],
+    *,
+    site_key: str | None = None,
+) -> list[models.PharmacyPurchaseOrderDetail]:
+    if not order_rows:
+        return []
+    batch = _load_order_batch(conn, [row["id"] for row in order_rows])
+    line_columns = _table_columns(conn, "pharmacy_purchase_order_items")
     sku_expr = "NULLIF(TRIM(pi.barcode), '') AS sku"
     unit_expr = "COALESCE(NULLIF(TRIM(pi.packaging), ''), 'Unité') AS unit"
-    if has_line_sku:
+    if "sku" in line_columns:
         sku_expr = "COALESCE(NULLIF(TRIM(poi.sku), ''), NULLIF(TRIM(pi.barcode), '')) AS sku"
-    if has_line_unit:
+    if "unit" in line_columns:
         unit_expr = "COALESCE(NULLIF(TRIM(poi.unit), ''), NULLIF(TRIM(pi.packaging), ''), 'Unité') AS unit"
-    items_cur = conn.execute(
+    items_by_order: dict[int, list[models.PharmacyPurchaseOrderItem]] = defaultdict(list)
+    for item_row in conn.execute(
         f"""
         SELECT poi.id,
                poi.purchase_order_id,
@@ -17496,56 +21042,52 @@ def _build_pharmacy_purchase_order_detail(
                {unit_expr}
         FROM pharmacy_purchase_order_items AS poi
         JOIN pharmacy_items AS pi ON pi.id = poi.pharmacy_item_id
-        WHERE poi.purchase_order_id = ?
+        WHERE poi.purchase_order_id IN ({batch})
         ORDER BY pi.name COLLATE NOCASE
-        """,
-        (order_row["id"],),
-    )
-    items = [
-        models.PharmacyPurchaseOrderItem(
-            id=item_row["id"],
-            purchase_order_id=item_row["purchase_order_id"],
-            pharmacy_item_id=item_row["pharmacy_item_id"],
-            quantity_ordered=item_row["quantity_ordered"],
-            quantity_received=item_row["quantity_received"],
-            pharmacy_item_name=item_row["pharmacy_item_name"],
-            sku=_row_get(item_row, "sku"),
-            unit=_row_get(item_row, "unit"),
+        """
+    ).fetchall():
+        items_by_order[item_row["purchase_order_id"]].append(
+            models.PharmacyPurchaseOrderItem(
+                id=item_row["id"],
+                purchase_order_id=item_row["purchase_order_id"],
+                pharmacy_item_id=item_row["pharmacy_item_id"],
+                quantity_ordered=item_row["quantity_ordered"],
+                quantity_received=item_row["quantity_received"],
+                pharmacy_item_name=item_row["pharmacy_item_name"],
+                sku=_row_get(item_row, "sku"),
+                unit=_row_get(item_row, "unit"),
+            )
         )
-        for item_row in items_cur.fetchall()
-    ]
-    resolved_email = None
-    supplier_has_email = False
-    supplier_missing_reason = None
-    supplier_id = _row_get(order_row, "supplier_id")
-    supplier = resolve_supplier_for_order(conn, site_key or db.get_current_site_key(), supplier_id)
-    if supplier_id is None:
-        supplier_missing_reason = "SUPPLIER_MISSING"
-    elif supplier is None:
-        supplier_missing_reason = "SUPPLIER_NOT_FOUND"
-    else:
-        try:
-            resolved_email = require_supplier_email(supplier)
-            supplier_has_email = True
-        except SupplierResolutionError as exc:
-            supplier_missing_reason = exc.code
-    return models.PharmacyPurchaseOrderDetail(
-        id=order_row["id"],
-        supplier_id=supplier_id,
-        supplier_name=order_row["supplier_name"],
-        supplier_email=supplier.email if supplier else None,
-        supplier_email_resolved=resolved_email,
-        supplier_has_email=supplier_has_email,
-        supplier_missing_reason=supplier_missing_reason,
-        status=order_row["status"],
-        created_at=order_row["created_at"],
-        note=order_row["note"],
-        auto_created=bool(_row_get(order_row, "auto_created", 0)),
-        is_archived=bool(_row_get(order_row, "is_archived", 0)),
-        archived_at=_row_get(order_row, "archived_at"),
-        archived_by=_row_get(order_row, "archived_by"),
-        items=items,
+    suppliers = _resolve_suppliers_for_orders(
+        conn, (_row_get(row, "supplier_id") for row in order_rows)
     )
+    details: list[models.PharmacyPurchaseOrderDetail] = []
+    for order_row in order_rows:
+        supplier_id = _row_get(order_row, "supplier_id")
+        supplier = suppliers.get(supplier_id) if supplier_id is not None else None
+        resolved_email, supplier_has_email, supplier_missing_reason = (
+            _resolve_order_supplier_state(supplier_id, supplier)
+        )
+        details.append(
+            models.PharmacyPurchaseOrderDetail(
+                id=order_row["id"],
+                supplier_id=supplier_id,
+                supplier_name=order_row["supplier_name"],
+                supplier_email=supplier.email if supplier else None,
+                supplier_email_resolved=resolved_email,
+                supplier_has_email=supplier_has_email,
+                supplier_missing_reason=supplier_missing_reason,
+                status=order_row["status"],
+                created_at=order_row["created_at"],
+                note=order_row["note"],
+                auto_created=bool(_row_get(order_row, "auto_created", 0)),
+                is_archived=bool(_row_get(order_row, "is_archived", 0)),
+                archived_at=_row_get(order_row, "archived_at"),
+                archived_by=_row_get(order_row, "archived_by"),
+                items=items_by_order.get(order_row["id"], []),
+            )
+        )
+    return details
 
 
 def list_pharmacy_purchase_orders(
@@ -17561,6 +21103,8 @@ def list_pharmacy_purchase_orders(
     elif not include_archived:
         where_clause = "WHERE COALESCE(po.is_archived, 0) = 0"
     with db.get_stock_connection() as conn:
+        if archived_only or include_archived:
+            _overlay_purchase_order_archive(conn, db.get_current_site_key())
         cur = conn.execute(
             f"""
             SELECT po.*, s.name AS supplier_name, s.email AS supplier_email
@@ -17572,24 +21116,23 @@ def list_pharmacy_purchase_orders(
             params,
         )
         rows = cur.fetchall()
-        return [
-            _build_pharmacy_purchase_order_detail(conn, row, site_key=db.get_current_site_key())
-            for row in rows
-        ]
+        return _build_pharmacy_purchase_order_details(
+            conn, rows, site_key=db.get_current_site_key()
+        )
 
 
 def get_pharmacy_purchase_order(order_id: int) -> models.PharmacyPurchaseOrderDetail:
     ensure_database_ready()
+    query = """
+        SELECT po.*, s.name AS supplier_name, s.email AS supplier_email
+        FROM pharmacy_purchase_orders AS po
+        LEFT JOIN suppliers AS s ON s.id = po.supplier_id
+        WHERE po.id = ?
+    """
     with db.get_stock_connection() as conn:
-        row = conn.execute(
-            """
-            SELECT po.*, s.name AS supplier_name, s.email AS supplier_email
-            FROM pharmacy_purchase_orders AS po
-            LEFT JOIN suppliers AS s ON s.id = po.supplier_id
-            WHERE po.id = ?
-            """,
-            (order_id,),
-        ).fetchone()
+        row = conn.execute(query, (order_id,)).fetchone()
+        if row is None and _overlay_purchase_order_archive(conn, db.get_current_site_key()):
+            row = conn.execute(query, (order_id,)).fetchone()
         if row is None:
             raise ValueError("Bon de commande pharmacie introuvable")
         return _build_pharmacy_purchase_order_detail(conn, row, site_key=db.get_current_site_key())
@@ -17809,7 +21352,7 @@ def receive_pharmacy_purchase_order(
                             f"Réception bon de commande pharmacie #{order_id}"
                         ),
                     )
-                    _maybe_create_auto_purchase_order(
+                    _queue_auto_purchase_order(
                         conn, "pharmacy", line["pharmacy_item_id"]
                     )
             else:
@@ -17842,7 +21385,7 @@ def receive_pharmacy_purchase_order(
                         "INSERT INTO pharmacy_movements (pharmacy_item_id, delta, reason) VALUES (?, ?, ?)",
                         (item_id, increment, f"Réception bon de commande pharmacie #{order_id}"),
                     )
-                    _maybe_create_auto_purchase_order(conn, "pharmacy", item_id)
+                    _queue_auto_purchase_order(conn, "pharmacy", item_id)
             totals = conn.execute(
                 """
                 SELECT quantity_ordered, quantity_received
@@ -17869,6 +21412,217 @@ def receive_pharmacy_purchase_order(
     return get_pharmacy_purchase_order(order_id)
 
 
+@dataclass(frozen=True)
+class _PurchaseOrderReceptionSpec:
+    inventory_module: str
+    movements_table: str
+    movement_item_column: str
+    movement_reason: str
+
+
+_PURCHASE_ORDER_RECEPTIONS: dict[str, _PurchaseOrderReceptionSpec] = {
+    "clothing": _PurchaseOrderReceptionSpec(
+        "default", "movements", "item_id", "Réception bon de commande #{order_id}"
+    ),
+    "inventory_remise": _PurchaseOrderReceptionSpec(
+        "inventory_remise",
+        "remise_movements",
+        "item_id",
+        "Réception bon de commande remise #{order_id}",
+    ),
+    "pharmacy": _PurchaseOrderReceptionSpec(
+        "pharmacy",
+        "pharmacy_movements",
+        "pharmacy_item_id",
+        "Réception bon de commande pharmacie #{order_id}",
+    ),
+}
+
+
+def _refresh_purchase_order_statuses(
+    conn: sqlite3.Connection, module_key: str, statuses: dict[int, str]
+) -> None:
+    listing = _PURCHASE_ORDER_LISTINGS[module_key]
+    placeholders = ", ".join("?" for _ in statuses)
+    for row in conn.execute(
+        f"""
+        SELECT purchase_order_id,
+               SUM(CASE WHEN quantity_received < quantity_ordered THEN 1 ELSE 0 END) AS open_lines,
+               SUM(CASE WHEN quantity_received > 0 THEN 1 ELSE 0 END) AS started_lines
+        FROM {listing.lines_table}
+        WHERE purchase_order_id IN ({placeholders})
+        GROUP BY purchase_order_id
+        """,
+        list(statuses),
+    ).fetchall():
+        current = statuses[row["purchase_order_id"]]
+        if not row["open_lines"]:
+            new_status = "RECEIVED"
+        elif row["started_lines"]:
+            new_status = "PARTIALLY_RECEIVED"
+        else:
+            new_status = current
+        if new_status != current:
+            conn.execute(
+                f"UPDATE {listing.orders_table} SET status = ? WHERE id = ?",
+                (new_status, row["purchase_order_id"]),
+            )
+
+
+def _receive_purchase_order_lines(
+    conn: sqlite3.Connection,
+    module_key: str,
+    increments: dict[tuple[int, int], int],
+    *,
+    created_by: str | None,
+    note: str | None,
+    normalized_site_key: str,
+) -> None:
+    listing = _PURCHASE_ORDER_LISTINGS[module_key]
+    spec = _PURCHASE_ORDER_RECEPTIONS[module_key]
+    order_ids = sorted({order_id for order_id, _ in increments})
+    order_rows = {
+        row["id"]: row
+        for row in conn.execute(
+            f"SELECT id, status FROM {listing.orders_table} WHERE id IN ({', '.join('?' for _ in order_ids)})",
+            order_ids,
+        ).fetchall()
+    }
+    for order_id in order_ids:
+        order_row = order_rows.get(order_id)
+        if order_row is None:
+            raise ValueError(f"Bon de commande #{order_id} introuvable")
+        if order_row["status"] == "CANCELLED":
+            raise ValueError(f"Bon de commande #{order_id} annulé")
+        if module_key == "clothing" and _is_replacement_reception_locked(conn, order_id):
+            raise ReplacementReceptionLockedError(
+                f"Réception verrouillée : remplacement non clôturé (bon de commande #{order_id})"
+            )
+    line_ids = [line_id for _, line_id in increments]
+    lines = {
+        row["id"]: row
+        for row in conn.execute(
+            f"SELECT * FROM {listing.lines_table} WHERE id IN ({', '.join('?' for _ in line_ids)})",
+            line_ids,
+        ).fetchall()
+    }
+    for (order_id, line_id), increment in increments.items():
+        line = lines.get(line_id)
+        if line is None or line["purchase_order_id"] != order_id:
+            raise ValueError(f"Ligne de commande #{line_id} introuvable")
+        if increment > line["quantity_ordered"] - line["quantity_received"]:
+            raise ValueError(f"Quantité reçue supérieure au restant (ligne #{line_id})")
+
+    if module_key == "clothing":
+        for (order_id, line_id), increment in increments.items():
+            _record_purchase_order_line_receipt(
+                conn,
+                order_id,
+                lines[line_id],
+                models.PurchaseOrderReceiveLinePayload(
+                    purchase_order_line_id=line_id,
+                    received_qty=increment,
+                    conformity_status="conforme",
+                    note=note,
+                ),
+                created_by=created_by,
+                normalized_site_key=normalized_site_key,
+            )
+    else:
+        conn.executemany(
+            f"UPDATE {listing.lines_table} SET quantity_received = quantity_received + ? WHERE id = ?",
+            [(increment, line_id) for (_, line_id), increment in increments.items()],
+        )
+        conn.executemany(
+            f"UPDATE {listing.items_table} SET quantity = quantity + ? WHERE id = ?",
+            [
+                (increment, lines[line_id][listing.line_item_column])
+                for (_, line_id), increment in increments.items()
+            ],
+        )
+        conn.executemany(
+            f"INSERT INTO {spec.movements_table} ({spec.movement_item_column}, delta, reason) VALUES (?, ?, ?)",
+            [
+                (
+                    lines[line_id][listing.line_item_column],
+                    increment,
+                    spec.movement_reason.format(order_id=order_id),
+                )
+                for (order_id, line_id), increment in increments.items()
+            ],
+        )
+    for _, line_id in increments:
+        _queue_auto_purchase_order(
+            conn, spec.inventory_module, lines[line_id][listing.line_item_column]
+        )
+    _refresh_purchase_order_statuses(
+        conn, module_key, {order_id: order_rows[order_id]["status"] for order_id in order_ids}
+    )
+
+
+def receive_purchase_orders_bulk(
+    payload: models.PurchaseOrderBulkReceivePayload, *, created_by: str | None
+) -> models.PurchaseOrderBulkReceiveResult:
+    """Receive lines of several orders, possibly from several modules, in one transaction.
+
+    Every line is validated before anything is written; a single invalid line rejects
+    the whole delivery.
+    """
+
+    ensure_database_ready()
+    increments_by_module: dict[str, dict[tuple[int, int], int]] = defaultdict(dict)
+    for line in payload.lines:
+        module_increments = increments_by_module[line.module]
+        key = (line.order_id, line.line_id)
+        module_increments[key] = module_increments.get(key, 0) + line.qty
+    normalized_site_key = db.get_current_site_key()
+    summaries: list[models.PurchaseOrderSummary] = []
+    with db.get_stock_connection() as conn:
+        try:
+            for module_key, increments in increments_by_module.items():
+                _receive_purchase_order_lines(
+                    conn,
+                    module_key,
+                    increments,
+                    created_by=created_by,
+                    note=payload.note,
+                    normalized_site_key=normalized_site_key,
+                )
+            _persist_after_commit(
+                conn,
+                *(
+                    _PURCHASE_ORDER_RECEPTIONS[module_key].inventory_module
+                    for module_key in increments_by_module
+                ),
+            )
+        except Exception:
+            conn.rollback()
+            raise
+        for module_key, increments in increments_by_module.items():
+            listing = _PURCHASE_ORDER_LISTINGS[module_key]
+            order_ids = sorted({order_id for order_id, _ in increments})
+            rows = conn.execute(
+                f"""
+                SELECT po.id, po.supplier_id, po.status, po.created_at, po.note,
+                       po.auto_created, po.is_archived, po.archived_at,
+                       s.name AS supplier_name
+                FROM {listing.orders_table} AS po
+                LEFT JOIN suppliers AS s ON s.id = po.supplier_id
+                WHERE po.id IN ({", ".join("?" for _ in order_ids)})
+                ORDER BY po.id
+                """,
+                order_ids,
+            ).fetchall()
+            summaries.extend(_build_purchase_order_summaries(conn, module_key, rows))
+    return models.PurchaseOrderBulkReceiveResult(
+        received_lines=sum(len(increments) for increments in increments_by_module.values()),
+        received_quantity=sum(
+            sum(increments.values()) for increments in increments_by_module.values()
+        ),
+        orders=summaries,
+    )
+
+
 def list_available_modules() -> list[models.ModuleDefinition]:
     ensure_database_ready()
     definitions = [
@@ -153,6 +153,15 @@ def resolve_site_key(
     return db.DEFAULT_SITE_KEY
 
 
+def list_accessible_site_keys(user: models.User) -> list[str]:
+    """Sites whose data a user may read: all of them for admins and the central entity."""
+
+    assigned = user.site_key or get_user_site_assignment(user.username) or db.DEFAULT_SITE_KEY
+    if user.role == "admin" or assigned == "CENTRAL_ENTITY":
+        return db.list_site_keys()
+    return [assigned]
+
+
 def resolve_site_context(
     user: models.User | None,
     header_site_key: str | None,
@@ -0,0 +1,75 @@
+"""Background processing of the coalesced auto purchase order queue."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+from backend.core import db, services
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_QUEUE_INTERVAL_SECONDS = 2
+_DEFAULT_DEBOUNCE_SECONDS = 2
+
+
+def _get_int_env(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def process_all_sites(debounce_seconds: int) -> dict[str, int]:
+    results: dict[str, int] = {}
+    for site_key in db.list_site_keys():
+        try:
+            results[site_key] = services.process_auto_purchase_order_queue(
+                site_key, debounce_seconds=debounce_seconds
+            )
+        except Exception as exc:
+            logger.error("[AUTO_PO] queue processing failed site=%s", site_key, exc_info=exc)
+    return results
+
+
+async def _queue_loop(stop_event: asyncio.Event, interval_seconds: int, debounce_seconds: int) -> None:
+    while not stop_event.is_set():
+        try:
+            await asyncio.to_thread(process_all_sites, debounce_seconds)
+        except Exception as exc:
+            logger.error("[AUTO_PO] queue worker failure", exc_info=exc)
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+        except asyncio.TimeoutError:
+            continue
+
+
+def start_auto_purchase_order_worker(app: Any) -> None:
+    if getattr(app.state, "auto_purchase_order_task", None):
+        return
+    interval_seconds = _get_int_env("AUTO_PO_QUEUE_INTERVAL_SECONDS", _DEFAULT_QUEUE_INTERVAL_SECONDS)
+    debounce_seconds = _get_int_env("AUTO_PO_DEBOUNCE_SECONDS", _DEFAULT_DEBOUNCE_SECONDS)
+    stop_event = asyncio.Event()
+    app.state.auto_purchase_order_stop = stop_event
+    app.state.auto_purchase_order_task = asyncio.create_task(
+        _queue_loop(stop_event, interval_seconds, debounce_seconds)
+    )
+    logger.info(
+        "[AUTO_PO] queue worker started interval=%ss debounce=%ss", interval_seconds, debounce_seconds
+    )
+
+
+async def shutdown_auto_purchase_order_worker(app: Any) -> None:
+    stop_event: asyncio.Event | None = getattr(app.state, "auto_purchase_order_stop", None)
+    task: asyncio.Task | None = getattr(app.state, "auto_purchase_order_task", None)
+    if not stop_event or not task:
+        return
+    stop_event.set()
+    await task
+    # Flush what is left so that no pending evaluation waits for the next start.
+    await asyncio.to_thread(process_all_sites, 0)
+    logger.info("[AUTO_PO] queue worker stopped")
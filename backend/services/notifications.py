@@ -4,11 +4,14 @@ from __future__ import annotations
 import asyncio
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
+import json
 import logging
 import os
 from typing import Any
+from uuid import uuid4
 
 from backend.core import db, models, services
+from backend.services import email_sender
 from backend.services.email_sender import EmailSendError, send_email_smtp
 from backend.services.system_settings import get_email_smtp_config
 
@@ -16,6 +19,7 @@ logger = logging.getLogger(__name__)
 
 _DEFAULT_OUTBOX_INTERVAL_SECONDS = 3
 _DEFAULT_OUTBOX_BATCH_SIZE = 20
+_DEFAULT_OUTBOX_CLAIM_TIMEOUT_SECONDS = 600
 _DB_READY_CHECKED = False
 
 
@@ -85,7 +89,17 @@ def enqueue_email(
     priority: int = 5,
     purpose: str | None = None,
     meta: dict[str, Any] | None = None,
+    reply_to: str | None = None,
+    attachments: list[dict[str, Any]] | None = None,
+    max_attempts: int | None = None,
 ) -> int:
+    """Queue an email for the outbox worker and return its outbox id.
+
+    ``attachments`` are descriptors rendered by the worker right before sending,
+    so that no file content is stored in the outbox. Without ``max_attempts`` a
+    failing email is retried until it goes through.
+    """
+
     services.ensure_database_ready()
     with db.get_core_connection() as conn:
         cursor = conn.execute(
@@ -99,9 +113,14 @@ def enqueue_email(
                 sent_at,
                 send_attempts,
                 last_error,
-                priority
+                priority,
+                reply_to,
+                attachments_json,
+                purpose,
+                meta_json,
+                max_attempts
             )
-            VALUES (?, ?, ?, ?, ?, NULL, 0, NULL, ?)
+            VALUES (?, ?, ?, ?, ?, NULL, 0, NULL, ?, ?, ?, ?, ?, ?)
             """,
             (
                 to_email,
@@ -110,6 +129,11 @@ def enqueue_email(
                 body_html,
                 _utc_now_iso(),
                 priority,
+                reply_to,
+                json.dumps(attachments) if attachments else None,
+                purpose,
+                json.dumps(meta) if meta is not None else None,
+                max_attempts,
             ),
         )
         conn.commit()
@@ -196,42 +220,143 @@ def build_purchase_order_email(
     return subject, body_text, body_html
 
 
-def run_outbox_once(max_batch: int | None = None) -> OutboxRunResult:
-    _ensure_db_ready_once()
-    batch_size = max_batch or _DEFAULT_OUTBOX_BATCH_SIZE
-    sent = 0
-    failed = 0
+def _send_outbox_row(row: Any) -> str | None:
+    if not row["attachments_json"] and not row["reply_to"]:
+        send_email_smtp(
+            row["to_email"],
+            row["subject"],
+            row["body_text"],
+            row["body_html"],
+            sensitive=True,
+        )
+        return None
+    try:
+        attachments = [
+            services.render_email_attachment(descriptor)
+            for descriptor in json.loads(row["attachments_json"] or "[]")
+        ]
+    except Exception as exc:
+        # Any rendering error counts as a send attempt, so the row eventually reaches
+        # its max_attempts instead of being retried first on every run.
+        raise EmailSendError(f"Pièce jointe indisponible: {exc}") from exc
+    return email_sender.send_email(
+        row["to_email"],
+        row["subject"],
+        row["body_text"],
+        row["body_html"],
+        reply_to=row["reply_to"],
+        attachments=attachments,
+        sensitive=True,
+    )
+
+
+def _notify_delivery(row: Any, *, message_id: str | None, error: str | None) -> None:
+    if row["purpose"] != services.PURCHASE_ORDER_EMAIL_PURPOSE:
+        return
+    try:
+        services.record_purchase_order_email_delivery(
+            int(row["id"]),
+            json.loads(row["meta_json"] or "{}"),
+            message_id=message_id,
+            error=error,
+        )
+    except Exception as exc:
+        logger.error("[EMAIL] delivery callback failed id=%s", row["id"], exc_info=exc)
+
+
+def _claim_outbox_rows(batch_size: int, claim_token: str) -> list[Any]:
+    """Claim up to ``batch_size`` pending rows for this run and return them.
+
+    Each row is taken with a conditional UPDATE, so a row picked by two workers is
+    only sent by the one whose UPDATE matched. A claim older than the timeout is
+    considered abandoned (crashed worker) and can be taken again.
+    """
+
+    now = _utc_now()
+    claim_timeout = _get_int_env(
+        "OUTBOX_CLAIM_TIMEOUT_SECONDS", _DEFAULT_OUTBOX_CLAIM_TIMEOUT_SECONDS
+    )
+    expired_before = (now - timedelta(seconds=claim_timeout)).isoformat()
+    claimed = []
     with db.get_core_connection() as conn:
         rows = conn.execute(
             """
-            SELECT id, to_email, subject, body_text, body_html, send_attempts
+            SELECT id,
+                   to_email,
+                   subject,
+                   body_text,
+                   body_html,
+                   send_attempts,
+                   reply_to,
+                   attachments_json,
+                   purpose,
+                   meta_json,
+                   max_attempts
             FROM email_outbox
             WHERE sent_at IS NULL
+              AND failed_at IS NULL
+              AND (claimed_at IS NULL OR claimed_at < ?)
             ORDER BY priority ASC, id ASC
             LIMIT ?
             """,
-            (batch_size,),
+            (expired_before, batch_size),
         ).fetchall()
+        for row in rows:
+            cursor = conn.execute(
+                """
+                UPDATE email_outbox
+                SET claimed_at = ?, claim_token = ?
+                WHERE id = ?
+                  AND sent_at IS NULL
+                  AND failed_at IS NULL
+                  AND (claimed_at IS NULL OR claimed_at < ?)
+                """,
+                (now.isoformat(), claim_token, row["id"], expired_before),
+            )
+            if cursor.rowcount == 1:
+                claimed.append(row)
+        conn.commit()
+    return claimed
+
+
+def run_outbox_once(max_batch: int | None = None) -> OutboxRunResult:
+    _ensure_db_ready_once()
+    batch_size = max_batch or _DEFAULT_OUTBOX_BATCH_SIZE
+    sent = 0
+    failed = 0
+    claim_token = uuid4().hex
+    rows = _claim_outbox_rows(batch_size, claim_token)
+    # Each row is settled on its own connection so that no write lock is held
+    # while the SMTP server is being talked to. Settling a row releases its claim.
+    try:
         for row in rows:
             try:
-                send_email_smtp(
-                    row["to_email"],
-                    row["subject"],
-                    row["body_text"],
-                    row["body_html"],
-                    sensitive=True,
-                )
+                message_id = _send_outbox_row(row)
             except EmailSendError as exc:
                 failed += 1
                 attempts = int(row["send_attempts"]) + 1
-                conn.execute(
-                    """
-                    UPDATE email_outbox
-                    SET send_attempts = ?, last_error = ?
-                    WHERE id = ?
-                    """,
-                    (attempts, str(exc), row["id"]),
+                exhausted = row["max_attempts"] is not None and attempts >= int(
+                    row["max_attempts"]
                 )
+                with db.get_core_connection() as conn:
+                    conn.execute(
+                        """
+                        UPDATE email_outbox
+                        SET send_attempts = ?,
+                            last_error = ?,
+                            failed_at = ?,
+                            claimed_at = NULL,
+                            claim_token = NULL
+                        WHERE id = ? AND claim_token = ?
+                        """,
+                        (
+                            attempts,
+                            str(exc),
+                            _utc_now_iso() if exhausted else None,
+                            row["id"],
+                            claim_token,
+                        ),
+                    )
                 logger.warning(
                     "[EMAIL] failed id=%s to=%s attempts=%s error=%s",
                     row["id"],
@@ -239,17 +364,32 @@ def run_outbox_once(max_batch: int | None = None) -> OutboxRunResult:
                     attempts,
                     str(exc),
                 )
+                if exhausted:
+                    _notify_delivery(row, message_id=None, error=str(exc))
                 continue
             sent += 1
+            with db.get_core_connection() as conn:
+                conn.execute(
+                    """
+                    UPDATE email_outbox
+                    SET sent_at = ?, last_error = NULL, claimed_at = NULL, claim_token = NULL
+                    WHERE id = ? AND claim_token = ?
+                    """,
+                    (_utc_now_iso(), row["id"], claim_token),
+                )
+            logger.info("[EMAIL] sent id=%s to=%s", row["id"], row["to_email"])
+            _notify_delivery(row, message_id=message_id, error=None)
+    finally:
+        # Rows left unsettled by an unexpected error go back to the queue right away.
+        with db.get_core_connection() as conn:
             conn.execute(
                 """
                 UPDATE email_outbox
-                SET sent_at = ?, last_error = NULL
-                WHERE id = ?
+                SET claimed_at = NULL, claim_token = NULL
+                WHERE claim_token = ?
                 """,
-                (_utc_now_iso(), row["id"]),
+                (claim_token,),
             )
-            logger.info("[EMAIL] sent id=%s to=%s", row["id"], row["to_email"])
     return OutboxRunResult(sent=sent, failed=failed)
 
 
@@ -264,8 +404,12 @@ def purge_email_tables() -> None:
             (challenge_cutoff,),
         )
         conn.execute(
-            "DELETE FROM email_outbox WHERE sent_at IS NOT NULL AND sent_at < ?",
-            (outbox_cutoff,),
+            """
+            DELETE FROM email_outbox
+            WHERE (sent_at IS NOT NULL AND sent_at < ?)
+               OR (failed_at IS NOT NULL AND failed_at < ?)
+            """,
+            (outbox_cutoff, outbox_cutoff),
         )
         conn.commit()
 
@@ -0,0 +1,129 @@
+"""Disk cache of rendered purchase order PDFs, addressed by a hash of their inputs."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import tempfile
+import threading
+from typing import Any, Callable
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+# Bump when the renderer output changes for identical inputs.
+CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Guards reads against eviction: a hit is read while no eviction can unlink it.
+_CACHE_LOCK = threading.Lock()
+_ENTITY_TAG_PATTERN = re.compile(r'(?:W/)?"[^"]*"|\*')
+
+
+@dataclass(frozen=True)
+class CachedPdf:
+    path: Path
+    etag: str
+    cache_hit: bool
+    content: bytes
+
+    def read_bytes(self) -> bytes:
+        return self.content
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header against ``etag`` (weak comparison).
+
+    The header may list several comma-separated entity tags, weak ``W/`` tags or
+    ``*``, which matches any current representation.
+    """
+
+    if not if_none_match:
+        return False
+    for candidate in _ENTITY_TAG_PATTERN.findall(if_none_match):
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _cache_dir() -> Path:
+    configured = os.getenv("PURCHASE_ORDER_PDF_CACHE_DIR")
+    root = Path(configured) if configured else Path(tempfile.gettempdir()) / "purchase_order_pdf_cache"
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def _max_bytes() -> int:
+    raw = os.getenv("PURCHASE_ORDER_PDF_CACHE_MAX_BYTES")
+    if raw is None:
+        return DEFAULT_MAX_BYTES
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return DEFAULT_MAX_BYTES
+
+
+def cache_key(inputs: dict[str, Any]) -> str:
+    payload = json.dumps(
+        {"version": CACHE_FORMAT_VERSION, **inputs},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_or_render(key: str, render: Callable[[], bytes]) -> CachedPdf:
+    """Return the cached PDF for ``key``, rendering and storing it on a miss.
+
+    A hit refreshes the file modification time, which is the recency used by the
+    least-recently-used eviction run after every store. The content is read under
+    the cache lock, so a concurrent eviction cannot remove the file in between.
+    """
+
+    cache_path = _cache_dir() / f"{key}.pdf"
+    etag = f'"{key}"'
+    with _CACHE_LOCK:
+        try:
+            os.utime(cache_path)
+            content = cache_path.read_bytes()
+        except FileNotFoundError:
+            content = None
+    if content is not None:
+        logger.debug("[purchase_order_pdf] cache hit key=%s", key)
+        return CachedPdf(path=cache_path, etag=etag, cache_hit=True, content=content)
+
+    pdf_bytes = render()
+    temp_path = cache_path.with_name(f"{key}.{uuid4().hex}.tmp")
+    temp_path.write_bytes(pdf_bytes)
+    with _CACHE_LOCK:
+        temp_path.replace(cache_path)
+        _evict(keep=cache_path)
+    logger.debug("[purchase_order_pdf] cache miss key=%s size=%s", key, len(pdf_bytes))
+    return CachedPdf(path=cache_path, etag=etag, cache_hit=False, content=pdf_bytes)
+
+
+def _evict(*, keep: Path) -> None:
+    """Drop the least recently used entries above the size budget; needs ``_CACHE_LOCK``."""
+
+    max_bytes = _max_bytes()
+    entries: list[tuple[float, int, Path]] = []
+    for path in _cache_dir().glob("*.pdf"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        path.unlink(missing_ok=True)
+        total -= size
+
@@ -0,0 +1,81 @@
+"""Scheduled move of long-archived purchase orders to the site archive databases."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+from backend.core import db, services
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_ARCHIVE_INTERVAL_SECONDS = 24 * 60 * 60
+
+
+def _get_int_env(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def archive_all_sites(retention_days: int) -> dict[str, dict[str, int]]:
+    results: dict[str, dict[str, int]] = {}
+    for site_key in db.list_site_keys():
+        try:
+            results[site_key] = services.archive_closed_purchase_orders(
+                site_key, retention_days=retention_days
+            )
+        except Exception as exc:
+            logger.error("[PURCHASE_ORDER_ARCHIVE] archive run failed site=%s", site_key, exc_info=exc)
+    return results
+
+
+async def _archive_loop(stop_event: asyncio.Event, interval_seconds: int, retention_days: int) -> None:
+    while not stop_event.is_set():
+        try:
+            await asyncio.to_thread(archive_all_sites, retention_days)
+        except Exception as exc:
+            logger.error("[PURCHASE_ORDER_ARCHIVE] archive worker failure", exc_info=exc)
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+        except asyncio.TimeoutError:
+            continue
+
+
+def start_purchase_order_archive_worker(app: Any) -> None:
+    if getattr(app.state, "purchase_order_archive_task", None):
+        return
+    interval_seconds = _get_int_env(
+        "PURCHASE_ORDER_ARCHIVE_INTERVAL_SECONDS", _DEFAULT_ARCHIVE_INTERVAL_SECONDS
+    )
+    retention_days = _get_int_env(
+        "PURCHASE_ORDER_ARCHIVE_RETENTION_DAYS", services.PURCHASE_ORDER_ARCHIVE_RETENTION_DAYS
+    )
+    if retention_days <= 0:
+        logger.info("[PURCHASE_ORDER_ARCHIVE] archive worker disabled")
+        return
+    stop_event = asyncio.Event()
+    app.state.purchase_order_archive_stop = stop_event
+    app.state.purchase_order_archive_task = asyncio.create_task(
+        _archive_loop(stop_event, interval_seconds, retention_days)
+    )
+    logger.info(
+        "[PURCHASE_ORDER_ARCHIVE] archive worker started interval=%ss retention=%sd",
+        interval_seconds,
+        retention_days,
+    )
+
+
+async def shutdown_purchase_order_archive_worker(app: Any) -> None:
+    stop_event: asyncio.Event | None = getattr(app.state, "purchase_order_archive_stop", None)
+    task: asyncio.Task | None = getattr(app.state, "purchase_order_archive_task", None)
+    if not stop_event or not task:
+        return
+    stop_event.set()
+    await task
+    logger.info("[PURCHASE_ORDER_ARCHIVE] archive worker stopped")
@@ -19,6 +19,8 @@ from backend.services.pdf_config import (
     page_size_for_format,
     resolve_pdf_config,
 )
+from backend.services.pdf import purchase_order_cache
+from backend.services.pdf.purchase_order_cache import CachedPdf
 from backend.services.pdf.theme import apply_theme_reportlab, resolve_reportlab_theme, scale_reportlab_theme
 
 
@@ -582,3 +584,44 @@ def render_purchase_order_pdf(
     pdf.save()
     buffer.seek(0)
     return buffer.getvalue()
+
+
+def render_purchase_order_pdf_cached(
+    *,
+    title: str,
+    purchase_order: models.PurchaseOrderDetail,
+    buyer_block: dict[str, str | None],
+    supplier_block: dict[str, str | None],
+    delivery_block: dict[str, str | None],
+    include_received: bool,
+) -> CachedPdf:
+    """Render through the content-addressed cache.
+
+    The key covers the order detail, the header blocks (built from the site info) and
+    the resolved PDF config including its theme, so any change yields a new entry.
+    """
+
+    module_key = _resolve_module_key(purchase_order)
+    key = purchase_order_cache.cache_key(
+        {
+            "module": module_key,
+            "title": title,
+            "order": purchase_order.model_dump(mode="json"),
+            "buyer": buyer_block,
+            "supplier": supplier_block,
+            "delivery": delivery_block,
+            "include_received": include_received,
+            "config": resolve_pdf_config(module_key).config.model_dump(mode="json"),
+        }
+    )
+    return purchase_order_cache.get_or_render(
+        key,
+        lambda: render_purchase_order_pdf(
+            title=title,
+            purchase_order=purchase_order,
+            buyer_block=buyer_block,
+            supplier_block=supplier_block,
+            delivery_block=delivery_block,
+            include_received=include_received,
+        ),
+    )
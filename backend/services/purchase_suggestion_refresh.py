@@ -0,0 +1,69 @@
+"""Scheduled incremental refresh of the purchase suggestions of every site."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+from backend.core import db, services
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_REFRESH_INTERVAL_SECONDS = 300
+
+
+def _get_int_env(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def refresh_all_sites() -> dict[str, dict[str, int]]:
+    results: dict[str, dict[str, int]] = {}
+    for site_key in db.list_site_keys():
+        try:
+            results[site_key] = services.refresh_stale_purchase_suggestions(site_key)
+        except Exception as exc:
+            logger.error("[PURCHASE_SUGGESTIONS] scheduled refresh failed site=%s", site_key, exc_info=exc)
+    return results
+
+
+async def _refresh_loop(stop_event: asyncio.Event, interval_seconds: int) -> None:
+    while not stop_event.is_set():
+        try:
+            await asyncio.to_thread(refresh_all_sites)
+        except Exception as exc:
+            logger.error("[PURCHASE_SUGGESTIONS] refresh worker failure", exc_info=exc)
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+        except asyncio.TimeoutError:
+            continue
+
+
+def start_purchase_suggestion_refresh_worker(app: Any) -> None:
+    if getattr(app.state, "purchase_suggestion_refresh_task", None):
+        return
+    interval_seconds = _get_int_env(
+        "PURCHASE_SUGGESTION_REFRESH_INTERVAL_SECONDS", _DEFAULT_REFRESH_INTERVAL_SECONDS
+    )
+    stop_event = asyncio.Event()
+    app.state.purchase_suggestion_refresh_stop = stop_event
+    app.state.purchase_suggestion_refresh_task = asyncio.create_task(
+        _refresh_loop(stop_event, interval_seconds)
+    )
+    logger.info("[PURCHASE_SUGGESTIONS] refresh worker started interval=%ss", interval_seconds)
+
+
+async def shutdown_purchase_suggestion_refresh_worker(app: Any) -> None:
+    stop_event: asyncio.Event | None = getattr(app.state, "purchase_suggestion_refresh_stop", None)
+    task: asyncio.Task | None = getattr(app.state, "purchase_suggestion_refresh_task", None)
+    if not stop_event or not task:
+        return
+    stop_event.set()
+    await task
+    logger.info("[PURCHASE_SUGGESTIONS] refresh worker stopped")
@@ -0,0 +1,75 @@
+"""Periodic capture of the daily stock snapshots, expiry radar and item classes used by the reports."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any
+
+from backend.core import db, services
+
+logger = logging.getLogger(__name__)
+
+_DEFAULT_SNAPSHOT_INTERVAL_SECONDS = 3600
+
+
+def _get_int_env(name: str, default: int) -> int:
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def capture_all_sites() -> dict[str, dict[str, int]]:
+    results: dict[str, dict[str, int]] = {}
+    for site_key in db.list_site_keys():
+        try:
+            results[site_key] = services.capture_stock_snapshots(site_key)
+        except Exception as exc:
+            logger.error("[REPORTS] stock snapshot failed site=%s", site_key, exc_info=exc)
+        try:
+            services.capture_expiry_radar(site_key)
+        except Exception as exc:
+            logger.error("[REPORTS] expiry radar failed site=%s", site_key, exc_info=exc)
+        try:
+            services.refresh_item_classifications(site_key)
+        except Exception as exc:
+            logger.error("[REPORTS] item classification failed site=%s", site_key, exc_info=exc)
+    return results
+
+
+async def _snapshot_loop(stop_event: asyncio.Event, interval_seconds: int) -> None:
+    while not stop_event.is_set():
+        try:
+            await asyncio.to_thread(capture_all_sites)
+        except Exception as exc:
+            logger.error("[REPORTS] stock snapshot worker failure", exc_info=exc)
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=interval_seconds)
+        except asyncio.TimeoutError:
+            continue
+
+
+def start_snapshot_worker(app: Any) -> None:
+    if getattr(app.state, "stock_snapshot_task", None):
+        return
+    interval_seconds = _get_int_env(
+        "STOCK_SNAPSHOT_INTERVAL_SECONDS", _DEFAULT_SNAPSHOT_INTERVAL_SECONDS
+    )
+    stop_event = asyncio.Event()
+    app.state.stock_snapshot_stop = stop_event
+    app.state.stock_snapshot_task = asyncio.create_task(_snapshot_loop(stop_event, interval_seconds))
+    logger.info("[REPORTS] stock snapshot worker started interval=%ss", interval_seconds)
+
+
+async def shutdown_snapshot_worker(app: Any) -> None:
+    stop_event: asyncio.Event | None = getattr(app.state, "stock_snapshot_stop", None)
+    task: asyncio.Task | None = getattr(app.state, "stock_snapshot_task", None)
+    if not stop_event or not task:
+        return
+    stop_event.set()
+    await task
+    logger.info("[REPORTS] stock snapshot worker stopped")
@@ -280,6 +280,7 @@ def test_low_stock_triggers_auto_purchase_order() -> None:
     )
     assert movement.status_code == 204, movement.text
 
+    services.process_auto_purchase_order_queue()
     with db.get_stock_connection() as conn:
         rows = conn.execute(
             """
@@ -303,6 +304,7 @@ def test_low_stock_triggers_auto_purchase_order() -> None:
     )
     assert second_movement.status_code == 204, second_movement.text
 
+    services.process_auto_purchase_order_queue()
     with db.get_stock_connection() as conn:
         rows_after = conn.execute(
             """
@@ -349,6 +351,7 @@ def test_no_auto_purchase_order_without_supplier() -> None:
     )
     assert movement.status_code == 204, movement.text
 
+    services.process_auto_purchase_order_queue()
     with db.get_stock_connection() as conn:
         rows = conn.execute(
             """
@@ -399,6 +402,7 @@ def test_low_stock_triggers_auto_purchase_order_remise() -> None:
     )
     assert movement.status_code == 204, movement.text
 
+    services.process_auto_purchase_order_queue()
     with db.get_stock_connection() as conn:
         rows = conn.execute(
             """
@@ -422,6 +426,7 @@ def test_low_stock_triggers_auto_purchase_order_remise() -> None:
     )
     assert second_movement.status_code == 204, second_movement.text
 
+    services.process_auto_purchase_order_queue()
     with db.get_stock_connection() as conn:
         rows_after = conn.execute(
             """
@@ -471,6 +476,7 @@ def test_no_auto_purchase_order_without_supplier_remise() -> None:
     )
     assert movement.status_code == 204, movement.text
 
+    services.process_auto_purchase_order_queue()
     with db.get_stock_connection() as conn:
         rows = conn.execute(
             """
@@ -519,6 +525,7 @@ def test_low_stock_triggers_auto_purchase_order_pharmacy() -> None:
     )
     assert movement.status_code == 204, movement.text
 
+    services.process_auto_purchase_order_queue()
     with db.get_stock_connection() as conn:
         rows = conn.execute(
             """
@@ -542,6 +549,7 @@ def test_low_stock_triggers_auto_purchase_order_pharmacy() -> None:
     )
     assert second_movement.status_code == 204, second_movement.text
 
+    services.process_auto_purchase_order_queue()
     with db.get_stock_connection() as conn:
         rows_after = conn.execute(
             """
@@ -589,6 +597,7 @@ def test_no_auto_purchase_order_without_supplier_pharmacy() -> None:
     )
     assert movement.status_code == 204, movement.text
 
+    services.process_auto_purchase_order_queue()
     with db.get_stock_connection() as conn:
         rows = conn.execute(
             """
@@ -41,3 +41,82 @@ def test_refresh_auto_purchase_orders_is_idempotent() -> None:
         conn.execute("DELETE FROM items")
         conn.execute("DELETE FROM suppliers")
         conn.commit()
+
+
+def test_auto_purchase_order_queue_coalesces_items_by_supplier() -> None:
+    services.ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM auto_purchase_order_queue")
+        conn.execute("DELETE FROM purchase_order_items")
+        conn.execute("DELETE FROM purchase_orders")
+        conn.execute("DELETE FROM items")
+        conn.execute("DELETE FROM suppliers")
+        supplier_id = conn.execute(
+            "INSERT INTO suppliers (name) VALUES ('Queue Supplier')"
+        ).lastrowid
+        item_ids = [
+            conn.execute(
+                """
+                INSERT INTO items (name, sku, quantity, low_stock_threshold, track_low_stock, supplier_id)
+                VALUES (?, ?, 1, 6, 1, ?)
+                """,
+                (f"Article {index}", f"QUEUE-{index}", supplier_id),
+            ).lastrowid
+            for index in range(2)
+        ]
+        for _ in range(3):
+            for item_id in item_ids:
+                services._queue_auto_purchase_order(conn, "default", item_id)
+        conn.commit()
+        queued = conn.execute("SELECT COUNT(*) AS total FROM auto_purchase_order_queue").fetchone()
+    assert queued["total"] == 2
+
+    assert services.process_auto_purchase_order_queue(debounce_seconds=3600) == 0
+    assert services.process_auto_purchase_order_queue() == 2
+
+    with db.get_stock_connection() as conn:
+        orders = conn.execute(
+            "SELECT id FROM purchase_orders WHERE auto_created = 1 AND supplier_id = ?",
+            (supplier_id,),
+        ).fetchall()
+        assert len(orders) == 1
+        lines = conn.execute(
+            "SELECT item_id, quantity_ordered FROM purchase_order_items WHERE purchase_order_id = ?",
+            (orders[0]["id"],),
+        ).fetchall()
+        assert {row["item_id"]: row["quantity_ordered"] for row in lines} == {
+            item_ids[0]: 5,
+            item_ids[1]: 5,
+        }
+
+        conn.execute("DELETE FROM purchase_order_items")
+        conn.execute("DELETE FROM purchase_orders")
+        conn.execute("DELETE FROM items")
+        conn.execute("DELETE FROM suppliers")
+        conn.commit()
+
+
+def test_auto_purchase_order_queue_restarts_debounce_on_new_change() -> None:
+    services.ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM auto_purchase_order_queue")
+        conn.execute(
+            """
+            INSERT INTO auto_purchase_order_queue (module, item_id, queued_at)
+            VALUES ('default', 4242, datetime('now', '-2 hours'))
+            """
+        )
+        services._queue_auto_purchase_order(conn, "default", 4242)
+        conn.commit()
+        queued = conn.execute(
+            """
+            SELECT COUNT(*) AS total,
+                   MAX(queued_at >= datetime('now', '-1 minute')) AS recent
+            FROM auto_purchase_order_queue
+            """
+        ).fetchone()
+    assert queued["total"] == 1
+    assert queued["recent"] == 1
+
+    assert services.process_auto_purchase_order_queue(debounce_seconds=3600) == 0
+    assert services.process_auto_purchase_order_queue() == 1
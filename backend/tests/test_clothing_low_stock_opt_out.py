@@ -121,3 +121,46 @@ def test_create_update_roundtrip_persists_track_low_stock() -> None:
 
     with db.get_stock_connection(site_key) as conn:
         conn.execute("DELETE FROM items WHERE id = ?", (created["id"],))
+
+
+def test_low_stock_set_follows_item_writes() -> None:
+    site_key = "JLL"
+    services.ensure_site_database_ready(site_key)
+    sku = f"LSS-{uuid4().hex[:6]}"
+
+    def _entry(conn, item_id: int):
+        return conn.execute(
+            """
+            SELECT quantity, low_stock_threshold, track_low_stock
+            FROM low_stock_items
+            WHERE module = 'clothing' AND item_id = ?
+            """,
+            (item_id,),
+        ).fetchone()
+
+    with db.get_stock_connection(site_key) as conn:
+        cur = conn.execute(
+            """
+            INSERT INTO items (name, sku, quantity, low_stock_threshold, track_low_stock)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            ("Casque", sku, 1, 3, 1),
+        )
+        item_id = int(cur.lastrowid)
+        entry = _entry(conn, item_id)
+        assert entry is not None
+        assert (entry["quantity"], entry["low_stock_threshold"]) == (1, 3)
+
+        conn.execute("UPDATE items SET track_low_stock = 0 WHERE id = ?", (item_id,))
+        assert _entry(conn, item_id)["track_low_stock"] == 0
+
+        conn.execute("UPDATE items SET quantity = 10 WHERE id = ?", (item_id,))
+        assert _entry(conn, item_id) is None
+
+        conn.execute(
+            "UPDATE items SET quantity = 0, track_low_stock = 1 WHERE id = ?", (item_id,)
+        )
+        assert _entry(conn, item_id) is not None
+
+        conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
+        assert _entry(conn, item_id) is None
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.core import db, services
+from backend.tests.auth_helpers import login_headers
+
+client = TestClient(app)
+
+
+def _insert_pharmacy_item(conn, name: str, expiration: str | None, quantity: int = 5) -> int:
+    return conn.execute(
+        "INSERT INTO pharmacy_items (name, barcode, quantity, expiration_date) VALUES (?, ?, ?, ?)",
+        (name, f"EXP-{name}", quantity, expiration),
+    ).lastrowid
+
+
+def test_expiry_radar_buckets_and_daily_capture() -> None:
+    services.ensure_database_ready()
+    headers = login_headers(client, "admin", "admin123")
+    today = date.today()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM pharmacy_items")
+        conn.execute("DELETE FROM expiry_radar_daily")
+        _insert_pharmacy_item(conn, "Perime", (today - timedelta(days=2)).isoformat())
+        _insert_pharmacy_item(conn, "Semaine", f"{today + timedelta(days=3)} 00:00:00")
+        _insert_pharmacy_item(conn, "Mois", (today + timedelta(days=20)).isoformat())
+        _insert_pharmacy_item(conn, "Trimestre", (today + timedelta(days=60)).isoformat())
+        _insert_pharmacy_item(conn, "Lointain", (today + timedelta(days=400)).isoformat())
+        _insert_pharmacy_item(conn, "Vide", (today + timedelta(days=1)).isoformat(), quantity=0)
+        _insert_pharmacy_item(conn, "SansDate", None)
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM pharmacy_items "
+            "WHERE expiration_date IS NOT NULL AND date(expiration_date) < ?",
+            (today.isoformat(),),
+        ).fetchall()
+    assert any("idx_pharmacy_items_expiration_day" in row["detail"] for row in plan)
+
+    response = client.get("/reports/expiry-radar", params={"module": "pharmacy"}, headers=headers)
+    assert response.status_code == 200
+    buckets = {bucket["key"]: bucket for bucket in response.json()["buckets"]}
+    assert {key: [item["name"] for item in bucket["items"]] for key, bucket in buckets.items()} == {
+        "expired": ["Perime"],
+        "lt_7d": ["Semaine"],
+        "lt_30d": ["Mois"],
+        "lt_90d": ["Trimestre"],
+    }
+    assert buckets["lt_7d"]["items"][0]["days_left"] == 3
+
+    with_empty = client.get(
+        "/reports/expiry-radar",
+        params={"module": "pharmacy", "include_empty": True},
+        headers=headers,
+    ).json()
+    assert with_empty["buckets"][1]["count"] == 2
+
+    services.capture_expiry_radar()
+    history = client.get(
+        "/reports/expiry-radar/history",
+        params={"module": "pharmacy", "start": today.isoformat(), "end": today.isoformat()},
+        headers=headers,
+    )
+    assert history.status_code == 200
+    assert history.json() == [
+        {
+            "day": today.isoformat(),
+            "counts": {"expired": 1, "lt_7d": 1, "lt_30d": 1, "lt_90d": 1},
+            "quantities": {"expired": 5, "lt_7d": 5, "lt_30d": 5, "lt_90d": 5},
+        }
+    ]
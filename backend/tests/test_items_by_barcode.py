@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from uuid import uuid4
 
+import pytest
+
 from fastapi.testclient import TestClient
 
 from backend.app import app
@@ -84,3 +86,80 @@ def test_items_by_barcode_conflict() -> None:
     assert response.status_code == 409, response.text
     payload = response.json()
     assert len(payload["matches"]) == 2
+
+
+def test_barcode_index_follows_sku_changes() -> None:
+    services.ensure_database_ready()
+    old_sku = f"IDX-{uuid4().hex[:6]}"
+    new_sku = f"IDX-{uuid4().hex[:6]}"
+    item = services.create_item(models.ItemCreate(name="Lampe frontale", sku=old_sku, quantity=1))
+
+    assert [match.id for match in services.find_items_by_barcode("clothing", old_sku)] == [item.id]
+
+    services.update_item(
+        item.id, models.ItemUpdate(name="Lampe frontale", sku=new_sku, quantity=1)
+    )
+
+    assert services.find_items_by_barcode("clothing", old_sku) == []
+    assert [match.id for match in services.find_items_by_barcode("clothing", new_sku.lower())] == [
+        item.id
+    ]
+    with db.get_stock_connection() as conn:
+        indexed = conn.execute(
+            "SELECT normalized_code FROM barcode_index WHERE module = 'clothing' AND item_id = ?",
+            (item.id,),
+        ).fetchone()
+    assert indexed["normalized_code"] == new_sku.upper()
+
+    services.delete_item(item.id)
+    assert services.find_items_by_barcode("clothing", new_sku) == []
+
+
+def test_items_by_barcode_batch_resolves_each_code() -> None:
+    username = "barcode_admin_batch"
+    password = "password"
+    _create_admin_user(username, password)
+    headers = _auth_headers(username, password)
+
+    sku = f"BAT-{uuid4().hex[:6]}"
+    item = services.create_item(models.ItemCreate(name="Bouchons", sku=sku, quantity=4))
+    unknown = f"NONE-{uuid4().hex[:6]}"
+
+    response = client.post(
+        "/items/by-barcode/batch",
+        json={"codes": [sku.lower(), unknown, "  "], "modules": ["clothing"]},
+        headers=headers,
+    )
+
+    assert response.status_code == 200, response.text
+    results = response.json()
+    assert [entry["code"] for entry in results] == [sku.lower(), unknown, "  "]
+    assert results[0]["matches"] == [{"module": "clothing", "id": item.id, "name": "Bouchons"}]
+    assert results[1]["matches"] == []
+    assert results[2]["normalized_code"] is None
+
+
+def test_scan_add_dotations_batch_allocates_in_one_transaction() -> None:
+    services.ensure_database_ready()
+    collaborator = services.create_collaborator(
+        models.CollaboratorCreate(full_name=f"Batch {uuid4().hex[:6]}")
+    )
+    sku_a = f"DOT-{uuid4().hex[:6]}"
+    sku_b = f"DOT-{uuid4().hex[:6]}"
+    item_a = services.create_item(models.ItemCreate(name="Gilet", sku=sku_a, quantity=3))
+    item_b = services.create_item(models.ItemCreate(name="Gants", sku=sku_b, quantity=1))
+
+    created = services.scan_add_dotations(
+        employee_id=collaborator.id, barcodes=[sku_a, sku_b, sku_a.lower()]
+    )
+
+    assert {(dotation.item_id, dotation.quantity) for dotation in created} == {
+        (item_a.id, 2),
+        (item_b.id, 1),
+    }
+    assert services.get_item(item_a.id).quantity == 1
+    assert services.get_item(item_b.id).quantity == 0
+
+    with pytest.raises(ValueError, match="Stock insuffisant"):
+        services.scan_add_dotations(employee_id=collaborator.id, barcodes=[sku_a, sku_b])
+    assert services.get_item(item_a.id).quantity == 1
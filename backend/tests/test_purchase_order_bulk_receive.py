@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.core import db, services
+from backend.tests.auth_helpers import login_headers
+
+
+def _seed_orders() -> dict[str, int]:
+    services.ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        clothing_item = conn.execute(
+            "INSERT INTO items (name, sku, quantity) VALUES ('Veste bulk', 'BULK-CL', 0)"
+        ).lastrowid
+        remise_item = conn.execute(
+            "INSERT INTO remise_items (name, sku, quantity) VALUES ('Corde bulk', 'BULK-RM', 1)"
+        ).lastrowid
+        pharmacy_item = conn.execute(
+            "INSERT INTO pharmacy_items (name, quantity) VALUES ('Compresse bulk', 2)"
+        ).lastrowid
+        clothing_order = conn.execute(
+            "INSERT INTO purchase_orders (status) VALUES ('ORDERED')"
+        ).lastrowid
+        remise_order = conn.execute(
+            "INSERT INTO remise_purchase_orders (status) VALUES ('ORDERED')"
+        ).lastrowid
+        pharmacy_order = conn.execute(
+            "INSERT INTO pharmacy_purchase_orders (status) VALUES ('ORDERED')"
+        ).lastrowid
+        ids = {
+            "clothing_item": clothing_item,
+            "remise_item": remise_item,
+            "pharmacy_item": pharmacy_item,
+            "clothing_order": clothing_order,
+            "remise_order": remise_order,
+            "pharmacy_order": pharmacy_order,
+            "clothing_line": conn.execute(
+                """
+                INSERT INTO purchase_order_items (purchase_order_id, item_id, quantity_ordered)
+                VALUES (?, ?, 4)
+                """,
+                (clothing_order, clothing_item),
+            ).lastrowid,
+            "remise_line": conn.execute(
+                """
+                INSERT INTO remise_purchase_order_items (purchase_order_id, remise_item_id, quantity_ordered)
+                VALUES (?, ?, 3)
+                """,
+                (remise_order, remise_item),
+            ).lastrowid,
+            "pharmacy_line": conn.execute(
+                """
+                INSERT INTO pharmacy_purchase_order_items (purchase_order_id, pharmacy_item_id, quantity_ordered)
+                VALUES (?, ?, 5)
+                """,
+                (pharmacy_order, pharmacy_item),
+            ).lastrowid,
+        }
+        conn.commit()
+    return ids
+
+
+def test_bulk_receive_spans_modules_in_one_transaction() -> None:
+    ids = _seed_orders()
+    client = TestClient(app)
+    headers = login_headers(client, "admin", "admin123")
+
+    rejected = client.post(
+        "/purchase-orders/bulk-receive",
+        json={
+            "lines": [
+                {"module": "clothing", "order_id": ids["clothing_order"], "line_id": ids["clothing_line"], "qty": 2},
+                {"module": "pharmacy", "order_id": ids["pharmacy_order"], "line_id": ids["pharmacy_line"], "qty": 9},
+            ]
+        },
+        headers=headers,
+    )
+    assert rejected.status_code == 400, rejected.text
+    with db.get_stock_connection() as conn:
+        received = conn.execute(
+            "SELECT quantity_received FROM purchase_order_items WHERE id = ?", (ids["clothing_line"],)
+        ).fetchone()
+    assert received["quantity_received"] == 0
+
+    response = client.post(
+        "/purchase-orders/bulk-receive",
+        json={
+            "lines": [
+                {"module": "clothing", "order_id": ids["clothing_order"], "line_id": ids["clothing_line"], "qty": 1},
+                {"module": "clothing", "order_id": ids["clothing_order"], "line_id": ids["clothing_line"], "qty": 1},
+                {"module": "inventory_remise", "order_id": ids["remise_order"], "line_id": ids["remise_line"], "qty": 3},
+                {"module": "pharmacy", "order_id": ids["pharmacy_order"], "line_id": ids["pharmacy_line"], "qty": 5},
+            ],
+            "note": "Livraison groupée",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    result = response.json()
+    assert result["received_lines"] == 3
+    assert result["received_quantity"] == 10
+    statuses = {(order["module"], order["id"]): order["status"] for order in result["orders"]}
+    assert statuses == {
+        ("clothing", ids["clothing_order"]): "PARTIALLY_RECEIVED",
+        ("inventory_remise", ids["remise_order"]): "RECEIVED",
+        ("pharmacy", ids["pharmacy_order"]): "RECEIVED",
+    }
+
+    with db.get_stock_connection() as conn:
+        clothing = conn.execute("SELECT quantity FROM items WHERE id = ?", (ids["clothing_item"],)).fetchone()
+        remise = conn.execute(
+            "SELECT quantity FROM remise_items WHERE id = ?", (ids["remise_item"],)
+        ).fetchone()
+        pharmacy = conn.execute(
+            "SELECT quantity FROM pharmacy_items WHERE id = ?", (ids["pharmacy_item"],)
+        ).fetchone()
+        receipt = conn.execute(
+            "SELECT received_qty, conformity_status, note FROM purchase_order_receipts WHERE purchase_order_line_id = ?",
+            (ids["clothing_line"],),
+        ).fetchone()
+        pharmacy_movement = conn.execute(
+            "SELECT delta FROM pharmacy_movements WHERE pharmacy_item_id = ?", (ids["pharmacy_item"],)
+        ).fetchone()
+    assert (clothing["quantity"], remise["quantity"], pharmacy["quantity"]) == (2, 4, 7)
+    assert (receipt["received_qty"], receipt["conformity_status"], receipt["note"]) == (
+        2,
+        "conforme",
+        "Livraison groupée",
+    )
+    assert pharmacy_movement["delta"] == 5
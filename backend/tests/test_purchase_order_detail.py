@@ -1,6 +1,14 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
+import os
+
+from fastapi.testclient import TestClient
+
+from backend.app import app
 from backend.core import db, models, services
+from backend.services.pdf import purchase_order_cache
+from backend.tests.auth_helpers import login_headers
 
 
 def test_purchase_order_detail_includes_sku_and_unit() -> None:
@@ -57,3 +65,196 @@ def test_purchase_order_detail_includes_nonconformities_list() -> None:
     order = services.get_purchase_order(order_id)
     assert isinstance(order.nonconformities, list)
     assert order.nonconformities == []
+
+
+def _seed_orders(count: int) -> None:
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM purchase_order_receipts")
+        conn.execute("DELETE FROM purchase_order_items")
+        conn.execute("DELETE FROM purchase_orders")
+        conn.execute("DELETE FROM items")
+        item_ids = [
+            conn.execute(
+                "INSERT INTO items (name, sku, size, quantity) VALUES (?, ?, ?, ?)",
+                (f"Article {index}", f"SKU-BATCH-{index}", "M", 0),
+            ).lastrowid
+            for index in range(2)
+        ]
+        for index in range(count):
+            order_id = conn.execute(
+                "INSERT INTO purchase_orders (status, note, auto_created) VALUES (?, ?, ?)",
+                ("ORDERED", f"Commande {index}", index % 2),
+            ).lastrowid
+            for item_id in item_ids:
+                line_id = conn.execute(
+                    """
+                    INSERT INTO purchase_order_items (purchase_order_id, item_id, quantity_ordered, quantity_received)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    (order_id, item_id, 4, 1),
+                ).lastrowid
+                conn.execute(
+                    """
+                    INSERT INTO purchase_order_receipts (
+                        site_key, purchase_order_id, purchase_order_line_id, module,
+                        received_qty, conformity_status
+                    )
+                    VALUES (?, ?, ?, 'clothing', 1, 'conforme')
+                    """,
+                    (db.get_current_site_key(), order_id, line_id),
+                )
+
+
+def test_list_purchase_orders_uses_constant_number_of_queries(monkeypatch) -> None:
+    services.ensure_database_ready()
+    statements: list[str] = []
+    original = db.get_stock_connection
+
+    @contextmanager
+    def _traced_connection(*args, **kwargs):
+        with original(*args, **kwargs) as conn:
+            conn.set_trace_callback(statements.append)
+            yield conn
+
+    def _count_list_queries() -> tuple[int, list[models.PurchaseOrderDetail]]:
+        statements.clear()
+        monkeypatch.setattr(db, "get_stock_connection", _traced_connection)
+        try:
+            orders = services.list_purchase_orders()
+        finally:
+            monkeypatch.setattr(db, "get_stock_connection", original)
+        return (
+            len([sql for sql in statements if "INTO temp.purchase_order_batch" not in sql]),
+            orders,
+        )
+
+    _seed_orders(3)
+    small_count, small_orders = _count_list_queries()
+    _seed_orders(40)
+    large_count, large_orders = _count_list_queries()
+
+    assert len(small_orders) == 3
+    assert len(large_orders) == 40
+    assert large_count == small_count
+    detail = services.get_purchase_order(large_orders[5].id)
+    assert large_orders[5] == detail
+    assert [item.received_conforme_qty for item in detail.items] == [1, 1]
+    assert len(detail.receipts) == 2
+
+
+def test_purchase_order_summary_filters_and_paginates() -> None:
+    services.ensure_database_ready()
+    _seed_orders(5)
+    client = TestClient(app)
+    headers = login_headers(client, "admin", "admin123")
+
+    first = client.get("/purchase-orders/summary", params={"limit": 2}, headers=headers)
+    assert first.status_code == 200, first.text
+    first_page = first.json()
+    assert [order["note"] for order in first_page["items"]] == ["Commande 4", "Commande 3"]
+    assert first_page["items"][0]["line_count"] == 2
+    assert first_page["items"][0]["quantity_ordered"] == 8
+    assert first_page["items"][0]["quantity_received"] == 2
+    assert "items" not in first_page["items"][0]
+
+    seen = [order["id"] for order in first_page["items"]]
+    cursor = first_page["next_cursor"]
+    while cursor:
+        page = client.get(
+            "/purchase-orders/summary", params={"limit": 2, "cursor": cursor}, headers=headers
+        ).json()
+        seen.extend(order["id"] for order in page["items"])
+        cursor = page["next_cursor"]
+    assert len(seen) == len(set(seen)) == 5
+
+    auto = services.list_purchase_order_summaries("clothing", auto_created=True)
+    assert [order.note for order in auto.items] == ["Commande 3", "Commande 1"]
+    by_item = services.list_purchase_order_summaries("clothing", search="SKU-BATCH-1", statuses=["ordered"])
+    assert len(by_item.items) == 5
+    assert services.list_purchase_order_summaries("clothing", statuses=["RECEIVED"]).items == []
+
+    invalid = client.get("/purchase-orders/summary", params={"cursor": "%%%"}, headers=headers)
+    assert invalid.status_code == 400
+
+    parent_id = seen[0]
+    with db.get_stock_connection() as conn:
+        replacement_id = conn.execute(
+            """
+            INSERT INTO purchase_orders (status, note, created_at, kind, parent_id)
+            VALUES ('PENDING', 'Remplacement', CURRENT_TIMESTAMP, 'replacement_request', ?)
+            """,
+            (parent_id,),
+        ).lastrowid
+    listed = services.list_purchase_order_summaries("clothing")
+    assert replacement_id not in [order.id for order in listed.items]
+    children = client.get(
+        "/purchase-orders/summary", params={"parent_id": parent_id}, headers=headers
+    ).json()["items"]
+    assert [(order["id"], order["kind"], order["parent_id"]) for order in children] == [
+        (replacement_id, "replacement_request", parent_id)
+    ]
+    assert services.list_purchase_order_summaries("pharmacy", parent_id=parent_id).items == []
+
+
+def test_purchase_order_pdf_is_cached_with_etag(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("PURCHASE_ORDER_PDF_CACHE_DIR", str(tmp_path))
+    services.ensure_database_ready()
+    _seed_orders(1)
+    client = TestClient(app)
+    headers = login_headers(client, "admin", "admin123")
+    order_id = services.list_purchase_orders()[0].id
+
+    first = client.get(f"/purchase-orders/{order_id}/pdf", headers=headers)
+    assert first.status_code == 200, first.text
+    assert first.content.startswith(b"%PDF")
+    etag = first.headers["etag"]
+    assert len(list(tmp_path.glob("*.pdf"))) == 1
+
+    cached = client.get(
+        f"/purchase-orders/{order_id}/pdf", headers={**headers, "If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert len(list(tmp_path.glob("*.pdf"))) == 1
+    for header in (f'"other", W/{etag}', "*"):
+        listed = client.get(
+            f"/purchase-orders/{order_id}/pdf", headers={**headers, "If-None-Match": header}
+        )
+        assert listed.status_code == 304
+    mismatch = client.get(
+        f"/purchase-orders/{order_id}/pdf", headers={**headers, "If-None-Match": '"other"'}
+    )
+    assert mismatch.status_code == 200
+    assert mismatch.content == first.content
+
+    services.update_purchase_order(order_id, models.PurchaseOrderUpdate(note="Note modifiée"))
+    changed = client.get(
+        f"/purchase-orders/{order_id}/pdf", headers={**headers, "If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+def test_purchase_order_pdf_cache_evicts_least_recently_used(tmp_path, monkeypatch) -> None:
+    monkeypatch.setenv("PURCHASE_ORDER_PDF_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("PURCHASE_ORDER_PDF_CACHE_MAX_BYTES", "250")
+    renders: list[str] = []
+
+    def _get(name: str) -> purchase_order_cache.CachedPdf:
+        def _render() -> bytes:
+            renders.append(name)
+            return name.encode("ascii") * 100
+
+        return purchase_order_cache.get_or_render(purchase_order_cache.cache_key({"name": name}), _render)
+
+    first = _get("a")
+    os.utime(first.path, (1, 1))
+    second = _get("b")
+    os.utime(second.path, (2, 2))
+    assert _get("a").cache_hit
+    _get("c")
+
+    assert renders == ["a", "b", "c"]
+    assert first.path.exists()
+    assert not second.path.exists()
+    second.path.write_bytes(b"stale")
+    assert second.read_bytes() == b"b" * 100
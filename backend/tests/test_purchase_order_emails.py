@@ -11,7 +11,7 @@ if str(ROOT) not in sys.path:
 
 from backend.app import app
 from backend.core import db, security, services
-from backend.services import email_sender
+from backend.services import email_sender, notifications
 from backend.tests.auth_helpers import login_headers
 
 client = TestClient(app)
@@ -22,6 +22,7 @@ def _reset_tables() -> None:
     with db.get_core_connection() as conn:
         conn.execute("DELETE FROM purchase_order_email_log")
         conn.execute("DELETE FROM purchase_order_audit_log")
+        conn.execute("DELETE FROM email_outbox")
         conn.commit()
     with db.get_stock_connection() as conn:
         conn.execute("DELETE FROM purchase_order_items")
@@ -133,7 +134,7 @@ def test_send_purchase_order_to_supplier_success() -> None:
     headers = _login_headers("po_admin", "password")
     order_id = _create_purchase_order(supplier_email="supplier@example.com")
 
-    with patch("backend.core.services.email_sender.send_email") as send_email:
+    with patch("backend.services.email_sender.send_email") as send_email:
         send_email.return_value = "msg-123"
         response = client.post(
             f"/purchase-orders/{order_id}/send-to-supplier",
@@ -141,11 +142,21 @@ def test_send_purchase_order_to_supplier_success() -> None:
             json={},
         )
 
-    assert response.status_code == 200, response.text
-    payload = response.json()
-    assert payload["status"] == "sent"
-    assert payload["sent_to"] == "supplier@example.com"
-
+        assert response.status_code == 202, response.text
+        payload = response.json()
+        assert payload["status"] == "queued"
+        assert payload["sent_to"] == "supplier@example.com"
+        send_email.assert_not_called()
+        with db.get_stock_connection() as conn:
+            row = conn.execute(
+                "SELECT last_sent_at FROM purchase_orders WHERE id = ?",
+                (order_id,),
+            ).fetchone()
+        assert row["last_sent_at"] is None
+
+        result = notifications.run_outbox_once()
+
+    assert result.sent == 1
     send_email.assert_called_once()
     kwargs = send_email.call_args.kwargs
     assert kwargs["reply_to"] == admin_email
@@ -154,9 +165,13 @@ def test_send_purchase_order_to_supplier_success() -> None:
 
     with db.get_core_connection() as conn:
         row = conn.execute(
-            "SELECT status, supplier_email, user_email, message_id FROM purchase_order_email_log"
+            """
+            SELECT status, supplier_email, user_email, message_id, tracking_id
+            FROM purchase_order_email_log
+            """
         ).fetchone()
     assert row is not None
+    assert row["tracking_id"] == payload["tracking_id"]
     assert row["status"] == "sent"
     assert row["supplier_email"] == "supplier@example.com"
     assert row["user_email"] == admin_email
@@ -180,21 +195,25 @@ def test_send_purchase_order_to_supplier_failure_logs() -> None:
     order_id = _create_purchase_order(supplier_email="supplier@example.com")
 
     with patch(
-        "backend.core.services.email_sender.send_email",
+        "backend.services.email_sender.send_email",
         side_effect=email_sender.EmailSendError("SMTP down"),
-    ):
+    ) as send_email:
         response = client.post(
             f"/purchase-orders/{order_id}/send-to-supplier",
             headers=headers,
             json={},
         )
+        assert response.status_code == 202, response.text
+        for _ in range(services.PURCHASE_ORDER_EMAIL_MAX_ATTEMPTS + 1):
+            notifications.run_outbox_once()
 
-    assert response.status_code == 500
+    assert send_email.call_count == services.PURCHASE_ORDER_EMAIL_MAX_ATTEMPTS
     with db.get_core_connection() as conn:
-        row = conn.execute(
+        rows = conn.execute(
             "SELECT status, error_message FROM purchase_order_email_log"
-        ).fetchone()
-    assert row is not None
+        ).fetchall()
+    assert len(rows) == 1
+    row = rows[0]
     assert row["status"] == "failed"
     assert row["error_message"]
 
@@ -310,16 +329,17 @@ def test_send_pharmacy_purchase_order_to_supplier_success() -> None:
     headers = _login_headers("po_admin", "password")
     order_id = _create_pharmacy_purchase_order(supplier_email="supplier@example.com")
 
-    with patch("backend.core.services.email_sender.send_email") as send_email:
+    with patch("backend.services.email_sender.send_email") as send_email:
         send_email.return_value = "msg-456"
         response = client.post(
             f"/pharmacy/orders/{order_id}/send-to-supplier",
             headers=headers,
         )
+        notifications.run_outbox_once()
 
-    assert response.status_code == 200, response.text
+    assert response.status_code == 202, response.text
     payload = response.json()
-    assert payload["status"] == "sent"
+    assert payload["status"] == "queued"
     assert payload["sent_to"] == "supplier@example.com"
 
     send_email.assert_called_once()
@@ -342,3 +362,86 @@ def test_send_pharmacy_purchase_order_to_supplier_success() -> None:
     assert row["action"] == "send_to_supplier"
     assert row["status"] == "ok"
     assert row["recipient_email"] == "supplier@example.com"
+
+
+def test_outbox_rows_are_claimed_before_sending() -> None:
+    _reset_tables()
+    email_id = notifications.enqueue_email(
+        "claim@example.com", "Sujet", "Corps", reply_to="buyer@example.com"
+    )
+
+    # Another worker already holds the row: this run must not send it.
+    assert len(notifications._claim_outbox_rows(10, "other-worker")) == 1
+    with patch("backend.services.email_sender.send_email") as send_email:
+        send_email.return_value = "msg-claim"
+        assert notifications.run_outbox_once().sent == 0
+        send_email.assert_not_called()
+
+        # A stale claim (crashed worker) is taken over.
+        with db.get_core_connection() as conn:
+            conn.execute(
+                "UPDATE email_outbox SET claimed_at = '2000-01-01T00:00:00+00:00' WHERE id = ?",
+                (email_id,),
+            )
+        assert notifications.run_outbox_once().sent == 1
+        send_email.assert_called_once()
+
+    with db.get_core_connection() as conn:
+        row = conn.execute(
+            "SELECT sent_at, claimed_at, claim_token FROM email_outbox WHERE id = ?",
+            (email_id,),
+        ).fetchone()
+    assert row["sent_at"]
+    assert row["claimed_at"] is None
+    assert row["claim_token"] is None
+
+
+def test_outbox_failure_releases_claim() -> None:
+    _reset_tables()
+    email_id = notifications.enqueue_email(
+        "claim@example.com", "Sujet", "Corps", reply_to="buyer@example.com"
+    )
+
+    with patch(
+        "backend.services.email_sender.send_email",
+        side_effect=email_sender.EmailSendError("SMTP down"),
+    ):
+        assert notifications.run_outbox_once().failed == 1
+
+    with db.get_core_connection() as conn:
+        row = conn.execute(
+            "SELECT send_attempts, claimed_at, claim_token FROM email_outbox WHERE id = ?",
+            (email_id,),
+        ).fetchone()
+    assert row["send_attempts"] == 1
+    assert row["claimed_at"] is None
+    assert row["claim_token"] is None
+
+
+def test_outbox_attachment_render_error_counts_as_failed_attempt() -> None:
+    _reset_tables()
+    email_id = notifications.enqueue_email(
+        "claim@example.com",
+        "Sujet",
+        "Corps",
+        attachments=[{"kind": "purchase_order_pdf"}],
+        max_attempts=1,
+    )
+
+    with patch(
+        "backend.core.services.render_email_attachment",
+        side_effect=OSError("disque plein"),
+    ), patch("backend.services.email_sender.send_email") as send_email:
+        result = notifications.run_outbox_once()
+
+    assert result.failed == 1
+    send_email.assert_not_called()
+    with db.get_core_connection() as conn:
+        row = conn.execute(
+            "SELECT send_attempts, failed_at, last_error, claim_token FROM email_outbox WHERE id = ?",
+            (email_id,),
+        ).fetchone()
+    assert row["send_attempts"] == 1
+    assert row["failed_at"]
+    assert "disque plein" in row["last_error"]
+    assert row["claim_token"] is None
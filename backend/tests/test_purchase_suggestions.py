@@ -476,3 +476,243 @@ def test_module_without_expiry_field_does_not_break() -> None:
     assert len(lines) == 1
     assert lines[0]["reason_codes"] == ["LOW_STOCK"]
     assert lines[0]["expiry_date"] is None
+
+
+def test_forecast_strategy_uses_consumption_history() -> None:
+    _reset_tables()
+    _create_user("suggest_admin", "password", role="admin")
+    headers = _login_headers("suggest_admin", "password")
+
+    today = date.today()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM movements")
+        supplier_id = conn.execute(
+            "INSERT INTO suppliers (name) VALUES ('Fournisseur Prévision')"
+        ).lastrowid
+        item_id = conn.execute(
+            """
+            INSERT INTO items (name, sku, quantity, low_stock_threshold, track_low_stock, supplier_id)
+            VALUES ('Gants nitrile', 'CL-FC', 10, 2, 1, ?)
+            """,
+            (supplier_id,),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO movements (item_id, delta, reason, created_at) VALUES (?, ?, ?, ?)",
+            [
+                (item_id, -3, "Sortie", f"{(today - timedelta(days=offset)).isoformat()} 09:00:00")
+                for offset in range(30)
+            ]
+            + [(item_id, -50, "Ajustement inventaire", f"{today.isoformat()} 10:00:00")],
+        )
+        conn.commit()
+
+    threshold_only = client.post(
+        "/purchasing/suggestions/refresh", json={"module_keys": ["clothing"]}, headers=headers
+    )
+    assert threshold_only.status_code == 200, threshold_only.text
+    assert threshold_only.json() == []
+
+    forecasts = client.get(
+        "/purchasing/forecasts", params={"module": "clothing"}, headers=headers
+    ).json()
+    assert forecasts == [
+        {
+            "item_id": item_id,
+            "quantity": 10,
+            "avg_daily": 1.0,
+            "std_daily": 1.414,
+            "days_of_cover": 10.0,
+            "reorder_point": 14,
+            "order_up_to": 44,
+            "needs_reorder": True,
+        }
+    ]
+
+    response = client.post(
+        "/purchasing/suggestions/refresh",
+        json={"module_keys": ["clothing"], "strategy": "forecast"},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    [suggestion] = response.json()
+    [line] = suggestion["lines"]
+    assert line["item_id"] == item_id
+    assert line["qty_suggested"] == 34
+    assert line["reason_codes"] == ["LOW_COVER"]
+    assert line["reason_label"] == "Couverture insuffisante (10 j)"
+
+    # Scheduled runs keep the strategy of the last refresh instead of falling back to
+    # thresholds, which would dismiss the forecast draft.
+    site_key = db.get_current_site_key()
+    with db.get_stock_connection() as conn:
+        conn.execute(
+            "UPDATE purchase_suggestion_refresh_state SET full_refreshed_on = NULL WHERE module = 'clothing'"
+        )
+        conn.commit()
+    assert services.refresh_stale_purchase_suggestions(site_key)["clothing"] == 1
+    with db.get_stock_connection() as conn:
+        conn.execute("UPDATE items SET quantity = 9 WHERE id = ?", (item_id,))
+        conn.commit()
+    assert services.refresh_stale_purchase_suggestions(site_key)["clothing"] == 1
+    [scheduled] = services.list_purchase_suggestions(
+        site_key=site_key, module_key="clothing", status="draft"
+    )
+    [scheduled_line] = scheduled.lines
+    assert scheduled_line.reason_codes == ["LOW_COVER"]
+    assert scheduled_line.qty_suggested == 35
+
+
+def test_refresh_upserts_lines_and_keeps_manual_quantities() -> None:
+    _reset_tables()
+    site_key = db.get_current_site_key()
+    with db.get_stock_connection() as conn:
+        supplier_id = conn.execute("INSERT INTO suppliers (name) VALUES ('Fournisseur C')").lastrowid
+        item_ids = [
+            conn.execute(
+                """
+                INSERT INTO items (name, sku, quantity, low_stock_threshold, track_low_stock, supplier_id)
+                VALUES (?, ?, 1, 10, 1, ?)
+                """,
+                (f"Article {index}", f"UP-{index:03d}", supplier_id),
+            ).lastrowid
+            for index in range(50)
+        ]
+        conn.commit()
+
+    (suggestion,) = services.refresh_purchase_suggestions(site_key=site_key, module_keys=["clothing"])
+    assert len(suggestion.lines) == 50
+    edited = next(line for line in suggestion.lines if line.item_id == item_ids[0])
+    with db.get_stock_connection() as conn:
+        conn.execute("UPDATE purchase_suggestion_lines SET qty_final = 42 WHERE id = ?", (edited.id,))
+        conn.execute("UPDATE items SET quantity = 50 WHERE id = ?", (item_ids[1],))
+        conn.execute("UPDATE items SET quantity = 3 WHERE id = ?", (item_ids[2],))
+        conn.commit()
+
+    (refreshed,) = services.refresh_purchase_suggestions(site_key=site_key, module_keys=["clothing"])
+    lines_by_item = {line.item_id: line for line in refreshed.lines}
+    assert refreshed.id == suggestion.id
+    assert len(lines_by_item) == 49
+    assert item_ids[1] not in lines_by_item
+    assert lines_by_item[item_ids[0]].id == edited.id
+    assert lines_by_item[item_ids[0]].qty_final == 42
+    assert lines_by_item[item_ids[2]].stock_current == 3
+    assert lines_by_item[item_ids[2]].qty_final == lines_by_item[item_ids[2]].qty_suggested
+
+    with db.get_stock_connection() as conn:
+        conn.execute("UPDATE items SET quantity = 50")
+        conn.commit()
+    assert services.refresh_purchase_suggestions(site_key=site_key, module_keys=["clothing"]) == []
+    with db.get_stock_connection() as conn:
+        row = conn.execute(
+            "SELECT status FROM purchase_suggestions WHERE id = ?", (suggestion.id,)
+        ).fetchone()
+        remaining = conn.execute("SELECT COUNT(*) AS total FROM purchase_suggestion_lines").fetchone()
+    assert row["status"] == "dismissed"
+    assert remaining["total"] == 0
+
+
+def test_supplier_names_resolved_from_one_lookup_per_run() -> None:
+    _reset_tables()
+    with db.get_stock_connection() as conn:
+        supplier_id = conn.execute(
+            "INSERT INTO suppliers (name) VALUES ('Pharma  Nord')"
+        ).lastrowid
+        for index, supplier_name in enumerate(["pharma nord", "  PHARMA NORD ", "Inconnu"]):
+            conn.execute(
+                """
+                INSERT INTO pharmacy_items (name, quantity, low_stock_threshold, extra_json)
+                VALUES (?, 0, 5, ?)
+                """,
+                (f"Article {index}", f'{{"fournisseur": "{supplier_name}"}}'),
+            )
+        conn.commit()
+
+        statements: list[str] = []
+        conn.set_trace_callback(statements.append)
+        try:
+            candidates = services._get_reorder_candidates(conn, "pharmacy", 0, 0)
+        finally:
+            conn.set_trace_callback(None)
+
+    suppliers_by_label = {line["label"]: line["supplier_id"] for line in candidates}
+    assert suppliers_by_label == {
+        "Article 0": supplier_id,
+        "Article 1": supplier_id,
+        "Article 2": None,
+    }
+    assert sum("FROM suppliers" in statement for statement in statements) == 1
+
+
+def test_scheduled_refresh_recomputes_changed_items_only() -> None:
+    _reset_tables()
+    site_key = db.get_current_site_key()
+    with db.get_stock_connection() as conn:
+        supplier_id = conn.execute(
+            "INSERT INTO suppliers (name) VALUES ('Fournisseur Planifié')"
+        ).lastrowid
+        restocked, untouched, newly_low = (
+            conn.execute(
+                """
+                INSERT INTO items (name, sku, quantity, low_stock_threshold, track_low_stock, supplier_id)
+                VALUES (?, ?, ?, 5, 1, ?)
+                """,
+                (name, sku, quantity, supplier_id),
+            ).lastrowid
+            for name, sku, quantity in (
+                ("Gilet", "CL-30", 1),
+                ("Casquette", "CL-31", 2),
+                ("Ceinture", "CL-32", 9),
+            )
+        )
+        conn.commit()
+
+    first_run = services.refresh_stale_purchase_suggestions(site_key)
+    assert first_run["clothing"] == 2
+    assert services.refresh_stale_purchase_suggestions(site_key)["clothing"] == 0
+
+    with db.get_stock_connection() as conn:
+        conn.execute("UPDATE items SET quantity = 8 WHERE id = ?", (restocked,))
+        conn.execute("UPDATE items SET quantity = 0 WHERE id = ?", (newly_low,))
+        conn.execute(
+            "UPDATE purchase_suggestion_lines SET qty_final = 10 WHERE item_id = ?",
+            (untouched,),
+        )
+        conn.commit()
+
+    assert services.refresh_stale_purchase_suggestions(site_key)["clothing"] == 2
+
+    with db.get_stock_connection() as conn:
+        lines = conn.execute(
+            """
+            SELECT psl.item_id, psl.qty_final
+            FROM purchase_suggestion_lines AS psl
+            JOIN purchase_suggestions AS ps ON ps.id = psl.suggestion_id
+            WHERE ps.module_key = 'clothing' AND ps.status = 'draft'
+            """
+        ).fetchall()
+        pending = conn.execute("SELECT COUNT(*) FROM purchase_suggestion_dirty_items").fetchone()[0]
+    assert {row["item_id"]: row["qty_final"] for row in lines} == {untouched: 10, newly_low: 5}
+    assert pending == 0
+
+
+def test_change_tracking_triggers_follow_tracked_columns() -> None:
+    services.ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        conn.executescript(
+            """
+            DROP TRIGGER IF EXISTS trg_items_suggestion_dirty_update;
+            CREATE TRIGGER trg_items_suggestion_dirty_update
+            AFTER UPDATE OF name ON items
+            BEGIN
+                INSERT OR IGNORE INTO purchase_suggestion_dirty_items (module, item_id)
+                VALUES ('clothing', NEW.id);
+            END;
+            """
+        )
+        services._ensure_purchase_suggestion_change_tracking(conn)
+        conn.commit()
+        trigger_sql = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'trg_items_suggestion_dirty_update'"
+        ).fetchone()["sql"]
+    assert "low_stock_threshold" in trigger_sql
+    assert "quantity" in trigger_sql
@@ -10,7 +10,7 @@ if str(ROOT) not in sys.path:
 
 from backend.app import app
 from backend.core import db, security, services
-from backend.services import email_sender
+from backend.services import email_sender, notifications
 from backend.tests.auth_helpers import login_headers
 
 client = TestClient(app)
@@ -21,6 +21,7 @@ def _reset_tables() -> None:
     with db.get_core_connection() as conn:
         conn.execute("DELETE FROM purchase_order_email_log")
         conn.execute("DELETE FROM purchase_order_audit_log")
+        conn.execute("DELETE FROM email_outbox")
         conn.commit()
     with db.get_stock_connection() as conn:
         conn.execute("DELETE FROM remise_purchase_order_items")
@@ -108,17 +109,18 @@ def test_send_remise_purchase_order_to_supplier_success() -> None:
     headers = _login_headers("remise_admin", "password")
     order_id, _ = _create_remise_purchase_order(supplier_email="sebastien.cangemi@orange.fr")
 
-    with patch("backend.core.services.email_sender.send_email") as send_email:
+    with patch("backend.services.email_sender.send_email") as send_email:
         send_email.return_value = "msg-456"
         response = client.post(
             f"/remise-inventory/orders/{order_id}/send-to-supplier",
             headers=headers,
             json={},
         )
+        notifications.run_outbox_once()
 
-    assert response.status_code == 200, response.text
+    assert response.status_code == 202, response.text
     payload = response.json()
-    assert payload["status"] == "sent"
+    assert payload["status"] == "queued"
     assert payload["sent_to"] == "sebastien.cangemi@orange.fr"
 
     send_email.assert_called_once()
@@ -234,7 +236,7 @@ def test_send_remise_purchase_order_email_send_failure_logs() -> None:
     order_id, _ = _create_remise_purchase_order(supplier_email="contact@example.com")
 
     with patch(
-        "backend.core.services.email_sender.send_email",
+        "backend.services.email_sender.send_email",
         side_effect=email_sender.EmailSendError("SMTP down"),
     ):
         response = client.post(
@@ -242,8 +244,10 @@ def test_send_remise_purchase_order_email_send_failure_logs() -> None:
             headers=headers,
             json={},
         )
+        assert response.status_code == 202, response.text
+        for _ in range(services.PURCHASE_ORDER_EMAIL_MAX_ATTEMPTS):
+            notifications.run_outbox_once()
 
-    assert response.status_code == 500
     with db.get_core_connection() as conn:
         row = conn.execute(
             "SELECT status, error_message, module_key FROM purchase_order_email_log"
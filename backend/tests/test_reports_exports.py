@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import csv
+import importlib.util
+import io
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.core import db, services
+from backend.tests.auth_helpers import login_headers
+
+client = TestClient(app)
+
+
+def _seed_clothing(movement_count: int) -> int:
+    services.ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM movements")
+        conn.execute("DELETE FROM items")
+        item_id = conn.execute(
+            "INSERT INTO items (name, sku, size, quantity, low_stock_threshold) VALUES (?, ?, ?, ?, ?)",
+            ("Parka", "EXP-1", "XL", 7, 2),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO movements (item_id, delta, reason, created_at) VALUES (?, ?, ?, ?)",
+            [(item_id, 1, "Appro", "2024-02-01 08:00:00") for _ in range(movement_count)],
+        )
+    return int(item_id)
+
+
+def test_items_csv_export_streams_legacy_columns() -> None:
+    _seed_clothing(0)
+    headers = login_headers(client, "admin", "admin123")
+    response = client.get("/reports/export/csv", headers=headers)
+    assert response.status_code == 200
+    assert 'filename="inventaire.csv"' in response.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["ID", "Nom", "SKU", "Catégorie", "Taille", "Quantité", "Seuil bas"]
+    assert rows[1][1:] == ["Parka", "EXP-1", "", "XL", "7", "2"]
+
+
+def test_movement_export_streams_every_chunk() -> None:
+    item_id = _seed_clothing(12_001)
+    headers = login_headers(client, "admin", "admin123")
+
+    ndjson = client.get(
+        "/reports/export/movements",
+        params={"module": "clothing", "format": "ndjson"},
+        headers=headers,
+    )
+    assert ndjson.status_code == 200
+    assert ndjson.headers["content-type"].startswith("application/x-ndjson")
+    lines = ndjson.text.splitlines()
+    assert len(lines) == 12_001
+    assert json.loads(lines[0])["item_id"] == item_id
+
+    as_csv = client.get(
+        "/reports/export/movements", params={"module": "clothing"}, headers=headers
+    )
+    assert as_csv.status_code == 200
+    rows = list(csv.reader(io.StringIO(as_csv.text)))
+    assert rows[0] == ["id", "item_id", "delta", "reason", "created_at"]
+    assert len(rows) == 12_002
+
+
+def test_export_rejects_unknown_dataset_and_format() -> None:
+    headers = login_headers(client, "admin", "admin123")
+    assert client.get("/reports/export/unknown", headers=headers).status_code == 400
+    assert (
+        client.get(
+            "/reports/export/purchase_orders",
+            params={"module": "vehicle_inventory"},
+            headers=headers,
+        ).status_code
+        == 400
+    )
+    assert (
+        client.get(
+            "/reports/export/dotations", params={"format": "xml"}, headers=headers
+        ).status_code
+        == 400
+    )
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("pyarrow") is not None, reason="pyarrow est installé"
+)
+def test_parquet_export_requires_pyarrow() -> None:
+    headers = login_headers(client, "admin", "admin123")
+    response = client.get(
+        "/reports/export/items",
+        params={"module": "pharmacy", "format": "parquet"},
+        headers=headers,
+    )
+    assert response.status_code == 400
+    assert "pyarrow" in response.json()["detail"]
+
+
+def test_parquet_export_falls_back_to_text_for_mismatched_values() -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    _seed_clothing(0)
+    with db.get_stock_connection() as conn:
+        conn.execute(
+            "INSERT INTO items (name, sku, quantity, low_stock_threshold) VALUES (?, ?, ?, ?)",
+            ("Gants", "EXP-2", "beaucoup", 3),
+        )
+    headers = login_headers(client, "admin", "admin123")
+    response = client.get(
+        "/reports/export/items",
+        params={"module": "clothing", "format": "parquet"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert str(table.schema.field("quantity").type) == "string"
+    assert table.column("quantity").to_pylist() == ["7", "beaucoup"]
+    assert str(table.schema.field("low_stock_threshold").type) == "int64"
+    assert table.column("low_stock_threshold").to_pylist() == [2, 3]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from datetime import date, timedelta
+
 from fastapi.testclient import TestClient
 
 from backend.app import app
@@ -140,3 +142,237 @@ def test_reports_overview_aggregation() -> None:
     assert series_map["2024-01-01"]["in"] == 10
     assert series_map["2024-01-02"]["out"] == 6
     assert payload["tops"]["out"][0]["qty"] == 6
+
+
+def test_reports_overview_reads_incremental_rollups() -> None:
+    headers = login_headers(client, "admin", "admin123")
+    services.ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM movements")
+        conn.execute("DELETE FROM items")
+        item_id = conn.execute(
+            "INSERT INTO items (name, sku, size, quantity) VALUES (?, ?, ?, ?)",
+            ("Veste", "SKU-R", "L", 20),
+        ).lastrowid
+        conn.executemany(
+            "INSERT INTO movements (item_id, delta, reason, created_at) VALUES (?, ?, ?, ?)",
+            [
+                (item_id, 8, "Appro", "2024-03-04 09:00:00"),
+                (item_id, -3, "Dotation Jean", "2024-03-06 10:00:00"),
+                (item_id, -2, "Ajustement", "2024-03-12 10:00:00"),
+                (item_id, 5, "Appro", "2024-03-13 10:00:00"),
+            ],
+        )
+        conn.execute(
+            "DELETE FROM movements WHERE item_id = ? AND delta = 5", (item_id,)
+        )
+        conn.execute(
+            "UPDATE movements SET created_at = ? WHERE item_id = ? AND delta = -2",
+            ("2024-03-11 10:00:00", item_id),
+        )
+        rows = conn.execute(
+            """
+            SELECT day, qty_in, qty_out, move_count
+            FROM movement_daily_rollups
+            WHERE module = 'clothing'
+            ORDER BY day
+            """
+        ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        ("2024-03-04", 8, 0, 1),
+        ("2024-03-06", 0, 3, 1),
+        ("2024-03-11", 0, 2, 1),
+    ]
+
+    params = {"module": "clothing", "start": "2024-03-01", "end": "2024-03-31", "bucket": "week"}
+    response = client.get("/reports/overview", params=params, headers=headers)
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["kpis"]["in_qty"] == 8
+    assert payload["kpis"]["out_qty"] == 5
+    series_map = {entry["t"]: entry for entry in payload["series"]["moves"]}
+    assert series_map["2024-03-04"]["out"] == 3
+    assert series_map["2024-03-11"]["out"] == 2
+    assert payload["tops"]["out"][0] == {"sku": "SKU-R", "name": "Veste", "qty": 5}
+
+    filtered = client.get(
+        "/reports/overview",
+        params={**params, "include_dotation": False, "include_adjustment": False},
+        headers=headers,
+    ).json()
+    assert filtered["kpis"]["out_qty"] == 0
+
+    rebuild = client.post(
+        "/admin/reports/rollups/rebuild", json={"module_key": "clothing"}, headers=headers
+    )
+    assert rebuild.status_code == 200
+    assert rebuild.json()["rebuilt"] == {"clothing": 3}
+    assert client.get("/reports/overview", params=params, headers=headers).json() == payload
+
+
+def test_reports_overview_low_stock_history_from_snapshots() -> None:
+    headers = login_headers(client, "admin", "admin123")
+    services.ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM movements")
+        conn.execute("DELETE FROM items")
+        conn.execute("DELETE FROM stock_daily_snapshots WHERE module = 'clothing'")
+        item_id = conn.execute(
+            """
+            INSERT INTO items (name, sku, size, quantity, low_stock_threshold, track_low_stock)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            ("Casque", "SKU-S", "U", 1, 5, 1),
+        ).lastrowid
+    assert services.capture_stock_snapshots(day=date(2024, 5, 1))["clothing"] == 1
+    assert services.capture_stock_snapshots(day=date(2024, 5, 2))["clothing"] == 0
+    with db.get_stock_connection() as conn:
+        conn.execute("UPDATE items SET quantity = 10 WHERE id = ?", (item_id,))
+    services.capture_stock_snapshots(day=date(2024, 5, 3))
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
+    services.capture_stock_snapshots(day=date(2024, 5, 4))
+
+    response = client.get(
+        "/reports/overview",
+        params={"module": "clothing", "start": "2024-04-30", "end": "2024-05-04", "bucket": "day"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    series = response.json()["series"]
+    assert [point["count"] for point in series["low_stock"]] == [0, 1, 1, 0, 0]
+    assert [point["quantity"] for point in series["stock"]] == [0, 1, 1, 10, 0]
+
+
+def test_reports_overview_order_series_bucketed_in_sql() -> None:
+    headers = login_headers(client, "admin", "admin123")
+    services.ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM purchase_orders")
+        conn.executemany(
+            "INSERT INTO purchase_orders (status, created_at) VALUES (?, ?)",
+            [
+                ("PENDING", "2024-01-05 10:00:00"),
+                ("RECEIVED", "2024-01-20 10:00:00"),
+                ("CANCELLED", "2024-01-31T23:00:00"),
+                ("PARTIALLY_RECEIVED", "2024-02-01 08:00:00"),
+                ("ORDERED", "2024-03-15 08:00:00"),
+            ],
+        )
+
+    response = client.get(
+        "/reports/overview",
+        params={"module": "clothing", "start": "2024-01-01", "end": "2024-02-29", "bucket": "month"},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    orders = {entry["t"]: entry for entry in response.json()["series"]["orders"]}
+    assert orders["2024-01-01"] == {
+        "t": "2024-01-01",
+        "created": 3,
+        "ordered": 1,
+        "partial": 0,
+        "received": 1,
+        "cancelled": 1,
+    }
+    assert orders["2024-02-01"]["partial"] == 1
+    assert "2024-03-01" not in orders
+
+
+def test_reports_overview_cache_invalidated_by_writes() -> None:
+    headers = login_headers(client, "admin", "admin123")
+    services.ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM movements")
+        conn.execute("DELETE FROM items")
+        item_id = conn.execute(
+            "INSERT INTO items (name, sku, size, quantity) VALUES (?, ?, ?, ?)",
+            ("Bottes", "SKU-C", "42", 3),
+        ).lastrowid
+        conn.execute(
+            "INSERT INTO movements (item_id, delta, reason, created_at) VALUES (?, ?, ?, ?)",
+            (item_id, 4, "Appro", "2024-06-03 08:00:00"),
+        )
+    services.clear_report_cache()
+    params = {"module": "clothing", "start": "2024-06-01", "end": "2024-06-30"}
+
+    first = client.get("/reports/overview", params=params, headers=headers).json()
+    second = client.get("/reports/overview", params=params, headers=headers).json()
+    assert first == second
+    stats = client.get("/admin/reports/cache", headers=headers).json()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    with db.get_stock_connection() as conn:
+        conn.execute(
+            "INSERT INTO movements (item_id, delta, reason, created_at) VALUES (?, ?, ?, ?)",
+            (item_id, 2, "Appro", "2024-06-04 08:00:00"),
+        )
+    third = client.get("/reports/overview", params=params, headers=headers).json()
+    assert third["kpis"]["in_qty"] == 6
+    assert services.get_report_cache_stats().misses == 2
+
+
+def test_item_classification_abc_xyz_and_filters() -> None:
+    headers = login_headers(client, "admin", "admin123")
+    services.ensure_database_ready()
+    today = date.today()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM movements")
+        conn.execute("DELETE FROM items")
+        conn.execute("DELETE FROM item_classifications WHERE module = 'clothing'")
+        conn.execute("DELETE FROM item_classification_runs")
+        ids = {
+            name: conn.execute(
+                "INSERT INTO items (name, sku, quantity) VALUES (?, ?, ?)",
+                (name, f"SKU-{name}", 50),
+            ).lastrowid
+            for name in ("Gants", "Bottes", "Casque")
+        }
+        conn.executemany(
+            "INSERT INTO movements (item_id, delta, reason, created_at) VALUES (?, ?, ?, ?)",
+            [
+                (ids["Gants"], -1, "Sortie", f"{today - timedelta(days=offset)} 08:00:00")
+                for offset in range(365)
+            ]
+            + [
+                (ids["Bottes"], -60, "Sortie", f"{today - timedelta(days=3)} 08:00:00"),
+                (ids["Casque"], -40, "Ajustement", f"{today - timedelta(days=3)} 08:00:00"),
+            ],
+        )
+
+    pending = client.get("/reports/classification", params={"module": "clothing"}, headers=headers)
+    assert pending.status_code == 200
+    assert pending.json()["computed_on"] is None
+    assert pending.json()["items"] == []
+    with db.get_stock_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM item_classification_runs").fetchone()[0] == 0
+
+    refreshed = services.refresh_item_classifications()
+    assert refreshed["clothing"] == 3
+    assert set(refreshed) == {"clothing", "pharmacy", "inventory_remise", "vehicle_inventory"}
+    assert services.refresh_item_classifications() == {}
+
+    response = client.get("/reports/classification", params={"module": "clothing"}, headers=headers)
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["computed_on"] == today.isoformat()
+    classes = {entry["name"]: (entry["abc_class"], entry["xyz_class"]) for entry in payload["items"]}
+    assert classes == {"Gants": ("A", "X"), "Bottes": ("B", "Z"), "Casque": ("C", "Z")}
+    assert payload["counts"]["AX"] == 1
+    assert payload["items"][0]["consumption"] == 365
+
+    with db.get_stock_connection() as conn:
+        conn.execute(
+            "INSERT INTO movements (item_id, delta, reason, created_at) VALUES (?, ?, ?, ?)",
+            (ids["Casque"], -900, "Sortie", f"{today} 09:00:00"),
+        )
+    cached = client.get(
+        "/reports/classification", params={"module": "clothing", "abc": "A"}, headers=headers
+    ).json()
+    assert [entry["name"] for entry in cached["items"]] == ["Gants"]
+
+    listed = client.get("/items/", params={"abc": "AB", "xyz": "Z"}, headers=headers)
+    assert listed.status_code == 200
+    assert [item["name"] for item in listed.json()] == ["Bottes"]
+    invalid = client.get("/items/", params={"abc": "Q"}, headers=headers)
+    assert invalid.status_code == 400
@@ -0,0 +1,81 @@
+"""Reporting benchmark on a synthetic ledger of one million movements.
+
+Opt-in: set ``REPORTS_BENCHMARK=1`` to run it. It empties the clothing items and
+movements of the current site database.
+"""
+from __future__ import annotations
+
+import os
+import time
+from datetime import date
+
+import pytest
+
+from backend.core import db, services
+
+pytestmark = pytest.mark.skipif(
+    os.getenv("REPORTS_BENCHMARK") != "1",
+    reason="Benchmark désactivé (REPORTS_BENCHMARK=1 pour l'exécuter)",
+)
+
+_MOVEMENT_COUNT = 1_000_000
+_ITEM_COUNT = 500
+_MAX_SECONDS = 1.0
+
+
+def test_reports_overview_scales_with_one_million_movements() -> None:
+    services.ensure_database_ready()
+    with db.get_stock_connection() as conn:
+        conn.execute("DELETE FROM movements")
+        conn.execute("DELETE FROM items")
+        conn.execute(
+            """
+            WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+            INSERT INTO items (name, sku, size, quantity, low_stock_threshold, track_low_stock)
+            SELECT 'Article ' || n, 'BENCH-' || n, 'U', 100, 10, 1 FROM seq
+            """,
+            (_ITEM_COUNT,),
+        )
+        first_id = conn.execute("SELECT MIN(id) AS id FROM items").fetchone()["id"]
+        conn.execute(
+            """
+            WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < ?)
+            INSERT INTO movements (item_id, delta, reason, created_at)
+            SELECT ? + (n % ?),
+                   CASE WHEN n % 3 = 0 THEN 5 ELSE -2 END,
+                   CASE WHEN n % 7 = 0 THEN 'Dotation' ELSE 'Sortie' END,
+                   datetime('2023-01-01', '+' || (n % 730) || ' days', '+' || (n % 86400) || ' seconds')
+            FROM seq
+            """,
+            (_MOVEMENT_COUNT, first_id, _ITEM_COUNT),
+        )
+        expected = conn.execute(
+            """
+            SELECT SUM(CASE WHEN delta > 0 THEN delta ELSE 0 END) AS in_qty,
+                   SUM(CASE WHEN delta < 0 THEN -delta ELSE 0 END) AS out_qty
+            FROM movements
+            WHERE date(created_at) BETWEEN '2023-01-01' AND '2023-12-31'
+              AND lower(reason) NOT LIKE '%dotation%'
+            """
+        ).fetchone()
+
+    try:
+        started = time.perf_counter()
+        overview = services.get_reports_overview(
+            "clothing",
+            start=date(2023, 1, 1),
+            end=date(2023, 12, 31),
+            bucket="week",
+            include_dotation=False,
+        )
+        elapsed = time.perf_counter() - started
+
+        assert overview.kpis.in_qty == expected["in_qty"]
+        assert overview.kpis.out_qty == expected["out_qty"]
+        assert sum(point.in_qty for point in overview.series.moves) == expected["in_qty"]
+        assert len(overview.tops.out) == 5
+        assert elapsed < _MAX_SECONDS, f"Rapport trop lent: {elapsed:.2f}s"
+    finally:
+        with db.get_stock_connection() as conn:
+            conn.execute("DELETE FROM movements")
+            conn.execute("DELETE FROM items")
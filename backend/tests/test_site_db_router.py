@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import threading
+from datetime import date
 from pathlib import Path
 
 from fastapi.testclient import TestClient
@@ -163,3 +165,184 @@ def test_admin_can_switch_site(tmp_path, monkeypatch) -> None:
     skus = {item["sku"] for item in list_items.json()}
     assert "STE-ITEM" in skus
     assert "JLL-ITEM" not in skus
+
+
+def test_consolidated_stats_respects_site_access(tmp_path, monkeypatch) -> None:
+    _init_test_dbs(tmp_path, monkeypatch)
+    _create_user("central-admin", role="admin")
+    _create_user("gsm-viewer", role="user")
+    sites.set_user_site_assignment("gsm-viewer", "GSM")
+    viewer = services.get_user("gsm-viewer")
+    assert viewer is not None
+    services.upsert_module_permission(
+        models.ModulePermissionUpsert(user_id=viewer.id, module="clothing", can_view=True, can_edit=False)
+    )
+    for site_key, quantity in (("JLL", 4), ("GSM", 6)):
+        with db.get_stock_connection(site_key) as conn:
+            conn.execute("DELETE FROM items")
+            conn.execute(
+                "INSERT INTO items (name, sku, quantity) VALUES (?, ?, ?)",
+                (f"{site_key} Item", f"{site_key}-ITEM", quantity),
+            )
+
+    client = TestClient(app)
+    admin_headers = {"Authorization": f"Bearer {_login_token('central-admin', 'pass')}"}
+    response = client.get(
+        "/reports/consolidated/stats",
+        params={"module": "clothing", "site": ["JLL", "GSM"]},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["stats"]["total_stock"] == 10
+    assert payload["partial"] is False
+    assert {entry["site_key"]: entry["status"] for entry in payload["sites"]} == {
+        "JLL": "ok",
+        "GSM": "ok",
+    }
+
+    viewer_headers = {"Authorization": f"Bearer {_login_token('gsm-viewer', 'pass')}"}
+    own = client.get("/reports/consolidated/stats", params={"module": "clothing"}, headers=viewer_headers)
+    assert own.status_code == 200
+    assert own.json()["stats"]["total_stock"] == 6
+    forbidden = client.get(
+        "/reports/consolidated/stats",
+        params={"module": "clothing", "site": "JLL"},
+        headers=viewer_headers,
+    )
+    assert forbidden.status_code == 403
+
+
+def test_consolidated_overview_reports_slow_sites_as_partial(tmp_path, monkeypatch) -> None:
+    _init_test_dbs(tmp_path, monkeypatch)
+    release = threading.Event()
+    original = services.get_reports_overview
+
+    def _slow_on_gsm(*args, **kwargs):
+        if db.get_current_site_key() == "GSM":
+            release.wait(5)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(services, "get_reports_overview", _slow_on_gsm)
+    try:
+        result = services.get_consolidated_reports_overview(
+            "clothing",
+            site_keys=["JLL", "GSM"],
+            start=date(2024, 1, 1),
+            end=date(2024, 1, 7),
+            timeout_seconds=0.5,
+        )
+    finally:
+        release.set()
+    statuses = {entry.site_key: entry.status for entry in result.sites}
+    assert statuses == {"JLL": "ok", "GSM": "timeout"}
+    assert result.partial is True
+    assert len(result.overview.series.moves) == 7
+
+
+def test_dashboard_stats_single_call_per_site_and_consolidated(tmp_path, monkeypatch) -> None:
+    _init_test_dbs(tmp_path, monkeypatch)
+    _create_user("dash-admin", role="admin")
+    _create_user("dash-viewer", role="user")
+    viewer = services.get_user("dash-viewer")
+    assert viewer is not None
+    services.upsert_module_permission(
+        models.ModulePermissionUpsert(user_id=viewer.id, module="pharmacy", can_view=True, can_edit=False)
+    )
+    for site_key, quantities in (("JLL", (0, 3)), ("GSM", (5,))):
+        with db.get_stock_connection(site_key) as conn:
+            conn.execute("DELETE FROM items")
+            conn.execute("DELETE FROM pharmacy_items")
+            for index, quantity in enumerate(quantities):
+                conn.execute(
+                    "INSERT INTO items (name, sku, quantity, low_stock_threshold) VALUES (?, ?, ?, ?)",
+                    (f"{site_key} {index}", f"{site_key}-{index}", quantity, 2),
+                )
+            conn.execute("INSERT INTO pharmacy_items (name, quantity) VALUES (?, ?)", ("Gaze", 7))
+    services.clear_report_cache()
+
+    client = TestClient(app)
+    admin_headers = {"Authorization": f"Bearer {_login_token('dash-admin', 'pass')}"}
+    token = db.set_current_site("JLL")
+    try:
+        response = client.get("/reports/dashboard", headers={**admin_headers, "X-Site-Key": "JLL"})
+        assert response.status_code == 200
+        modules = response.json()["modules"]
+        assert set(modules) == set(services.DASHBOARD_MODULES)
+        for module_key, stats in modules.items():
+            assert stats == services.get_inventory_stats(module_key).model_dump()
+        assert modules["clothing"]["stockouts"] == 1
+        assert modules["clothing"]["low_stock"] == 1
+        hits = services.get_report_cache_stats().hits
+        services.get_dashboard_stats()
+        assert services.get_report_cache_stats().hits == hits + 1
+        with db.get_stock_connection() as conn:
+            conn.execute("UPDATE items SET quantity = 9 WHERE sku = 'JLL-0'")
+        assert services.get_dashboard_stats().modules["clothing"].stockouts == 0
+    finally:
+        db.reset_current_site(token)
+
+    consolidated = client.get(
+        "/reports/consolidated/dashboard",
+        params={"module": ["clothing", "pharmacy"], "site": ["JLL", "GSM"]},
+        headers=admin_headers,
+    )
+    assert consolidated.status_code == 200
+    payload = consolidated.json()
+    assert payload["modules"]["clothing"]["total_stock"] == 17
+    assert payload["modules"]["pharmacy"]["references"] == 2
+    assert set(payload["by_site"]) == {"JLL", "GSM"}
+
+    viewer_headers = {"Authorization": f"Bearer {_login_token('dash-viewer', 'pass')}"}
+    own = client.get("/reports/dashboard", headers=viewer_headers)
+    assert own.status_code == 200
+    assert list(own.json()["modules"]) == ["pharmacy"]
+    forbidden = client.get("/reports/dashboard", params={"module": "clothing"}, headers=viewer_headers)
+    assert forbidden.status_code == 403
+
+
+def test_consolidated_overview_ranks_tops_on_full_site_counts(tmp_path, monkeypatch) -> None:
+    _init_test_dbs(tmp_path, monkeypatch)
+    _create_user("tops-admin", role="admin")
+    for site_key in ("JLL", "GSM"):
+        with db.get_stock_connection(site_key) as conn:
+            conn.execute("DELETE FROM movements")
+            conn.execute("DELETE FROM items")
+            quantities = [(f"{site_key}-{qty}", qty) for qty in (9, 8, 7, 6, 5)]
+            for sku, qty in [*quantities, ("COMMON", 4)]:
+                item_id = conn.execute(
+                    "INSERT INTO items (name, sku, quantity) VALUES (?, ?, ?)",
+                    (sku, sku, 50),
+                ).lastrowid
+                conn.execute(
+                    "INSERT INTO movements (item_id, delta, reason, created_at) VALUES (?, ?, ?, ?)",
+                    (item_id, -qty, "Sortie", "2024-01-02 10:00:00"),
+                )
+    services.clear_report_cache()
+
+    result = services.get_consolidated_reports_overview(
+        "clothing", site_keys=["JLL", "GSM"], start=date(2024, 1, 1), end=date(2024, 1, 7)
+    )
+    top_out = [(item.sku, item.qty) for item in result.overview.tops.out]
+    assert len(top_out) == 5
+    assert ("COMMON", 8) in top_out
+
+    original = services.has_module_access
+
+    def _denied_on_gsm(user, module, *, action="view"):
+        if db.get_current_site_key() == "GSM":
+            return False
+        return original(user, module, action=action)
+
+    monkeypatch.setattr(services, "has_module_access", _denied_on_gsm)
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {_login_token('tops-admin', 'pass')}"}
+    params = {"module": "clothing", "start": "2024-01-01", "end": "2024-01-07"}
+    forbidden = client.get(
+        "/reports/consolidated/overview", params={**params, "site": ["JLL", "GSM"]}, headers=headers
+    )
+    assert forbidden.status_code == 403
+    allowed = client.get(
+        "/reports/consolidated/overview", params={**params, "site": "JLL"}, headers=headers
+    )
+    assert allowed.status_code == 200
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.core import db, models, services
+from backend.tests.auth_helpers import login_headers
+
+client = TestClient(app)
+
+
+def _admin_headers() -> dict[str, str]:
+    return login_headers(client, "admin", "admin123")
+
+
+def test_stocktake_session_reconciles_counts_from_several_devices() -> None:
+    services.ensure_database_ready()
+    headers = _admin_headers()
+    sku_a = f"INV-{uuid4().hex[:6]}"
+    sku_b = f"INV-{uuid4().hex[:6]}"
+    item_a = services.create_item(models.ItemCreate(name="Cagoule", sku=sku_a, quantity=10))
+    item_b = services.create_item(models.ItemCreate(name="Ceinture", sku=sku_b, quantity=4))
+
+    created = client.post("/stocktake/sessions", json={"module": "clothing"}, headers=headers)
+    assert created.status_code == 201, created.text
+    session_id = created.json()["id"]
+
+    first = client.post(
+        f"/stocktake/sessions/{session_id}/counts",
+        json={"device_id": "scanner-1", "lines": [{"barcode": sku_a.lower(), "quantity": 5}]},
+        headers=headers,
+    )
+    assert first.status_code == 200, first.text
+    assert first.json() == {"accepted": 1, "unresolved": []}
+
+    second = client.post(
+        f"/stocktake/sessions/{session_id}/counts",
+        json={
+            "device_id": "scanner-2",
+            "lines": [
+                {"barcode": sku_a, "quantity": 2},
+                {"item_id": item_b.id, "quantity": 4},
+                {"barcode": "INCONNU-XYZ", "quantity": 1},
+            ],
+        },
+        headers=headers,
+    )
+    assert second.status_code == 200, second.text
+    assert second.json()["unresolved"] == ["INCONNU-XYZ"]
+
+    variances = client.get(f"/stocktake/sessions/{session_id}/variances", headers=headers)
+    assert variances.status_code == 200, variances.text
+    assert variances.json() == [
+        {"item_id": item_a.id, "name": "Cagoule", "expected_qty": 10, "counted_qty": 7, "delta": -3}
+    ]
+
+    reconciled = client.post(f"/stocktake/sessions/{session_id}/reconcile", headers=headers)
+    assert reconciled.status_code == 200, reconciled.text
+    payload = reconciled.json()
+    assert payload["adjusted_items"] == 1
+    assert payload["quantity_removed"] == 3
+    assert payload["session"]["status"] == "RECONCILED"
+    assert payload["session"]["counted_items"] == 2
+
+    assert services.get_item(item_a.id).quantity == 7
+    assert services.get_item(item_b.id).quantity == 4
+    movements = services.fetch_movements(item_a.id)
+    assert [(movement.delta, movement.reason) for movement in movements][:1] == [
+        (-3, f"Inventaire #{session_id}")
+    ]
+
+    again = client.post(f"/stocktake/sessions/{session_id}/reconcile", headers=headers)
+    assert again.status_code == 400
+
+
+def test_stocktake_handles_large_counts_in_bulk() -> None:
+    services.ensure_database_ready()
+    prefix = f"BULK-{uuid4().hex[:6]}"
+    with db.get_stock_connection() as conn:
+        conn.executemany(
+            "INSERT INTO items (name, sku, quantity) VALUES (?, ?, ?)",
+            [(f"Article {index}", f"{prefix}-{index}", 5) for index in range(10_000)],
+        )
+        rows = conn.execute(
+            "SELECT id FROM items WHERE sku LIKE ? ORDER BY id", (f"{prefix}-%",)
+        ).fetchall()
+    item_ids = [row["id"] for row in rows]
+
+    session = services.create_stocktake_session(models.StocktakeSessionCreate(module="clothing"))
+    result = services.upload_stocktake_counts(
+        session.id,
+        models.StocktakeCountUpload(
+            lines=[
+                models.StocktakeCountLine(item_id=item_id, quantity=index % 7)
+                for index, item_id in enumerate(item_ids)
+            ]
+        ),
+    )
+    assert result.accepted == 10_000
+
+    reconciled = services.reconcile_stocktake_session(session.id)
+
+    expected_adjusted = sum(1 for index in range(10_000) if index % 7 != 5)
+    assert reconciled.adjusted_items == expected_adjusted
+    with db.get_stock_connection() as conn:
+        mismatched = conn.execute(
+            "SELECT COUNT(1) AS count FROM items WHERE sku LIKE ? AND quantity <> (id - ?) % 7",
+            (f"{prefix}-%", item_ids[0]),
+        ).fetchone()
+        movement_count = conn.execute(
+            "SELECT COUNT(1) AS count FROM movements WHERE reason = ?",
+            (f"Inventaire #{session.id}",),
+        ).fetchone()
+        conn.execute("DELETE FROM items WHERE sku LIKE ?", (f"{prefix}-%",))
+    assert mismatched["count"] == 0
+    assert movement_count["count"] == expected_adjusted
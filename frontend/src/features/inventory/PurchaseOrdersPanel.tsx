@@ -1,5 +1,13 @@
 import { FormEvent, MouseEvent, useEffect, useMemo, useRef, useState } from "react";
-import { QueryKey, keepPreviousData, useMutation, useQueries, useQuery, useQueryClient } from "@tanstack/react-query";
+import {
+  QueryKey,
+  keepPreviousData,
+  useInfiniteQuery,
+  useMutation,
+  useQueries,
+  useQuery,
+  useQueryClient
+} from "@tanstack/react-query";
 import { AxiosError } from "axios";
 
 import { api } from "../../lib/api";
@@ -189,6 +197,35 @@ interface PurchaseOrderDetail {
   supplier_returns?: ClothingSupplierReturn[];
 }
 
+interface PurchaseOrderSummary {
+  id: number;
+  module: string;
+  supplier_id: number | null;
+  supplier_name: string | null;
+  supplier_email: string | null;
+  status: string;
+  created_at: string;
+  note: string | null;
+  auto_created: boolean;
+  is_archived: boolean;
+  archived_at: string | null;
+  kind: "standard" | "replacement_request";
+  parent_id: number | null;
+  line_count: number;
+  quantity_ordered: number;
+  quantity_received: number;
+}
+
+interface PurchaseOrderSummaryPage {
+  items: PurchaseOrderSummary[];
+  next_cursor: string | null;
+}
+
+interface OpenedPurchaseOrder {
+  order: PurchaseOrderDetail;
+  replacements: PurchaseOrderDetail[];
+}
+
 interface CreateOrderPayload {
   supplier_id: number | null;
   status: string;
@@ -334,6 +371,8 @@ const STATUS_BADGE_LABELS: Record<PrimaryOrderStatus, { label: string; tone: "su
   }
 };
 
+const ORDERS_PAGE_SIZE = 50;
+
 const BLOCKING_RETURN_STATUSES = new Set(["to_prepare", "shipped"]);
 const BLOCKING_SUPPLIER_RETURN_STATUSES = new Set(["prepared", "shipped"]);
 
@@ -699,47 +738,111 @@ export function PurchaseOrdersPanel({
     ...(Array.isArray(ordersQueryKey) ? ordersQueryKey : [ordersQueryKey]),
     { module: moduleKey, site: siteKey }
   ];
-  const resolvedOrdersQueryKey = [...ordersCacheKey, showArchived ? "archived" : "active"];
+  const summaryQueryKey = [...ordersCacheKey, "summary", showArchived ? "archived" : "active"];
   const {
-    data: ordersData = [],
+    data: summaryPages,
     isLoading: loadingOrders,
     isFetching: isFetchingOrders,
-    refetch: refetchOrders
-  } = useQuery<PurchaseOrderDetail[]>({
-    queryKey: resolvedOrdersQueryKey,
-    queryFn: async () => {
+    refetch: refetchOrders,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage
+  } = useInfiniteQuery({
+    queryKey: summaryQueryKey,
+    initialPageParam: null as string | null,
+    queryFn: async ({ pageParam }): Promise<PurchaseOrderSummaryPage> => {
       try {
-        const response = await api.get<PurchaseOrderDetail[]>(`${purchaseOrdersPath}/`, {
-          params: showArchived ? { include_archived: true } : undefined
+        const response = await api.get<PurchaseOrderSummaryPage>(`${purchaseOrdersPath}/summary`, {
+          params: {
+            archived_only: showArchived ? true : undefined,
+            cursor: pageParam ?? undefined,
+            limit: ORDERS_PAGE_SIZE
+          }
         });
         setListError(null);
-        return response.data.map((order) => ({
-          ...order,
-          kind: order.kind ?? "standard",
-          items: order.items.map((item) => {
-            const candidate = item[itemIdField];
-            const normalizedId = typeof candidate === "number" ? candidate : item.item_id;
-            return {
-              ...item,
-              item_id: normalizedId
-            } satisfies PurchaseOrderItem;
-          }),
-          receipts: order.receipts ?? [],
-          pending_assignments: order.pending_assignments ?? [],
-          supplier_returns: order.supplier_returns ?? []
-        }));
+        return {
+          items: response.data.items ?? [],
+          next_cursor: response.data.next_cursor ?? null
+        };
       } catch (requestError: unknown) {
         const status = (requestError as AxiosError<ApiErrorResponse>)?.response?.status;
         if (status === 404) {
           setListError("Impossible de charger les bons de commande pour ce module.");
-          return [] as PurchaseOrderDetail[];
+          return { items: [], next_cursor: null };
         }
         setListError("Impossible de charger les bons de commande.");
-        return [] as PurchaseOrderDetail[];
+        return { items: [], next_cursor: null };
       }
     },
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
     placeholderData: keepPreviousData
   });
+  const orderSummaries = useMemo(
+    () => dedupeById((summaryPages?.pages ?? []).flatMap((page) => page.items)),
+    [summaryPages]
+  );
+
+  const normalizeOrder = (order: PurchaseOrderDetail): PurchaseOrderDetail => ({
+    ...order,
+    kind: order.kind ?? "standard",
+    items: order.items.map((item) => {
+      const candidate = item[itemIdField];
+      const normalizedId = typeof candidate === "number" ? candidate : item.item_id;
+      return {
+        ...item,
+        item_id: normalizedId
+      } satisfies PurchaseOrderItem;
+    }),
+    receipts: order.receipts ?? [],
+    pending_assignments: order.pending_assignments ?? [],
+    supplier_returns: order.supplier_returns ?? []
+  });
+
+  const fetchOrderDetail = async (orderId: number) => {
+    const response = await api.get<PurchaseOrderDetail>(`${purchaseOrdersPath}/${orderId}`);
+    return normalizeOrder(response.data);
+  };
+
+  // Details (lines, receipts, replacement requests) are only loaded for opened orders.
+  const [openOrderIds, setOpenOrderIds] = useState<number[]>([]);
+  const orderDetailQueries = useQueries({
+    queries: openOrderIds.map((orderId) => ({
+      queryKey: [...ordersCacheKey, "detail", orderId],
+      queryFn: async (): Promise<OpenedPurchaseOrder> => {
+        const order = await fetchOrderDetail(orderId);
+        if (!enableReplacementFlow) {
+          return { order, replacements: [] };
+        }
+        const children = await api.get<PurchaseOrderSummaryPage>(
+          `${purchaseOrdersPath}/summary`,
+          { params: { parent_id: orderId, include_archived: true } }
+        );
+        const replacements = await Promise.all(
+          (children.data.items ?? []).map((child) => fetchOrderDetail(child.id))
+        );
+        return { order, replacements };
+      }
+    }))
+  });
+  const openedOrdersById = useMemo(() => {
+    const map = new Map<number, (typeof orderDetailQueries)[number]>();
+    openOrderIds.forEach((orderId, index) => {
+      map.set(orderId, orderDetailQueries[index]);
+    });
+    return map;
+  }, [openOrderIds, orderDetailQueries]);
+  const openedOrders = useMemo(
+    () =>
+      orderDetailQueries
+        .map((query) => query.data)
+        .filter((entry): entry is OpenedPurchaseOrder => Boolean(entry)),
+    [orderDetailQueries]
+  );
+  const toggleOrderOpen = (orderId: number) => {
+    setOpenOrderIds((prev) =>
+      prev.includes(orderId) ? prev.filter((id) => id !== orderId) : [...prev, orderId]
+    );
+  };
 
   const { data: items = [] } = useQuery({
     queryKey: ["purchase-order-items-options", purchaseOrdersPath],
@@ -781,59 +884,6 @@ export function PurchaseOrdersPanel({
     }
   }, [assigneesError]);
 
-  const buildOrderSignature = (order: PurchaseOrderDetail) => {
-    const supplierKey = order.supplier_id ?? "none";
-    const createdAt = order.created_at ?? "";
-    const lineParts = order.items
-      .map((line) => {
-        const lineItemId =
-          typeof line[itemIdField] === "number" ? line[itemIdField] : line.item_id;
-        return [
-          lineItemId,
-          line.quantity_ordered,
-          line.line_type ?? "standard",
-          line.beneficiary_employee_id ?? "",
-          line.return_expected ? 1 : 0,
-          line.return_reason ?? "",
-          line.return_employee_item_id ?? "",
-          line.target_dotation_id ?? "",
-          line.return_qty ?? ""
-        ].join(":");
-      })
-      .sort();
-    return `${supplierKey}|${createdAt}|${lineParts.join(",")}`;
-  };
-
-  const dedupedOrders = (() => {
-    const byId = new Map<number, PurchaseOrderDetail>();
-    ordersData.forEach((order) => {
-      if (byId.has(order.id)) {
-        console.warn("[purchase-orders] duplicate id detected", order.id);
-      }
-      byId.set(order.id, order);
-    });
-
-    const signatureMap = new Map<string, PurchaseOrderDetail>();
-    const deduped: PurchaseOrderDetail[] = [];
-
-    byId.forEach((order) => {
-      const signature = buildOrderSignature(order);
-      const existing = signatureMap.get(signature);
-      if (existing) {
-        console.warn("[purchase-orders] duplicate signature detected", {
-          existingId: existing.id,
-          duplicateId: order.id,
-          signature
-        });
-        return;
-      }
-      signatureMap.set(signature, order);
-      deduped.push(order);
-    });
-
-    return deduped;
-  })();
-
   const assignedItemEmployeeIds = (() => {
     const ids = new Set<number>();
     draftLines.forEach((line) => {
@@ -841,7 +891,7 @@ export function PurchaseOrdersPanel({
         ids.add(line.beneficiaryId);
       }
     });
-    dedupedOrders.forEach((order) => {
+    openedOrders.forEach(({ order }) => {
       (order.pending_assignments ?? []).forEach((assignment) => {
         if (
           (assignment.target_dotation_id || assignment.return_employee_item_id) &&
@@ -1036,7 +1086,7 @@ export function PurchaseOrdersPanel({
       });
     },
     onSuccess: async (_, order) => {
-      setMessage("Email envoyé au fournisseur.");
+      setMessage("Email mis en file d'envoi au fournisseur.");
       setOverrideEmail("");
       setSendModalOrder(null);
       await queryClient.invalidateQueries({ queryKey: ordersCacheKey });
@@ -1064,7 +1114,7 @@ export function PurchaseOrdersPanel({
       });
     },
     onSuccess: async (_, { order }) => {
-      setMessage("Demande de remplacement envoyée.");
+      setMessage("Demande de remplacement mise en file d'envoi.");
       await queryClient.invalidateQueries({ queryKey: ordersCacheKey });
       await queryClient.invalidateQueries({
         queryKey: ["purchase-order-email-log", order.id]
@@ -1274,30 +1324,22 @@ export function PurchaseOrdersPanel({
   }, [assignedItemEmployeeIds, assignedItemsQueries]);
   const replacementOrdersByParent = useMemo(() => {
     const map = new Map<number, Map<number, PurchaseOrderDetail>>();
-    dedupedOrders.forEach((order) => {
-      if (order.kind !== "replacement_request" || !order.parent_id) {
-        return;
-      }
-      const lineId = order.replacement_for_line_id;
-      if (!lineId) {
-        return;
-      }
-      const existing = map.get(order.parent_id) ?? new Map<number, PurchaseOrderDetail>();
-      existing.set(lineId, order);
-      map.set(order.parent_id, existing);
+    openedOrders.forEach(({ replacements }) => {
+      replacements.forEach((order) => {
+        if (order.kind !== "replacement_request" || !order.parent_id) {
+          return;
+        }
+        const lineId = order.replacement_for_line_id;
+        if (!lineId) {
+          return;
+        }
+        const existing = map.get(order.parent_id) ?? new Map<number, PurchaseOrderDetail>();
+        existing.set(lineId, order);
+        map.set(order.parent_id, existing);
+      });
     });
     return map;
-  }, [dedupedOrders]);
-  const visibleOrders = useMemo(
-    () =>
-      dedupedOrders.filter(
-        (order) =>
-          order.kind !== "replacement_request" &&
-          (showArchived ? order.is_archived : !order.is_archived)
-      ),
-    [dedupedOrders, showArchived]
-  );
-  const ordersToRender = useMemo(() => dedupeById(visibleOrders), [visibleOrders]);
+  }, [openedOrders]);
 
   useEffect(() => {
     setReplacementAccess(enableReplacementFlow);
@@ -1896,7 +1938,7 @@ export function PurchaseOrdersPanel({
     });
   };
 
-  const orderViews = ordersToRender.map((order) => {
+  const renderOrderDetailRow = (order: PurchaseOrderDetail) => {
     const isArchived = Boolean(order.is_archived);
     const isReadOnly = isArchived;
     const timelineEvents = buildPurchaseOrderTimeline(order);
@@ -2586,6 +2628,13 @@ export function PurchaseOrdersPanel({
               </span>
             ) : null}
           </div>
+          <button
+            type="button"
+            onClick={() => toggleOrderOpen(order.id)}
+            className="text-xs font-semibold text-indigo-200 hover:text-indigo-100"
+          >
+            Fermer le détail
+          </button>
         </div>
         <div className="min-w-0 space-y-1 text-slate-200">
           <p className="text-xs font-semibold uppercase tracking-wide text-slate-400 lg:hidden">
@@ -2639,8 +2688,102 @@ export function PurchaseOrdersPanel({
       </div>
     );
 
-    return { id: order.id, row: tableRow };
-  });
+    return tableRow;
+  };
+
+  const renderOrderSummaryRow = (summary: PurchaseOrderSummary) => {
+    const detailQuery = openedOrdersById.get(summary.id);
+    if (detailQuery?.data) {
+      return renderOrderDetailRow(detailQuery.data.order);
+    }
+    const isLoadingDetail = Boolean(detailQuery?.isFetching);
+    return (
+      <div
+        key={summary.id}
+        className="grid grid-cols-1 gap-4 px-4 py-4 text-sm text-slate-100 lg:grid-cols-[180px_280px_180px_1fr_220px] lg:gap-6 lg:py-3"
+      >
+        <div className="min-w-0 space-y-1 text-slate-300">
+          <p className="text-xs font-semibold uppercase tracking-wide text-slate-400 lg:hidden">
+            Créé le
+          </p>
+          <div className="flex flex-wrap items-center gap-2">
+            <span>{new Date(summary.created_at).toLocaleString()}</span>
+            {summary.auto_created ? (
+              <span className="rounded border border-indigo-500/40 bg-indigo-500/20 px-2 py-0.5 text-[10px] uppercase tracking-wide text-indigo-200">
+                Auto
+              </span>
+            ) : null}
+          </div>
+        </div>
+        <div className="min-w-0 space-y-1 text-slate-200">
+          <p className="text-xs font-semibold uppercase tracking-wide text-slate-400 lg:hidden">
+            Fournisseur
+          </p>
+          <div className="min-w-0">
+            <p className="truncate">{summary.supplier_name ?? "-"}</p>
+            <p className="truncate text-xs text-slate-400">
+              {summary.supplier_email ?? "Email manquant"}
+            </p>
+          </div>
+        </div>
+        <div className="min-w-0 space-y-2 text-slate-200">
+          <p className="text-xs font-semibold uppercase tracking-wide text-slate-400 lg:hidden">
+            Statut
+          </p>
+          <div className="flex flex-col gap-2 text-xs">
+            {summary.is_archived ? (
+              <StatusBadge
+                label={STATUS_BADGE_LABELS.ARCHIVE.label}
+                tone={STATUS_BADGE_LABELS.ARCHIVE.tone}
+                tooltip={STATUS_BADGE_LABELS.ARCHIVE.tooltip}
+              />
+            ) : null}
+            <span className="text-xs text-slate-300">{resolveOrderStatusLabel(summary.status)}</span>
+          </div>
+        </div>
+        <div className="min-w-0 space-y-1 text-xs text-slate-200">
+          <p className="text-xs font-semibold uppercase tracking-wide text-slate-400 lg:hidden">
+            Lignes
+          </p>
+          <p>
+            {summary.line_count} ligne{summary.line_count > 1 ? "s" : ""} — Reçu:{" "}
+            {summary.quantity_received}/{summary.quantity_ordered}
+          </p>
+          {summary.note ? (
+            <p className="text-slate-400">
+              Note: <TruncatedText text={summary.note} maxLength={notePreviewLength} />
+            </p>
+          ) : null}
+          {detailQuery?.isError ? (
+            <p className="text-red-400">Impossible de charger le détail du bon de commande.</p>
+          ) : null}
+        </div>
+        <div className="min-w-0 space-y-2 text-slate-200 lg:text-right">
+          <p className="text-xs font-semibold uppercase tracking-wide text-slate-400 lg:hidden">
+            Actions
+          </p>
+          <div className="flex w-full flex-col gap-2 lg:items-end">
+            <button
+              type="button"
+              onClick={() => toggleOrderOpen(summary.id)}
+              disabled={isLoadingDetail}
+              className="w-full rounded bg-indigo-500 px-3 py-1 text-xs font-semibold text-white ring-1 ring-white/20 hover:bg-indigo-400 disabled:cursor-not-allowed disabled:opacity-60 lg:w-auto"
+            >
+              {isLoadingDetail ? "Chargement..." : "Ouvrir"}
+            </button>
+            <button
+              type="button"
+              onClick={() => handleDownload(summary.id)}
+              disabled={downloadingId === summary.id}
+              className="w-full rounded border border-slate-700 px-3 py-1 text-xs font-semibold text-slate-200 hover:bg-slate-800 disabled:cursor-not-allowed disabled:opacity-60 lg:w-auto"
+            >
+              {downloadingId === summary.id ? "Téléchargement..." : "Télécharger PDF"}
+            </button>
+          </div>
+        </div>
+      </div>
+    );
+  };
 
   return (
     <section className="space-y-4">
@@ -2723,8 +2866,8 @@ export function PurchaseOrdersPanel({
                 <div className="px-4 py-3 text-right">Actions</div>
               </div>
               <div className="divide-y divide-slate-900">
-                {orderViews.map((view) => view.row)}
-                {ordersToRender.length === 0 && !loadingOrders ? (
+                {orderSummaries.map((summary) => renderOrderSummaryRow(summary))}
+                {orderSummaries.length === 0 && !loadingOrders ? (
                   <div className="px-4 py-4 text-sm text-slate-400">
                     {showArchived
                       ? "Aucun bon de commande archivé."
@@ -2734,6 +2877,16 @@ export function PurchaseOrdersPanel({
               </div>
             </div>
           </div>
+          {hasNextPage ? (
+            <button
+              type="button"
+              onClick={() => void fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="rounded-md border border-slate-700 px-4 py-2 text-sm font-semibold text-slate-200 transition hover:bg-slate-800 disabled:cursor-not-allowed disabled:opacity-60"
+            >
+              {isFetchingNextPage ? "Chargement..." : "Charger plus"}
+            </button>
+          ) : null}
           {loadingOrders ? (
             <p className="text-sm text-slate-400">Chargement des bons de commande...</p>
           ) : null}
@@ -1,5 +1,12 @@
 import { FormEvent, useMemo, useState } from "react";
-import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
+import {
+  keepPreviousData,
+  useInfiniteQuery,
+  useMutation,
+  useQueries,
+  useQuery,
+  useQueryClient
+} from "@tanstack/react-query";
 import { AxiosError } from "axios";
 
 import { api } from "../../lib/api";
@@ -61,6 +68,27 @@ interface PharmacyPurchaseOrderDetail {
   items: PharmacyPurchaseOrderItem[];
 }
 
+interface PharmacyPurchaseOrderSummary {
+  id: number;
+  supplier_id: number | null;
+  supplier_name: string | null;
+  supplier_email: string | null;
+  status: string;
+  created_at: string;
+  note: string | null;
+  auto_created: boolean;
+  is_archived: boolean;
+  archived_at: string | null;
+  line_count: number;
+  quantity_ordered: number;
+  quantity_received: number;
+}
+
+interface PharmacyPurchaseOrderSummaryPage {
+  items: PharmacyPurchaseOrderSummary[];
+  next_cursor: string | null;
+}
+
 interface PharmacyPurchaseOrderRefreshResponse {
   created: number;
   updated: number;
@@ -92,6 +120,8 @@ const ORDER_STATUSES: Array<{ value: string; label: string }> = [
   { value: "CANCELLED", label: "Annulé" }
 ];
 
+const ORDERS_PAGE_SIZE = 50;
+
 type PrimaryOrderStatus = "CONFORME" | "REMPLACEMENT_EN_COURS" | "ARCHIVE";
 
 const STATUS_BADGE_LABELS: Record<
@@ -228,20 +258,65 @@ export function PharmacyOrdersPanel({ canEdit }: { canEdit: boolean }) {
     );
   };
 
-  const { data: orders = [], isLoading } = useQuery({
+  const {
+    data: summaryPages,
+    isLoading,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage
+  } = useInfiniteQuery({
     queryKey: ordersQueryKey,
-    queryFn: async () => {
-      const response = await api.get<PharmacyPurchaseOrderDetail[]>("/pharmacy/orders/", {
-        params: showArchived ? { include_archived: true } : undefined
+    initialPageParam: null as string | null,
+    queryFn: async ({ pageParam }) => {
+      const response = await api.get<PharmacyPurchaseOrderSummaryPage>("/pharmacy/orders/summary", {
+        params: {
+          archived_only: showArchived ? true : undefined,
+          cursor: pageParam ?? undefined,
+          limit: ORDERS_PAGE_SIZE
+        }
       });
       return response.data;
-    }
+    },
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
+    placeholderData: keepPreviousData
   });
 
-  const visibleOrders = useMemo(
-    () => orders.filter((order) => (showArchived ? order.is_archived : !order.is_archived)),
-    [orders, showArchived]
-  );
+  const orderSummaries = useMemo(() => {
+    const seen = new Set<number>();
+    return (summaryPages?.pages ?? [])
+      .flatMap((page) => page.items)
+      .filter((summary) => {
+        if (seen.has(summary.id)) {
+          return false;
+        }
+        seen.add(summary.id);
+        return true;
+      });
+  }, [summaryPages]);
+
+  // Order lines are only loaded for the orders opened from the summary list.
+  const [openOrderIds, setOpenOrderIds] = useState<number[]>([]);
+  const orderDetailQueries = useQueries({
+    queries: openOrderIds.map((orderId) => ({
+      queryKey: ["pharmacy-orders", "detail", orderId],
+      queryFn: async () => {
+        const response = await api.get<PharmacyPurchaseOrderDetail>(`/pharmacy/orders/${orderId}`);
+        return response.data;
+      }
+    }))
+  });
+  const openedOrdersById = useMemo(() => {
+    const map = new Map<number, (typeof orderDetailQueries)[number]>();
+    openOrderIds.forEach((orderId, index) => {
+      map.set(orderId, orderDetailQueries[index]);
+    });
+    return map;
+  }, [openOrderIds, orderDetailQueries]);
+  const toggleOrderOpen = (orderId: number) => {
+    setOpenOrderIds((prev) =>
+      prev.includes(orderId) ? prev.filter((id) => id !== orderId) : [...prev, orderId]
+    );
+  };
 
   const { data: pharmacyItems = [] } = useQuery({
     queryKey: ["pharmacy-items-options"],
@@ -357,7 +432,7 @@ export function PharmacyOrdersPanel({ canEdit }: { canEdit: boolean }) {
       setSendingId(order.id);
     },
     onSuccess: async () => {
-      setMessage("Email envoyé au fournisseur.");
+      setMessage("Email mis en file d'envoi au fournisseur.");
       await queryClient.invalidateQueries({ queryKey: ["pharmacy-orders"] });
     },
     onError: (mutationError) => {
@@ -758,7 +833,84 @@ export function PharmacyOrdersPanel({ canEdit }: { canEdit: boolean }) {
                 </tr>
               </thead>
               <tbody className="divide-y divide-slate-900 bg-slate-950/60 text-sm text-slate-100">
-                {visibleOrders.map((order) => {
+                {orderSummaries.map((summary) => {
+                  const detailQuery = openedOrdersById.get(summary.id);
+                  const order = detailQuery?.data;
+                  if (!order) {
+                    const isLoadingDetail = Boolean(detailQuery?.isFetching);
+                    return (
+                      <tr key={summary.id}>
+                        <td className="px-4 py-3 text-slate-300">
+                          {new Date(summary.created_at).toLocaleString()}
+                          {summary.auto_created ? (
+                            <span className="ml-2 rounded border border-indigo-500/40 bg-indigo-500/20 px-2 py-0.5 text-[10px] uppercase tracking-wide text-indigo-200">
+                              Auto
+                            </span>
+                          ) : null}
+                        </td>
+                        <td className="px-4 py-3 text-slate-200">
+                          <div className="flex flex-col">
+                            <span>{summary.supplier_name ?? "-"}</span>
+                            <span className="text-xs text-slate-400">
+                              {summary.supplier_email ?? "Email manquant"}
+                            </span>
+                          </div>
+                        </td>
+                        <td className="px-4 py-3 text-xs text-slate-200">
+                          <div className="flex flex-col gap-2">
+                            {summary.is_archived ? (
+                              <StatusBadge
+                                label={STATUS_BADGE_LABELS.ARCHIVE.label}
+                                tone={STATUS_BADGE_LABELS.ARCHIVE.tone}
+                                tooltip={STATUS_BADGE_LABELS.ARCHIVE.tooltip}
+                              />
+                            ) : null}
+                            <span>
+                              {ORDER_STATUSES.find((option) => option.value === summary.status)
+                                ?.label ?? summary.status}
+                            </span>
+                          </div>
+                        </td>
+                        <td className="px-4 py-3 text-xs text-slate-200">
+                          <p>
+                            {summary.line_count} ligne{summary.line_count > 1 ? "s" : ""} — Reçu:{" "}
+                            {summary.quantity_received}/{summary.quantity_ordered}
+                          </p>
+                          {summary.note ? (
+                            <p className="text-slate-400">
+                              Note:{" "}
+                              <TruncatedText text={summary.note} maxLength={notePreviewLength} />
+                            </p>
+                          ) : null}
+                          {detailQuery?.isError ? (
+                            <p className="text-red-400">
+                              Impossible de charger le détail du bon de commande.
+                            </p>
+                          ) : null}
+                        </td>
+                        <td className="px-4 py-3 text-slate-200">
+                          <div className="flex flex-col gap-2">
+                            <button
+                              type="button"
+                              onClick={() => toggleOrderOpen(summary.id)}
+                              disabled={isLoadingDetail}
+                              className="rounded bg-indigo-500 px-3 py-1 text-xs font-semibold text-white ring-1 ring-white/20 hover:bg-indigo-400 disabled:cursor-not-allowed disabled:opacity-60"
+                            >
+                              {isLoadingDetail ? "Chargement..." : "Ouvrir"}
+                            </button>
+                            <button
+                              type="button"
+                              onClick={() => handleDownload(summary.id)}
+                              disabled={downloadingId === summary.id}
+                              className="rounded border border-slate-700 px-3 py-1 text-xs font-semibold text-slate-200 hover:bg-slate-800 disabled:cursor-not-allowed disabled:opacity-60"
+                            >
+                              {downloadingId === summary.id ? "Téléchargement..." : "Télécharger PDF"}
+                            </button>
+                          </div>
+                        </td>
+                      </tr>
+                    );
+                  }
                   const isArchived = Boolean(order.is_archived);
                   const isReadOnly = isArchived;
                   const timelineEvents = buildPharmacyTimeline(order);
@@ -882,6 +1034,13 @@ export function PharmacyOrdersPanel({ canEdit }: { canEdit: boolean }) {
                       </td>
                       <td className="px-4 py-3 text-slate-200">
                         <div className="flex flex-col gap-2">
+                          <button
+                            type="button"
+                            onClick={() => toggleOrderOpen(order.id)}
+                            className="rounded border border-slate-700 px-3 py-1 text-xs font-semibold text-slate-200 hover:bg-slate-800"
+                          >
+                            Fermer le détail
+                          </button>
                           <button
                             type="button"
                             onClick={() => handleDownload(order.id)}
@@ -1008,7 +1167,7 @@ export function PharmacyOrdersPanel({ canEdit }: { canEdit: boolean }) {
                     </tr>
                   );
                 })}
-                {visibleOrders.length === 0 && !isLoading ? (
+                {orderSummaries.length === 0 && !isLoading ? (
                   <tr>
                     <td className="px-4 py-4 text-sm text-slate-400" colSpan={5}>
                       {showArchived
@@ -1020,6 +1179,16 @@ export function PharmacyOrdersPanel({ canEdit }: { canEdit: boolean }) {
               </tbody>
             </table>
           </div>
+          {hasNextPage ? (
+            <button
+              type="button"
+              onClick={() => void fetchNextPage()}
+              disabled={isFetchingNextPage}
+              className="rounded-md border border-slate-700 px-4 py-2 text-sm font-semibold text-slate-200 transition hover:bg-slate-800 disabled:cursor-not-allowed disabled:opacity-60"
+            >
+              {isFetchingNextPage ? "Chargement..." : "Charger plus"}
+            </button>
+          ) : null}
           {isLoading ? <p className="text-sm text-slate-400">Chargement...</p> : null}
         </div>
 
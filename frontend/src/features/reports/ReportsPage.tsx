@@ -57,6 +57,11 @@ interface ReportLowStockSeriesPoint {
   count: number;
 }
 
+interface ReportStockSeriesPoint {
+  t: string;
+  quantity: number;
+}
+
 interface ReportOrderSeriesPoint {
   t: string;
   created: number;
@@ -87,6 +92,7 @@ interface ReportOverview {
     moves: ReportMoveSeriesPoint[];
     net: ReportNetSeriesPoint[];
     low_stock: ReportLowStockSeriesPoint[];
+    stock?: ReportStockSeriesPoint[];
     orders: ReportOrderSeriesPoint[];
   };
   tops: {
@@ -161,6 +161,13 @@ class PharmacyInventoryManager:
             ON pharmacy_inventory(item_id)
             """
         )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_pharmacy_expiration_day
+            ON pharmacy_inventory(date(expiration_date))
+            WHERE expiration_date IS NOT NULL
+            """
+        )
 
     def ensure_schema(
         self,
@@ -548,12 +555,15 @@ class PharmacyInventoryManager:
                 self._ensure_inventory_schema(inv_cursor)
                 self._ensure_items_schema(items_cursor)
                 inv_cursor.execute(
-                    """
+                    f"""
                     SELECT id, item_id, lot_number, expiration_date, quantity,
                            storage_condition, prescription_required
                       FROM pharmacy_inventory
                      WHERE expiration_date IS NOT NULL
-                    """
+                       AND date(expiration_date) <= ?
+                       {"" if include_empty else "AND quantity > 0"}
+                    """,
+                    (cutoff.isoformat(),),
                 )
                 rows = inv_cursor.fetchall()
                 item_ids = {row[1] for row in rows}
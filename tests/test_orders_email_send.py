@@ -10,6 +10,7 @@ if str(ROOT) not in sys.path:
 
 from backend.app import app
 from backend.core import db, security, services
+from backend.services import notifications
 from backend.tests.auth_helpers import login_headers
 
 client = TestClient(app)
@@ -20,6 +21,7 @@ def _reset_tables() -> None:
     with db.get_core_connection() as conn:
         conn.execute("DELETE FROM purchase_order_email_log")
         conn.execute("DELETE FROM purchase_order_audit_log")
+        conn.execute("DELETE FROM email_outbox")
         conn.commit()
     with db.get_stock_connection() as conn:
         conn.execute("DELETE FROM pharmacy_purchase_order_items")
@@ -123,15 +125,16 @@ def test_send_remise_order_uses_supplier_email() -> None:
     assert response.status_code == 201, response.text
     order_id = response.json()["id"]
 
-    with patch("backend.core.services.email_sender.send_email") as send_email:
+    with patch("backend.services.email_sender.send_email") as send_email:
         send_email.return_value = "msg-remise"
         response = client.post(
             f"/remise-inventory/orders/{order_id}/send-to-supplier",
             headers=headers,
             json={},
         )
+        notifications.run_outbox_once()
 
-    assert response.status_code == 200, response.text
+    assert response.status_code == 202, response.text
     assert send_email.call_args.args[0] == "remise@test.fr"
 
 
@@ -161,14 +164,15 @@ def test_send_pharmacy_order_uses_supplier_email() -> None:
     assert response.status_code == 201, response.text
     order_id = response.json()["id"]
 
-    with patch("backend.core.services.email_sender.send_email") as send_email:
+    with patch("backend.services.email_sender.send_email") as send_email:
         send_email.return_value = "msg-pharma"
         response = client.post(
             f"/pharmacy/orders/{order_id}/send-to-supplier",
             headers=headers,
         )
+        notifications.run_outbox_once()
 
-    assert response.status_code == 200, response.text
+    assert response.status_code == 202, response.text
     assert send_email.call_args.args[0] == "pharma@test.fr"
 
 
@@ -98,3 +98,69 @@ def test_sync_skips_remise_item_without_sku(temp_backend_db, caplog):
         "[SYNC] skipping remise item without sku" in record.message
         for record in caplog.records
     )
+
+
+def test_remise_changes_are_queued_and_synced(temp_backend_db):
+    _, remise_item = _create_vehicle_context()
+
+    with db.get_stock_connection() as conn:
+        template = conn.execute(
+            "SELECT name FROM vehicle_items WHERE remise_item_id = ? AND category_id IS NULL",
+            (remise_item.id,),
+        ).fetchone()
+        assert template is not None
+        conn.execute(
+            "UPDATE remise_items SET name = ? WHERE id = ?",
+            ("Valise renommée", remise_item.id),
+        )
+        queued = conn.execute(
+            "SELECT remise_item_id FROM vehicle_remise_sync_queue"
+        ).fetchall()
+        assert [row["remise_item_id"] for row in queued] == [remise_item.id]
+        assert services._process_vehicle_remise_sync_queue(conn) == 1
+        renamed = conn.execute(
+            "SELECT name FROM vehicle_items WHERE remise_item_id = ?",
+            (remise_item.id,),
+        ).fetchone()
+        remaining = conn.execute(
+            "SELECT COUNT(*) AS count FROM vehicle_remise_sync_queue"
+        ).fetchone()
+
+    assert renamed["name"] == "Valise renommée"
+    assert remaining["count"] == 0
+
+    services.delete_remise_item(remise_item.id)
+    with db.get_stock_connection() as conn:
+        leftover = conn.execute(
+            "SELECT 1 FROM vehicle_items WHERE remise_item_id = ?",
+            (remise_item.id,),
+        ).fetchone()
+    assert leftover is None
+
+
+def test_full_reconcile_removes_orphaned_vehicle_items(temp_backend_db):
+    _, remise_item = _create_vehicle_context()
+    with db.get_stock_connection() as conn:
+        conn.execute(
+            """
+            INSERT INTO vehicle_items (name, sku, category_id, quantity, remise_item_id)
+            VALUES (?, ?, NULL, 0, ?)
+            """,
+            ("Orphelin", f"ORPH-{uuid4().hex[:6]}", remise_item.id + 1000),
+        )
+
+    result = services.reconcile_vehicle_inventory_with_remise()
+
+    assert result["orphans_deleted"] == 1
+    assert result["synced"] >= 1
+    with db.get_stock_connection() as conn:
+        orphan = conn.execute(
+            "SELECT 1 FROM vehicle_items WHERE remise_item_id = ?",
+            (remise_item.id + 1000,),
+        ).fetchone()
+        kept = conn.execute(
+            "SELECT 1 FROM vehicle_items WHERE remise_item_id = ?",
+            (remise_item.id,),
+        ).fetchone()
+    assert orphan is None
+    assert kept is not None